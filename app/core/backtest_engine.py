@@ -13,8 +13,37 @@ from app.models.position import Position
 # Import Strategy base class from the correct file
 from app.strategies.base.strategy import Strategy 
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional, the kernels below also run as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
 logger = logging.getLogger(__name__)
 
+ENGINE_MODES = ("reference", "fast")
+
+
+@njit(cache=True)
+def _next_entry_index(entry: np.ndarray, stop_loss: np.ndarray, close: np.ndarray, start: int) -> int:
+    """First bar >= start with an entry signal and a valid (non-NaN, below close) stop, or -1."""
+    for i in range(start, entry.shape[0]):
+        if entry[i] and not np.isnan(stop_loss[i]) and not stop_loss[i] >= close[i]:
+            return i
+    return -1
+
+
+@njit(cache=True)
+def _next_exit_index(exit_signal: np.ndarray, stop_reference: np.ndarray, stop_price: float, start: int) -> int:
+    """First bar >= start with an exit signal or the stop reference at/below the stop, or -1."""
+    for i in range(start, exit_signal.shape[0]):
+        if exit_signal[i] or stop_reference[i] <= stop_price:
+            return i
+    return -1
+
+
 class BacktestEngine:
     """
     A backtesting engine that simulates trading with historical data,
@@ -26,7 +55,8 @@ class BacktestEngine:
                  strategy: Strategy, # Add strategy object
                  initial_balance: float = 10000.0,
                  trading_fee: float = 0.001, 
-                 slippage_std: float = 0.001):
+                 slippage_std: float = 0.001,
+                 mode: str = "reference"):
         """
         Initialize the backtest engine.
         
@@ -36,7 +66,13 @@ class BacktestEngine:
             initial_balance: Starting account balance
             trading_fee: Fee per trade as a decimal (e.g., 0.001 for 0.1%)
             slippage_std: Standard deviation for slippage simulation
+            mode: 'reference' runs the per-row loop; 'fast' scans contiguous signal arrays
+                  for the next order with compiled kernels (requires strategy.get_signal_arrays,
+                  otherwise falls back to 'reference')
         """
+        if mode not in ENGINE_MODES:
+            raise ValueError(f"Unknown engine mode '{mode}', expected one of {ENGINE_MODES}")
+        self.mode = mode
         self.data = historical_data.copy()
         self.strategy = strategy
         self.initial_balance = initial_balance
@@ -52,7 +88,7 @@ class BacktestEngine:
         # Performance tracking
         self.portfolio_values = pd.Series(index=self.data.index, dtype=float)
         self.portfolio_values.iloc[0] = initial_balance
-        self.trades: List[Order] = []
+        self.trades: List[OrderBase] = []
         
         # --- Pre-calculate signals --- 
         print("Calculating strategy signals...")
@@ -282,7 +318,126 @@ class BacktestEngine:
              pass 
 
     def run(self):
-        """Run the backtest simulation."""
+        """Run the backtest simulation in the configured mode."""
+        if self.mode == "fast" and self._run_fast():
+            return
+        self._run_reference()
+
+    def _run_fast(self) -> bool:
+        """
+        Array-based event loop producing the same orders and portfolio values as _run_reference.
+
+        Signal/stop columns are extracted once into contiguous arrays. Compiled kernels jump
+        straight to the next bar where an order can happen; orders themselves still go through
+        execute_market_order (same slippage draws, fees and strategy state updates), and the
+        portfolio values of the bars in between are filled in one vectorized step.
+
+        Returns:
+            bool: False if the strategy does not provide signal arrays (nothing was run)
+        """
+        arrays = self.strategy.get_signal_arrays(self.data_with_signals)
+        if arrays is None:
+            logger.info(f"{type(self.strategy).__name__} does not provide signal arrays, using the reference loop")
+            return False
+
+        n = len(self.data_with_signals)
+        print(f"Running backtest (fast path) for {n} periods...")
+        close = self.data_with_signals['close'].to_numpy(dtype=float)
+        mtm_close = self.data['close'].to_numpy(dtype=float)
+        entry = np.ascontiguousarray(arrays['entry'], dtype=np.bool_)
+        exit_signal = np.ascontiguousarray(arrays['exit'], dtype=np.bool_)
+        stop_reference = np.ascontiguousarray(arrays.get('stop_reference', close), dtype=float)
+        if 'stop_loss' in self.data_with_signals.columns:
+            stop_loss = self.data_with_signals['stop_loss'].to_numpy(dtype=float)
+        else:
+            stop_loss = np.full(n, np.nan)
+        regimes = self.data_with_signals['regime'].to_numpy() if 'regime' in self.data_with_signals.columns else None
+        timestamps = self.data_with_signals.index
+        values = self.portfolio_values.to_numpy(dtype=float, copy=True)
+
+        i = max(self.first_valid_index, 0)
+        last_flat_index = None
+        while i < n:
+            in_position = self.strategy.state.is_in_position
+            if in_position:
+                stop_price = self.strategy.state.trailing_stop_price
+                j = _next_exit_index(exit_signal, stop_reference,
+                                     -np.inf if stop_price is None else float(stop_price), i)
+            else:
+                j = _next_entry_index(entry, stop_loss, close, i)
+
+            # Bars without orders: value is cash plus the unchanged position marked to market
+            end = n if j < 0 else j
+            if end > i:
+                values[i:end] = self._portfolio_values_for(mtm_close[i:end])
+                if not in_position:
+                    last_flat_index = self._last_regime_update_index(entry, stop_loss, close, i, end, last_flat_index)
+            if j < 0:
+                break
+
+            self.current_index = j
+            current_price = close[j]
+            if in_position:
+                if self.position_size > 0:
+                    self.execute_market_order(quantity=self.position_size, price=current_price, side='sell')
+            else:
+                initial_stop_loss_price = stop_loss[j]
+                position_size = self.strategy.calculate_position_size(
+                    account_balance=self.available_balance,
+                    entry_price=current_price,
+                    stop_loss_price=initial_stop_loss_price
+                )
+                if position_size > 0:
+                    order = self.execute_market_order(quantity=position_size, price=current_price, side='buy')
+                    if order.status == OrderStatus.FILLED:
+                        self.strategy.update_state(timestamp=timestamps[j],
+                                                   is_in_position=True,
+                                                   position_size=self.position_size,
+                                                   entry_price=self.position.entry_price,
+                                                   regime=regimes[j] if regimes is not None else None,
+                                                   trailing_stop_price=initial_stop_loss_price)
+                else:
+                    print(f"Warning: Calculated position size is {position_size:.4f}. Skipping trade.")
+
+            values[j] = self._portfolio_values_for(mtm_close[j:j + 1])[0]
+            if not self.strategy.state.is_in_position:
+                last_flat_index = j
+            i = j + 1
+
+        # The reference loop refreshes the regime on every flat bar; only the last one is observable
+        if regimes is not None and last_flat_index is not None and not self.strategy.state.is_in_position:
+            self.strategy.update_state(timestamp=timestamps[last_flat_index],
+                                       is_in_position=False,
+                                       position_size=self.strategy.state.current_position_size,
+                                       entry_price=self.strategy.state.entry_price,
+                                       regime=regimes[last_flat_index])
+
+        self.portfolio_values = pd.Series(values, index=self.portfolio_values.index, dtype=float)
+        print("Backtest finished.")
+        self.portfolio_values.ffill(inplace=True)
+        return True
+
+    def _portfolio_values_for(self, closes: np.ndarray) -> np.ndarray:
+        """Portfolio value (cash + position at the given closes), as update_portfolio_value computes it."""
+        if self.position_size != 0 and self.position is not None:
+            return self.available_balance + self.position_size * closes
+        return np.full(closes.shape[0], self.available_balance, dtype=float)
+
+    @staticmethod
+    def _last_regime_update_index(entry: np.ndarray, stop_loss: np.ndarray, close: np.ndarray,
+                                  start: int, end: int, previous: Optional[int]) -> Optional[int]:
+        """
+        Last flat bar in [start, end) where the reference loop would refresh the regime.
+
+        Entry signals with an invalid stop skip that refresh in the reference loop.
+        """
+        with np.errstate(invalid='ignore'):
+            skipped = entry[start:end] & (np.isnan(stop_loss[start:end]) | (stop_loss[start:end] >= close[start:end]))
+        updated = np.flatnonzero(~skipped)
+        return start + int(updated[-1]) if updated.size else previous
+
+    def _run_reference(self):
+        """Per-row reference loop: one pandas row and strategy call per bar."""
         print(f"Running backtest for {len(self.data_with_signals)} periods...")
         
         # Skip initial periods where indicators might be NaN
@@ -0,0 +1,221 @@
+"""
+Non-blocking fan-out of market data to browser websocket clients.
+
+publish() serializes a message once and offers the payload to every client's outbound
+buffer without awaiting any socket. Each client has its own sender task, so a slow browser
+only delays itself. While a client is behind, pending tickers are conflated to the latest
+one per product. A client is evicted (its socket closed with 1013 "try again later") when
+its buffer exceeds max_pending messages or its oldest unsent message is older than max_lag.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, FrozenSet, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+
+    def _dumps(message: Any) -> str:
+        return orjson.dumps(message).decode()
+except ImportError:  # optional speedup
+    def _dumps(message: Any) -> str:
+        return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+DEFAULT_MAX_PENDING = 1_000
+DEFAULT_MAX_LAG = 5.0  # seconds
+DEFAULT_CONFLATE_TYPES: FrozenSet[str] = frozenset({"ticker"})
+EVICT_CLOSE_CODE = 1013  # try again later
+LATENCY_SAMPLES = 10_000
+
+
+class ClientChannel:
+    """Outbound buffer and sender task for one client."""
+
+    __slots__ = ('websocket', 'pending', 'wakeup', 'task', 'sent', 'conflated', 'closed', 'inflight_since')
+
+    def __init__(self, websocket: Any):
+        self.websocket = websocket
+        # key -> (first_published_at, published_at, payload); first_published_at survives conflation
+        self.pending: "OrderedDict[Any, tuple]" = OrderedDict()
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.conflated = 0
+        self.closed = False
+        self.inflight_since: Optional[float] = None  # first publish time of the message being sent
+
+    def offer(self, key: Any, payload: str, published_at: float) -> None:
+        entry = self.pending.get(key)
+        if entry is not None:
+            self.pending[key] = (entry[0], published_at, payload)
+            self.conflated += 1
+        else:
+            self.pending[key] = (published_at, published_at, payload)
+        if not self.wakeup.is_set():
+            self.wakeup.set()
+
+    def oldest_age(self, now: float) -> float:
+        if self.inflight_since is not None:
+            return now - self.inflight_since
+        if not self.pending:
+            return 0.0
+        return now - next(iter(self.pending.values()))[0]
+
+
+class Broadcaster:
+    """Per-client outbound queues with conflation, concurrent fan-out and slow-client eviction."""
+
+    def __init__(self,
+                 max_pending: int = DEFAULT_MAX_PENDING,
+                 max_lag: float = DEFAULT_MAX_LAG,
+                 conflate_types: FrozenSet[str] = DEFAULT_CONFLATE_TYPES,
+                 on_evict: Optional[Callable[[Any], None]] = None):
+        """
+        Args:
+            max_pending: Unsent messages at which a client is evicted
+            max_lag: Age (seconds) of a client's oldest unsent message at which it is evicted
+            conflate_types: Message types keyed by (type, product_id), keeping only the latest
+            on_evict: Called with the websocket of each client dropped for lagging or a failed send
+        """
+        self.max_pending = max_pending
+        self.max_lag = max_lag
+        self.conflate_types = frozenset(conflate_types)
+        self.on_evict = on_evict
+        self.clients: Dict[Any, ClientChannel] = {}
+        self._seq = 0
+        self.published = 0
+        self.evicted = 0
+        self.sent = 0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    # --- Client lifecycle ---
+
+    def register(self, websocket: Any) -> ClientChannel:
+        """Start a sender task for an accepted websocket."""
+        channel = self.clients.get(websocket)
+        if channel is None:
+            channel = ClientChannel(websocket)
+            channel.task = asyncio.create_task(self._sender(channel))
+            self.clients[websocket] = channel
+        return channel
+
+    def unregister(self, websocket: Any) -> None:
+        """Stop sending to a websocket (does not close it)."""
+        channel = self.clients.pop(websocket, None)
+        if channel is not None:
+            channel.closed = True
+            if channel.task is not None:
+                channel.task.cancel()
+
+    def _evict(self, channel: ClientChannel, reason: str) -> None:
+        logger.warning(f"Evicting slow websocket client ({reason}; {len(channel.pending)} pending)")
+        self.evicted += 1
+        self.unregister(channel.websocket)
+        asyncio.create_task(self._close(channel.websocket))
+        if self.on_evict is not None:
+            try:
+                self.on_evict(channel.websocket)
+            except Exception as e:
+                logger.error(f"Error in on_evict callback: {e}", exc_info=True)
+
+    @staticmethod
+    async def _close(websocket: Any) -> None:
+        try:
+            await asyncio.wait_for(websocket.close(code=EVICT_CLOSE_CODE), timeout=1.0)
+        except Exception:  # the client is already unresponsive
+            pass
+
+    # --- Fan-out ---
+
+    def _key(self, message: Dict) -> Any:
+        message_type = message.get("type")
+        if message_type in self.conflate_types and message.get("product_id") is not None:
+            return (message_type, message["product_id"])
+        self._seq += 1
+        return self._seq
+
+    def publish(self, message: Dict) -> int:
+        """
+        Serialize a message once and queue it for every client. Never awaits a socket.
+
+        Returns:
+            Number of clients the message was queued for
+        """
+        if not self.clients:
+            return 0
+        payload = _dumps(message)
+        key = self._key(message)
+        now = time.perf_counter()
+        self.published += 1
+        slow = []
+        for channel in self.clients.values():
+            channel.offer(key, payload, now)
+            if len(channel.pending) > self.max_pending or channel.oldest_age(now) > self.max_lag:
+                slow.append(channel)
+        for channel in slow:
+            self._evict(channel, "lagging" if len(channel.pending) <= self.max_pending else "buffer full")
+        return len(self.clients)
+
+    def send_to(self, websocket: Any, message: Dict) -> bool:
+        """Queue a message for a single registered client."""
+        channel = self.clients.get(websocket)
+        if channel is None:
+            return False
+        channel.offer(self._key(message), _dumps(message), time.perf_counter())
+        return True
+
+    async def _sender(self, channel: ClientChannel) -> None:
+        websocket = channel.websocket
+        try:
+            while True:
+                await channel.wakeup.wait()
+                channel.wakeup.clear()
+                while channel.pending:
+                    _, (first_published_at, published_at, payload) = channel.pending.popitem(last=False)
+                    channel.inflight_since = first_published_at
+                    await websocket.send_text(payload)
+                    channel.inflight_since = None
+                    channel.sent += 1
+                    self.sent += 1
+                    self.latencies.append(time.perf_counter() - published_at)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.info(f"Websocket send failed, dropping client: {e}")
+            if not channel.closed:
+                self.unregister(websocket)
+                if self.on_evict is not None:
+                    self.on_evict(websocket)
+
+    async def close(self) -> None:
+        """Stop every sender task."""
+        channels = list(self.clients.values())
+        for channel in channels:
+            self.unregister(channel.websocket)
+        await asyncio.gather(*(c.task for c in channels if c.task is not None), return_exceptions=True)
+
+    # --- Metrics ---
+
+    def stats(self) -> Dict[str, Any]:
+        """Client count, counters and publish-to-send latency over recent sends."""
+        latencies = sorted(self.latencies)
+
+        def pct(q: float) -> float:
+            return latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000.0 if latencies else 0.0
+
+        now = time.perf_counter()
+        return {
+            'clients': len(self.clients),
+            'published': self.published,
+            'sent': self.sent,
+            'conflated': sum(c.conflated for c in self.clients.values()),
+            'evicted': self.evicted,
+            'max_pending': max((len(c.pending) for c in self.clients.values()), default=0),
+            'max_lag_ms': max((c.oldest_age(now) for c in self.clients.values()), default=0.0) * 1000.0,
+            'latency_p50_ms': pct(0.50),
+            'latency_p99_ms': pct(0.99),
+        }
@@ -38,6 +38,10 @@ class Settings(BaseSettings):
     
     # Run Mode
     DRY_RUN_MODE: bool = False # Set to True to simulate orders without real execution
+
+    # Multi-product runtime fed from the websocket ticker stream (decisions are broadcast, not traded)
+    LIVE_RUNTIME_ENABLED: bool = False
+    LIVE_RUNTIME_PRODUCTS: Optional[str] = None # Comma-separated product ids; defaults to the websocket products
     
     # Database Settings (for future use)
     DATABASE_URL: Optional[str] = None
@@ -54,6 +58,9 @@ class Settings(BaseSettings):
         if 'DEBUG' in data and isinstance(data['DEBUG'], str):
             data['DEBUG'] = data['DEBUG'].lower() in ('true', 't', 'yes', 'y', '1')
             
+        if 'LIVE_RUNTIME_ENABLED' in data and isinstance(data['LIVE_RUNTIME_ENABLED'], str):
+            data['LIVE_RUNTIME_ENABLED'] = data['LIVE_RUNTIME_ENABLED'].lower() in ('true', 't', 'yes', 'y', '1')
+
         # Add other boolean parsing if needed
             
         return data
@@ -1,9 +1,11 @@
 import os
+import time
 import logging
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy import create_engine, select, func, desc
+from sqlalchemy import create_engine, select, func, desc, insert, update, bindparam, event, literal_column
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 # Use updated paths
@@ -11,7 +13,8 @@ from app.core.database.database import SessionLocal # Assuming database.py is he
 from app.core.database.models import Candle, Zone, Base
 from app.core.data_processor import OHLCVProcessor
 from app.core.zone_detector import detect_base_patterns
-from typing import List, Dict, Optional
+from app.core.zone_index import ZoneIndex
+from typing import List, Dict, Optional, Tuple
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,14 +33,123 @@ TIMEFRAME_TO_GRANULARITY = {
 # Reverse mapping for convenience if needed
 GRANULARITY_TO_TIMEFRAME = {v: k for k, v in TIMEFRAME_TO_GRANULARITY.items()}
 
+# Bulk ingestion settings
+OHLCV_VALUE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+CANDLE_KEY_COLUMNS = ['symbol', 'granularity', 'timestamp']
+DEFAULT_UPSERT_CHUNK_SIZE = 5000
+DEFAULT_READ_CHUNK_SIZE = 20000
+ON_CONFLICT_MODES = ('ignore', 'update')
+
+# Zone status write-behind: pending touches/deactivations are flushed after this many
+# seconds or zones, on close_session(), and before any ORM read of zones on the session
+DEFAULT_ZONE_FLUSH_INTERVAL = 1.0
+DEFAULT_ZONE_FLUSH_MAX_PENDING = 500
+
+
+def ohlcv_frame_to_records(df: pd.DataFrame, symbol: str, api_granularity: str,
+                           min_timestamp: Optional[int] = None) -> Tuple[List[Dict], int]:
+    """Converts an OHLCV DataFrame column-wise into candle row dictionaries.
+
+    Rows with any NaN are dropped (as the per-row path did), timestamps are converted to
+    Unix seconds in one vectorized step and duplicate timestamps keep the last row.
+
+    Args:
+        df: DataFrame with 'timestamp' (datetime) and OHLCV columns.
+        symbol: The trading pair symbol.
+        api_granularity: API granularity string stored with each candle.
+        min_timestamp: Optional lower bound (Unix seconds) for candles to keep.
+
+    Returns:
+        Tuple of (list of row dicts ordered by timestamp, number of rows dropped as invalid).
+    """
+    valid = df.loc[~df.isnull().any(axis=1)]
+    invalid_count = len(df) - len(valid)
+    if valid.empty:
+        return [], invalid_count
+
+    timestamps = pd.to_datetime(valid['timestamp'], utc=True)
+    unix_seconds = ((timestamps - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)).astype('int64')
+    frame = pd.DataFrame({'timestamp': unix_seconds.to_numpy()})
+    for col in OHLCV_VALUE_COLUMNS:
+        frame[col] = valid[col].to_numpy(dtype=float)
+    if min_timestamp is not None:
+        frame = frame.loc[frame['timestamp'] >= min_timestamp]
+    frame = frame.drop_duplicates(subset='timestamp', keep='last').sort_values('timestamp')
+
+    columns = {col: frame[col].tolist() for col in frame.columns}
+    n_rows = len(frame)
+    symbols = [symbol] * n_rows
+    granularities = [api_granularity] * n_rows
+    records = [
+        {'symbol': sym, 'granularity': gran, 'timestamp': ts,
+         'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+        for sym, gran, ts, o, h, l, c, v in zip(
+            symbols, granularities, columns['timestamp'], columns['open'], columns['high'],
+            columns['low'], columns['close'], columns['volume']
+        )
+    ]
+    return records, invalid_count
+
+
+def build_candle_upsert(dialect_name: str, on_conflict: str = 'ignore'):
+    """Builds a dialect-aware INSERT ... ON CONFLICT statement for the candles table.
+
+    Args:
+        dialect_name: SQLAlchemy dialect name ('sqlite', 'postgresql', 'mysql', ...).
+        on_conflict: 'ignore' keeps existing candles, 'update' overwrites their OHLCV values.
+
+    Returns:
+        An executable insert statement, or None if the dialect has no native upsert.
+    """
+    table = Candle.__table__
+    if dialect_name in ('sqlite', 'postgresql'):
+        if dialect_name == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table)
+        if on_conflict == 'update':
+            return stmt.on_conflict_do_update(
+                index_elements=CANDLE_KEY_COLUMNS,
+                set_={col: stmt.excluded[col] for col in OHLCV_VALUE_COLUMNS}
+            )
+        return stmt.on_conflict_do_nothing(index_elements=CANDLE_KEY_COLUMNS)
+
+    if dialect_name in ('mysql', 'mariadb'):
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        stmt = dialect_insert(table)
+        if on_conflict == 'update':
+            return stmt.on_duplicate_key_update({col: stmt.inserted[col] for col in OHLCV_VALUE_COLUMNS})
+        return stmt.prefix_with('IGNORE')
+
+    return None
+
 class DataManager:
     """Handles fetching, storing, and retrieving OHLCV data using OHLCVProcessor."""
 
-    def __init__(self, db_session: Session = SessionLocal()):
-        """Initializes the DataManager with a database session."""
-        self.db = db_session
+    def __init__(self, db_session: Optional[Session] = None,
+                 zone_flush_interval: float = DEFAULT_ZONE_FLUSH_INTERVAL,
+                 zone_flush_max_pending: int = DEFAULT_ZONE_FLUSH_MAX_PENDING):
+        """Initializes the DataManager with a database session.
+
+        Args:
+            db_session: SQLAlchemy session to use. Defaults to a new SessionLocal() session
+                per instance; the zone flush hook is registered on it (and removed again by
+                close_session), so managers must not share a default session.
+            zone_flush_interval: Seconds zone status updates may stay unwritten.
+            zone_flush_max_pending: Pending zone updates that force a flush.
+        """
+        self.db = db_session if db_session is not None else SessionLocal()
         # Use OHLCVProcessor for fetching and processing
         self.processor = OHLCVProcessor()
+        # Active zones are matched against candles in memory; see update_zone_status
+        self.zone_index = ZoneIndex()
+        self.zone_flush_interval = zone_flush_interval
+        self.zone_flush_max_pending = zone_flush_max_pending
+        self._zone_last_flush = time.monotonic()
+        event.listen(self.db, 'do_orm_execute', self._flush_zones_before_read)
+        event.listen(self.db, 'after_commit', self._zones_committed)
+        event.listen(self.db, 'after_rollback', self._zones_rolled_back)
 
     def _get_api_granularity(self, timeframe: str) -> Optional[str]:
         """Helper to get the API granularity string from a timeframe string."""
@@ -48,7 +160,132 @@ class DataManager:
             logger.error(f"Invalid timeframe '{timeframe}' provided.")
         return api_granularity
 
-    def store_historical_ohlcv(self, symbol: str, timeframe: str, start_unix: int, end_unix: int):
+    def _update_candles(self, rows: List[Dict]):
+        """Overwrites the OHLCV values of already stored candles in one executemany UPDATE."""
+        if not rows:
+            return
+        table = Candle.__table__
+        stmt = (
+            update(table)
+            .where(table.c.symbol == bindparam('b_symbol'),
+                   table.c.granularity == bindparam('b_granularity'),
+                   table.c.timestamp == bindparam('b_timestamp'))
+            .values({col: bindparam(f'b_{col}') for col in OHLCV_VALUE_COLUMNS})
+        )
+        self.db.connection().execute(stmt, [{f'b_{k}': v for k, v in r.items()} for r in rows])
+
+    def _write_candle_chunk_fallback(self, chunk: List[Dict], on_conflict: str) -> int:
+        """Writes a chunk on dialects without native upsert: insert new keys, optionally update the rest.
+
+        Returns:
+            Number of candles inserted.
+        """
+        symbol, api_granularity = chunk[0]['symbol'], chunk[0]['granularity']
+        existing = set(self.db.execute(
+            select(Candle.timestamp).where(
+                Candle.symbol == symbol,
+                Candle.granularity == api_granularity,
+                Candle.timestamp.in_([r['timestamp'] for r in chunk])
+            )
+        ).scalars())
+        new_rows = [r for r in chunk if r['timestamp'] not in existing]
+        if new_rows:
+            self.db.execute(insert(Candle.__table__), new_rows)
+        if on_conflict == 'update':
+            self._update_candles([r for r in chunk if r['timestamp'] in existing])
+        return len(new_rows)
+
+    def _write_candle_chunk(self, chunk: List[Dict], on_conflict: str) -> int:
+        """Writes a chunk with the dialect's native upsert.
+
+        The number of new candles comes from the write itself (RETURNING on PostgreSQL and
+        SQLite, the affected-row count otherwise) instead of counting stored rows around it.
+
+        Returns:
+            Number of candles inserted.
+        """
+        dialect = self.db.get_bind().dialect
+        if dialect.name == 'postgresql':
+            # xmax is 0 for rows the statement inserted, set for rows it updated
+            stmt = build_candle_upsert(dialect.name, on_conflict).returning(
+                literal_column('xmax = 0').label('inserted'))
+            return sum(1 for inserted in self.db.execute(stmt, chunk).scalars() if inserted)
+
+        ignore_stmt = build_candle_upsert(dialect.name, 'ignore')
+        if ignore_stmt is None:
+            return self._write_candle_chunk_fallback(chunk, on_conflict)
+        if dialect.name == 'sqlite' and dialect.insert_executemany_returning:
+            # DO NOTHING returns only the rows it inserted
+            new_keys = set(self.db.execute(ignore_stmt.returning(Candle.__table__.c.timestamp), chunk).scalars())
+            if on_conflict == 'update':
+                self._update_candles([r for r in chunk if r['timestamp'] not in new_keys])
+            return len(new_keys)
+
+        # Skipped duplicates do not count as affected rows
+        inserted = self.db.execute(ignore_stmt, chunk).rowcount
+        if on_conflict == 'update':
+            # Which rows were new is not known here; rewriting them with the same values is harmless
+            self._update_candles(chunk)
+        return inserted
+
+    def bulk_upsert_ohlcv(self, df: pd.DataFrame, symbol: str, api_granularity: str,
+                          on_conflict: str = 'ignore', chunk_size: int = DEFAULT_UPSERT_CHUNK_SIZE,
+                          min_timestamp: Optional[int] = None) -> Dict[str, int]:
+        """Stores an OHLCV DataFrame with chunked, dialect-aware INSERT ... ON CONFLICT batches.
+
+        Duplicates of already stored candles are skipped (or overwritten with on_conflict='update')
+        instead of failing the whole batch. Each chunk is committed on its own, so an error in
+        one chunk does not discard the others.
+
+        Args:
+            df: DataFrame with 'timestamp' (datetime) and OHLCV columns.
+            symbol: The trading pair symbol.
+            api_granularity: API granularity string stored with each candle.
+            on_conflict: 'ignore' to keep existing candles, 'update' to overwrite them.
+            chunk_size: Number of rows per executemany batch.
+            min_timestamp: Optional lower bound (Unix seconds) for candles to store.
+
+        Returns:
+            Dict with 'inserted', 'updated', 'skipped' (existing candles left unchanged),
+            'invalid' (rows with NaNs) and 'failed' (rows in chunks that errored) counts.
+        """
+        if on_conflict not in ON_CONFLICT_MODES:
+            raise ValueError(f"on_conflict must be one of {ON_CONFLICT_MODES}, got '{on_conflict}'")
+
+        records, invalid_count = ohlcv_frame_to_records(df, symbol, api_granularity, min_timestamp)
+        counts = {'inserted': 0, 'updated': 0, 'skipped': 0, 'invalid': invalid_count, 'failed': 0}
+        if invalid_count:
+            logger.warning(f"Skipping {invalid_count} rows with NaN values for {symbol} ({api_granularity}).")
+        if not records:
+            return counts
+
+        dialect_name = self.db.get_bind().dialect.name
+        if build_candle_upsert(dialect_name, on_conflict) is None:
+            logger.debug(f"No native upsert for dialect '{dialect_name}', using existence check per chunk.")
+
+        for start in range(0, len(records), max(chunk_size, 1)):
+            chunk = records[start:start + chunk_size]
+            first_ts, last_ts = chunk[0]['timestamp'], chunk[-1]['timestamp']
+            try:
+                inserted = self._write_candle_chunk(chunk, on_conflict)
+                self.db.commit()
+            except SQLAlchemyError as e:
+                self.db.rollback()
+                counts['failed'] += len(chunk)
+                logger.error(f"Error storing candle chunk {first_ts}-{last_ts} for {symbol} ({api_granularity}): {e}")
+                continue
+
+            counts['inserted'] += inserted
+            if on_conflict == 'update':
+                counts['updated'] += len(chunk) - inserted
+            else:
+                counts['skipped'] += len(chunk) - inserted
+
+        return counts
+
+    def store_historical_ohlcv(self, symbol: str, timeframe: str, start_unix: int, end_unix: int,
+                               on_conflict: str = 'ignore',
+                               chunk_size: int = DEFAULT_UPSERT_CHUNK_SIZE) -> Optional[Dict[str, int]]:
         """Fetches historical OHLCV data using OHLCVProcessor and stores it.
 
         Args:
@@ -56,6 +293,11 @@ class DataManager:
             timeframe: The candle timeframe string (e.g., '1h', '15m').
             start_unix: The start timestamp in Unix seconds.
             end_unix: The end timestamp in Unix seconds.
+            on_conflict: 'ignore' to skip candles already stored, 'update' to overwrite them.
+            chunk_size: Number of rows per insert batch.
+
+        Returns:
+            Counts from bulk_upsert_ohlcv, or None if nothing was fetched or an error occurred.
         """
         api_granularity = self._get_api_granularity(timeframe)
         if not api_granularity:
@@ -78,45 +320,13 @@ class DataManager:
                 logger.warning(f"No data returned or processed for {symbol} ({timeframe}) in the specified range.")
                 return
 
-            candles_to_store = []
-            # Iterate over DataFrame rows
-            for _, row in df.iterrows():
-                # Check for NaNs which might result from processing/cleaning
-                if row.isnull().any():
-                    logger.warning(f"Skipping row due to NaN values: {row.to_dict()}")
-                    continue
-
-                # Timestamp from DataFrame is already timezone-aware datetime
-                candle_timestamp = int(row['timestamp'].timestamp())
-
-                candle_obj = Candle(
-                    symbol=symbol,
-                    granularity=api_granularity, # Store the API granularity string
-                    timestamp=candle_timestamp,
-                    open=float(row['open']),
-                    high=float(row['high']),
-                    low=float(row['low']),
-                    close=float(row['close']),
-                    volume=float(row['volume'])
-                )
-                candles_to_store.append(candle_obj)
-
-            if not candles_to_store:
-                 logger.warning(f"No valid candle objects created from DataFrame for {symbol} ({timeframe}).")
-                 return
-
-            logger.info(f"Attempting to store {len(candles_to_store)} candles for {symbol} ({timeframe}).")
-
-            # Add all candle objects to the session
-            self.db.add_all(candles_to_store)
-            # Commit the session to save changes to the database
-            self.db.commit()
-            logger.info(f"Successfully stored {len(candles_to_store)} candles.")
-
-        except IntegrityError as e:
-            self.db.rollback() # Rollback the transaction on integrity error
-            logger.warning(f"IntegrityError storing data for {symbol} ({timeframe}): {e}. "
-                           f"This likely means some fetched candles already exist in the DB. Skipping duplicates.")
+            logger.info(f"Attempting to store {len(df)} candles for {symbol} ({timeframe}).")
+            counts = self.bulk_upsert_ohlcv(df, symbol, api_granularity,
+                                            on_conflict=on_conflict, chunk_size=chunk_size)
+            logger.info(f"Stored candles for {symbol} ({timeframe}): {counts['inserted']} inserted, "
+                        f"{counts['updated']} updated, {counts['skipped']} skipped as duplicates, "
+                        f"{counts['invalid']} invalid, {counts['failed']} failed.")
+            return counts
 
         except Exception as e:
             self.db.rollback()
@@ -157,6 +367,79 @@ class DataManager:
             logger.error(f"Error retrieving OHLCV data for {symbol} ({timeframe}): {e}", exc_info=True)
             return [] # Return empty list on error
 
+    def get_stored_ohlcv_frame(self, symbol: str, timeframe: str, start_unix: int, end_unix: int,
+                               columns: Optional[List[str]] = None,
+                               chunk_size: int = DEFAULT_READ_CHUNK_SIZE) -> pd.DataFrame:
+        """Retrieves stored OHLCV data as a timestamp-indexed DataFrame without ORM objects.
+
+        Runs a core select and copies fetchmany batches column-wise into preallocated
+        float64 arrays, which is several times faster than materializing Candle objects.
+
+        Args:
+            symbol: The trading pair symbol.
+            timeframe: The candle timeframe string (e.g., '1h', '15m').
+            start_unix: The start timestamp in Unix seconds.
+            end_unix: The end timestamp in Unix seconds.
+            columns: Optional subset of 'open', 'high', 'low', 'close', 'volume' to load.
+            chunk_size: Number of rows fetched per batch.
+
+        Returns:
+            DataFrame indexed by a UTC DatetimeIndex named 'timestamp', ordered by time.
+            Empty on invalid timeframe or error.
+        """
+        columns = list(OHLCV_VALUE_COLUMNS if columns is None else columns)
+        unknown = [col for col in columns if col not in OHLCV_VALUE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown OHLCV columns {unknown}, expected a subset of {OHLCV_VALUE_COLUMNS}")
+
+        empty = pd.DataFrame({col: pd.Series(dtype='float64') for col in columns},
+                             index=pd.DatetimeIndex([], tz='UTC', name='timestamp'))
+        api_granularity = self._get_api_granularity(timeframe)
+        if not api_granularity:
+            return empty
+
+        logger.info(f"Retrieving stored frame for {symbol} ({timeframe} / {api_granularity}) from {start_unix} to {end_unix}")
+        table = Candle.__table__
+        filters = (
+            table.c.symbol == symbol,
+            table.c.granularity == api_granularity,
+            table.c.timestamp >= start_unix,
+            table.c.timestamp <= end_unix
+        )
+        try:
+            n_rows = self.db.execute(select(func.count()).select_from(table).where(*filters)).scalar_one()
+            timestamps = np.empty(n_rows, dtype=np.int64)
+            values = [np.empty(n_rows, dtype=np.float64) for _ in columns]
+
+            result = self.db.execute(
+                select(table.c.timestamp, *[table.c[col] for col in columns])
+                .where(*filters)
+                .order_by(table.c.timestamp)
+            )
+            filled = 0
+            while True:
+                batch = result.fetchmany(chunk_size)
+                if not batch:
+                    break
+                end = filled + len(batch)
+                if end > len(timestamps):
+                    # Rows were added after the count; grow the buffers
+                    timestamps = np.resize(timestamps, end)
+                    values = [np.resize(arr, end) for arr in values]
+                batch_columns = list(zip(*batch))
+                timestamps[filled:end] = batch_columns[0]
+                for arr, col_values in zip(values, batch_columns[1:]):
+                    arr[filled:end] = col_values
+                filled = end
+        except Exception as e:
+            logger.error(f"Error retrieving OHLCV frame for {symbol} ({timeframe}): {e}", exc_info=True)
+            return empty
+
+        index = pd.DatetimeIndex(pd.to_datetime(timestamps[:filled], unit='s', utc=True), name='timestamp')
+        frame = pd.DataFrame({col: arr[:filled] for col, arr in zip(columns, values)}, index=index)
+        logger.info(f"Retrieved {filled} candles from DB.")
+        return frame
+
     def update_recent_ohlcv(self, symbol: str, timeframe: str):
         """Fetches the latest OHLCV data since the last stored candle and updates the database.
 
@@ -207,48 +490,14 @@ class DataManager:
                 logger.info(f"No new candle data returned or processed for {symbol} ({timeframe}) since {start_dt}.")
                 return
 
-            candles_to_store = []
-            start_unix_for_filter = latest_candle.timestamp + 1
-            for _, row in df.iterrows():
-                if row.isnull().any():
-                    logger.warning(f"Skipping row due to NaN values: {row.to_dict()}")
-                    continue
-
-                candle_timestamp = int(row['timestamp'].timestamp())
-
-                # Double-check timestamp to avoid re-inserting the latest known candle
-                # or candles older than our calculated start
-                if candle_timestamp >= start_unix_for_filter:
-                    candle_obj = Candle(
-                        symbol=symbol,
-                        granularity=api_granularity,
-                        timestamp=candle_timestamp,
-                        open=float(row['open']),
-                        high=float(row['high']),
-                        low=float(row['low']),
-                        close=float(row['close']),
-                        volume=float(row['volume'])
-                    )
-                    candles_to_store.append(candle_obj)
-
-            if not candles_to_store:
-                 logger.info(f"No valid new candles found after filtering for {symbol} ({timeframe}).")
-                 return
-
-            logger.info(f"Attempting to store {len(candles_to_store)} new candles for {symbol} ({timeframe}).")
-
-            # Store the new candles
-            try:
-                self.db.add_all(candles_to_store)
-                self.db.commit()
-                logger.info(f"Successfully stored {len(candles_to_store)} new candles.")
-            except IntegrityError as ie:
-                self.db.rollback()
-                logger.warning(f"IntegrityError while storing new candles for {symbol} ({timeframe}): {ie}. "
-                               f"Likely duplicate data overlap. Skipping duplicates.")
-            except Exception as commit_e:
-                self.db.rollback()
-                logger.error(f"Error committing new candles for {symbol} ({timeframe}): {commit_e}", exc_info=True)
+            # Only store candles after the latest known one
+            counts = self.bulk_upsert_ohlcv(df, symbol, api_granularity,
+                                            min_timestamp=latest_candle.timestamp + 1)
+            if counts['inserted'] == 0 and counts['skipped'] == 0:
+                logger.info(f"No valid new candles found after filtering for {symbol} ({timeframe}).")
+            else:
+                logger.info(f"Stored {counts['inserted']} new candles for {symbol} ({timeframe}), "
+                            f"{counts['skipped']} skipped as duplicates.")
 
         except Exception as e:
             self.db.rollback()
@@ -303,13 +552,22 @@ class DataManager:
         # Use the existing session stored in self.db
         session = self.db 
         try:
-            for zone_info in detected_zones_info:
-                # Convert dict info to Zone model object
-                leg_in_candle = ohlcv_df.iloc[zone_info['leg_in_index']]
-                leg_out_candle = ohlcv_df.iloc[zone_info['leg_out_index']]
-                base_start_candle = ohlcv_df.iloc[zone_info['base_start_index']]
-                base_end_candle = ohlcv_df.iloc[zone_info['base_end_index']]
+            # Epoch seconds for every candle at once instead of a row lookup per zone
+            timestamps = pd.to_datetime(ohlcv_df['timestamp'])
+            epoch = pd.Timestamp(0, tz=timestamps.dt.tz)
+            epoch_seconds = ((timestamps - epoch) // pd.Timedelta(seconds=1)).to_numpy()
+            formation_times = [int(epoch_seconds[zone_info['leg_out_index']]) for zone_info in detected_zones_info]
+
+            # One query for the zones already stored in the detected formation time range
+            existing_keys = set(session.execute(
+                select(Zone.type, Zone.formation_timestamp, Zone.zone_low, Zone.zone_high).where(
+                    Zone.symbol == symbol,
+                    Zone.timeframe == timeframe,
+                    Zone.formation_timestamp.between(min(formation_times), max(formation_times))
+                )
+            ).all())
 
+            for zone_info, formation_timestamp in zip(detected_zones_info, formation_times):
                 # Create the Zone object
                 zone = Zone(
                     symbol=symbol,
@@ -317,10 +575,10 @@ class DataManager:
                     type=zone_info['type'],
                     zone_low=zone_info['zone_low'],
                     zone_high=zone_info['zone_high'],
-                    leg_in_timestamp=int(leg_in_candle['timestamp'].timestamp()),
-                    base_start_timestamp=int(base_start_candle['timestamp'].timestamp()),
-                    base_end_timestamp=int(base_end_candle['timestamp'].timestamp()),
-                    formation_timestamp=int(leg_out_candle['timestamp'].timestamp()),
+                    leg_in_timestamp=int(epoch_seconds[zone_info['leg_in_index']]),
+                    base_start_timestamp=int(epoch_seconds[zone_info['base_start_index']]),
+                    base_end_timestamp=int(epoch_seconds[zone_info['base_end_index']]),
+                    formation_timestamp=formation_timestamp,
                     is_active=True, # New zones start active
                     num_touches=0,
                     # Get scores and RSI from the detected info
@@ -328,24 +586,11 @@ class DataManager:
                     initial_strength_score=zone_info.get('strength_score', 0),
                     rsi_at_formation=zone_info.get('rsi_at_formation') # Can be NaN
                 )
-                
-                # Use merge to handle potential duplicates based on unique constraint
-                # Assumes a unique constraint exists on (symbol, timeframe, formation_timestamp, type)
-                # If merge isn't suitable, use a query check first.
-                # session.merge(zone) # Merge might be complex depending on state
-                
-                # Simpler approach: Check if exists before adding
-                exists_query = select(Zone).where(
-                    Zone.symbol == symbol,
-                    Zone.timeframe == timeframe,
-                    Zone.type == zone.type,
-                    Zone.formation_timestamp == zone.formation_timestamp,
-                    Zone.zone_low == zone.zone_low,
-                    Zone.zone_high == zone.zone_high
-                )
-                existing_zone = session.execute(exists_query).scalar_one_or_none()
-                
-                if not existing_zone:
+
+                # Same duplicate check as before: type, formation time and bounds
+                key = (zone.type, zone.formation_timestamp, zone.zone_low, zone.zone_high)
+                if key not in existing_keys:
+                    existing_keys.add(key)
                     session.add(zone)
                     new_zones_count += 1
                     logger.debug(f"Adding new {zone.type} zone {zone.zone_low}-{zone.zone_high} formed at {zone.formation_timestamp}")
@@ -354,6 +599,7 @@ class DataManager:
             
             if new_zones_count > 0:
                 session.commit()
+                self.zone_index.invalidate(symbol)
                 logger.info(f"Successfully stored {new_zones_count} new zones for {symbol} {timeframe}.")
             else:
                 logger.info(f"No new unique zones detected to store for {symbol} {timeframe}.")
@@ -423,27 +669,19 @@ class DataManager:
         # Find potentially relevant active zones across all timeframes for the symbol
         # that overlap with the current candle's price range
         try:
-            overlapping_zones = (
-                self.db.query(Zone)
-                .filter(
-                    Zone.symbol == symbol,
-                    Zone.is_active == True,
-                    Zone.zone_low <= candle_high, # Candle high is above zone low
-                    Zone.zone_high >= candle_low  # Candle low is below zone high
-                )
-                .all()
-            )
+            overlapping_zones = self.zone_index.get(self.db, symbol).overlapping(candle_low, candle_high)
         except Exception as e:
             logger.error(f"Error querying overlapping zones for {symbol}: {e}", exc_info=True)
             return
 
         if not overlapping_zones:
             # logger.debug(f"No active zones overlap with candle H:{candle_high} L:{candle_low} for {symbol}")
+            self._maybe_flush_zones()
             return
 
         logger.info(f"Candle ({candle_ts} H:{candle_high} L:{candle_low} C:{candle_close}) potentially interacts with {len(overlapping_zones)} active zone(s) for {symbol}.")
         
-        updated_zones = []
+        index = self.zone_index.get(self.db, symbol)
         for zone in overlapping_zones:
             # Ensure the candle is *after* the zone formation
             if candle_ts <= zone.formation_timestamp:
@@ -453,7 +691,7 @@ class DataManager:
             # Update touch info regardless of deactivation
             zone.num_touches += 1
             zone.last_tested_timestamp = candle_ts
-            updated_zones.append(zone)
+            self.zone_index.mark_dirty(zone)
 
             # Check for zone invalidation (candle closing beyond the distal line)
             should_deactivate = False
@@ -466,18 +704,68 @@ class DataManager:
             
             if should_deactivate:
                 zone.is_active = False
+                index.remove(zone.id)
 
-        # Commit changes if any zones were updated
-        if updated_zones:
-            try:
-                self.db.commit()
-                logger.info(f"Committed status updates for {len(updated_zones)} zones.")
-            except Exception as e:
-                self.db.rollback()
-                logger.error(f"Error committing zone status updates: {e}", exc_info=True)
+        # Written back in bulk (write-behind)
+        self._maybe_flush_zones()
+
+    def _maybe_flush_zones(self):
+        """Flushes pending zone updates once the interval or pending-count threshold is reached."""
+        pending = len(self.zone_index.dirty)
+        if pending and (pending >= self.zone_flush_max_pending
+                        or time.monotonic() - self._zone_last_flush >= self.zone_flush_interval):
+            self.flush_zone_updates()
+
+    def flush_zone_updates(self, commit: bool = True) -> int:
+        """Writes pending zone touches and deactivations to the database.
+
+        Args:
+            commit: Commit the session; with False the updates join the session's current
+                transaction and are pending again if it rolls back.
+
+        Returns:
+            Number of zones written (0 on error; the updates stay pending).
+        """
+        self._zone_last_flush = time.monotonic()
+        try:
+            written = self.zone_index.flush(self.db, commit=commit)
+            if written:
+                logger.info(f"{'Committed' if commit else 'Wrote'} status updates for {written} zones.")
+            return written
+        except Exception as e:
+            logger.error(f"Error committing zone status updates: {e}", exc_info=True)
+            return 0
+
+    def rebuild_zone_index(self) -> int:
+        """Reloads the active-zone index from the database (e.g. on startup).
+
+        Returns:
+            Number of active zones indexed.
+        """
+        self.flush_zone_updates()
+        return self.zone_index.rebuild(self.db)
+
+    def _flush_zones_before_read(self, orm_execute_state):
+        """Session hook: ORM reads of zones see pending write-behind updates."""
+        if self.zone_index.dirty and orm_execute_state.is_select and any(
+                mapper.class_ is Zone for mapper in orm_execute_state.all_mappers):
+            # Runs inside the caller's statement: the caller owns commit and rollback
+            self.flush_zone_updates(commit=False)
+
+    def _zones_committed(self, session):
+        self.zone_index.committed()
+
+    def _zones_rolled_back(self, session):
+        self.zone_index.rolled_back()
 
     def close_session(self):
-        """Closes the database session."""
+        """Flushes pending zone updates and closes the database session."""
+        self.flush_zone_updates()
+        for name, fn in (('do_orm_execute', self._flush_zones_before_read),
+                         ('after_commit', self._zones_committed),
+                         ('after_rollback', self._zones_rolled_back)):
+            if event.contains(self.db, name, fn):
+                event.remove(self.db, name, fn)
         self.db.close()
 
 # Placeholder for more methods (retrieve, update_recent, etc.) 
\ No newline at end of file
@@ -4,25 +4,99 @@ from typing import Optional, Dict, List, Union
 from datetime import datetime, timezone
 import logging
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
 from coinbase.rest import RESTClient
 from requests.exceptions import HTTPError
 
+from app.core.ohlcv_cache import OHLCVCache, timeframe_to_seconds
+
 logger = logging.getLogger(__name__)
 
+COINBASE_API_URL = "https://api.coinbase.com"
+PUBLIC_CANDLES_PATH = "/api/v3/brokerage/market/products/{product_id}/candles"
+MAX_CANDLES_PER_REQUEST = 300  # Coinbase returns at most 350 candles per request
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by concurrent requests, with adaptive backoff on 429s"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, min_rate: float = 0.5):
+        """
+        Initialize the token bucket
+
+        Args:
+            rate: Sustained requests per second
+            capacity: Maximum burst size (defaults to one second of requests)
+            min_rate: Lower bound for the rate after repeated 429 responses
+        """
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.capacity = float(capacity) if capacity else max(1.0, self.max_rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + max(0.0, now - self.updated) * self.rate)
+                self.updated = max(self.updated, now)
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None):
+        """Halve the rate and pause all callers after a 429 response."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+            self.tokens = 0.0
+            self.updated = self.blocked_until
+
+    def on_success(self):
+        """Recover the rate additively after successful requests."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+
 class OHLCVProcessor:
     """Process and normalize OHLCV (Open, High, Low, Close, Volume) data"""
     
-    def __init__(self, decimal_places: int = 8):
+    def __init__(
+        self,
+        decimal_places: int = 8,
+        cache: Optional[OHLCVCache] = None,
+        max_workers: int = 1,
+        requests_per_second: float = 10.0,
+        base_url: str = COINBASE_API_URL
+    ):
         """
         Initialize the OHLCV processor
         
         Args:
             decimal_places: Number of decimal places to round price values to
+            cache: Optional local OHLCV cache; when set, get_ohlcv only fetches ranges not cached yet
+            max_workers: Number of chunk requests in flight; above 1 enables concurrent fetching
+            requests_per_second: Shared request rate for concurrent fetching
+            base_url: API base URL for concurrent fetching of public candles
         """
         self.decimal_places = decimal_places
+        self.cache = cache
         self.client = RESTClient()
         self.rate_limit_wait = 0.1  # Initial wait time between requests
         self.max_retries = 3
+        self.max_workers = max_workers
+        self.base_url = base_url.rstrip('/')
+        self.rate_limiter = TokenBucket(requests_per_second)
+        self._thread_local = threading.local()
         
     def get_ohlcv(
         self,
@@ -30,6 +104,35 @@ class OHLCVProcessor:
         timeframe: str,
         start_time: datetime,
         end_time: Optional[datetime] = None
+    ) -> pd.DataFrame:
+        """
+        Get historical OHLCV data, served from the local cache when one is configured
+        
+        Args:
+            symbol: Trading pair symbol (e.g., 'BTC-USD')
+            timeframe: Candle timeframe ('15m', '1h', '4h')
+            start_time: Start time for data retrieval
+            end_time: Optional end time for data retrieval (defaults to current time)
+            
+        Returns:
+            DataFrame with columns [timestamp, open, high, low, close, volume]
+        """
+        if self.cache is None:
+            return self._fetch_ohlcv(symbol, timeframe, start_time, end_time)
+
+        end_time = end_time or datetime.now(timezone.utc)
+        df = self.cache.get(
+            symbol, timeframe, start_time, end_time,
+            fetch_fn=lambda gap_start, gap_end: self._fetch_ohlcv(symbol, timeframe, gap_start, gap_end)
+        )
+        return df.reset_index()
+
+    def _fetch_ohlcv(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_time: datetime,
+        end_time: Optional[datetime] = None
     ) -> pd.DataFrame:
         """
         Fetch historical OHLCV data from Coinbase Advanced API
@@ -76,86 +179,90 @@ class OHLCVProcessor:
             
             # Initialize empty list for candles
             all_candles = []
-            current_start = start_time
-            logger.debug(f"[{symbol}] Starting data fetch loop. Initial start: {current_start}, Target end: {end_time}")
+            if self.max_workers > 1:
+                all_candles = self._fetch_candles_concurrent(symbol, valid_timeframes[timeframe], timeframe,
+                                                             start_time, end_time)
+            else:
+                current_start = start_time
+                logger.debug(f"[{symbol}] Starting data fetch loop. Initial start: {current_start}, Target end: {end_time}")
             
-            while current_start < end_time:
-                loop_start_time = time.time()
-                logger.debug(f"[{symbol}] Fetching chunk starting: {current_start}")
+                while current_start < end_time:
+                    loop_start_time = time.time()
+                    logger.debug(f"[{symbol}] Fetching chunk starting: {current_start}")
                 
-                chunk_end_time = min(current_start + pd.Timedelta(days=1), end_time)
-                logger.debug(f"[{symbol}] Calculated chunk end: {chunk_end_time}")
+                    chunk_end_time = min(current_start + pd.Timedelta(days=1), end_time)
+                    logger.debug(f"[{symbol}] Calculated chunk end: {chunk_end_time}")
                 
-                for attempt in range(self.max_retries):
-                    logger.debug(f"[{symbol}] Attempt {attempt + 1}/{self.max_retries} for chunk starting {current_start}")
-                    try:
-                        # Get candles from Coinbase API
-                        api_call_start = time.time()
-                        logger.debug(f"[{symbol}] Calling get_public_candles: product_id={symbol}, start={int(current_start.timestamp())}, end={int(chunk_end_time.timestamp())}, granularity={valid_timeframes[timeframe]}")
+                    for attempt in range(self.max_retries):
+                        logger.debug(f"[{symbol}] Attempt {attempt + 1}/{self.max_retries} for chunk starting {current_start}")
+                        try:
+                            # Get candles from Coinbase API
+                            api_call_start = time.time()
+                            logger.debug(f"[{symbol}] Calling get_public_candles: product_id={symbol}, start={int(current_start.timestamp())}, end={int(chunk_end_time.timestamp())}, granularity={valid_timeframes[timeframe]}")
                         
-                        candles = self.client.get_public_candles(
-                            product_id=symbol,
-                            start=str(int(current_start.timestamp())),  # Convert to Unix timestamp string
-                            end=str(int(chunk_end_time.timestamp())), # Use calculated chunk end
-                            granularity=valid_timeframes[timeframe],
-                            timeout=30 # Add a 30-second timeout to the API request
-                        )
-                        api_call_duration = time.time() - api_call_start
-                        logger.debug(f"[{symbol}] API call successful. Duration: {api_call_duration:.2f}s")
-
-                        # Check if 'candles' key exists and is a list
-                        if 'candles' in candles and isinstance(candles['candles'], list):
-                           fetched_count = len(candles['candles'])
-                           logger.debug(f"[{symbol}] Fetched {fetched_count} candles in this chunk.")
-                           all_candles.extend(candles['candles'])
-                        else:
-                           logger.warning(f"[{symbol}] API response did not contain a list under 'candles' key: {candles}")
-                        
-                        # Move to the next time chunk
-                        logger.debug(f"[{symbol}] Successfully processed chunk. Moving current_start from {current_start} to {chunk_end_time}")
-                        current_start = chunk_end_time # Move start to the end of the successfully fetched chunk
-                        time.sleep(self.rate_limit_wait)  # Respect rate limits
-                        break # Exit retry loop on success
-
-                    except HTTPError as e:
-                        api_call_duration = time.time() - api_call_start
-                        logger.warning(f"[{symbol}] API call failed (HTTPError). Duration: {api_call_duration:.2f}s. Error: {e}")
-                        # Check for rate limiting first
-                        if e.response is not None and e.response.status_code == 429:
-                            if attempt < self.max_retries - 1:
-                                self.rate_limit_wait *= 2 # Exponential backoff
-                                logger.warning(f"[{symbol}] Rate limit hit. Retrying attempt {attempt + 2}/{self.max_retries} in {self.rate_limit_wait:.2f}s...")
-                                time.sleep(self.rate_limit_wait)
-                                continue # Continue to the next attempt
+                            candles = self.client.get_public_candles(
+                                product_id=symbol,
+                                start=str(int(current_start.timestamp())),  # Convert to Unix timestamp string
+                                end=str(int(chunk_end_time.timestamp())), # Use calculated chunk end
+                                granularity=valid_timeframes[timeframe],
+                                timeout=30 # Add a 30-second timeout to the API request
+                            )
+                            api_call_duration = time.time() - api_call_start
+                            logger.debug(f"[{symbol}] API call successful. Duration: {api_call_duration:.2f}s")
+
+                            # Check if 'candles' key exists and is a list
+                            if 'candles' in candles and isinstance(candles['candles'], list):
+                               fetched_count = len(candles['candles'])
+                               logger.debug(f"[{symbol}] Fetched {fetched_count} candles in this chunk.")
+                               all_candles.extend(candles['candles'])
                             else:
-                                logger.error(f"[{symbol}] Max retries exceeded due to rate limiting.")
-                                raise # Re-raise the last HTTPError after max retries
-
-                        # Check for invalid product_id error
-                        elif e.response is not None and e.response.status_code == 400:
-                           try:
-                               error_details = e.response.json()
-                               if error_details.get("error") == "INVALID_ARGUMENT" and "product_id" in error_details.get("error_details", ""):
-                                   logger.error(f"[{symbol}] Invalid symbol provided. API error: {error_details}")
-                                   raise ValueError(f"Invalid symbol provided: {symbol}") from e
-                           except Exception:
-                               logger.error(f"[{symbol}] Received 400 Bad Request, but couldn't parse error details. Original error: {e}")
-                               raise
+                               logger.warning(f"[{symbol}] API response did not contain a list under 'candles' key: {candles}")
+                        
+                            # Move to the next time chunk
+                            logger.debug(f"[{symbol}] Successfully processed chunk. Moving current_start from {current_start} to {chunk_end_time}")
+                            current_start = chunk_end_time # Move start to the end of the successfully fetched chunk
+                            time.sleep(self.rate_limit_wait)  # Respect rate limits
+                            break # Exit retry loop on success
+
+                        except HTTPError as e:
+                            api_call_duration = time.time() - api_call_start
+                            logger.warning(f"[{symbol}] API call failed (HTTPError). Duration: {api_call_duration:.2f}s. Error: {e}")
+                            # Check for rate limiting first
+                            if e.response is not None and e.response.status_code == 429:
+                                if attempt < self.max_retries - 1:
+                                    self.rate_limit_wait *= 2 # Exponential backoff
+                                    logger.warning(f"[{symbol}] Rate limit hit. Retrying attempt {attempt + 2}/{self.max_retries} in {self.rate_limit_wait:.2f}s...")
+                                    time.sleep(self.rate_limit_wait)
+                                    continue # Continue to the next attempt
+                                else:
+                                    logger.error(f"[{symbol}] Max retries exceeded due to rate limiting.")
+                                    raise # Re-raise the last HTTPError after max retries
+
+                            # Check for invalid product_id error
+                            elif e.response is not None and e.response.status_code == 400:
+                               try:
+                                   error_details = e.response.json()
+                                   if error_details.get("error") == "INVALID_ARGUMENT" and "product_id" in error_details.get("error_details", ""):
+                                       logger.error(f"[{symbol}] Invalid symbol provided. API error: {error_details}")
+                                       raise ValueError(f"Invalid symbol provided: {symbol}") from e
+                               except Exception:
+                                   logger.error(f"[{symbol}] Received 400 Bad Request, but couldn't parse error details. Original error: {e}")
+                                   raise
                         
-                        # Re-raise other HTTP errors
-                        logger.error(f"[{symbol}] Unhandled HTTPError during API call: {e}", exc_info=True)
-                        raise
-
-                    except Exception as e:
-                        api_call_duration = time.time() - api_call_start
-                        logger.error(f"[{symbol}] Unexpected error during API call. Duration: {api_call_duration:.2f}s. Error: {e}", exc_info=True)
-                        raise # Re-raise the unexpected error
-                else:
-                    # This block executes if the retry loop completes without a `break` (i.e., all retries failed)
-                    logger.error(f"[{symbol}] All {self.max_retries} retries failed for chunk starting {current_start}. Stopping fetch for this symbol.")
-                    # Decide how to handle this: return partially fetched data or raise error/return empty?
-                    # For now, let's proceed with whatever data we have gathered so far.
-                    break # Exit the outer while loop
+                            # Re-raise other HTTP errors
+                            logger.error(f"[{symbol}] Unhandled HTTPError during API call: {e}", exc_info=True)
+                            raise
+
+                        except Exception as e:
+                            api_call_duration = time.time() - api_call_start
+                            logger.error(f"[{symbol}] Unexpected error during API call. Duration: {api_call_duration:.2f}s. Error: {e}", exc_info=True)
+                            raise # Re-raise the unexpected error
+                    else:
+                        # This block executes if the retry loop completes without a `break` (i.e., all retries failed)
+                        logger.error(f"[{symbol}] All {self.max_retries} retries failed for chunk starting {current_start}. Stopping fetch for this symbol.")
+                        # Decide how to handle this: return partially fetched data or raise error/return empty?
+                        # For now, let's proceed with whatever data we have gathered so far.
+                        break # Exit the outer while loop
                     
             logger.debug(f"[{symbol}] Finished data fetch loop. Total candles gathered: {len(all_candles)}")
 
@@ -193,7 +300,8 @@ class OHLCVProcessor:
             try:
                  # Ensure the column exists before conversion
                  if 'timestamp' in df.columns:
-                      df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s', utc=True, errors='coerce')
+                      df['timestamp'] = pd.to_datetime(pd.to_numeric(df['timestamp'], errors='coerce'),
+                                                       unit='s', utc=True, errors='coerce')
                       # Drop rows where timestamp conversion failed (became NaT)
                       initial_rows = len(df)
                       df.dropna(subset=['timestamp'], inplace=True)
@@ -284,6 +392,105 @@ class OHLCVProcessor:
             # Ensure an empty DataFrame with correct columns is returned on failure
             return pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
         
+    def _session(self) -> requests.Session:
+        """Return a requests session owned by the calling thread."""
+        session = getattr(self._thread_local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            self._thread_local.session = session
+        return session
+
+    def _request_candle_chunk(self, symbol: str, granularity: str, chunk_start: int, chunk_end: int) -> List[Dict]:
+        """
+        Request one chunk of public candles under the shared rate limiter, retrying on 429s
+        
+        Args:
+            symbol: Trading pair symbol
+            granularity: API granularity string
+            chunk_start: Chunk start in Unix seconds
+            chunk_end: Chunk end in Unix seconds
+            
+        Returns:
+            List of raw candle dicts
+        """
+        url = self.base_url + PUBLIC_CANDLES_PATH.format(product_id=symbol)
+        params = {'start': str(chunk_start), 'end': str(chunk_end), 'granularity': granularity}
+        max_attempts = max(self.max_retries, 5)
+        for attempt in range(max_attempts):
+            self.rate_limiter.acquire()
+            response = self._session().get(url, params=params, timeout=30)
+            if response.status_code == 429:
+                retry_after = response.headers.get('Retry-After')
+                try:
+                    retry_after = float(retry_after) if retry_after is not None else None
+                except ValueError:
+                    retry_after = None
+                self.rate_limiter.on_rate_limited(retry_after)
+                logger.warning(f"[{symbol}] Rate limit hit for chunk {chunk_start}-{chunk_end}. "
+                               f"Retry {attempt + 1}/{max_attempts} at {self.rate_limiter.rate:.2f} req/s")
+                continue
+            if response.status_code == 400:
+                try:
+                    error_details = response.json()
+                except ValueError:
+                    error_details = {}
+                if error_details.get("error") == "INVALID_ARGUMENT" and "product_id" in str(error_details.get("error_details", "")):
+                    logger.error(f"[{symbol}] Invalid symbol provided. API error: {error_details}")
+                    raise ValueError(f"Invalid symbol provided: {symbol}")
+            response.raise_for_status()
+            self.rate_limiter.on_success()
+            candles = response.json().get('candles')
+            if not isinstance(candles, list):
+                logger.warning(f"[{symbol}] API response did not contain a list under 'candles' key for chunk {chunk_start}-{chunk_end}")
+                return []
+            return candles
+
+        logger.error(f"[{symbol}] Max retries exceeded due to rate limiting for chunk {chunk_start}-{chunk_end}.")
+        raise HTTPError(f"429 Too Many Requests after {max_attempts} attempts", response=response)
+
+    def _fetch_candles_concurrent(
+        self,
+        symbol: str,
+        granularity: str,
+        timeframe: str,
+        start_time: datetime,
+        end_time: datetime
+    ) -> List[Dict]:
+        """
+        Fetch the range in parallel chunk requests and reassemble them in order
+        
+        Args:
+            symbol: Trading pair symbol
+            granularity: API granularity string
+            timeframe: Candle timeframe ('15m', '1h', '4h')
+            start_time: Start time (UTC)
+            end_time: End time (UTC)
+            
+        Returns:
+            List of raw candle dicts in chunk order, without duplicates
+        """
+        chunk_seconds = timeframe_to_seconds(timeframe) * MAX_CANDLES_PER_REQUEST
+        start_ts, end_ts = int(start_time.timestamp()), int(end_time.timestamp())
+        chunks = [(chunk_start, min(chunk_start + chunk_seconds, end_ts))
+                  for chunk_start in range(start_ts, end_ts, chunk_seconds)]
+        logger.debug(f"[{symbol}] Fetching {len(chunks)} chunks with {self.max_workers} workers")
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks)) or 1)
+        try:
+            futures = [executor.submit(self._request_candle_chunk, symbol, granularity, chunk_start, chunk_end)
+                       for chunk_start, chunk_end in chunks]
+            results = [future.result() for future in futures]
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        # Chunks are reassembled in range order; adjacent chunks share their boundary candle,
+        # so keep the first copy of each start time
+        candles_by_start = {}
+        for chunk_candles in results:
+            for candle in chunk_candles:
+                candles_by_start.setdefault(str(candle.get('start')), candle)
+        return list(candles_by_start.values())
+
     def normalize_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Normalize OHLCV data by ensuring consistent data types and standardizing decimal precision.
@@ -453,7 +660,7 @@ class OHLCVProcessor:
         
         # Handle missing values
         numeric_columns = ['open', 'high', 'low', 'close', 'volume']
-        df[numeric_columns] = df[numeric_columns].fillna(method='ffill').fillna(method='bfill')
+        df[numeric_columns] = df[numeric_columns].ffill().bfill()
         
         # Handle price anomalies if detected
         if 'price_anomalies' in validation_results:
@@ -59,6 +59,115 @@ def calculate_macd(prices: pd.Series,
     
     return macd_line, signal_line, histogram
 
+def calculate_sma(prices: pd.Series, period: int = 20) -> pd.Series:
+    """
+    Calculate the Simple Moving Average (SMA) for a price series.
+
+    Args:
+        prices: Series of prices
+        period: Window length
+
+    Returns:
+        Series containing SMA values (NaN until the window is full)
+    """
+    return prices.rolling(window=period).mean()
+
+def calculate_ema(prices: pd.Series, period: int = 20) -> pd.Series:
+    """
+    Calculate the Exponential Moving Average (EMA) for a price series.
+
+    Args:
+        prices: Series of prices
+        period: EMA span
+
+    Returns:
+        Series containing EMA values (NaN for the first period - 1 values)
+    """
+    return prices.ewm(span=period, adjust=False, min_periods=period).mean()
+
+def calculate_bollinger_bands(prices: pd.Series,
+                              period: int = 20,
+                              num_std: float = 2.0) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    """
+    Calculate Bollinger Bands for a price series, using the population standard deviation.
+
+    Args:
+        prices: Series of closing prices
+        period: Window length
+        num_std: Band width in standard deviations
+
+    Returns:
+        Tuple of (upper band, middle band, lower band)
+    """
+    middle = prices.rolling(window=period).mean()
+    std = prices.rolling(window=period).std(ddof=0)
+    return middle + num_std * std, middle, middle - num_std * std
+
+def calculate_true_range(high: pd.Series, low: pd.Series, close: pd.Series) -> pd.Series:
+    """
+    Calculate the True Range; the first bar uses high - low.
+
+    Args:
+        high: Series of high prices
+        low: Series of low prices
+        close: Series of closing prices
+
+    Returns:
+        Series containing True Range values
+    """
+    prev_close = close.shift(1)
+    ranges = pd.concat([high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1)
+    return ranges.max(axis=1)
+
+def calculate_atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
+    """
+    Calculate the Average True Range (ATR) with Wilder smoothing.
+
+    Args:
+        high: Series of high prices
+        low: Series of low prices
+        close: Series of closing prices
+        period: ATR period
+
+    Returns:
+        Series containing ATR values (NaN for the first period - 1 values)
+    """
+    tr = calculate_true_range(high, low, close)
+    return tr.ewm(alpha=1.0 / period, adjust=False, min_periods=period).mean()
+
+def calculate_adx(high: pd.Series,
+                  low: pd.Series,
+                  close: pd.Series,
+                  period: int = 14) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    """
+    Calculate the Average Directional Index (ADX) and directional indicators with Wilder smoothing.
+
+    Args:
+        high: Series of high prices
+        low: Series of low prices
+        close: Series of closing prices
+        period: ADX period
+
+    Returns:
+        Tuple of (ADX, +DI, -DI); DI values start after period bars, ADX after 2 * period - 1
+    """
+    up_move = high.diff().fillna(0.0)
+    down_move = -low.diff().fillna(0.0)
+    plus_dm = up_move.where((up_move > down_move) & (up_move > 0), 0.0)
+    minus_dm = down_move.where((down_move > up_move) & (down_move > 0), 0.0)
+
+    alpha = 1.0 / period
+    tr = calculate_true_range(high, low, close).ewm(alpha=alpha, adjust=False, min_periods=period).mean()
+    plus_di = (100 * plus_dm.ewm(alpha=alpha, adjust=False, min_periods=period).mean() / tr).mask(tr == 0, 0.0)
+    minus_di = (100 * minus_dm.ewm(alpha=alpha, adjust=False, min_periods=period).mean() / tr).mask(tr == 0, 0.0)
+
+    di_sum = plus_di + minus_di
+    dx = 100 * (plus_di - minus_di).abs() / di_sum
+    dx = dx.mask(di_sum == 0, 0.0)
+    adx = dx.ewm(alpha=alpha, adjust=False, min_periods=period).mean()
+
+    return adx, plus_di, minus_di
+
 def calculate_volume_profile(ohlcv_data: pd.DataFrame,
                            price_levels: int = 100,
                            value_area_volume_ratio: float = 0.68) -> VolumeProfile:
@@ -0,0 +1,519 @@
+"""
+Multi-product live trading runtime.
+
+Hosts many products in one process behind a single shared websocket feed. Each product
+has its own ProductState (strategy instance, candle buffer, optional streaming signal
+engine) and its own worker task. Ticks are routed to the product's inbox without blocking
+the feed. A worker drains everything that arrived since its last run and evaluates the
+strategy once on the latest row. Workers yield between batches, so products are served
+round-robin. Products whose evaluations are measured as slow run in a thread pool. A slow
+strategy therefore only delays its own product: it coalesces its own backlog and never
+holds the event loop or other products' workers.
+
+ShardedLiveRuntime spreads products over worker processes by a stable hash of the
+product id. Each process runs its own MultiProductRuntime.
+"""
+import asyncio
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from app.core.streaming_indicators import StreamingIndicatorEngine
+from app.strategies.base.strategy import Strategy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER_SIZE = 200
+LATENCY_WINDOW = 10_000
+# Products whose evaluations average more than this (seconds) run in the thread pool
+DEFAULT_OFFLOAD_THRESHOLD = 0.002
+EVAL_TIME_ALPHA = 0.2
+
+StrategyFactory = Callable[[str], Strategy]
+DecisionCallback = Callable[['Decision'], Union[None, Awaitable[None]]]
+
+
+@dataclass
+class Decision:
+    """Result of one strategy evaluation for a product."""
+    product_id: str
+    action: Optional[str]  # 'buy', 'sell' or None
+    timestamp: Any
+    price: float
+    latency: float  # seconds from receipt of the newest tick to the decision
+    ticks: int  # ticks consumed by this evaluation (> 1 when a backlog was coalesced)
+    row: Optional[pd.Series] = None
+
+
+@dataclass
+class ProductState:
+    """Per-product state owned by the runtime; only its worker touches it after creation."""
+    product_id: str
+    strategy: Strategy
+    data_buffer: deque
+    signal_engine: Optional[StreamingIndicatorEngine] = None
+    latest_row: Optional[pd.Series] = None
+    inbox: deque = field(default_factory=deque)
+    wakeup: Optional[asyncio.Event] = None
+    latencies: deque = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+    ticks: int = 0
+    evaluations: int = 0
+    decisions: int = 0
+    errors: int = 0
+    last_action: Optional[str] = None
+    eval_time: Optional[float] = None  # moving average of seconds per evaluation
+
+
+def shard_for(product_id: str, n_shards: int) -> int:
+    """Stable shard index for a product (independent of PYTHONHASHSEED)."""
+    return zlib.crc32(product_id.encode('utf-8')) % n_shards
+
+
+def ticker_to_candle(message: Dict) -> Optional[Dict]:
+    """
+    Convert a ticker message into the candle dict LiveTrader buffers.
+
+    Ticker messages carry only the last price, so it is used for open/high/low/close.
+    """
+    try:
+        price = float(message.get("price"))
+    except (TypeError, ValueError):
+        return None
+    if price <= 0:
+        return None
+    volume = message.get("volume_24_h", message.get("volume_24h", 0))
+    timestamp = message.get("time")
+    return {
+        'timestamp': pd.Timestamp(timestamp) if timestamp else pd.Timestamp.now(tz='UTC'),
+        'open': price,
+        'high': price,
+        'low': price,
+        'close': price,
+        'volume': float(volume or 0),
+    }
+
+
+def summarize_latencies(latencies: Iterable[float]) -> Dict[str, float]:
+    """Count, mean, p50/p95/p99 and max of a latency sample, in milliseconds."""
+    values = np.fromiter(latencies, dtype=float) * 1000.0
+    if len(values) == 0:
+        return {'count': 0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        'count': int(len(values)),
+        'mean_ms': float(values.mean()),
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'max_ms': float(values.max()),
+    }
+
+
+class MultiProductRuntime:
+    """
+    Runs one strategy instance per product over a shared ticker feed.
+    """
+
+    def __init__(self,
+                 strategy_factory: StrategyFactory,
+                 on_decision: Optional[DecisionCallback] = None,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 min_candles: int = 1,
+                 max_workers: int = 8,
+                 offload_threshold: float = DEFAULT_OFFLOAD_THRESHOLD,
+                 emit_all: bool = False):
+        """
+        Args:
+            strategy_factory: Callable creating a fresh Strategy for a product id
+            on_decision: Optional (sync or async) callback receiving each Decision with an action
+            buffer_size: Candles kept per product for the generate_signals fallback path
+            min_candles: Candles required before a product's strategy is evaluated
+            max_workers: Threads for slow products' evaluations; 0 evaluates everything inline
+            offload_threshold: Average evaluation time (seconds) above which a product is
+                evaluated in the thread pool instead of inline on the event loop
+            emit_all: Also pass decisions without an action to on_decision
+        """
+        self.strategy_factory = strategy_factory
+        self.on_decision = on_decision
+        self.buffer_size = buffer_size
+        self.min_candles = min_candles
+        self.emit_all = emit_all
+        self.offload_threshold = offload_threshold
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='strategy') if max_workers > 0 else None
+        self.products: Dict[str, ProductState] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._running = False
+        self.dropped = 0
+
+    # --- Product management ---
+
+    def add_product(self, product_id: str) -> ProductState:
+        """Create the state for a product and start its worker if the runtime is running."""
+        if product_id in self.products:
+            return self.products[product_id]
+        strategy = self.strategy_factory(product_id)
+        state = ProductState(
+            product_id=product_id,
+            strategy=strategy,
+            data_buffer=deque(maxlen=self.buffer_size),
+            signal_engine=strategy.create_signal_engine(),
+        )
+        self.products[product_id] = state
+        if self._running:
+            self._start_worker(state)
+        logger.info(f"Runtime tracking {product_id}")
+        return state
+
+    async def remove_product(self, product_id: str) -> None:
+        """Stop a product's worker and drop its state."""
+        task = self._tasks.pop(product_id, None)
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self.products.pop(product_id, None)
+
+    # --- Feed ---
+
+    def dispatch(self, message: Dict, received_at: Optional[float] = None) -> bool:
+        """
+        Route a feed message to its product's inbox. Never blocks.
+
+        Args:
+            message: Ticker message (other message types are ignored)
+            received_at: time.perf_counter() at receipt; defaults to now
+
+        Returns:
+            True if the message was queued for a product
+        """
+        if message.get("type") != "ticker":
+            return False
+        state = self.products.get(message.get("product_id"))
+        if state is None:
+            self.dropped += 1
+            return False
+        state.inbox.append((time.perf_counter() if received_at is None else received_at, message))
+        if state.wakeup is not None:
+            state.wakeup.set()
+        return True
+
+    async def consume(self, message_queue: asyncio.Queue) -> None:
+        """Dispatch messages from the shared websocket queue until a None sentinel arrives."""
+        while True:
+            message = await message_queue.get()
+            try:
+                if message is None:
+                    break
+                if isinstance(message, dict):
+                    self.dispatch(message)
+            finally:
+                message_queue.task_done()
+
+    # --- Lifecycle ---
+
+    async def start(self) -> None:
+        """Start one worker task per product."""
+        self._running = True
+        for state in self.products.values():
+            self._start_worker(state)
+
+    async def stop(self, drain: bool = True, timeout: float = 30.0) -> None:
+        """
+        Stop all workers.
+
+        Args:
+            drain: Wait for workers to process everything already in their inboxes
+            timeout: Maximum seconds to wait for the drain
+        """
+        if drain:
+            deadline = time.monotonic() + timeout
+            while any(state.inbox for state in self.products.values()) and time.monotonic() < deadline:
+                await asyncio.sleep(0.005)
+        self._running = False
+        for state in self.products.values():
+            if state.wakeup is not None:
+                state.wakeup.set()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+        if self.executor:
+            self.executor.shutdown(wait=True)
+
+    def _start_worker(self, state: ProductState) -> None:
+        state.wakeup = asyncio.Event()
+        if state.inbox:
+            state.wakeup.set()
+        self._tasks[state.product_id] = asyncio.create_task(
+            self._product_worker(state), name=f"runtime-{state.product_id}")
+
+    async def _product_worker(self, state: ProductState) -> None:
+        loop = asyncio.get_running_loop()
+        while self._running or state.inbox:
+            await state.wakeup.wait()
+            state.wakeup.clear()
+            if not state.inbox:
+                continue
+            # Take everything that arrived since the last evaluation
+            batch = []
+            while state.inbox:
+                batch.append(state.inbox.popleft())
+            # Cheap strategies run inline (no thread handoff or GIL contention); products that
+            # are slow, or not yet measured, run in the pool so they cannot stall the loop
+            offload = self.executor is not None and (
+                state.eval_time is None or state.eval_time > self.offload_threshold)
+            try:
+                if offload:
+                    decision = await loop.run_in_executor(self.executor, self._process_batch, state, batch)
+                else:
+                    decision = self._process_batch(state, batch)
+            except Exception as e:
+                state.errors += 1
+                logger.error(f"Error evaluating strategy for {state.product_id}: {e}", exc_info=True)
+                continue
+            if decision is not None:
+                await self._emit(decision)
+            if not offload:
+                # Let the feed and other products run before this product's next batch
+                await asyncio.sleep(0)
+
+    # --- Evaluation (inline or in a pool thread; one batch per product at a time) ---
+
+    def _process_batch(self, state: ProductState, batch: List) -> Optional[Decision]:
+        """Feed a batch of ticks to the product's state and evaluate the strategy once."""
+        started = time.perf_counter()
+        latest_received = None
+        for received_at, message in batch:
+            candle = ticker_to_candle(message)
+            if candle is None:
+                continue
+            state.data_buffer.append(candle)
+            if state.signal_engine is not None:
+                state.signal_engine.ingest(candle)
+            state.ticks += 1
+            latest_received = received_at
+
+        if latest_received is None or len(state.data_buffer) < self.min_candles:
+            return None
+
+        row = self._latest_row(state)
+        action = self._decide(state, row)
+        finished = time.perf_counter()
+        latency = finished - latest_received
+        elapsed = finished - started
+        state.eval_time = elapsed if state.eval_time is None else (
+            EVAL_TIME_ALPHA * elapsed + (1 - EVAL_TIME_ALPHA) * state.eval_time)
+        state.latencies.append(latency)
+        state.evaluations += 1
+        return Decision(
+            product_id=state.product_id,
+            action=action,
+            timestamp=row.name,
+            price=float(row['close']),
+            latency=latency,
+            ticks=len(batch),
+            row=row,
+        )
+
+    @staticmethod
+    def _latest_row(state: ProductState) -> pd.Series:
+        if state.signal_engine is not None:
+            state.latest_row = state.signal_engine.latest()
+            return state.latest_row
+        df = pd.DataFrame(list(state.data_buffer))
+        df.set_index('timestamp', inplace=True)
+        return state.strategy.generate_signals(df).iloc[-1]
+
+    @staticmethod
+    def _decide(state: ProductState, row: pd.Series) -> Optional[str]:
+        """Same entry/exit checks and state updates as LiveTrader._run_live_strategy."""
+        strategy = state.strategy
+        if strategy.should_enter_trade(row):
+            strategy.update_state(row.name, True, 0, None, row.get('regime'))
+            action = 'buy'
+        elif strategy.should_exit_trade(row):
+            strategy.update_state(row.name, False, 0, None, row.get('regime'))
+            action = 'sell'
+        else:
+            return None
+        state.decisions += 1
+        state.last_action = action
+        return action
+
+    async def _emit(self, decision: Decision) -> None:
+        if self.on_decision is None or (decision.action is None and not self.emit_all):
+            return
+        try:
+            result = self.on_decision(decision)
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            logger.error(f"Error in decision callback for {decision.product_id}: {e}", exc_info=True)
+
+    # --- Reporting ---
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-product tick/evaluation counters and decision latency summary."""
+        return {
+            product_id: {
+                'ticks': state.ticks,
+                'evaluations': state.evaluations,
+                'decisions': state.decisions,
+                'errors': state.errors,
+                'backlog': len(state.inbox),
+                'last_action': state.last_action,
+                'eval_ms': None if state.eval_time is None else state.eval_time * 1000.0,
+                **summarize_latencies(state.latencies),
+            }
+            for product_id, state in self.products.items()
+        }
+
+
+def _shard_main(shard_id: int,
+                product_ids: List[str],
+                inbox: multiprocessing.Queue,
+                outbox: multiprocessing.Queue,
+                strategy_factory: StrategyFactory,
+                runtime_kwargs: Dict[str, Any]) -> None:
+    """Entry point of a shard process: a MultiProductRuntime fed from a process queue."""
+
+    async def run():
+        loop = asyncio.get_running_loop()
+
+        def forward(decision: Decision):
+            outbox.put({
+                'type': 'decision',
+                'shard': shard_id,
+                'product_id': decision.product_id,
+                'action': decision.action,
+                'timestamp': decision.timestamp,
+                'price': decision.price,
+                'latency': decision.latency,
+            })
+
+        runtime = MultiProductRuntime(strategy_factory, on_decision=forward, **runtime_kwargs)
+        for product_id in product_ids:
+            runtime.add_product(product_id)
+        await runtime.start()
+
+        # A reader thread turns blocking process-queue reads into loop callbacks
+        done = asyncio.Event()
+
+        def reader():
+            while True:
+                batch = inbox.get()
+                if batch is None:
+                    loop.call_soon_threadsafe(done.set)
+                    return
+                received_at = time.perf_counter()
+                loop.call_soon_threadsafe(
+                    lambda b=batch, r=received_at: [runtime.dispatch(m, r) for m in b])
+
+        threading.Thread(target=reader, name=f"shard-{shard_id}-reader", daemon=True).start()
+        await done.wait()
+        await runtime.stop(drain=True)
+        outbox.put({'type': 'stats', 'shard': shard_id, 'stats': runtime.stats()})
+
+    asyncio.run(run())
+
+
+class ShardedLiveRuntime:
+    """
+    Spreads products across worker processes, each running a MultiProductRuntime.
+
+    Products are assigned by shard_for(product_id, n_shards). The strategy factory must
+    be importable by the child processes (a module-level function).
+    """
+
+    def __init__(self,
+                 strategy_factory: StrategyFactory,
+                 product_ids: List[str],
+                 n_shards: int = 2,
+                 batch_size: int = 64,
+                 **runtime_kwargs):
+        """
+        Args:
+            strategy_factory: Module-level callable creating a Strategy for a product id
+            product_ids: Products to host
+            n_shards: Number of worker processes
+            batch_size: Messages sent to a shard per queue put (amortizes pickling)
+            **runtime_kwargs: Passed to each shard's MultiProductRuntime (on_decision is not supported)
+        """
+        self.n_shards = n_shards
+        self.batch_size = batch_size
+        self.assignments: Dict[int, List[str]] = {i: [] for i in range(n_shards)}
+        for product_id in product_ids:
+            self.assignments[shard_for(product_id, n_shards)].append(product_id)
+        self.inboxes = [multiprocessing.Queue() for _ in range(n_shards)]
+        self.outbox = multiprocessing.Queue()
+        self._pending: List[List[Dict]] = [[] for _ in range(n_shards)]
+        self.processes = [
+            multiprocessing.Process(
+                target=_shard_main,
+                args=(i, self.assignments[i], self.inboxes[i], self.outbox, strategy_factory, runtime_kwargs),
+                name=f"live-runtime-shard-{i}",
+                daemon=True,
+            )
+            for i in range(n_shards)
+        ]
+
+    def start(self) -> None:
+        for process in self.processes:
+            process.start()
+
+    def dispatch(self, message: Dict) -> None:
+        """Queue a ticker for the shard owning its product."""
+        product_id = message.get("product_id")
+        if message.get("type") != "ticker" or not product_id:
+            return
+        shard = shard_for(product_id, self.n_shards)
+        pending = self._pending[shard]
+        pending.append(message)
+        if len(pending) >= self.batch_size:
+            self._flush(shard)
+
+    def flush(self) -> None:
+        """Send any partially filled batches."""
+        for shard in range(self.n_shards):
+            self._flush(shard)
+
+    def _flush(self, shard: int) -> None:
+        if self._pending[shard]:
+            self.inboxes[shard].put(self._pending[shard])
+            self._pending[shard] = []
+
+    def stop(self, timeout: float = 60.0) -> Dict[str, Any]:
+        """
+        Drain and stop all shards.
+
+        Returns:
+            Dict with 'decisions' (list of decision dicts) and 'stats' (per-product stats)
+        """
+        self.flush()
+        for inbox in self.inboxes:
+            inbox.put(None)
+        decisions, stats = [], {}
+        remaining = self.n_shards
+        deadline = time.monotonic() + timeout
+        while remaining and time.monotonic() < deadline:
+            try:
+                item = self.outbox.get(timeout=max(deadline - time.monotonic(), 0.01))
+            except queue.Empty:
+                break
+            if item['type'] == 'decision':
+                decisions.append(item)
+            else:
+                stats.update(item['stats'])
+                remaining -= 1
+        for process in self.processes:
+            process.join(timeout=5)
+        if remaining:
+            logger.warning(f"{remaining} runtime shard(s) did not report before the timeout")
+        return {'decisions': decisions, 'stats': stats}
@@ -59,6 +59,10 @@ class LiveTrader:
         # Needs at least MA period + ATR period for regime, or RSI period
         required_buffer_size = max(self.strategy.ma_period + self.strategy.atr_period, self.strategy.rsi_period) * 2
         self.data_buffer = deque(maxlen=required_buffer_size)  # Buffer for OHLCV data
+
+        # Incremental indicators, fed one candle at a time (None -> DataFrame path)
+        self.signal_engine = self.strategy.create_signal_engine()
+        self.latest_signal_row: Optional[pd.Series] = None
         
         self.current_position = 0  # 0: Flat, 1: Long (Strategy is long-only)
         # self.last_signal = 0 # Strategy state handles this implicitly now
@@ -98,6 +102,11 @@ class LiveTrader:
                 volume = float(message.get("volume_24h", 0))
                 timestamp = pd.Timestamp.now(tz='UTC')
                 
+                # Keep the executor's position marks current without REST polling
+                price_cache = getattr(self.order_executor, 'price_cache', None)
+                if price_cache is not None:
+                    price_cache.update(self.product_id, price)
+
                 # --- Feed price to DryRunExecutor if in dry run mode --- 
                 if self.settings.DRY_RUN_MODE and isinstance(self.order_executor, DryRunExecutor):
                     # Ensure order_executor is DryRunExecutor before calling its specific method
@@ -115,6 +124,9 @@ class LiveTrader:
                     'volume': volume # Using 24h volume, might not be ideal for indicators
                 })
                 
+                if self.signal_engine is not None:
+                    self.latest_signal_row = self.signal_engine.update(self.data_buffer[-1])
+
                 logger.debug(f"Buffer size: {len(self.data_buffer)}, Price: {price:.2f}")
 
                 # Only run strategy if we have enough data for all indicators
@@ -158,13 +170,17 @@ class LiveTrader:
     async def _run_live_strategy(self, db: AsyncSession):
         """Runs the RSI Momentum strategy on the current data buffer."""
         try:
-            # Convert deque to DataFrame
-            df = pd.DataFrame(list(self.data_buffer))
-            df.set_index('timestamp', inplace=True)
+            if self.latest_signal_row is not None:
+                # Streaming engine already holds the latest row for the full history
+                latest_row = self.latest_signal_row
+            else:
+                # Convert deque to DataFrame
+                df = pd.DataFrame(list(self.data_buffer))
+                df.set_index('timestamp', inplace=True)
 
-            # Generate signals using the strategy instance
-            signals_df = self.strategy.generate_signals(df)
-            latest_row = signals_df.iloc[-1]
+                # Generate signals using the strategy instance
+                signals_df = self.strategy.generate_signals(df)
+                latest_row = signals_df.iloc[-1]
 
             logger.info(f"Strategy Check: RSI={latest_row.get('rsi', float('nan')):.2f}, Regime={latest_row.get('regime', 'N/A')}, Signal={latest_row.get('signal', 0)}, Pos={self.strategy.state.is_in_position}")
 
@@ -0,0 +1,368 @@
+"""
+Local partitioned OHLCV cache.
+
+Candles are stored per symbol/timeframe/month as NumPy structured arrays (.npy), next to a
+coverage file recording which time ranges have already been fetched. Requests are served
+from disk and only the missing gaps are passed to the fetch function. Partitions are replaced
+atomically and opened with mmap_mode='r', so parallel worker processes can read the same
+history without copying it.
+"""
+import os
+import re
+import json
+import logging
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to unlocked writes
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+CANDLE_DTYPE = np.dtype([('timestamp', '<i8')] + [(col, '<f8') for col in OHLCV_COLUMNS])
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_CACHE_DIR = os.environ.get('OHLCV_CACHE_DIR', os.path.join(PROJECT_ROOT, 'data', 'cache', 'ohlcv'))
+
+_UNIT_SECONDS = {'m': 60, 'min': 60, 't': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+TimeLike = Union[int, float, str, datetime, pd.Timestamp]
+FetchFn = Callable[[datetime, datetime], Optional[pd.DataFrame]]
+
+
+def timeframe_to_seconds(timeframe: str) -> int:
+    """
+    Convert a timeframe string such as '15m', '1h' or '1d' to seconds.
+
+    Args:
+        timeframe: Timeframe string
+
+    Returns:
+        int: Candle interval in seconds
+    """
+    match = re.fullmatch(r'\s*(\d+)\s*([a-zA-Z]+)\s*', str(timeframe))
+    unit = match.group(2).lower() if match else None
+    if unit not in _UNIT_SECONDS or int(match.group(1)) <= 0:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return int(match.group(1)) * _UNIT_SECONDS[unit]
+
+
+def to_unix_seconds(value: TimeLike) -> int:
+    """
+    Convert a timestamp (Unix seconds, date string or datetime) to Unix seconds.
+    Naive datetimes and strings are interpreted as UTC.
+    """
+    if isinstance(value, (int, np.integer, float, np.floating)):
+        return int(value)
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize('UTC')
+    return int(ts.timestamp())
+
+
+def _month_bounds(ts: int) -> Tuple[int, int]:
+    """Return the [start, end) Unix seconds of the calendar month containing ts."""
+    dt = datetime.fromtimestamp(ts, tz=timezone.utc)
+    start = datetime(dt.year, dt.month, 1, tzinfo=timezone.utc)
+    end = datetime(dt.year + dt.month // 12, dt.month % 12 + 1, 1, tzinfo=timezone.utc)
+    return int(start.timestamp()), int(end.timestamp())
+
+
+def _merge_intervals(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Merge overlapping or touching [start, end) intervals."""
+    merged = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def frame_to_candles(df: pd.DataFrame) -> np.ndarray:
+    """
+    Convert an OHLCV DataFrame to a sorted, de-duplicated candle array.
+
+    Accepts either a 'timestamp' column or a DatetimeIndex, and OHLCV column names in any case.
+    Rows with NaN values are dropped.
+
+    Args:
+        df: OHLCV DataFrame
+
+    Returns:
+        np.ndarray: Structured array with CANDLE_DTYPE
+    """
+    if df is None or df.empty:
+        return np.empty(0, dtype=CANDLE_DTYPE)
+
+    lower = {str(col).lower(): col for col in df.columns}
+    missing = [col for col in OHLCV_COLUMNS if col not in lower]
+    if missing:
+        raise ValueError(f"OHLCV data is missing columns {missing}")
+
+    if 'timestamp' in lower:
+        timestamps = pd.to_datetime(df[lower['timestamp']], utc=True)
+    elif isinstance(df.index, pd.DatetimeIndex):
+        timestamps = df.index.tz_localize('UTC') if df.index.tz is None else df.index.tz_convert('UTC')
+    else:
+        raise ValueError("OHLCV data needs a 'timestamp' column or a DatetimeIndex")
+
+    seconds = (pd.DatetimeIndex(timestamps) - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+    candles = np.empty(len(df), dtype=CANDLE_DTYPE)
+    candles['timestamp'] = np.asarray(seconds, dtype=np.int64)
+    valid = np.ones(len(df), dtype=bool)
+    for col in OHLCV_COLUMNS:
+        values = pd.to_numeric(df[lower[col]], errors='coerce').to_numpy(dtype=np.float64)
+        candles[col] = values
+        valid &= ~np.isnan(values)
+    candles = candles[valid]
+
+    # Keep the last row per timestamp, ordered by time
+    _, last = np.unique(candles['timestamp'][::-1], return_index=True)
+    return candles[len(candles) - 1 - last]
+
+
+def candles_to_frame(arrays: Dict[str, np.ndarray], columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Build a DataFrame indexed by a UTC DatetimeIndex named 'timestamp' from candle arrays."""
+    columns = OHLCV_COLUMNS if columns is None else columns
+    index = pd.DatetimeIndex(pd.to_datetime(np.asarray(arrays['timestamp']), unit='s', utc=True), name='timestamp')
+    return pd.DataFrame({col: np.asarray(arrays[col]) for col in columns}, index=index)
+
+
+class OHLCVCache:
+    """
+    Partitioned on-disk OHLCV store that serves cached ranges and fetches only missing gaps.
+
+    Layout: <root_dir>/<symbol>/<timeframe>/<YYYY-MM>.npy plus coverage.json with the
+    fetched [start, end) ranges in Unix seconds.
+    """
+
+    def __init__(self, root_dir: Optional[str] = None):
+        """
+        Initialize the cache
+
+        Args:
+            root_dir: Cache directory (defaults to $OHLCV_CACHE_DIR or data/cache/ohlcv)
+        """
+        self.root_dir = root_dir or DEFAULT_CACHE_DIR
+
+    # --- Paths and metadata ---
+
+    def _series_dir(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root_dir, symbol.replace('/', '-'), timeframe)
+
+    def _partition_path(self, symbol: str, timeframe: str, month_start: int) -> str:
+        month = datetime.fromtimestamp(month_start, tz=timezone.utc).strftime('%Y-%m')
+        return os.path.join(self._series_dir(symbol, timeframe), f"{month}.npy")
+
+    def _coverage_path(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self._series_dir(symbol, timeframe), 'coverage.json')
+
+    def coverage(self, symbol: str, timeframe: str) -> List[Tuple[int, int]]:
+        """Return the merged [start, end) ranges already fetched for a symbol/timeframe."""
+        path = self._coverage_path(symbol, timeframe)
+        if not os.path.exists(path):
+            return []
+        try:
+            with open(path) as f:
+                return _merge_intervals([tuple(item) for item in json.load(f).get('covered', [])])
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache coverage file {path}: {e}")
+            return []
+
+    @contextmanager
+    def _lock(self, symbol: str, timeframe: str):
+        """Serialize writers of one symbol/timeframe across processes."""
+        series_dir = self._series_dir(symbol, timeframe)
+        os.makedirs(series_dir, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(series_dir, '.lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _atomic_write(path: str, write_fn: Callable):
+        """Write to a temporary file in the same directory and move it into place."""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write_fn(f)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    # --- Ranges ---
+
+    def _aligned_range(self, timeframe: str, start: TimeLike, end: TimeLike) -> Tuple[int, int, int]:
+        interval = timeframe_to_seconds(timeframe)
+        start_ts, end_ts = to_unix_seconds(start), to_unix_seconds(end)
+        if start_ts >= end_ts:
+            raise ValueError("start must be before end")
+        return start_ts - start_ts % interval, -(-end_ts // interval) * interval, interval
+
+    def missing_ranges(self, symbol: str, timeframe: str, start: TimeLike, end: TimeLike) -> List[Tuple[int, int]]:
+        """
+        Return the [start, end) gaps of the requested range that are not cached yet.
+
+        Args:
+            symbol: Trading pair symbol
+            timeframe: Timeframe string
+            start: Range start
+            end: Range end (exclusive)
+
+        Returns:
+            list: Missing (start, end) ranges in Unix seconds, aligned to the candle interval
+        """
+        start_ts, end_ts, _ = self._aligned_range(timeframe, start, end)
+        gaps = []
+        cursor = start_ts
+        for cov_start, cov_end in self.coverage(symbol, timeframe):
+            if cov_end <= cursor:
+                continue
+            if cov_start >= end_ts:
+                break
+            if cov_start > cursor:
+                gaps.append((cursor, cov_start))
+            cursor = max(cursor, cov_end)
+        if cursor < end_ts:
+            gaps.append((cursor, end_ts))
+        return gaps
+
+    # --- Writing ---
+
+    def store(self, symbol: str, timeframe: str, df: pd.DataFrame,
+              covered: Optional[Tuple[int, int]] = None) -> int:
+        """
+        Merge candles into the monthly partitions, newer data replacing cached candles.
+
+        Args:
+            symbol: Trading pair symbol
+            timeframe: Timeframe string
+            df: OHLCV DataFrame ('timestamp' column or DatetimeIndex)
+            covered: Optional [start, end) range to mark as fetched
+
+        Returns:
+            int: Number of candles written
+        """
+        candles = frame_to_candles(df)
+        with self._lock(symbol, timeframe):
+            month_start = _month_bounds(int(candles['timestamp'][0]))[0] if len(candles) else None
+            while month_start is not None and month_start <= candles['timestamp'][-1]:
+                month_end = _month_bounds(month_start)[1]
+                lo, hi = np.searchsorted(candles['timestamp'], [month_start, month_end], side='left')
+                if hi > lo:
+                    new = candles[lo:hi]
+                    path = self._partition_path(symbol, timeframe, month_start)
+                    if os.path.exists(path):
+                        # New candles come first so they win over cached ones
+                        combined = np.concatenate([new, np.load(path)])
+                        _, first = np.unique(combined['timestamp'], return_index=True)
+                        new = combined[first]
+                    self._atomic_write(path, lambda f, arr=new: np.save(f, arr))
+                month_start = month_end
+
+            if covered is not None:
+                intervals = _merge_intervals(self.coverage(symbol, timeframe) + [tuple(map(int, covered))])
+                payload = json.dumps({'covered': [list(item) for item in intervals]}).encode()
+                self._atomic_write(self._coverage_path(symbol, timeframe), lambda f: f.write(payload))
+        return len(candles)
+
+    # --- Reading ---
+
+    def read_arrays(self, symbol: str, timeframe: str, start: TimeLike, end: TimeLike) -> Dict[str, np.ndarray]:
+        """
+        Read cached candles in [start, end) as column arrays.
+
+        When the range lies within one monthly partition the arrays are read-only views
+        of the memory-mapped file (no copy); otherwise the partition slices are concatenated.
+
+        Returns:
+            dict: 'timestamp' (int64 Unix seconds) and OHLCV float64 arrays
+        """
+        start_ts, end_ts = to_unix_seconds(start), to_unix_seconds(end)
+        pieces = []
+        month_start = _month_bounds(start_ts)[0]
+        while month_start < end_ts:
+            path = self._partition_path(symbol, timeframe, month_start)
+            if os.path.exists(path):
+                partition = np.load(path, mmap_mode='r')
+                lo, hi = np.searchsorted(partition['timestamp'], [start_ts, end_ts], side='left')
+                if hi > lo:
+                    pieces.append(partition[lo:hi])
+            month_start = _month_bounds(month_start)[1]
+
+        if not pieces:
+            candles = np.empty(0, dtype=CANDLE_DTYPE)
+        elif len(pieces) == 1:
+            candles = pieces[0]
+        else:
+            candles = np.concatenate(pieces)
+        return {name: candles[name] for name in CANDLE_DTYPE.names}
+
+    def read(self, symbol: str, timeframe: str, start: TimeLike, end: TimeLike,
+             columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Read cached candles in [start, end) as a DataFrame indexed by 'timestamp'."""
+        return candles_to_frame(self.read_arrays(symbol, timeframe, start, end), columns)
+
+    def get(self, symbol: str, timeframe: str, start: TimeLike, end: TimeLike,
+            fetch_fn: Optional[FetchFn] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Serve [start, end) from the cache, fetching and storing only the missing gaps.
+
+        Only the span the fetched candles actually cover (first candle to the end of the
+        last one) is marked as covered, and never beyond the start of the candle that is
+        still forming, so truncated fetches and the forming candle are refetched next time.
+
+        Args:
+            symbol: Trading pair symbol
+            timeframe: Timeframe string
+            start: Range start
+            end: Range end (exclusive)
+            fetch_fn: Called as fetch_fn(gap_start, gap_end) with UTC datetimes; returns an
+                OHLCV DataFrame. Without it only cached data is returned.
+            columns: Optional subset of OHLCV columns to return
+
+        Returns:
+            pd.DataFrame: Candles indexed by a UTC DatetimeIndex named 'timestamp'
+        """
+        start_ts, end_ts, interval = self._aligned_range(timeframe, start, end)
+        if fetch_fn is not None:
+            now = int(datetime.now(timezone.utc).timestamp())
+            closed_end = now - now % interval
+            for gap_start, gap_end in self.missing_ranges(symbol, timeframe, start_ts, end_ts):
+                logger.info(f"Cache miss for {symbol} {timeframe}: fetching "
+                            f"{datetime.fromtimestamp(gap_start, tz=timezone.utc)} to "
+                            f"{datetime.fromtimestamp(gap_end, tz=timezone.utc)}")
+                fetched = fetch_fn(datetime.fromtimestamp(gap_start, tz=timezone.utc),
+                                   datetime.fromtimestamp(gap_end, tz=timezone.utc))
+                timestamps = frame_to_candles(fetched)['timestamp']
+                timestamps = timestamps[(timestamps >= gap_start) & (timestamps < gap_end)]
+                if not len(timestamps):
+                    logger.warning(f"No data fetched for {symbol} {timeframe} gap {gap_start}-{gap_end}")
+                    continue
+                covered_start = int(timestamps[0])
+                covered_end = min(int(timestamps[-1]) + interval, closed_end)
+                if covered_start > gap_start or covered_end < min(gap_end, closed_end):
+                    logger.info(f"Fetch for {symbol} {timeframe} covered only "
+                                f"{covered_start}-{covered_end} of gap {gap_start}-{gap_end}")
+                self.store(symbol, timeframe, fetched,
+                           covered=(covered_start, covered_end) if covered_end > covered_start else None)
+
+        return self.read(symbol, timeframe, to_unix_seconds(start), to_unix_seconds(end), columns)
@@ -7,6 +7,7 @@ import pandas as pd
 import statistics
 import uuid
 import time
+from collections import deque
 from enum import Enum
 # SQLAlchemy session for logging
 from sqlalchemy.ext.asyncio import AsyncSession 
@@ -26,9 +27,13 @@ from app.models.position import Position
 # Import logging components
 from app.core.trade_log.crud import create_log_entry
 from app.core.trade_log.models import EventType, OrderStatus, TradeSide
+from app.core.price_cache import PriceCache
 
 logger = logging.getLogger(__name__)
 
+# Position events kept in memory (oldest are discarded)
+POSITION_EVENTS_MAXLEN = 10_000
+
 class OrderExecutionError(Exception):
     """Custom exception for order execution errors"""
     pass
@@ -103,7 +108,10 @@ class OrderExecutor:
         client: CoinbaseClient,
         signal_manager: Optional['SignalManager'] = None,
         default_time_in_force: str = "GTC",
-        min_signal_confidence: float = 0.7
+        min_signal_confidence: float = 0.7,
+        price_cache: Optional[PriceCache] = None,
+        price_stale_after: float = 5.0,
+        risk_check_move_pct: float = 0.1
     ):
         """
         Initialize the OrderExecutor.
@@ -113,6 +121,10 @@ class OrderExecutor:
             signal_manager: Optional SignalManager for signal confirmation
             default_time_in_force: Default time in force setting for orders
             min_signal_confidence: Minimum confidence score required for signal confirmation
+            price_cache: Shared price cache fed by the websocket ticker stream
+            price_stale_after: Seconds without a ticker after which position monitoring
+                falls back to REST prices
+            risk_check_move_pct: Price move (%) since the last risk check that triggers another
         """
         self.client = client
         self.signal_manager = signal_manager
@@ -142,9 +154,13 @@ class OrderExecutor:
             'trade_count': 0
         }
         self._position_monitors: Dict[str, asyncio.Task] = {}
-        self._position_events: List[Dict] = []
+        self._position_events: deque = deque(maxlen=POSITION_EVENTS_MAXLEN)
         self._risk_metrics_cache: Dict[str, Dict] = {}
         self._last_metrics_update = datetime.now()
+        self.price_cache = price_cache or PriceCache()
+        self.price_stale_after = price_stale_after
+        self.risk_check_move_pct = risk_check_move_pct
+        self._monitor_stats = {'price_updates': 0, 'risk_checks': 0, 'rest_fallbacks': 0}
         
     async def execute_market_order(
         self,
@@ -1146,25 +1162,50 @@ class OrderExecutor:
         """Get all open positions"""
         return [p for p in self._positions.values() if p.status == "OPEN"]
 
-    async def get_position_risk_metrics(self, product_id: str) -> Dict[str, float]:
-        """Get risk metrics for a position"""
-        position = await self.get_position(product_id)
-        if not position:
-            return {}
-            
-        current_price = float((await self.client.get_product(product_id))["price"])
+    async def _get_mark_price(self, product_id: str) -> float:
+        """Latest price from the websocket-fed cache, or from REST if the feed is stale."""
+        price = self.price_cache.get(product_id, max_age=self.price_stale_after)
+        if price is None:
+            before = self.price_cache.entry(product_id)
+            product = await self.client.get_product(product_id)
+            price = float(product["price"])
+            self._monitor_stats['rest_fallbacks'] += 1
+            current = self.price_cache.entry(product_id)
+            if current is not before:
+                # A ticker arrived while the request was in flight; it is newer than the REST price
+                return current.price
+            self.price_cache.update(product_id, price, source="rest")
+        return price
+
+    @staticmethod
+    def _mark_position(position: Position, current_price: float) -> None:
+        """Revalue a position at the given price."""
         position.current_price = current_price
-        
-        # Calculate risk metrics
+        position.unrealized_pnl = (current_price - position.entry_price) * position.size
+        if position.side == OrderSide.SELL:
+            position.unrealized_pnl *= -1
+
+    @staticmethod
+    def _calculate_risk_metrics(position: Position) -> Dict[str, float]:
+        """Risk metrics for a position at its current mark."""
+        cost_basis = position.entry_price * position.size
         position.risk_metrics.update({
-            "unrealized_pnl_pct": (position.unrealized_pnl / (position.entry_price * position.size)) * 100,
-            "position_value": position.size * current_price,
+            "unrealized_pnl_pct": (position.unrealized_pnl / cost_basis) * 100 if cost_basis else 0.0,
+            "position_value": position.size * position.current_price,
             "max_drawdown": min(0, position.unrealized_pnl),
             "time_in_position": (datetime.now() - position.entry_time).total_seconds() / 3600  # hours
         })
-        
         return position.risk_metrics
 
+    async def get_position_risk_metrics(self, product_id: str) -> Dict[str, float]:
+        """Get risk metrics for a position"""
+        position = await self.get_position(product_id)
+        if not position:
+            return {}
+            
+        self._mark_position(position, await self._get_mark_price(product_id))
+        return self._calculate_risk_metrics(position)
+
     async def get_performance_metrics(self) -> Dict[str, float]:
         """Get aggregated performance metrics"""
         if not any(self._performance_metrics.values()):
@@ -1208,10 +1249,12 @@ class OrderExecutor:
         if abs(position.size) > self._risk_thresholds['max_position_size']:
             return False, f"Position size {position.size} exceeds maximum {self._risk_thresholds['max_position_size']}"
         
-        if position.unrealized_pnl_pct < -self._risk_thresholds['max_drawdown_pct']:
-            return False, f"Position drawdown {position.unrealized_pnl_pct}% exceeds maximum {self._risk_thresholds['max_drawdown_pct']}%"
+        unrealized_pnl_pct = position.risk_metrics.get('unrealized_pnl_pct', 0.0)
+        if unrealized_pnl_pct < -self._risk_thresholds['max_drawdown_pct']:
+            return False, f"Position drawdown {unrealized_pnl_pct}% exceeds maximum {self._risk_thresholds['max_drawdown_pct']}%"
         
-        daily_pnl_pct = (self._daily_stats['total_pnl'] / self._daily_stats['start_balance']) * 100
+        start_balance = self._daily_stats['start_balance']
+        daily_pnl_pct = (self._daily_stats['total_pnl'] / start_balance) * 100 if start_balance > 0 else 0.0
         if daily_pnl_pct < -self._risk_thresholds['max_daily_loss_pct']:
             return False, f"Daily loss {daily_pnl_pct}% exceeds maximum {self._risk_thresholds['max_daily_loss_pct']}%"
         
@@ -1297,42 +1340,74 @@ class OrderExecutor:
         self._position_monitors.clear()
 
     async def _monitor_position(self, product_id: str):
-        """Monitor a position continuously."""
+        """
+        Monitor a position from the shared price cache.
+
+        The position is re-marked on every ticker for the product; risk metrics and
+        thresholds are re-evaluated only once the price has moved risk_check_move_pct since
+        the last check. When no ticker arrives for price_stale_after seconds, the price is
+        fetched over REST instead.
+        """
+        wakeup = asyncio.Event()
+
+        def on_price(_product_id: str, _price: float) -> None:
+            # Only feed ticks wake the monitor; our own REST refreshes are already marked
+            entry = self.price_cache.entry(_product_id)
+            if entry is None or entry.source != "rest":
+                wakeup.set()
+
+        self.price_cache.subscribe(product_id, on_price)
+        last_checked_price: Optional[float] = None
+        reference_pnl: Optional[float] = None
         try:
             while True:
                 position = self._positions.get(product_id)
                 if not position or position.status == "CLOSED":
                     break
 
-                # Update current price
-                product = await self.client.get_product(product_id)
-                current_price = float(product["price"])
-                
-                # Update position metrics
-                old_pnl = position.unrealized_pnl
-                position.current_price = current_price
-                position.unrealized_pnl = (current_price - position.entry_price) * position.size
-                if position.side == OrderSide.SELL:
-                    position.unrealized_pnl *= -1
-                
-                # Calculate and cache risk metrics
-                risk_metrics = await self.get_position_risk_metrics(product_id)
-                self._risk_metrics_cache[product_id] = {
-                    "metrics": risk_metrics,
-                    "timestamp": datetime.now()
-                }
-                
-                # Check for significant P&L changes (>1%)
-                pnl_change_pct = abs((position.unrealized_pnl - old_pnl) / (position.entry_price * position.size) * 100)
+                if last_checked_price is not None:
+                    try:
+                        await asyncio.wait_for(wakeup.wait(), timeout=self.price_stale_after)
+                    except asyncio.TimeoutError:
+                        pass  # feed is quiet; _get_mark_price falls back to REST
+                wakeup.clear()
+                current_price = await self._get_mark_price(product_id)
+
+                position = self._positions.get(product_id)
+                if not position or position.status == "CLOSED":
+                    break
+                self._monitor_stats['price_updates'] += 1
+                if reference_pnl is None:
+                    reference_pnl = position.unrealized_pnl
+                self._mark_position(position, current_price)
+
+                # Check for significant P&L changes (>1%) since the last reported one
+                cost_basis = position.entry_price * position.size
+                pnl_change_pct = abs((position.unrealized_pnl - reference_pnl) / cost_basis * 100) if cost_basis else 0.0
                 if pnl_change_pct > 1.0:
                     self._position_events.append({
                         "type": "pnl_change",
                         "product_id": product_id,
-                        "old_pnl": old_pnl,
+                        "old_pnl": reference_pnl,
                         "new_pnl": position.unrealized_pnl,
                         "change_pct": pnl_change_pct,
                         "timestamp": datetime.now()
                     })
+                    reference_pnl = position.unrealized_pnl
+
+                # Risk checks only when the price has moved enough since the last one
+                if last_checked_price is not None and \
+                        abs(current_price - last_checked_price) < last_checked_price * self.risk_check_move_pct / 100:
+                    continue
+                last_checked_price = current_price
+                self._monitor_stats['risk_checks'] += 1
+
+                # Calculate and cache risk metrics
+                risk_metrics = self._calculate_risk_metrics(position)
+                self._risk_metrics_cache[product_id] = {
+                    "metrics": risk_metrics,
+                    "timestamp": datetime.now()
+                }
                 
                 # Check risk thresholds
                 is_safe, message = await self.check_risk_thresholds(position)
@@ -1345,8 +1420,6 @@ class OrderExecutor:
                     })
                     await self.halt_trading(message)
                 
-                await asyncio.sleep(1)  # Update frequency
-                
         except asyncio.CancelledError:
             logger.info(f"Position monitoring stopped for {product_id}")
         except Exception as e:
@@ -1357,6 +1430,12 @@ class OrderExecutor:
                 "error": str(e),
                 "timestamp": datetime.now()
             })
+        finally:
+            self.price_cache.unsubscribe(product_id, on_price)
+
+    def get_monitoring_stats(self) -> Dict[str, int]:
+        """Counts of price updates, risk checks and REST fallbacks in position monitoring."""
+        return dict(self._monitor_stats)
 
     async def get_aggregated_risk_metrics(self) -> Dict[str, Any]:
         """Get aggregated risk metrics across all positions."""
@@ -1395,7 +1474,7 @@ class OrderExecutor:
         start_time: Optional[datetime] = None
     ) -> List[Dict]:
         """Get position-related events with optional filtering."""
-        events = self._position_events
+        events = list(self._position_events)
         
         if product_id:
             events = [e for e in events if e["product_id"] == product_id]
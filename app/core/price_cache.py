@@ -0,0 +1,90 @@
+"""
+Shared latest-price cache fed by the websocket ticker stream.
+
+Consumers that used to poll client.get_product for a mark price read the cache instead,
+and can subscribe to be notified when a product's price changes. Each entry records
+where the price came from ("ws" or "rest") and when it arrived, so callers can tell
+when the feed has gone stale and fall back to REST.
+"""
+import logging
+import time
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+PriceListener = Callable[[str, float], None]
+
+
+class PriceEntry(NamedTuple):
+    price: float
+    updated_at: float  # time.monotonic()
+    source: str
+
+
+class PriceCache:
+    """Latest price per product with change listeners and staleness checks."""
+
+    def __init__(self):
+        self._prices: Dict[str, PriceEntry] = {}
+        self._listeners: Dict[str, List[PriceListener]] = {}
+        self.updates = 0
+
+    def update(self, product_id: str, price: float, source: str = "ws") -> None:
+        """
+        Record a price and notify the product's listeners.
+
+        Listeners run synchronously and should only schedule work (e.g. set an event).
+        """
+        price = float(price)
+        self._prices[product_id] = PriceEntry(price, time.monotonic(), source)
+        self.updates += 1
+        for listener in self._listeners.get(product_id, ()):
+            try:
+                listener(product_id, price)
+            except Exception as e:
+                logger.error(f"Error in price listener for {product_id}: {e}", exc_info=True)
+
+    def on_ticker(self, message: Mapping[str, Any]) -> None:
+        """Update from a websocket ticker message (dict or ws_decoder.Ticker)."""
+        product_id, price = message.get("product_id"), message.get("price")
+        if product_id and price is not None:
+            try:
+                self.update(product_id, price)
+            except (TypeError, ValueError):
+                logger.warning(f"Ignoring ticker with invalid price for {product_id}: {price!r}")
+
+    def get(self, product_id: str, max_age: Optional[float] = None) -> Optional[float]:
+        """
+        Latest price for a product.
+
+        Args:
+            product_id: Product to look up
+            max_age: If given, return None when the price is older than this many seconds
+
+        Returns:
+            The price, or None if unknown or stale
+        """
+        entry = self._prices.get(product_id)
+        if entry is None:
+            return None
+        if max_age is not None and time.monotonic() - entry.updated_at > max_age:
+            return None
+        return entry.price
+
+    def entry(self, product_id: str) -> Optional[PriceEntry]:
+        return self._prices.get(product_id)
+
+    def age(self, product_id: str) -> Optional[float]:
+        """Seconds since the product's price was last updated, or None if never."""
+        entry = self._prices.get(product_id)
+        return None if entry is None else time.monotonic() - entry.updated_at
+
+    def subscribe(self, product_id: str, listener: PriceListener) -> None:
+        self._listeners.setdefault(product_id, []).append(listener)
+
+    def unsubscribe(self, product_id: str, listener: PriceListener) -> None:
+        listeners = self._listeners.get(product_id)
+        if listeners and listener in listeners:
+            listeners.remove(listener)
+            if not listeners:
+                del self._listeners[product_id]
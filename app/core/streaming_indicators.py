@@ -0,0 +1,347 @@
+"""
+Incremental (O(1) per candle) versions of the indicators in app.core.indicators.
+
+Each indicator consumes one candle at a time and returns the value the batch function
+would produce for the last row of the full history. The rolling and exponential updates
+follow the arithmetic of the pandas implementations (Kahan-compensated window sums,
+constant-window shortcut, adjust=False EWM normalization), so live values match the
+batch path to floating point precision.
+"""
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+import pandas as pd
+
+NAN = float('nan')
+
+SignalFn = Callable[[Dict[str, Any], Optional[Dict[str, Any]]], Dict[str, Any]]
+
+
+class RollingWindow:
+    """Rolling mean and population variance over a fixed window, updated in O(1)."""
+
+    def __init__(self, period: int):
+        if period < 1:
+            raise ValueError("period must be at least 1")
+        self.period = period
+        self.values = deque()
+        self._sum = 0.0
+        self._compensation_add = 0.0
+        self._compensation_remove = 0.0
+        self._neg_count = 0
+        self._mean = 0.0
+        self._ssqdm = 0.0
+        self._same_value = NAN
+        self._same_count = 0
+
+    def update(self, value: float):
+        """Add a value, dropping the oldest one once the window is full."""
+        value = float(value)
+        # Remove before add, with separate Kahan compensations, as pandas' rolling sum does
+        if len(self.values) == self.period:
+            old = self.values.popleft()
+            y = -old - self._compensation_remove
+            t = self._sum + y
+            self._compensation_remove = t - self._sum - y
+            self._sum = t
+            if old < 0:
+                self._neg_count -= 1
+            n = len(self.values)
+            if n == 0:
+                self._mean, self._ssqdm = 0.0, 0.0
+            else:
+                delta = old - self._mean
+                self._mean -= delta / n
+                self._ssqdm -= delta * (old - self._mean)
+
+        self.values.append(value)
+        y = value - self._compensation_add
+        t = self._sum + y
+        self._compensation_add = t - self._sum - y
+        self._sum = t
+        if value < 0:
+            self._neg_count += 1
+        # Welford update for the variance
+        delta = value - self._mean
+        self._mean += delta / len(self.values)
+        self._ssqdm += delta * (value - self._mean)
+
+        if value == self._same_value:
+            self._same_count += 1
+        else:
+            self._same_value, self._same_count = value, 1
+
+    @property
+    def is_full(self) -> bool:
+        return len(self.values) == self.period
+
+    @property
+    def is_constant(self) -> bool:
+        return self._same_count >= self.period
+
+    def mean(self) -> float:
+        """Mean of the window, NaN until it is full."""
+        if not self.is_full:
+            return NAN
+        if self.is_constant:
+            return self._same_value
+        result = self._sum / self.period
+        if self._neg_count == 0 and result < 0:
+            return 0.0
+        if self._neg_count == self.period and result > 0:
+            return 0.0
+        return result
+
+    def var(self) -> float:
+        """Population variance of the window, NaN until it is full."""
+        if not self.is_full:
+            return NAN
+        if self.is_constant:
+            return 0.0
+        return max(self._ssqdm / self.period, 0.0)
+
+
+class EWM:
+    """Exponentially weighted mean with adjust=False semantics and a min_periods threshold."""
+
+    def __init__(self, alpha: float, min_periods: int = 1):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.count = 0
+        self.weighted = NAN
+
+    def update(self, value: float) -> float:
+        """Add an observation (NaN observations are skipped) and return the current mean."""
+        if not math.isnan(value):
+            if self.count == 0:
+                self.weighted = value
+            elif self.weighted != value:
+                old_wt = 1.0 - self.alpha
+                self.weighted = (old_wt * self.weighted + self.alpha * value) / (old_wt + self.alpha)
+            self.count += 1
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.weighted if self.count >= self.min_periods else NAN
+
+
+class StreamingIndicator(ABC):
+    """An indicator updated one candle at a time."""
+
+    #: Names of the values returned by update(), in order
+    outputs: Tuple[str, ...] = ('value',)
+
+    @abstractmethod
+    def update(self, high: float, low: float, close: float) -> Union[float, Tuple[float, ...]]:
+        """Consume the next candle and return the latest value(s)."""
+
+
+class SMA(StreamingIndicator):
+    """Simple moving average of the close (calculate_sma)."""
+
+    def __init__(self, period: int = 20):
+        self.window = RollingWindow(period)
+
+    def update(self, high: float, low: float, close: float) -> float:
+        self.window.update(close)
+        return self.window.mean()
+
+
+class EMA(StreamingIndicator):
+    """Exponential moving average of the close (calculate_ema)."""
+
+    def __init__(self, period: int = 20):
+        self.ewm = EWM(2.0 / (period + 1), min_periods=period)
+
+    def update(self, high: float, low: float, close: float) -> float:
+        return self.ewm.update(close)
+
+
+class RSI(StreamingIndicator):
+    """Relative Strength Index from rolling average gains and losses (calculate_rsi)."""
+
+    def __init__(self, period: int = 14):
+        self.gains = RollingWindow(period)
+        self.losses = RollingWindow(period)
+        self.prev_close = None
+
+    def update(self, high: float, low: float, close: float) -> float:
+        delta = NAN if self.prev_close is None else close - self.prev_close
+        self.prev_close = close
+        self.gains.update(delta if delta > 0 else 0.0)
+        self.losses.update(-delta if delta < 0 else 0.0)
+
+        avg_gain, avg_loss = self.gains.mean(), self.losses.mean()
+        if math.isnan(avg_gain) or math.isnan(avg_loss):
+            return NAN
+        if avg_loss == 0:
+            return NAN if avg_gain == 0 else 100.0
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+class BollingerBands(StreamingIndicator):
+    """Bollinger Bands with the population standard deviation (calculate_bollinger_bands)."""
+
+    outputs = ('upper', 'middle', 'lower')
+
+    def __init__(self, period: int = 20, num_std: float = 2.0):
+        self.window = RollingWindow(period)
+        self.num_std = num_std
+
+    def update(self, high: float, low: float, close: float) -> Tuple[float, float, float]:
+        self.window.update(close)
+        middle = self.window.mean()
+        std = math.sqrt(self.window.var()) if self.window.is_full else NAN
+        return middle + self.num_std * std, middle, middle - self.num_std * std
+
+
+class _TrueRange:
+    """True Range of consecutive candles; the first candle uses high - low."""
+
+    def __init__(self):
+        self.prev_close = None
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if self.prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        return tr
+
+
+class ATR(StreamingIndicator):
+    """Average True Range with Wilder smoothing (calculate_atr)."""
+
+    def __init__(self, period: int = 14):
+        self.true_range = _TrueRange()
+        self.ewm = EWM(1.0 / period, min_periods=period)
+
+    def update(self, high: float, low: float, close: float) -> float:
+        return self.ewm.update(self.true_range.update(high, low, close))
+
+
+class ADX(StreamingIndicator):
+    """Average Directional Index and directional indicators (calculate_adx)."""
+
+    outputs = ('adx', 'plus_di', 'minus_di')
+
+    def __init__(self, period: int = 14):
+        alpha = 1.0 / period
+        self.true_range = _TrueRange()
+        self.tr = EWM(alpha, min_periods=period)
+        self.plus_dm = EWM(alpha, min_periods=period)
+        self.minus_dm = EWM(alpha, min_periods=period)
+        self.adx = EWM(alpha, min_periods=period)
+        self.prev_high = None
+        self.prev_low = None
+
+    def update(self, high: float, low: float, close: float) -> Tuple[float, float, float]:
+        up_move = 0.0 if self.prev_high is None else high - self.prev_high
+        down_move = 0.0 if self.prev_low is None else self.prev_low - low
+        self.prev_high, self.prev_low = high, low
+        plus_dm = up_move if (up_move > down_move and up_move > 0) else 0.0
+        minus_dm = down_move if (down_move > up_move and down_move > 0) else 0.0
+
+        tr = self.tr.update(self.true_range.update(high, low, close))
+        smoothed_plus = self.plus_dm.update(plus_dm)
+        smoothed_minus = self.minus_dm.update(minus_dm)
+        if math.isnan(tr):
+            return self.adx.update(NAN), NAN, NAN
+
+        plus_di = 0.0 if tr == 0 else 100 * smoothed_plus / tr
+        minus_di = 0.0 if tr == 0 else 100 * smoothed_minus / tr
+        di_sum = plus_di + minus_di
+        dx = 0.0 if di_sum == 0 else 100 * abs(plus_di - minus_di) / di_sum
+        return self.adx.update(dx), plus_di, minus_di
+
+
+class StreamingIndicatorEngine:
+    """
+    Feeds candles to a set of streaming indicators and builds the latest signal row.
+
+    The row returned by update() contains the candle fields, every indicator output and
+    the columns added by signal_fn, i.e. what generate_signals(history).iloc[-1] returns
+    for a strategy whose indicators are computed over the full candle history.
+    """
+
+    def __init__(self,
+                 indicators: Dict[Union[str, Tuple[str, ...]], StreamingIndicator],
+                 signal_fn: Optional[SignalFn] = None):
+        """
+        Args:
+            indicators: Mapping of output column name(s) to indicator; multi-output indicators
+                take a tuple of names matching their outputs (e.g. ('bb_upper', 'bb_middle', 'bb_lower'))
+            signal_fn: Optional function (row, previous_row) -> dict of signal columns
+        """
+        self.indicators = []
+        for names, indicator in indicators.items():
+            names = (names,) if isinstance(names, str) else tuple(names)
+            if len(names) != len(indicator.outputs):
+                raise ValueError(f"{type(indicator).__name__} produces {len(indicator.outputs)} values, "
+                                 f"got column names {names}")
+            self.indicators.append((names, indicator))
+        self.signal_fn = signal_fn
+        self.prev_row: Optional[Dict[str, Any]] = None
+        self.prev_timestamp = None
+        self.count = 0
+
+    def ingest(self, candle: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Consume one candle and return the latest row as a plain dict.
+
+        Cheaper than update() when only some rows are needed; latest() builds the Series
+        for the most recent candle on demand.
+
+        Args:
+            candle: Mapping with 'high', 'low', 'close' (and optionally 'timestamp', 'open', 'volume')
+        """
+        row = {key: value for key, value in candle.items() if key != 'timestamp'}
+        high, low, close = float(candle['high']), float(candle['low']), float(candle['close'])
+        for names, indicator in self.indicators:
+            values = indicator.update(high, low, close)
+            if len(names) == 1:
+                row[names[0]] = values
+            else:
+                row.update(zip(names, values))
+        if self.signal_fn is not None:
+            row.update(self.signal_fn(row, self.prev_row))
+        self.prev_row = row
+        self.prev_timestamp = candle.get('timestamp')
+        self.count += 1
+        return row
+
+    def latest(self) -> Optional[pd.Series]:
+        """The row for the most recent candle, or None before the first one."""
+        if self.prev_row is None:
+            return None
+        return pd.Series(self.prev_row, name=self.prev_timestamp)
+
+    def update(self, candle: Mapping[str, Any]) -> pd.Series:
+        """
+        Consume one candle and return the latest signal row.
+
+        Args:
+            candle: Mapping with 'high', 'low', 'close' (and optionally 'timestamp', 'open', 'volume')
+
+        Returns:
+            pd.Series named by the candle timestamp
+        """
+        self.ingest(candle)
+        return self.latest()
+
+    def update_many(self, candles: Union[pd.DataFrame, Iterable[Mapping[str, Any]]]) -> Optional[pd.Series]:
+        """
+        Consume a batch of candles (e.g. to warm up from history) and return the last row.
+
+        Args:
+            candles: DataFrame indexed by timestamp, or an iterable of candle mappings
+        """
+        if isinstance(candles, pd.DataFrame):
+            candles = ({'timestamp': ts, **row} for ts, row in zip(candles.index, candles.to_dict('records')))
+        for candle in candles:
+            self.ingest(candle)
+        return self.latest()
@@ -1,3 +1,4 @@
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from .models import TradeLog, EventType, OrderStatus, TradeSide
@@ -56,6 +57,36 @@ async def create_log_entry(
         logger.error(f"Error creating log entry: {e}", exc_info=True)
         raise # Re-raise the exception after logging
 
+async def create_log_entries(db: AsyncSession, rows: list[dict]) -> int:
+    """
+    Bulk-inserts log entries in a single transaction.
+
+    Args:
+        db: Session to use
+        rows: Column -> value mappings for TradeLog (same fields as create_log_entry).
+            A missing or None 'timestamp' falls back to the DB default.
+
+    Returns:
+        Number of rows inserted
+    """
+    if not rows:
+        return 0
+    # executemany needs identical keys per statement, so group rows by their column set
+    groups: dict[tuple, list[dict]] = {}
+    for row in rows:
+        row = {key: value for key, value in row.items() if not (key == 'timestamp' and value is None)}
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    try:
+        for group in groups.values():
+            await db.execute(insert(TradeLog), group)
+        await db.commit()
+        logger.debug(f"Created {len(rows)} log entries")
+        return len(rows)
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error creating {len(rows)} log entries: {e}", exc_info=True)
+        raise
+
 # --- Add other CRUD operations as needed --- #
 
 # Example: Get logs by trade_id
@@ -0,0 +1,211 @@
+"""
+Write-behind persistence for TradeLog rows.
+
+TradeLogWriter buffers rows in memory and a background task writes them with bulk inserts
+(crud.create_log_entries) once batch_size rows are pending or every flush_interval seconds.
+Producers only await when max_buffer rows are waiting, i.e. when the database has fallen
+behind. Flushes that fail because the database is unreachable keep their rows and are
+retried with backoff. Any other failure means some rows can never be written (constraint
+violation, bad enum or timestamp): the batch is split until those rows are isolated, the
+rest is written, and the bad rows are logged and kept in a bounded dead-letter list
+instead of blocking every later fill. close() flushes whatever is left.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.orm import sessionmaker
+
+from app.core.trade_log.crud import create_log_entries
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_FLUSH_INTERVAL = 0.5  # seconds
+DEFAULT_MAX_BUFFER = 10_000
+MAX_RETRY_DELAY = 30.0  # seconds
+DEFAULT_MAX_DEAD_LETTERS = 1_000
+
+# Errors that mean the database could not be reached; anything else is a problem with the rows
+TRANSIENT_ERRORS = (sa_exc.OperationalError, sa_exc.InterfaceError, sa_exc.DisconnectionError,
+                    sa_exc.TimeoutError, OSError, asyncio.TimeoutError)
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """True if a failed write may succeed when retried unchanged."""
+    if isinstance(error, sa_exc.DBAPIError) and error.connection_invalidated:
+        return True
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+class TradeLogWriter:
+    """Buffers TradeLog rows and persists them in bulk from a background task."""
+
+    def __init__(self,
+                 session_factory: sessionmaker,
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 max_buffer: int = DEFAULT_MAX_BUFFER,
+                 retry_delay: float = 0.5,
+                 close_retries: int = 3,
+                 max_dead_letters: int = DEFAULT_MAX_DEAD_LETTERS):
+        """
+        Args:
+            session_factory: Factory producing AsyncSession instances
+            batch_size: Pending rows that trigger a flush before flush_interval elapses
+            flush_interval: Longest time a row waits in memory
+            max_buffer: Pending rows at which put() waits for the writer (backpressure)
+            retry_delay: Initial delay after a failed flush, doubled per consecutive failure
+            close_retries: Flush attempts on close() before giving up on the remaining rows
+            max_dead_letters: Rejected rows kept in dead_letters (oldest dropped first)
+        """
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.retry_delay = retry_delay
+        self.close_retries = close_retries
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._flush_requested = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._consecutive_failures = 0
+        # Rows that can never be written, with the error that rejected them
+        self.dead_letters: Deque[Tuple[Dict[str, Any], str]] = deque(maxlen=max_dead_letters)
+
+        # Metrics
+        self.written = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.rejected = 0
+        self.backpressure_waits = 0
+        self.last_flush_ms = 0.0
+
+    def start(self) -> None:
+        """Start the background flush task (on the running loop)."""
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._task = asyncio.create_task(self._run(), name="trade-log-writer")
+
+    async def put(self, **fields: Any) -> None:
+        """
+        Queue a TradeLog row; fields are the create_log_entry keyword arguments.
+
+        Returns immediately unless max_buffer rows are pending.
+        """
+        if self._closing:
+            raise RuntimeError("TradeLogWriter is closed")
+        while len(self._buffer) >= self.max_buffer:
+            self.backpressure_waits += 1
+            self._space.clear()
+            self._flush_requested.set()
+            await self._space.wait()
+        self._buffer.append(fields)
+        if len(self._buffer) >= self.batch_size:
+            self._flush_requested.set()
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            if not await self.flush() and not self._closing:
+                delay = min(self.retry_delay * 2 ** (self._consecutive_failures - 1), MAX_RETRY_DELAY)
+                await asyncio.sleep(delay)
+
+    async def _write(self, rows: List[Dict[str, Any]]) -> None:
+        async with self.session_factory() as db:
+            await create_log_entries(db, rows)
+
+    async def flush(self) -> bool:
+        """
+        Write all pending rows, normally in one transaction.
+
+        If the batch is rejected for its content, it is split in halves (recursively) so
+        the rows that can be written are, and each row that cannot goes to dead_letters.
+
+        Returns:
+            True if the buffer was written (or empty); if the database is unreachable the
+            rows not yet written stay buffered and False is returned
+        """
+        if not self._buffer:
+            return True
+        batch, self._buffer = self._buffer, []
+        start = time.perf_counter()
+        # Chunks still to write, in order
+        chunks = [batch]
+        while chunks:
+            rows = chunks.pop(0)
+            try:
+                await self._write(rows)
+            except Exception as e:
+                if is_transient_error(e):
+                    # Keep the unwritten rows, ahead of anything queued meanwhile, for the next attempt
+                    self._buffer[:0] = [row for chunk in [rows] + chunks for row in chunk]
+                    self.failed_flushes += 1
+                    self._consecutive_failures += 1
+                    logger.error(f"Trade log flush of {len(batch)} rows failed ({len(self._buffer)} pending): {e}")
+                    return False
+                if len(rows) == 1:
+                    self._reject(rows[0], e)
+                else:
+                    middle = len(rows) // 2
+                    chunks[:0] = [rows[:middle], rows[middle:]]
+                continue
+            self.written += len(rows)
+        self.last_flush_ms = (time.perf_counter() - start) * 1000.0
+        self.flushes += 1
+        self._consecutive_failures = 0
+        if len(self._buffer) < self.max_buffer:
+            self._space.set()
+        logger.debug(f"Trade log flushed {len(batch)} rows in {self.last_flush_ms:.1f} ms")
+        return True
+
+    def _reject(self, row: Dict[str, Any], error: Exception) -> None:
+        self.rejected += 1
+        self.dead_letters.append((row, str(error)))
+        logger.error(f"Trade log row rejected and moved to dead letters: {row} ({type(error).__name__}: {error})")
+
+    async def close(self) -> bool:
+        """
+        Stop the background task and flush the remaining rows.
+
+        Returns:
+            True if every buffered row was written
+        """
+        self._closing = True
+        self._flush_requested.set()
+        if self._task is not None:
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                logger.error(f"Trade log writer task failed: {e}", exc_info=True)
+            self._task = None
+        for attempt in range(self.close_retries):
+            if await self.flush():
+                return True
+            await asyncio.sleep(self.retry_delay * 2 ** attempt)
+        logger.error(f"Trade log writer closed with {len(self._buffer)} unwritten rows")
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Buffer depth and flush counters."""
+        return {
+            'buffered': len(self._buffer),
+            'written': self.written,
+            'flushes': self.flushes,
+            'failed_flushes': self.failed_flushes,
+            'rejected': self.rejected,
+            'backpressure_waits': self.backpressure_waits,
+            'last_flush_ms': self.last_flush_ms,
+        }
@@ -1,12 +1,63 @@
 import logging
+import math
 from typing import Dict, List, Optional
 from collections import deque
-import numpy as np
 from datetime import datetime
-import json
 
 logger = logging.getLogger(__name__)
 
+# Recompute the running sums exactly after this many updates to cancel float drift
+MA_RESYNC_INTERVAL = 10_000
+
+
+class MovingAverageState:
+    """Running sums over the last short/long window prices of one product, updated in O(1)."""
+
+    __slots__ = ('short_window', 'long_window', 'prices', 'short_sum', 'long_sum', '_updates')
+
+    def __init__(self, short_window: int, long_window: int):
+        self.short_window = short_window
+        self.long_window = long_window
+        self.prices = deque(maxlen=long_window)
+        self.short_sum = 0.0
+        self.long_sum = 0.0
+        self._updates = 0
+
+    def append(self, price: float) -> None:
+        """Add a price, evicting the values that leave each window."""
+        prices = self.prices
+        if len(prices) >= self.short_window:
+            self.short_sum -= prices[-self.short_window]
+        if len(prices) == self.long_window:
+            self.long_sum -= prices[0]
+        prices.append(price)
+        self.short_sum += price
+        self.long_sum += price
+
+        self._updates += 1
+        if self._updates >= MA_RESYNC_INTERVAL:
+            self.resync()
+
+    def resync(self) -> None:
+        """Recompute both sums exactly from the stored prices."""
+        prices = list(self.prices)
+        self.short_sum = math.fsum(prices[-self.short_window:])
+        self.long_sum = math.fsum(prices)
+        self._updates = 0
+
+    @property
+    def is_ready(self) -> bool:
+        return len(self.prices) >= self.long_window
+
+    @property
+    def short_ma(self) -> float:
+        return self.short_sum / min(len(self.prices), self.short_window)
+
+    @property
+    def long_ma(self) -> float:
+        return self.long_sum / len(self.prices)
+
+
 class TradingStrategy:
     def __init__(self, short_window: int = 20, long_window: int = 50):
         """
@@ -19,8 +70,9 @@ class TradingStrategy:
         self.short_window = short_window
         self.long_window = long_window
         
-        # Price history for each product
+        # Price history for each product (the deque owned by the product's MovingAverageState)
         self.price_history: Dict[str, deque] = {}
+        self.ma_state: Dict[str, MovingAverageState] = {}
         
         # Moving averages for each product
         self.short_ma: Dict[str, Optional[float]] = {}
@@ -33,7 +85,9 @@ class TradingStrategy:
 
     def initialize_product(self, product_id: str) -> None:
         """Initialize data structures for a new product."""
-        self.price_history[product_id] = deque(maxlen=self.long_window)
+        state = MovingAverageState(self.short_window, self.long_window)
+        self.ma_state[product_id] = state
+        self.price_history[product_id] = state.prices
         self.short_ma[product_id] = None
         self.long_ma[product_id] = None
         self.positions[product_id] = None
@@ -41,11 +95,12 @@ class TradingStrategy:
 
     def calculate_moving_averages(self, product_id: str) -> None:
         """Calculate short and long moving averages for a product."""
-        if len(self.price_history[product_id]) >= self.long_window:
-            prices = list(self.price_history[product_id])
-            self.short_ma[product_id] = np.mean(prices[-self.short_window:])
-            self.long_ma[product_id] = np.mean(prices)
-            logger.debug(f"{product_id} - Short MA: {self.short_ma[product_id]:.2f}, Long MA: {self.long_ma[product_id]:.2f}")
+        state = self.ma_state[product_id]
+        if state.is_ready:
+            self.short_ma[product_id] = state.short_ma
+            self.long_ma[product_id] = state.long_ma
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"{product_id} - Short MA: {self.short_ma[product_id]:.2f}, Long MA: {self.long_ma[product_id]:.2f}")
 
     def analyze_ticker(self, ticker_data: Dict) -> Optional[Dict]:
         """
@@ -61,11 +116,9 @@ class TradingStrategy:
             # Extract relevant data
             product_id = ticker_data.get("product_id")
             price = float(ticker_data.get("price", 0))
-            # Use current time if timestamp not available
-            timestamp = datetime.now()
             
-            # Additional logging for debugging
-            logger.debug(f"Analyzing ticker: {json.dumps(ticker_data)}")
+            # Additional logging for debugging (formatted lazily, only when enabled)
+            logger.debug("Analyzing ticker: %s", ticker_data)
             
             # Skip processing if missing essential data
             if not product_id or price == 0:
@@ -76,11 +129,12 @@ class TradingStrategy:
             if product_id not in self.price_history:
                 self.initialize_product(product_id)
             
-            # Add price to history
-            self.price_history[product_id].append(price)
+            # Add price to history and update the running sums
+            state = self.ma_state[product_id]
+            state.append(price)
             
             # Only generate signals once we have enough data
-            if len(self.price_history[product_id]) < self.long_window:
+            if not state.is_ready:
                 return None
             
             # Calculate moving averages
@@ -89,7 +143,8 @@ class TradingStrategy:
             # Generate trading signals
             signal = self.generate_signal(product_id)
             if signal:
-                signal["timestamp"] = timestamp
+                # Use current time if timestamp not available
+                signal["timestamp"] = datetime.now()
                 logger.info(f"Generated signal for {product_id}: {signal}")
                 return signal
             
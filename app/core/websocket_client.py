@@ -20,14 +20,16 @@ from app.core.config import Settings, get_settings
 import random
 import secrets
 
-from coinbase.websocket import WSClient, WebsocketResponse, WSClientException, WSClientConnectionClosedException
+from coinbase.websocket import WSClient, WSClientException, WSClientConnectionClosedException
+from app.core.ws_decoder import DEFAULT_CONSUMED_CHANNELS, JSONDecodeError, MessageDecoder
+from app.core.ws_bridge import DEFAULT_MAX_BATCH, DEFAULT_MAX_DELAY, MessageBridge
 
 # Configure logging for WebSocket client
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
-# Create file handler
-websocket_handler = logging.FileHandler('websocket.log')
+# Create file handler (opened on the first record, so importing the module creates no file)
+websocket_handler = logging.FileHandler('websocket.log', delay=True)
 websocket_handler.setLevel(logging.DEBUG)
 
 # Create console handler
@@ -66,7 +68,12 @@ class CoinbaseWebSocketClient:
         loop: Optional[asyncio.AbstractEventLoop] = None,
         connection_established_event: Optional[asyncio.Event] = None,
         retry: bool = True,
-        verbose: bool = False # Set to True for detailed SDK logging
+        verbose: bool = False, # Set to True for detailed SDK logging
+        message_format: str = "dict",
+        consumed_channels: Optional[Set[str]] = None,
+        batch_size: int = DEFAULT_MAX_BATCH,
+        batch_delay: float = DEFAULT_MAX_DELAY,
+        conflate_tickers: bool = True
     ):
         """
         Initializes the WebSocket client.
@@ -82,7 +89,17 @@ class CoinbaseWebSocketClient:
             connection_established_event (Optional[asyncio.Event]): Event to set when connection is open.
             retry (bool): Whether the client should automatically attempt reconnection. Defaults to True.
             verbose (bool): Enable verbose logging from the underlying WSClient. Defaults to False.
+            message_format (str): "dict" puts plain dicts on the queue (default); "struct" puts the
+                compact Ticker/MarketTrade/OrderUpdate tuples from app.core.ws_decoder.
+            consumed_channels (Optional[Set[str]]): Channels decoded onto the queue. Frames from
+                other channels are dropped unparsed. Defaults to ticker, user and market_trades.
+            batch_size (int): Pending messages that trigger an immediate hand-off to the loop.
+            batch_delay (float): Longest time (seconds) a message waits before being handed off.
+            conflate_tickers (bool): Keep only the latest pending ticker per product when the
+                consumer is behind. Order updates are never conflated or dropped.
         """
+        if message_format not in ("dict", "struct"):
+            raise ValueError(f"message_format must be 'dict' or 'struct', got {message_format!r}")
         self.api_key = api_key
         self.api_secret = api_secret
         self.product_ids = product_ids
@@ -93,6 +110,12 @@ class CoinbaseWebSocketClient:
         self._verbose = verbose
         self.main_loop = loop
         self._connection_event = connection_established_event
+        self.message_format = message_format
+        self.decoder = MessageDecoder(consumed_channels or DEFAULT_CONSUMED_CHANNELS)
+        self._batch_size = batch_size
+        self._batch_delay = batch_delay
+        self._conflate_tickers = conflate_tickers
+        self.bridge: Optional[MessageBridge] = None
         
         self.ws_client: Optional[WSClient] = None
         self._is_running = False # Flag set in _on_open
@@ -119,105 +142,37 @@ class CoinbaseWebSocketClient:
     def _on_message(self, msg: str):
         """Callback executed when a message is received."""
         try:
-            # logger.debug(f"Raw WS message: {msg}") # Log raw for debugging if needed
-            data = json.loads(msg)
-            
-            # Optionally parse using WebsocketResponse for easier access
-            ws_response = WebsocketResponse(data)
-            channel = ws_response.channel
-            
-            # Basic logging to reduce noise, increase level if needed
-            if channel not in ["ticker", "heartbeats"]:
-                logger.info(f"Received message on channel '{channel}'")
-            else:
-                logger.debug(f"Received message on channel '{channel}'")
-
-            # Process based on channel type
-            if channel == "ticker" and self.message_queue:
-                for event in ws_response.events:
-                    for ticker in event.tickers:
-                        # Put relevant ticker data onto the queue
-                        ticker_data = {
-                            'type': 'ticker',
-                            'product_id': ticker.product_id,
-                            'price': ticker.price,
-                            'volume_24_h': ticker.volume_24_h,
-                            'time': ws_response.timestamp # Use message timestamp
-                        }
-                        try:
-                            # Use threadsafe call to put item on the queue owned by the main loop
-                            if self.main_loop and self.message_queue:
-                                self.main_loop.call_soon_threadsafe(self.message_queue.put_nowait, ticker_data)
-                            else:
-                                logger.warning("Main loop or message queue not available for ticker data.")
-                        except Exception as e:
-                            # Log error during task creation or putting on queue
-                            logger.error(f"Error putting ticker message on queue: {e}", exc_info=True)
-
-            elif channel == "heartbeats":
-                # Heartbeats are useful for checking connection health, but maybe not needed in queue
-                logger.debug(f"Heartbeat received: {ws_response.timestamp}")
-                
-            elif channel == "user" and self.message_queue:
-                for event in ws_response.events:
-                    if event.type == "snapshot": # Initial order state (ignore for now)
-                        logger.info("User channel snapshot received.")
-                        continue 
-                    # Process actual order updates
-                    for order in event.orders:
-                        # Check if order is considered filled/closed
-                        if order.status in ["FILLED", "CANCELLED", "EXPIRED", "FAILED"]:
-                            order_data = {
-                                'type': 'user_order_update',
-                                'order_id': order.order_id,
-                                'client_order_id': order.client_order_id,
-                                'product_id': order.product_id,
-                                'side': order.side,
-                                'status': order.status,
-                                'cumulative_quantity': order.cumulative_quantity,
-                                'total_fees': order.total_fees,
-                                'average_filled_price': order.average_filled_price,
-                                'time': ws_response.timestamp
-                            }
-                            logger.info(f"Putting order update onto queue: {order.order_id} ({order.status})")
-                            try:
-                                # Use threadsafe call for user order updates as well
-                                if self.main_loop and self.message_queue:
-                                    self.main_loop.call_soon_threadsafe(self.message_queue.put_nowait, order_data)
-                                else:
-                                    logger.warning("Main loop or message queue not available for user order data.")
-                            except Exception as e:
-                                # Log error during task creation or putting on queue
-                                logger.error(f"Error putting user order update on queue: {e}", exc_info=True)
-
-            elif channel == "market_trades" and self.message_queue: # Added market_trades handling
-                 for event in ws_response.events:
-                     for trade in event.trades:
-                         trade_data = {
-                             'type': 'market_trade',
-                             'trade_id': trade.trade_id,
-                             'product_id': trade.product_id,
-                             'price': trade.price,
-                             'size': trade.size,
-                             'side': trade.side,
-                             'time': trade.time # Use trade timestamp
-                         }
-                         logger.debug(f"Putting market trade onto queue: {trade.trade_id}")
-                         try:
-                             if self.main_loop and self.message_queue:
-                                 self.main_loop.call_soon_threadsafe(self.message_queue.put_nowait, trade_data)
-                             else:
-                                 logger.warning("Main loop or message queue not available for market trade data.")
-                         except Exception as e:
-                             logger.error(f"Error putting market trade message on queue: {e}", exc_info=True)
-
-            elif channel == "subscriptions":
-                 logger.info(f"Subscription confirmation received: {data}")
-
-            else:
-                logger.debug(f"Unhandled message on channel '{channel}': {data}")
+            # Channels we do not consume are dropped before JSON parsing
+            channel, messages, data = self.decoder.decode(msg)
+
+            if channel == "heartbeats":
+                # Heartbeats are useful for checking connection health, but not needed in queue
+                return
+            if channel == "subscriptions":
+                logger.info(f"Subscription confirmation received: {data}")
+                return
+            if data is None:
+                return
+            if not messages:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"No queued messages from channel '{channel}'")
+                return
+
+            bridge = self._get_bridge()
+            if bridge is None:
+                logger.warning(f"Main loop or message queue not available for {channel} data.")
+                return
+            as_dicts = self.message_format == "dict"
+            for message in messages:
+                if message.type == 'user_order_update':
+                    logger.info(f"Putting order update onto queue: {message.order_id} ({message.status})")
+                try:
+                    # Buffered here and handed to the main loop's queue in micro-batches
+                    bridge.put(message.to_dict() if as_dicts else message)
+                except Exception as e:
+                    logger.error(f"Error putting {channel} message on queue: {e}", exc_info=True)
 
-        except json.JSONDecodeError:
+        except JSONDecodeError:
             logger.error(f"Failed to decode JSON message: {msg}")
         except Exception as e:
             # Catch-all for errors during message processing *within this callback*
@@ -229,6 +184,22 @@ class CoinbaseWebSocketClient:
                 except Exception as callback_err:
                     logger.error(f"Error executing on_error callback: {callback_err}", exc_info=True)
 
+    def _get_bridge(self) -> Optional[MessageBridge]:
+        """The batching bridge to the main loop's queue, created once both are available."""
+        if self.bridge is None and self.main_loop and self.message_queue is not None:
+            self.bridge = MessageBridge(
+                self.main_loop,
+                self.message_queue,
+                max_batch=self._batch_size,
+                max_delay=self._batch_delay,
+                conflate_tickers=self._conflate_tickers,
+            )
+        return self.bridge
+
+    def bridge_stats(self) -> Dict[str, Any]:
+        """Queue depth, lag and conflation counters of the message bridge (empty before the first message)."""
+        return self.bridge.stats() if self.bridge else {}
+
     def connect(self):
         """Establishes the WebSocket connection and starts listening."""
         if self._is_running:
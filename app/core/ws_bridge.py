@@ -0,0 +1,183 @@
+"""
+Batched hand-off of websocket messages from the SDK thread to the asyncio loop.
+
+The websocket SDK delivers frames on its own thread. Instead of one
+loop.call_soon_threadsafe per message, MessageBridge buffers messages on the thread side
+and wakes the loop once per micro-batch (after max_delay seconds, or immediately once
+max_batch messages are pending). Each flush moves as many messages into the asyncio.Queue
+as it has room for. The rest stay in the buffer, where tickers keep being conflated to
+the latest one per product, so a lagging consumer sees fresh prices instead of a backlog.
+Order updates are never conflated or dropped.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_DELAY = 0.005  # seconds
+DEFAULT_MAX_PENDING = 50_000
+LAG_EWMA_ALPHA = 0.05
+
+# Message types that must reach the consumer even under overload
+UNDROPPABLE_TYPES = frozenset({"user_order_update"})
+
+
+class MessageBridge:
+    """Thread-side buffer that feeds an asyncio.Queue in micro-batches."""
+
+    def __init__(self,
+                 loop: asyncio.AbstractEventLoop,
+                 queue: asyncio.Queue,
+                 max_batch: int = DEFAULT_MAX_BATCH,
+                 max_delay: float = DEFAULT_MAX_DELAY,
+                 max_pending: int = DEFAULT_MAX_PENDING,
+                 conflate_tickers: bool = True):
+        """
+        Args:
+            loop: Event loop owning the queue
+            queue: Destination queue; a maxsize > 0 bounds it and the bridge applies backpressure
+            max_batch: Pending messages that trigger an immediate flush
+            max_delay: Longest time a message waits on the thread side before a flush
+            max_pending: Thread-side bound; beyond it the oldest droppable messages are shed
+            conflate_tickers: Keep only the latest pending ticker per product
+        """
+        self.loop = loop
+        self.queue = queue
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.conflate_tickers = conflate_tickers
+
+        self._lock = threading.Lock()
+        self._pending: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._seq = 0
+        self._scheduled = False  # a flush (timer or immediate) is pending on the loop
+        self._urgent = False  # an immediate flush is pending on the loop
+        self._retrying = False  # the queue was full; a retry flush is pending on the loop
+
+        # Metrics
+        self.received = 0
+        self.delivered = 0
+        self.conflated = 0
+        self.dropped = 0
+        self.batches = 0
+        self.wakeups = 0
+        self.max_queue_depth = 0
+        self.lag_avg = 0.0
+        self.lag_max = 0.0
+
+    # --- Websocket thread side ---
+
+    def put(self, message: Any) -> None:
+        """Buffer a message; called from the websocket thread (or the loop itself)."""
+        now = time.perf_counter()
+        wake = None
+        with self._lock:
+            self.received += 1
+            key = None
+            if self.conflate_tickers and message.get("type") == "ticker":
+                key = ("ticker", message.get("product_id"))
+                if key in self._pending:
+                    # Replace in place; a flush is already scheduled for this slot
+                    self._pending[key] = (now, message)
+                    self.conflated += 1
+                    return
+            if key is None:
+                key = self._seq
+                self._seq += 1
+            self._pending[key] = (now, message)
+            if len(self._pending) > self.max_pending:
+                self._shed()
+
+            # An immediate flush is pointless while the queue is full: the retry flush
+            # (or the next timer) moves messages as soon as the consumer makes room
+            if (len(self._pending) >= self.max_batch and not self._urgent
+                    and not self._retrying and not self.queue.full()):
+                self._urgent = self._scheduled = True
+                wake = self._flush
+            elif not self._scheduled:
+                self._scheduled = True
+                wake = self._flush_after_delay
+            if wake is not None:
+                self.wakeups += 1
+        if wake is not None:
+            try:
+                self.loop.call_soon_threadsafe(wake)
+            except RuntimeError:  # loop closed during shutdown
+                logger.warning("Event loop closed; websocket messages are no longer delivered.")
+
+    def _shed(self) -> None:
+        """Drop the oldest droppable message (lock held)."""
+        for key, (_, message) in self._pending.items():
+            if message.get("type") not in UNDROPPABLE_TYPES:
+                del self._pending[key]
+                self.dropped += 1
+                return
+
+    # --- Event loop side ---
+
+    def _flush_after_delay(self) -> None:
+        self.loop.call_later(self.max_delay, self._flush)
+
+    def _flush(self) -> None:
+        """Move pending messages into the queue, up to its free capacity."""
+        with self._lock:
+            self._scheduled = self._urgent = self._retrying = False
+            if not self._pending:
+                return
+            if self.queue.maxsize > 0:
+                room = max(self.queue.maxsize - self.queue.qsize(), 0)
+            else:
+                room = len(self._pending)
+            batch = [self._pending.popitem(last=False)[1] for _ in range(min(room, len(self._pending)))]
+            retry = bool(self._pending)
+            if retry:
+                self._scheduled = self._retrying = True
+
+        now = time.perf_counter()
+        for enqueued_at, message in batch:
+            self.queue.put_nowait(message)
+            lag = now - enqueued_at
+            self.lag_avg += LAG_EWMA_ALPHA * (lag - self.lag_avg)
+            if lag > self.lag_max:
+                self.lag_max = lag
+        if batch:
+            self.delivered += len(batch)
+            self.batches += 1
+            depth = self.queue.qsize()
+            if depth > self.max_queue_depth:
+                self.max_queue_depth = depth
+        if retry:
+            # Consumer is behind: keep conflating on this side and try again shortly
+            self.loop.call_later(self.max_delay, self._flush)
+
+    def flush_now(self) -> None:
+        """Flush pending messages immediately (call on the loop thread)."""
+        self._flush()
+
+    # --- Metrics ---
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters, queue depth and hand-off lag (seconds converted to ms)."""
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            'received': self.received,
+            'delivered': self.delivered,
+            'conflated': self.conflated,
+            'dropped': self.dropped,
+            'pending': pending,
+            'batches': self.batches,
+            'wakeups': self.wakeups,
+            'avg_batch': self.delivered / self.batches if self.batches else 0.0,
+            'queue_depth': self.queue.qsize(),
+            'queue_maxsize': self.queue.maxsize,
+            'max_queue_depth': self.max_queue_depth,
+            'lag_avg_ms': self.lag_avg * 1000.0,
+            'lag_max_ms': self.lag_max * 1000.0,
+        }
@@ -0,0 +1,213 @@
+"""
+Decoding layer for Coinbase Advanced Trade websocket frames.
+
+Replaces the json.loads + WebsocketResponse path in CoinbaseWebSocketClient._on_message:
+
+- JSON is parsed with orjson or msgspec when installed, falling back to the stdlib.
+- The channel is read from the frame prefix before parsing, so frames on channels nobody
+  consumes (heartbeats, l2_data, ...) are counted and dropped without being decoded.
+- Consumed channels are turned straight from the parsed dicts into compact NamedTuple
+  messages (Ticker, MarketTrade, OrderUpdate) without building SDK response objects.
+  The messages support .get() like the dicts they replace, and to_dict() gives the
+  previous queue payloads.
+"""
+import json
+import logging
+from typing import Any, Callable, Dict, FrozenSet, List, NamedTuple, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    _loads: Callable[[Union[str, bytes]], Any] = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:  # optional speedup
+    try:
+        import msgspec
+        _loads = msgspec.json.Decoder().decode
+        JSON_BACKEND = "msgspec"
+    except ImportError:
+        _loads = json.loads
+        JSON_BACKEND = "json"
+
+JSONDecodeError: Tuple[type, ...] = (ValueError,)  # json/orjson errors subclass ValueError
+if JSON_BACKEND == "msgspec":
+    JSONDecodeError = (ValueError, msgspec.DecodeError)
+
+# Channels turned into queue messages
+DEFAULT_CONSUMED_CHANNELS: FrozenSet[str] = frozenset({"ticker", "user", "market_trades"})
+# Order states forwarded from the user channel
+TERMINAL_ORDER_STATUSES: FrozenSet[str] = frozenset({"FILLED", "CANCELLED", "EXPIRED", "FAILED"})
+
+_CHANNEL_PREFIX = '{"channel":"'
+
+
+class _MessageMixin:
+    """dict-style access for the message tuples, so existing consumers keep working."""
+
+    __slots__ = ()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self._fields else default
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+class _TickerFields(NamedTuple):
+    type: str
+    product_id: Optional[str]
+    price: Optional[str]
+    volume_24_h: Optional[str]
+    time: Optional[str]
+
+
+class _MarketTradeFields(NamedTuple):
+    type: str
+    trade_id: Optional[str]
+    product_id: Optional[str]
+    price: Optional[str]
+    size: Optional[str]
+    side: Optional[str]
+    time: Optional[str]
+
+
+class _OrderUpdateFields(NamedTuple):
+    type: str
+    order_id: Optional[str]
+    client_order_id: Optional[str]
+    product_id: Optional[str]
+    side: Optional[str]
+    status: Optional[str]
+    cumulative_quantity: Optional[str]
+    total_fees: Optional[str]
+    average_filled_price: Optional[str]
+    time: Optional[str]
+
+
+class Ticker(_TickerFields, _MessageMixin):
+    __slots__ = ()
+
+
+class MarketTrade(_MarketTradeFields, _MessageMixin):
+    __slots__ = ()
+
+
+class OrderUpdate(_OrderUpdateFields, _MessageMixin):
+    __slots__ = ()
+
+
+Message = Union[Ticker, MarketTrade, OrderUpdate]
+
+
+def peek_channel(raw: Union[str, bytes]) -> Optional[str]:
+    """
+    Read the channel name from the start of a frame without parsing it.
+
+    Coinbase frames serialize "channel" as the first key; anything else returns None so
+    the caller falls back to a full parse.
+    """
+    if isinstance(raw, (bytes, bytearray)):
+        if not raw.startswith(b'{"channel":"'):
+            return None
+        end = raw.find(b'"', 12)
+        return raw[12:end].decode() if end > 12 else None
+    if not raw.startswith(_CHANNEL_PREFIX):
+        return None
+    end = raw.find('"', 12)
+    return raw[12:end] if end > 12 else None
+
+
+def _tickers(data: Dict) -> List[Ticker]:
+    timestamp = data.get("timestamp")
+    return [
+        Ticker("ticker", t.get("product_id"), t.get("price"), t.get("volume_24_h"), timestamp)
+        for event in data.get("events") or ()
+        for t in event.get("tickers") or ()
+    ]
+
+
+def _market_trades(data: Dict) -> List[MarketTrade]:
+    return [
+        MarketTrade("market_trade", t.get("trade_id"), t.get("product_id"), t.get("price"),
+                    t.get("size"), t.get("side"), t.get("time"))
+        for event in data.get("events") or ()
+        for t in event.get("trades") or ()
+    ]
+
+
+def _order_updates(data: Dict) -> List[OrderUpdate]:
+    timestamp = data.get("timestamp")
+    updates = []
+    for event in data.get("events") or ():
+        if event.get("type") == "snapshot":  # initial order state
+            continue
+        for order in event.get("orders") or ():
+            status = order.get("status")
+            if status not in TERMINAL_ORDER_STATUSES:
+                continue
+            updates.append(OrderUpdate(
+                "user_order_update",
+                order.get("order_id"),
+                order.get("client_order_id"),
+                order.get("product_id"),
+                order.get("order_side", order.get("side")),
+                status,
+                order.get("cumulative_quantity"),
+                order.get("total_fees"),
+                order.get("avg_price", order.get("average_filled_price")),
+                timestamp,
+            ))
+    return updates
+
+
+_BUILDERS: Dict[str, Callable[[Dict], List]] = {
+    "ticker": _tickers,
+    "market_trades": _market_trades,
+    "user": _order_updates,
+}
+
+
+class MessageDecoder:
+    """
+    Turns raw frames into queue messages, skipping channels that are not consumed.
+    """
+
+    def __init__(self, consumed_channels: FrozenSet[str] = DEFAULT_CONSUMED_CHANNELS):
+        """
+        Args:
+            consumed_channels: Channels decoded into messages; all others are dropped
+        """
+        self.consumed_channels = frozenset(consumed_channels)
+        self.frames = 0
+        self.skipped = 0
+        self.heartbeats = 0
+
+    def decode(self, raw: Union[str, bytes]) -> Tuple[Optional[str], List[Message], Optional[Dict]]:
+        """
+        Decode one frame.
+
+        Args:
+            raw: Frame text as received
+
+        Returns:
+            (channel, messages, parsed) where parsed is the decoded dict, or None when the
+            frame was skipped without parsing
+
+        Raises:
+            ValueError: If the frame is not valid JSON
+        """
+        self.frames += 1
+        channel = peek_channel(raw)
+        if channel is not None and channel not in self.consumed_channels and channel != "subscriptions":
+            if channel == "heartbeats":
+                self.heartbeats += 1
+            self.skipped += 1
+            return channel, [], None
+
+        data = _loads(raw)
+        if not isinstance(data, dict):
+            raise ValueError(f"Unexpected frame type: {type(data).__name__}")
+        channel = data.get("channel")
+        builder = _BUILDERS.get(channel) if channel in self.consumed_channels else None
+        return channel, (builder(data) if builder else []), data
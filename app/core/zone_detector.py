@@ -62,6 +62,38 @@ def get_candle_direction(candle: pd.Series) -> str:
     else:
         return 'doji'
 
+# --- Array-level Classification ---
+
+def classify_candles(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray):
+    """Classifies every candle at once (array version of is_base_candle and get_candle_direction).
+
+    Args:
+        open_, high, low, close: Equal-length price arrays.
+
+    Returns:
+        Tuple (is_base, direction): a boolean array that is True for base candles, and an
+        int8 array of 1 ('up'), -1 ('down') or 0 ('doji').
+    """
+    open_, high, low, close = (np.asarray(a, dtype=float) for a in (open_, high, low, close))
+    body_size = np.abs(close - open_)
+    total_range = high - low
+    with np.errstate(divide='ignore', invalid='ignore'):
+        small_body = (body_size / total_range) < BASE_CANDLE_BODY_THRESHOLD
+    # Candles with no range are base candles only if the body is also zero
+    is_base = np.where(total_range <= 0, body_size == 0, small_body)
+    direction = (close > open_).astype(np.int8) - (close < open_).astype(np.int8)
+    return is_base, direction
+
+def find_runs(mask: np.ndarray):
+    """Run-length encodes the True stretches of a boolean array.
+
+    Returns:
+        Tuple (starts, ends) of index arrays; run k covers [starts[k], ends[k]).
+    """
+    padded = np.concatenate(([0], np.asarray(mask, dtype=np.int8), [0]))
+    edges = np.flatnonzero(np.diff(padded))
+    return edges[0::2], edges[1::2]
+
 # --- Indicator Calculations ---
 
 def calculate_rsi(series: pd.Series, period: int = 14) -> pd.Series:
@@ -139,10 +171,65 @@ def calculate_strength_score(zone: dict, ohlcv_df: pd.DataFrame) -> int:
         print(f"Error calculating strength score: {e}")
         return 0
 
+def calculate_freshness_scores(zone_low: np.ndarray, zone_high: np.ndarray, leg_out_index: np.ndarray,
+                               low: np.ndarray, high: np.ndarray, window: int = 32) -> np.ndarray:
+    """Bulk calculate_freshness_score for many zones.
+
+    Touches in the first `window` candles after each leg-out are counted for all zones at
+    once; zones with fewer than 2 touches by then keep scanning in doubling chunks.
+
+    Args:
+        zone_low, zone_high: Zone bounds, one entry per zone.
+        leg_out_index: Positional index of each zone's leg-out candle.
+        low, high: Candle lows and highs of the whole frame.
+        window: Candles checked for every zone in the first pass.
+
+    Returns:
+        Integer array of scores: 10 (0 touches), 5 (1 touch), 1 (2+ touches).
+    """
+    zone_low, zone_high = np.asarray(zone_low, dtype=float), np.asarray(zone_high, dtype=float)
+    leg_out_index = np.asarray(leg_out_index, dtype=np.int64)
+    n = len(low)
+    if len(leg_out_index) == 0 or n == 0:
+        return np.zeros(len(leg_out_index), dtype=np.int64)
+
+    idx = leg_out_index[:, None] + np.arange(1, window + 1)
+    in_frame = idx < n
+    idx = np.minimum(idx, n - 1)
+    touched = (low[idx] <= zone_high[:, None]) & (high[idx] >= zone_low[:, None]) & in_frame
+    touches = np.minimum(touched.sum(axis=1), 2)
+
+    for k in np.flatnonzero((touches < 2) & (leg_out_index + window + 1 < n)):
+        start, step = leg_out_index[k] + window + 1, window * 4
+        while touches[k] < 2 and start < n:
+            stop = min(start + step, n)
+            touches[k] += np.count_nonzero((low[start:stop] <= zone_high[k]) & (high[start:stop] >= zone_low[k]))
+            start, step = stop, step * 2
+        touches[k] = min(touches[k], 2)
+
+    return np.select([touches == 0, touches == 1], [10, 5], 1)
+
+def calculate_strength_scores(leg_out_index: np.ndarray, open_: np.ndarray, high: np.ndarray,
+                              low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """Bulk calculate_strength_score: leg-out body as a percentage of its range (0-100).
+
+    Returns:
+        Integer array of scores, 0 where the leg-out candle has no (or an invalid) range.
+    """
+    leg_out_index = np.asarray(leg_out_index, dtype=np.int64)
+    body_size = np.abs(close[leg_out_index] - open_[leg_out_index])
+    total_range = high[leg_out_index] - low[leg_out_index]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        strength = np.round((body_size / total_range) * 100)
+    valid = (total_range > 0) & np.isfinite(strength)
+    return np.where(valid, strength, 0).astype(np.int64)
+
 # --- Main Detection Logic ---
-def detect_base_patterns(ohlcv_df: pd.DataFrame) -> list:
-    """Detects Rally-Base-Drop (Supply) and Drop-Base-Rally (Demand) patterns,
-       including RSI at formation time.
+def detect_base_patterns_iterative(ohlcv_df: pd.DataFrame) -> list:
+    """Row-at-a-time reference implementation of detect_base_patterns.
+
+    Walks the frame candle by candle with is_base_candle/is_leg_candle/get_candle_direction.
+    Kept to verify the vectorized detector against; prefer detect_base_patterns.
 
     Args:
         ohlcv_df: DataFrame with OHLCV data, sorted by timestamp ascending. 
@@ -260,4 +347,100 @@ def detect_base_patterns(ohlcv_df: pd.DataFrame) -> list:
     # Ensure the RSI column is dropped to prevent side effects
     ohlcv_df.drop(columns=['rsi_14'], inplace=True, errors='ignore') 
 
-    return zones 
\ No newline at end of file
+    return zones 
+
+def detect_base_patterns(ohlcv_df: pd.DataFrame) -> list:
+    """Detects Rally-Base-Drop (Supply) and Drop-Base-Rally (Demand) patterns,
+       including RSI at formation time.
+
+    All candles are classified at once with classify_candles, base candle runs are found
+    with find_runs and each run is checked against its leg-in (the candle before it) and
+    leg-out (the candle after it). The result matches detect_base_patterns_iterative,
+    including its scan order: a run whose leg-in is the leg-out of a zone just found is skipped.
+
+    Args:
+        ohlcv_df: DataFrame with OHLCV data, sorted by timestamp ascending. 
+                  Must include columns: ['timestamp', 'open', 'high', 'low', 'close'].
+
+    Returns:
+        A list of dictionaries, each representing a detected zone.
+        Each dictionary contains:
+            - type: 'supply' or 'demand'
+            - leg_in_index: DataFrame index of the leg-in candle
+            - base_start_index: DataFrame index of the first base candle
+            - base_end_index: DataFrame index of the last base candle
+            - leg_out_index: DataFrame index of the leg-out candle
+            - zone_low: The lowest low price within the base candle(s)
+            - zone_high: The highest high price within the base candle(s)
+            - base_timestamps: List of timestamps for the base candles
+            - freshness_score: See calculate_freshness_score
+            - strength_score: See calculate_strength_score
+            - rsi_at_formation: RSI(14) value at the time of the leg-out candle (or NaN)
+    """
+    n = len(ohlcv_df)
+    if n < 3: # Need at least 3 candles for a pattern
+        return []
+
+    open_, high, low, close = (ohlcv_df[col].to_numpy(dtype=float) for col in ('open', 'high', 'low', 'close'))
+    is_base, direction = classify_candles(open_, high, low, close)
+
+    # Base runs with a leg-in before them (scanned while leg-in < n - 2) and a leg-out after them
+    starts, ends = find_runs(is_base)
+    keep = (starts >= 1) & (starts <= n - 2) & (ends < n)
+    starts, ends = starts[keep], ends[keep]
+    if len(starts) == 0:
+        return []
+    leg_in, leg_out = starts - 1, ends
+
+    bounds = np.column_stack((starts, ends)).ravel()
+    zone_low = np.minimum.reduceat(low, bounds)[0::2]
+    zone_high = np.maximum.reduceat(high, bounds)[0::2]
+
+    dir_in, dir_out = direction[leg_in], direction[leg_out]
+    demand = (dir_in == -1) & (dir_out == 1) & (high[leg_out] > zone_high)
+    supply = (dir_in == 1) & (dir_out == -1) & (low[leg_out] < zone_low)
+    candidate = demand | supply
+
+    # After a zone is found the scan resumes past its leg-out, so a run whose leg-in is that
+    # leg-out is never checked. Along a chain of such back-to-back candidate runs every
+    # other run is a zone, starting from the first.
+    run_no = np.arange(len(starts))
+    chained = np.zeros(len(starts), dtype=bool)
+    chained[1:] = (ends[:-1] == leg_in[1:]) & candidate[:-1]
+    chain_start = np.maximum.accumulate(np.where(chained, 0, run_no))
+    found = np.flatnonzero(candidate & ((run_no - chain_start) % 2 == 0))
+    if len(found) == 0:
+        return []
+
+    starts, ends, leg_in, leg_out = starts[found], ends[found], leg_in[found], leg_out[found]
+    zone_low, zone_high, demand = zone_low[found], zone_high[found], demand[found]
+    freshness = calculate_freshness_scores(zone_low, zone_high, leg_out, low, high)
+    strength = calculate_strength_scores(leg_out, open_, high, low, close)
+
+    rsi = calculate_rsi(ohlcv_df['close'], period=14)
+    rsi_values = np.full(n, np.nan) if rsi is None else np.asarray(rsi, dtype=float)
+
+    # Base timestamps for all zones in one lookup, then split per zone
+    lengths = ends - starts
+    offsets = np.cumsum(lengths)
+    positions = np.arange(offsets[-1]) - np.repeat(offsets - lengths, lengths) + np.repeat(starts, lengths)
+    timestamps = ohlcv_df['timestamp'].iloc[positions].tolist()
+
+    zones = []
+    columns = zip(leg_in.tolist(), starts.tolist(), ends.tolist(), zone_low.tolist(), zone_high.tolist(),
+                  demand.tolist(), freshness.tolist(), strength.tolist(), (offsets - lengths).tolist(), offsets.tolist())
+    for i, start, end, low_k, high_k, is_demand, fresh, strong, ts_from, ts_to in columns:
+        zones.append({
+            'leg_in_index': i,
+            'base_start_index': start,
+            'base_end_index': end - 1,
+            'leg_out_index': end,
+            'zone_low': low_k,
+            'zone_high': high_k,
+            'base_timestamps': timestamps[ts_from:ts_to],
+            'type': 'demand' if is_demand else 'supply',
+            'freshness_score': fresh,
+            'strength_score': strong,
+            'rsi_at_formation': rsi_values[end],
+        })
+    return zones
@@ -0,0 +1,234 @@
+"""
+In-memory index of active supply/demand zones for DataManager.update_zone_status.
+
+Per symbol, active zones are sorted by zone_low and a max segment tree is kept over their
+zone_high. "Which zones overlap [low, high]" (zone_low <= high and zone_high >= low, the
+SQL filter update_zone_status used) is a bisect for the zone_low bound plus a descent that
+only enters subtrees whose max zone_high reaches low: O(log n + k log n) for k matches.
+Deactivated zones are tombstoned in place and the symbol is compacted once half its
+entries are dead.
+
+Touches and deactivations are recorded on the in-memory records and marked dirty;
+flush() writes them back to the zones table with one bulk UPDATE. flush(commit=False)
+leaves the UPDATE in the caller's transaction: the written records are kept as
+uncommitted until the session reports the outcome through committed()/rolled_back().
+"""
+import logging
+import math
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from app.core.database.models import Zone
+
+logger = logging.getLogger(__name__)
+
+NEG_INF = -math.inf
+
+
+@dataclass(slots=True)
+class ZoneRecord:
+    """The zone columns update_zone_status reads and writes."""
+    id: int
+    symbol: str
+    timeframe: str
+    type: str
+    zone_low: float
+    zone_high: float
+    formation_timestamp: int
+    num_touches: int = 0
+    last_tested_timestamp: Optional[int] = None
+    is_active: bool = True
+
+
+class SymbolZoneIndex:
+    """Active zones of one symbol, queryable by price overlap."""
+
+    def __init__(self, records: Iterable[ZoneRecord] = ()):
+        self._build(list(records))
+
+    def _build(self, records: List[ZoneRecord]) -> None:
+        records.sort(key=lambda r: (r.zone_low, r.id))
+        self.records: List[Optional[ZoneRecord]] = records
+        self.lows = [r.zone_low for r in records]
+        self.positions = {r.id: i for i, r in enumerate(records)}
+        self.size = 1
+        while self.size < max(len(records), 1):
+            self.size *= 2
+        tree = [NEG_INF] * (2 * self.size)
+        for i, record in enumerate(records):
+            tree[self.size + i] = record.zone_high
+        for node in range(self.size - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self.tree = tree
+        self.tombstones = 0
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __contains__(self, zone_id: int) -> bool:
+        return zone_id in self.positions
+
+    def add(self, records: Iterable[ZoneRecord]) -> None:
+        """Insert zones (rebuilds the symbol; zones are added far less often than queried)."""
+        live = [r for r in self.records if r is not None]
+        known = set(self.positions)
+        live.extend(r for r in records if r.id not in known)
+        self._build(live)
+
+    def remove(self, zone_id: int) -> None:
+        """Drop a zone from the index (e.g. once deactivated)."""
+        i = self.positions.pop(zone_id, None)
+        if i is None:
+            return
+        self.records[i] = None
+        node = self.size + i
+        self.tree[node] = NEG_INF
+        node //= 2
+        while node:
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+            node //= 2
+        self.tombstones += 1
+        if self.tombstones * 2 > len(self.records):
+            self._build([r for r in self.records if r is not None])
+
+    def overlapping(self, low: float, high: float) -> List[ZoneRecord]:
+        """Zones with zone_low <= high and zone_high >= low, in zone_low order."""
+        end = bisect_right(self.lows, high)  # leaves [0, end) have zone_low <= high
+        if end == 0 or self.tree[1] < low:
+            return []
+        tree, size, records = self.tree, self.size, self.records
+        found = []
+        # Depth-first over nodes covering [node_lo, node_hi), left to right
+        stack = [(1, 0, size)]
+        while stack:
+            node, node_lo, node_hi = stack.pop()
+            if node_lo >= end or tree[node] < low:
+                continue
+            if node >= size:
+                found.append(records[node_lo])
+                continue
+            mid = (node_lo + node_hi) // 2
+            stack.append((2 * node + 1, mid, node_hi))
+            stack.append((2 * node, node_lo, mid))
+        return found
+
+
+class ZoneIndex:
+    """Per-symbol active-zone indexes with write-behind of touches and deactivations."""
+
+    def __init__(self):
+        self.symbols: Dict[str, SymbolZoneIndex] = {}
+        self.dirty: Dict[int, ZoneRecord] = {}
+        # Written in a transaction the caller has not committed yet
+        self.uncommitted: Dict[int, ZoneRecord] = {}
+
+    @staticmethod
+    def _load_records(session: Session, symbol: str) -> List[ZoneRecord]:
+        # Core select: rows are not attached to the session's identity map
+        rows = session.execute(
+            select(Zone.id, Zone.symbol, Zone.timeframe, Zone.type, Zone.zone_low, Zone.zone_high,
+                   Zone.formation_timestamp, Zone.num_touches, Zone.last_tested_timestamp)
+            .where(Zone.symbol == symbol, Zone.is_active == True)  # noqa: E712
+        ).all()
+        return [ZoneRecord(r.id, r.symbol, r.timeframe, r.type, float(r.zone_low), float(r.zone_high),
+                           int(r.formation_timestamp), r.num_touches or 0, r.last_tested_timestamp)
+                for r in rows]
+
+    def get(self, session: Session, symbol: str) -> SymbolZoneIndex:
+        """The symbol's index, loaded from the DB on first use."""
+        index = self.symbols.get(symbol)
+        if index is None:
+            records = self._load_records(session, symbol)
+            # Pending writes are newer than the DB
+            records = [self.dirty.get(r.id, r) for r in records]
+            index = self.symbols[symbol] = SymbolZoneIndex(r for r in records if r.is_active)
+            logger.debug(f"Loaded {len(index)} active zones for {symbol} into the zone index")
+        return index
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """Reload a symbol (or all symbols) from the DB on next use, e.g. after new zones are stored."""
+        if symbol is None:
+            self.symbols.clear()
+        else:
+            self.symbols.pop(symbol, None)
+
+    def rebuild(self, session: Session, symbols: Optional[Iterable[str]] = None) -> int:
+        """
+        Load every symbol with active zones (or the given ones) from the DB.
+
+        Returns:
+            Number of active zones indexed
+        """
+        if symbols is None:
+            symbols = session.execute(select(Zone.symbol).where(Zone.is_active == True).distinct()).scalars().all()  # noqa: E712
+        self.symbols.clear()
+        return sum(len(self.get(session, symbol)) for symbol in symbols)
+
+    def mark_dirty(self, record: ZoneRecord) -> None:
+        self.dirty[record.id] = record
+
+    def flush(self, session: Session, commit: bool = True) -> int:
+        """
+        Write pending touches/deactivations to the zones table in one bulk UPDATE.
+
+        Args:
+            session: Session to write through
+            commit: Commit (or on error roll back) the session; with False the UPDATE
+                stays in the caller's transaction and the caller commits or rolls back
+
+        Returns:
+            Number of zones written
+        """
+        if not self.dirty:
+            return 0
+        pending = self.dirty
+        self.dirty = {}
+        params = [{'b_id': r.id, 'b_num_touches': r.num_touches,
+                   'b_last_tested_timestamp': r.last_tested_timestamp, 'b_is_active': r.is_active}
+                  for r in pending.values()]
+        table = Zone.__table__
+        stmt = (update(table)
+                .where(table.c.id == bindparam('b_id'))
+                .values(num_touches=bindparam('b_num_touches'),
+                        last_tested_timestamp=bindparam('b_last_tested_timestamp'),
+                        is_active=bindparam('b_is_active')))
+        try:
+            session.connection().execute(stmt, params)
+            # ORM objects loaded before the update would otherwise keep the old values
+            for obj in list(session.identity_map.values()):
+                if isinstance(obj, Zone) and obj.id in pending:
+                    session.expire(obj)
+        except Exception:
+            if commit:
+                session.rollback()
+                self.rolled_back()
+            # Keep the writes (and any newer ones) for the next attempt
+            pending.update(self.dirty)
+            self.dirty = pending
+            raise
+        self.uncommitted.update(pending)
+        if commit:
+            try:
+                session.commit()
+            except Exception:
+                session.rollback()
+                self.rolled_back()
+                raise
+            self.committed()
+        return len(params)
+
+    def committed(self) -> None:
+        """The session committed: uncommitted writes are now stored."""
+        self.uncommitted.clear()
+
+    def rolled_back(self) -> None:
+        """The session rolled back: uncommitted writes are pending again."""
+        if self.uncommitted:
+            # Newer touches of the same zones are already on the records themselves
+            self.uncommitted.update(self.dirty)
+            self.dirty = self.uncommitted
+            self.uncommitted = {}
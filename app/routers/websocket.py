@@ -17,41 +17,55 @@ from app.core.trade_log.database import AsyncSessionFactory, init_db
 from app.core.trade_log.crud import create_log_entry
 from app.core.trade_log.models import EventType, TradeSide, OrderStatus
 from app.core.live_trader import LiveTrader
+from app.core.live_runtime import Decision, MultiProductRuntime
+from app.core.broadcaster import Broadcaster
+from app.core.price_cache import PriceCache
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Bound on the shared message queue; beyond it the websocket bridge holds messages back
+# and conflates tickers to the latest one per product
+MESSAGE_QUEUE_MAXSIZE = 10_000
+
 class ConnectionManager:
     def __init__(self):
         self.active_connections: List[WebSocket] = []
         self.market_data_cache: Dict[str, Dict] = {}  # product_id -> latest data
         self.message_queue: Optional[asyncio.Queue] = None
+        self.feed_task: Optional[asyncio.Task] = None
         self.coinbase_ws_client: Optional[CoinbaseWebSocketClient] = None
         self.coinbase_rest_client: Optional[CoinbaseClient] = None
         self.strategy: Optional[RSIMomentumStrategy] = None
         self.live_trader: Optional[LiveTrader] = None
+        # Multi-product runtime fed from the same ticker stream (optional)
+        self.runtime: Optional[MultiProductRuntime] = None
         self.order_executor: Optional[Union[OrderExecutor, DryRunExecutor]] = None
+        # Per-client outbound queues; slow clients are conflated, then evicted
+        self.broadcaster = Broadcaster(on_evict=self.disconnect)
+        # Latest ticker prices, used by OrderExecutor position monitoring instead of REST polling
+        self.price_cache = PriceCache()
         
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        self.broadcaster.register(websocket)
         logger.info("New WebSocket connection established")
         
     def disconnect(self, websocket: WebSocket):
+        self.broadcaster.unregister(websocket)
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
             logger.info("WebSocket connection closed")
             
     async def broadcast(self, message: Dict):
-        """Broadcast message to all connected clients"""
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting message: {str(e)}")
-                await self.disconnect(connection)
+        """Queue message for all connected clients (serialized once, sent by per-client tasks)"""
+        try:
+            self.broadcaster.publish(message)
+        except Exception as e:
+            logger.error(f"Error broadcasting message: {str(e)}")
                 
     async def handle_coinbase_message(self, message: Dict):
         """Handle incoming message from Coinbase WebSocket"""
@@ -60,15 +74,47 @@ class ConnectionManager:
 
         if product_id and message_type == "ticker":
             self.market_data_cache[product_id] = message
+            if self.runtime:
+                self.runtime.dispatch(message)
             await self.broadcast(message)
-            if self.message_queue:
-                try:
-                    asyncio.create_task(self.message_queue.put(message))
-                except Exception as e:
-                    logger.error(f"Error putting message onto strategy queue: {e}")
         elif message_type == "user_order":
              logger.info(f"Received user order update: {message}")
-        
+
+    async def consume_feed(self, queue: asyncio.Queue):
+        """
+        Consume the websocket client's message queue until a None sentinel arrives.
+
+        This is the path the live ticker stream takes (the client hands its messages to the
+        queue), so the price cache, the market data cache, the runtime and connected clients
+        are fed from here.
+        """
+        while True:
+            message = await queue.get()
+            try:
+                if message is None:
+                    break
+                if message.get("type") == "ticker":
+                    # Every product's ticks mark positions, whichever products a strategy trades
+                    self.price_cache.on_ticker(message)
+                if isinstance(message, dict):
+                    await self.handle_coinbase_message(message)
+            except Exception as e:
+                logger.error(f"Error handling feed message: {e}", exc_info=True)
+            finally:
+                queue.task_done()
+
+    async def on_runtime_decision(self, decision: Decision):
+        """Broadcast a runtime decision to connected clients (no orders are placed)."""
+        logger.info(f"Runtime decision for {decision.product_id}: {decision.action} at {decision.price}")
+        await self.broadcast({
+            "type": "runtime_decision",
+            "product_id": decision.product_id,
+            "action": decision.action,
+            "price": decision.price,
+            "timestamp": str(decision.timestamp),
+            "latency_ms": decision.latency * 1000.0,
+        })
+
 manager = ConnectionManager()
 
 @router.websocket("/ws/{product_id}")
@@ -99,7 +145,8 @@ async def websocket_endpoint(
             logger.info(f"Subscribed to {product_id} ticker updates")
         
         if product_id in manager.market_data_cache:
-            await websocket.send_json(manager.market_data_cache[product_id])
+            # Through the client's queue so it is not interleaved with broadcasts
+            manager.broadcaster.send_to(websocket, manager.market_data_cache[product_id])
         
         while True:
             try:
@@ -129,7 +176,7 @@ async def lifespan(app: FastAPI):
         # --- End DB Init --- 
         
         settings = get_settings()
-        manager.message_queue = asyncio.Queue()
+        manager.message_queue = asyncio.Queue(maxsize=MESSAGE_QUEUE_MAXSIZE)
 
         logger.info("Initializing Coinbase REST Client...")
         manager.coinbase_rest_client = CoinbaseClient(settings)
@@ -148,7 +195,7 @@ async def lifespan(app: FastAPI):
         else:
             logger.info("LIVE TRADING MODE ENABLED.")
             # Ensure the real OrderExecutor gets the REST client
-            manager.order_executor = OrderExecutor(manager.coinbase_rest_client) 
+            manager.order_executor = OrderExecutor(manager.coinbase_rest_client, price_cache=manager.price_cache)
         logger.info(f"Order Executor initialized ({type(manager.order_executor).__name__}).")
         # --- End Conditional Initialization --- 
 
@@ -198,6 +245,21 @@ async def lifespan(app: FastAPI):
         )
         logger.info("LiveTrader initialized.")
 
+        if settings.LIVE_RUNTIME_ENABLED:
+            runtime_products = [p.strip() for p in (settings.LIVE_RUNTIME_PRODUCTS or "").split(",") if p.strip()]
+            logger.info("Initializing multi-product runtime...")
+            manager.runtime = MultiProductRuntime(
+                lambda product_id: RSIMomentumStrategy(product_id=product_id, config=strategy_config),
+                on_decision=manager.on_runtime_decision,
+            )
+            for runtime_product_id in runtime_products or ws_product_ids:
+                manager.runtime.add_product(runtime_product_id)
+            await manager.runtime.start()
+            logger.info(f"Multi-product runtime started for {list(manager.runtime.products)}.")
+
+        # The websocket client feeds message_queue; this task tees it to caches, runtime and clients
+        manager.feed_task = asyncio.create_task(manager.consume_feed(manager.message_queue), name="websocket-feed")
+
         logger.info("Attempting to connect Coinbase WebSocket Client...")
         try:
             manager.coinbase_ws_client.connect() # Starts in background thread
@@ -248,6 +310,18 @@ async def lifespan(app: FastAPI):
         if manager.coinbase_ws_client:
             logger.info("Closing WebSocket client...")
             manager.coinbase_ws_client.close()
+
+        if manager.feed_task:
+            manager.feed_task.cancel()
+            await asyncio.gather(manager.feed_task, return_exceptions=True)
+            manager.feed_task = None
+
+        if manager.runtime:
+            logger.info("Stopping multi-product runtime...")
+            await manager.runtime.stop(drain=False)
+            manager.runtime = None
+
+        await manager.broadcaster.close()
         
         logger.info("Application shutdown complete.")
 
@@ -269,9 +343,20 @@ async def websocket_status():
         "active_connections": len(manager.active_connections),
         "cached_products": list(manager.market_data_cache.keys()),
         "subscribed_channels": manager.coinbase_ws_client.channels,
-        "subscribed_products": manager.coinbase_ws_client.product_ids if manager.coinbase_ws_client._is_running else []
+        "subscribed_products": manager.coinbase_ws_client.product_ids if manager.coinbase_ws_client._is_running else [],
+        "message_bridge": manager.coinbase_ws_client.bridge_stats(),
+        "broadcast": manager.broadcaster.stats()
     }
 
+@router.get("/runtime-status")
+async def runtime_status():
+    """
+    Get per-product tick counts, decisions and decision latency of the multi-product runtime
+    """
+    if not manager.runtime:
+        return {"status": "disabled", "products": {}}
+    return {"status": "running", "dropped": manager.runtime.dropped, "products": manager.runtime.stats()}
+
 @router.post("/subscribe/{product_id}")
 async def subscribe_to_product(product_id: str, settings: Settings = Depends(get_settings)):
     """
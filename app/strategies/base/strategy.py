@@ -1,12 +1,15 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 import pandas as pd
 import numpy as np
 import logging
 # Import Position model
 from app.models.position import Position
 
+if TYPE_CHECKING:
+    from app.core.streaming_indicators import StreamingIndicatorEngine
+
 # ... (logging setup)
 logger = logging.getLogger(__name__)
 
@@ -52,7 +55,40 @@ class Strategy(ABC):
         """Determine if we should exit a trade."""
         pass
     
-    def calculate_position_size(self, 
+    def get_signal_arrays(self, data: pd.DataFrame) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Vectorized form of should_enter_trade/should_exit_trade for the fast backtest path.
+
+        Strategies that can express their row decisions as arrays return a dict with:
+            - 'entry': bool array, True where should_enter_trade would return True
+            - 'exit': bool array, True where should_exit_trade would return True
+              regardless of the stop
+            - 'stop_reference' (optional): price compared against the stop set at entry
+              (state.trailing_stop_price); the position is also exited when it is <= the
+              stop. Defaults to the close price.
+
+        Args:
+            data: Output of generate_signals
+
+        Returns:
+            Dict of arrays, or None if the strategy only supports the per-row path
+        """
+        return None
+
+    def create_signal_engine(self) -> Optional["StreamingIndicatorEngine"]:
+        """
+        Incremental form of generate_signals for the live loop.
+
+        Strategies that support it return a StreamingIndicatorEngine whose update(candle)
+        result equals generate_signals(history).iloc[-1] for the full candle history fed
+        so far, at O(1) cost per candle.
+
+        Returns:
+            A fresh engine, or None if the strategy only supports the DataFrame path
+        """
+        return None
+
+    def calculate_position_size(self,
                               account_balance: float,
                               entry_price: float,
                               stop_loss_price: float) -> float:
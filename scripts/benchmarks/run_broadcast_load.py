@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+"""
+Load test for broadcasting market data to browser websocket clients.
+
+Simulates --clients connected browsers, --slow-clients of which take --slow-ms per send,
+and publishes a ticker stream (--rate messages/second over --products) for --duration
+seconds. Two broadcast paths are compared:
+
+- sequential: the previous ConnectionManager.broadcast, awaiting send_json (one JSON
+  serialization per client) on each client in turn
+- broadcaster: app.core.broadcaster.Broadcaster (serialize once, per-client queues with
+  ticker conflation and slow-client eviction)
+
+Reported: end-to-end latency (scheduled arrival -> client receive) p50/p99 for the normal clients,
+messages they received, how long publish calls blocked the producer, and evictions.
+
+Usage:
+    python scripts/benchmarks/run_broadcast_load.py --clients 500 --rate 200 --duration 5
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+import numpy as np
+
+# Ensure project root is in path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from app.core.broadcaster import Broadcaster
+
+
+class SimulatedClient:
+    """A browser connection: a send yields to the loop (or sleeps for slow clients) and records latency."""
+
+    def __init__(self, send_delay: float = 0.0):
+        self.send_delay = send_delay
+        self.latencies = []
+        self.closed = False
+
+    async def _deliver(self, message: dict):
+        if self.send_delay:
+            await asyncio.sleep(self.send_delay)
+        else:
+            await asyncio.sleep(0)
+        self.latencies.append(time.perf_counter() - message['ts'])
+
+    async def send_json(self, message: dict):
+        # starlette serializes per send_json call
+        await self._deliver(json.loads(json.dumps(message, separators=(",", ":"))))
+
+    async def send_text(self, payload: str):
+        await self._deliver(json.loads(payload))
+
+    async def close(self, code: int = 1000):
+        self.closed = True
+
+
+async def sequential_broadcast(clients, message):
+    for client in clients:
+        await client.send_json(message)
+
+
+async def run_case(mode: str, args):
+    normal = [SimulatedClient() for _ in range(args.clients - args.slow_clients)]
+    slow = [SimulatedClient(args.slow_ms / 1000.0) for _ in range(args.slow_clients)]
+    clients = normal + slow
+    broadcaster = Broadcaster() if mode == "broadcaster" else None
+    if broadcaster is not None:
+        for client in clients:
+            broadcaster.register(client)
+
+    interval = 1.0 / args.rate
+    n_messages = int(args.rate * args.duration)
+    blocked = 0.0
+    start = time.perf_counter()
+    for i in range(n_messages):
+        # Stamped with the scheduled arrival time, so latency includes time the producer was held up
+        message = {'type': 'ticker', 'product_id': f"P{i % args.products}-USD", 'price': f"{100 + i % 7}.5",
+                   'volume_24_h': "12345.6", 'time': "2024-05-01T12:00:00Z", 'ts': start + i * interval}
+        t0 = time.perf_counter()
+        if broadcaster is not None:
+            broadcaster.publish(message)
+        else:
+            await sequential_broadcast(clients, message)
+        blocked += time.perf_counter() - t0
+        delay = start + (i + 1) * interval - time.perf_counter()
+        await asyncio.sleep(max(delay, 0))
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0.5)  # let queues drain
+    evicted = 0
+    if broadcaster is not None:
+        evicted = broadcaster.stats()['evicted']
+        await broadcaster.close()
+
+    latencies = np.concatenate([np.array(c.latencies) for c in normal]) * 1000
+    received = np.mean([len(c.latencies) for c in normal])
+    return elapsed, n_messages, received, np.percentile(latencies, 50), np.percentile(latencies, 99), blocked, evicted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test websocket broadcast fan-out")
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--slow-clients', type=int, default=5)
+    parser.add_argument('--slow-ms', type=float, default=20.0, help="Per-send delay of slow clients")
+    parser.add_argument('--rate', type=float, default=200.0, help="Published messages per second")
+    parser.add_argument('--products', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients ({args.slow_clients} slow, {args.slow_ms:.0f} ms/send), "
+          f"{args.rate:.0f} msg/s over {args.products} products for {args.duration:.0f}s")
+    for mode in ("sequential", "broadcaster"):
+        elapsed, sent, received, p50, p99, blocked, evicted = asyncio.run(run_case(mode, args))
+        print(f"  {mode:12s} published {sent:6,} in {elapsed:6.1f}s  received/client {received:8,.0f}  "
+              f"latency p50 {p50:9.1f} ms  p99 {p99:9.1f} ms  producer blocked {blocked:6.2f}s  evicted {evicted}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+"""
+Load harness for the multi-product live runtime.
+
+Replays ticker messages for many products (recorded JSONL, or a synthetic random walk)
+through MultiProductRuntime or ShardedLiveRuntime at a fixed message rate, and reports
+per-product decision latency. Latency runs from receipt of a tick to the end of the
+strategy evaluation that consumed it.
+
+Recorded input is one ticker dict per line, in the shape CoinbaseWebSocketClient
+puts on its queue: {"type": "ticker", "product_id": ..., "price": ..., "time": ...}.
+
+Usage:
+    python scripts/benchmarks/run_live_runtime_load.py --products 50 --ticks 400 --rate 5000
+    python scripts/benchmarks/run_live_runtime_load.py --input tickers.jsonl --shards 4
+    python scripts/benchmarks/run_live_runtime_load.py --slow-product P00-USD --slow-ms 50
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+
+# Ensure project root is in path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from app.core.indicators import calculate_adx, calculate_atr, calculate_rsi, calculate_sma
+from app.core.live_runtime import MultiProductRuntime, ShardedLiveRuntime
+from app.core.streaming_indicators import ADX, ATR, RSI, SMA, StreamingIndicatorEngine
+from app.strategies.base.strategy import Strategy
+
+DEFAULT_PRODUCTS = 50
+DEFAULT_TICKS = 400
+DEFAULT_RATE = 5000.0  # messages per second across all products
+
+# Set from the command line before the runtime starts (inherited by shard processes)
+SLOW_PRODUCTS = {}
+
+
+class RSITrendStrategy(Strategy):
+    """RSI momentum entries filtered by SMA slope and ADX; the harness workload."""
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__()
+        self.delay = delay
+
+    def calculate_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
+        df = data.copy()
+        df['rsi'] = calculate_rsi(df['close'], 14)
+        df['sma'] = calculate_sma(df['close'], 20)
+        df['atr'] = calculate_atr(df['high'], df['low'], df['close'], 14)
+        df['adx'], df['plus_di'], df['minus_di'] = calculate_adx(df['high'], df['low'], df['close'], 14)
+        return df
+
+    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
+        df = self.calculate_indicators(data)
+        df['regime'] = np.where(df['sma'].diff() > 0, 'uptrend', 'downtrend')
+        df['signal'] = np.where((df['rsi'] > 60) & (df['regime'] == 'uptrend'), 1, 0)
+        return df
+
+    def create_signal_engine(self) -> StreamingIndicatorEngine:
+        def signals(row, prev):
+            regime = 'uptrend' if prev is not None and row['sma'] - prev['sma'] > 0 else 'downtrend'
+            return {'regime': regime, 'signal': 1 if row['rsi'] > 60 and regime == 'uptrend' else 0}
+        return StreamingIndicatorEngine({
+            'rsi': RSI(14), 'sma': SMA(20), 'atr': ATR(14),
+            ('adx', 'plus_di', 'minus_di'): ADX(14),
+        }, signal_fn=signals)
+
+    def should_enter_trade(self, row: pd.Series) -> bool:
+        if self.delay:
+            time.sleep(self.delay)
+        return not self.state.is_in_position and row['signal'] == 1
+
+    def should_exit_trade(self, row: pd.Series) -> bool:
+        return self.state.is_in_position and row['rsi'] < 40
+
+
+def strategy_factory(product_id: str) -> Strategy:
+    return RSITrendStrategy(delay=SLOW_PRODUCTS.get(product_id, 0.0))
+
+
+def load_tickers(path: str):
+    with open(path) as f:
+        return [message for message in map(json.loads, filter(str.strip, f)) if message.get('type') == 'ticker']
+
+
+def synthetic_tickers(n_products: int, ticks_per_product: int, seed: int = 42):
+    """Interleaved random-walk tickers, one per product per second."""
+    rng = np.random.default_rng(seed)
+    products = [f"P{i:02d}-USD" for i in range(n_products)]
+    paths = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, (ticks_per_product, n_products)), axis=0))
+    start = pd.Timestamp('2024-01-01', tz='UTC')
+    return [
+        {'type': 'ticker', 'product_id': product, 'price': f"{price:.4f}", 'volume_24_h': '1000',
+         'time': (start + pd.Timedelta(seconds=i)).isoformat()}
+        for i, row in enumerate(paths) for product, price in zip(products, row)
+    ]
+
+
+async def replay_in_process(tickers, products, rate: float, max_workers: int):
+    runtime = MultiProductRuntime(strategy_factory, max_workers=max_workers)
+    for product in products:
+        runtime.add_product(product)
+    await runtime.start()
+
+    start = time.perf_counter()
+    for i, ticker in enumerate(tickers):
+        runtime.dispatch(ticker)
+        # Pace the feed; yield to the workers whenever we are ahead of schedule
+        ahead = start + (i + 1) / rate - time.perf_counter()
+        if ahead > 0:
+            await asyncio.sleep(ahead)
+        elif i % 256 == 0:
+            await asyncio.sleep(0)
+    await runtime.stop()
+    return runtime.stats(), time.perf_counter() - start
+
+
+def replay_sharded(tickers, products, rate: float, n_shards: int, max_workers: int):
+    sharded = ShardedLiveRuntime(strategy_factory, products, n_shards=n_shards, batch_size=16,
+                                 max_workers=max_workers)
+    sharded.start()
+    start = time.perf_counter()
+    for i, ticker in enumerate(tickers):
+        sharded.dispatch(ticker)
+        ahead = start + (i + 1) / rate - time.perf_counter()
+        if ahead > 0.001:
+            sharded.flush()
+            time.sleep(ahead)
+    result = sharded.stop()
+    return result['stats'], time.perf_counter() - start
+
+
+def print_report(stats, elapsed: float, n_messages: int):
+    print(f"\n{'product':<12} {'ticks':>6} {'evals':>6} {'dec':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for product in sorted(stats):
+        s = stats[product]
+        if not s.get('count'):
+            print(f"{product:<12} {s['ticks']:>6} {s['evaluations']:>6} {s['decisions']:>4}   (no evaluations)")
+            continue
+        print(f"{product:<12} {s['ticks']:>6} {s['evaluations']:>6} {s['decisions']:>4} "
+              f"{s['p50_ms']:>8.2f} {s['p95_ms']:>8.2f} {s['p99_ms']:>8.2f} {s['max_ms']:>8.2f}")
+
+    p95s = np.array([s['p95_ms'] for s in stats.values() if s.get('count')])
+    print(f"\nReplayed {n_messages:,} tickers for {len(stats)} products in {elapsed:.2f}s "
+          f"({n_messages / elapsed:,.0f} msg/s)")
+    if len(p95s):
+        print(f"Per-product p95 latency: median {np.median(p95s):.2f} ms, worst {p95s.max():.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-product live runtime load harness")
+    parser.add_argument('--input', help="JSONL file of recorded ticker messages")
+    parser.add_argument('--products', type=int, default=DEFAULT_PRODUCTS, help="Synthetic products")
+    parser.add_argument('--ticks', type=int, default=DEFAULT_TICKS, help="Synthetic ticks per product")
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help="Replay rate in messages/second")
+    parser.add_argument('--shards', type=int, default=0, help="Worker processes (0 = single process)")
+    parser.add_argument('--workers', type=int, default=8, help="Strategy threads per runtime")
+    parser.add_argument('--slow-product', action='append', default=[], help="Product whose strategy is slowed down")
+    parser.add_argument('--slow-ms', type=float, default=50.0, help="Extra evaluation time for slow products")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    SLOW_PRODUCTS.update({product: args.slow_ms / 1000.0 for product in args.slow_product})
+
+    tickers = load_tickers(args.input) if args.input else synthetic_tickers(args.products, args.ticks)
+    products = sorted({t['product_id'] for t in tickers})
+    mode = f"{args.shards} shard processes" if args.shards else "single process"
+    print(f"Replaying {len(tickers):,} tickers for {len(products)} products at {args.rate:,.0f} msg/s ({mode})")
+
+    if args.shards:
+        stats, elapsed = replay_sharded(tickers, products, args.rate, args.shards, args.workers)
+    else:
+        stats, elapsed = asyncio.run(replay_in_process(tickers, products, args.rate, args.workers))
+    print_report(stats, elapsed, len(tickers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+Benchmark for handing training data to joblib optimizer workers.
+
+Dispatches --tasks light tasks (cache-key fingerprint plus one rolling mean, roughly
+the per-combination work outside the backtest itself) over --jobs workers and compares:
+
+- by-value: the DataFrame is an argument of every delayed(...) call, as
+  optimize_params_parallel did before
+- shared: the DataFrame is registered once in a DatasetRegistry and tasks receive a
+  DatasetHandle (scripts.strategies.refactored_edge.shared_data)
+
+Reported: wall time, per-task overhead and pickled argument size per task.
+
+Usage:
+    python scripts/benchmarks/run_shared_dataset_benchmark.py --rows 1000000 --tasks 200 --jobs 4
+"""
+
+import os
+import sys
+import time
+import pickle
+import argparse
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+# Ensure project root is in path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from scripts.strategies.refactored_edge.indicator_cache import fingerprint_data
+from scripts.strategies.refactored_edge.shared_data import DatasetRegistry, resolve_dataset
+
+
+def synthetic_ohlcv(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    close = 30_000 + np.cumsum(rng.normal(0, 20, n))
+    index = pd.date_range("2020-01-01", periods=n, freq="1min", tz="UTC")
+    return pd.DataFrame({'open': close + rng.normal(0, 5, n), 'high': close + 10, 'low': close - 10,
+                         'close': close, 'volume': rng.exponential(5, n)}, index=index)
+
+
+def task(data, window):
+    frame = resolve_dataset(data)
+    fingerprint_data(frame)  # what every indicator cache lookup pays
+    return float(frame['close'].rolling(window).mean().iloc[-1])
+
+
+def run(payload, args):
+    start = time.perf_counter()
+    results = Parallel(n_jobs=args.jobs)(delayed(task)(payload, 5 + i % 50) for i in range(args.tasks))
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dataset hand-off to joblib workers")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--tasks', type=int, default=200)
+    parser.add_argument('--jobs', type=int, default=4)
+    args = parser.parse_args()
+
+    data = synthetic_ohlcv(args.rows)
+    print(f"{args.rows:,} rows ({data.memory_usage().sum() / 1e6:.0f} MB), {args.tasks} tasks, {args.jobs} jobs")
+
+    # Start the worker pool before timing either case
+    Parallel(n_jobs=args.jobs)(delayed(abs)(i) for i in range(args.jobs))
+
+    by_value, expected = run(data, args)
+    print(f"  by-value  {by_value:7.2f}s  {by_value / args.tasks * 1000:7.1f} ms/task  "
+          f"{len(pickle.dumps(data)) / 1e6:9.2f} MB pickled/task")
+
+    start = time.perf_counter()
+    with DatasetRegistry() as registry:
+        handle = registry.register(data)
+        register_time = time.perf_counter() - start
+        shared, results = run(handle, args)
+    print(f"  shared    {shared:7.2f}s  {shared / args.tasks * 1000:7.1f} ms/task  "
+          f"{len(pickle.dumps(handle)) / 1e6:9.6f} MB pickled/task  (register {register_time:.2f}s once)")
+    print(f"  results identical: {results == expected}; speedup {by_value / shared:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+Benchmark the streaming indicator engine against recomputing indicators per candle.
+
+Feeds random-walk candles one at a time to a strategy's StreamingIndicatorEngine and,
+for comparison, evaluates generate_signals on a trailing window for every candle (what
+the live loop did before the engine existed). Reports the cost per candle of each path.
+
+Usage:
+    python scripts/benchmarks/run_streaming_indicator_benchmark.py --candles 500 --window 500
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Ensure project root is in path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from scripts.benchmarks.run_live_runtime_load import RSITrendStrategy
+
+DEFAULT_CANDLES = 500
+DEFAULT_WINDOW = 500
+
+
+def make_candles(n: int, seed: int = 11) -> pd.DataFrame:
+    """Random-walk OHLCV candles at one-minute spacing."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    return pd.DataFrame({
+        'open': np.r_[close[0], close[:-1]],
+        'high': close * (1 + rng.uniform(0, 0.003, n)),
+        'low': close * (1 - rng.uniform(0, 0.003, n)),
+        'close': close,
+        'volume': rng.uniform(1, 10, n),
+    }, index=pd.date_range('2024-01-01', periods=n, freq='1min', tz='UTC'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming indicators against batch recompute")
+    parser.add_argument('--candles', type=int, default=DEFAULT_CANDLES, help="Candles to process after warmup")
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW, help="Trailing window of the batch path")
+    parser.add_argument('--batch-samples', type=int, default=50,
+                        help="Candles timed on the (slow) batch path; the per-candle cost is extrapolated")
+    args = parser.parse_args()
+
+    candles = make_candles(args.window + args.candles)
+    strategy = RSITrendStrategy()
+    engine = strategy.create_signal_engine()
+    engine.update_many(candles.iloc[:args.window])
+    records = candles.iloc[args.window:].to_dict('records')
+
+    start = time.perf_counter()
+    for candle in records:
+        engine.update(candle)
+    streaming = (time.perf_counter() - start) / len(records)
+
+    samples = min(args.batch_samples, args.candles)
+    start = time.perf_counter()
+    for i in range(1, samples + 1):
+        strategy.generate_signals(candles.iloc[i:args.window + i]).iloc[-1]
+    batch = (time.perf_counter() - start) / samples
+
+    print(f"Per-candle cost over {args.candles} candles ({args.window}-candle batch window):")
+    print(f"  streaming engine  {streaming * 1e6:10.1f} us")
+    print(f"  batch recompute   {batch * 1e6:10.1f} us")
+    print(f"Speedup: {batch / streaming:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
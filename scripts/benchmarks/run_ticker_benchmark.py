@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+Benchmark TradingStrategy.analyze_ticker throughput with many subscribed products.
+
+Replays interleaved synthetic tickers (round-robin across products, as a multi-product
+ticker subscription delivers them) through the running-sum implementation and through a
+copy of the previous full-window recompute, and reports ticks/second overall and per product.
+
+Usage:
+    python scripts/benchmarks/run_ticker_benchmark.py --products 150 --ticks 2000
+"""
+
+import os
+import sys
+import time
+import json
+import argparse
+import logging
+
+import numpy as np
+
+# Ensure project root is in path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from app.core.trading_strategy import TradingStrategy
+
+DEFAULT_PRODUCTS = 150
+DEFAULT_TICKS = 2000
+
+
+class FullRecomputeStrategy(TradingStrategy):
+    """The previous per-tick path: debug json.dumps plus list copy and two np.mean calls."""
+
+    def calculate_moving_averages(self, product_id: str) -> None:
+        if len(self.price_history[product_id]) >= self.long_window:
+            prices = list(self.price_history[product_id])
+            self.short_ma[product_id] = np.mean(prices[-self.short_window:])
+            self.long_ma[product_id] = np.mean(prices)
+
+    def analyze_ticker(self, ticker_data):
+        json.dumps(ticker_data)
+        return super().analyze_ticker(ticker_data)
+
+
+def create_tickers(n_products: int, ticks_per_product: int, seed: int = 42):
+    """Interleaved ticker messages shaped like the Coinbase ticker channel."""
+    rng = np.random.default_rng(seed)
+    products = [f"COIN{i:03d}-USD" for i in range(n_products)]
+    paths = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, (ticks_per_product, n_products)), axis=0))
+    return [
+        {"type": "ticker", "product_id": product, "price": f"{price:.2f}", "volume_24h": "1000.0"}
+        for row in paths for product, price in zip(products, row)
+    ]
+
+
+def run(strategy_cls, tickers, short_window: int, long_window: int) -> float:
+    strategy = strategy_cls(short_window=short_window, long_window=long_window)
+    start = time.perf_counter()
+    for ticker in tickers:
+        strategy.analyze_ticker(ticker)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TradingStrategy ticker throughput")
+    parser.add_argument('--products', type=int, default=DEFAULT_PRODUCTS, help="Number of subscribed products")
+    parser.add_argument('--ticks', type=int, default=DEFAULT_TICKS, help="Ticks per product")
+    parser.add_argument('--short-window', type=int, default=20)
+    parser.add_argument('--long-window', type=int, default=50)
+    args = parser.parse_args()
+
+    # Signal INFO logs would dominate the measurement
+    logging.getLogger('app.core.trading_strategy').setLevel(logging.WARNING)
+
+    tickers = create_tickers(args.products, args.ticks)
+    print(f"Replaying {len(tickers):,} tickers across {args.products} products "
+          f"(SMA{args.short_window}/{args.long_window})")
+
+    results = {}
+    for name, cls in [("full recompute", FullRecomputeStrategy), ("running sums", TradingStrategy)]:
+        elapsed = run(cls, tickers, args.short_window, args.long_window)
+        results[name] = elapsed
+        rate = len(tickers) / elapsed
+        print(f"  {name:15s} {elapsed:7.3f}s  {rate:12,.0f} ticks/s total  "
+              f"{rate / args.products:10,.0f} ticks/s per product")
+
+    print(f"Speedup: {results['full recompute'] / results['running sums']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Burst benchmark for the websocket thread -> asyncio hand-off.
+
+A producer thread plays the websocket SDK and pushes a burst of tickers (round-robin over
+--products) with an order update every 100 messages. The consumer coroutine takes each message
+from the queue and spends --work-us microseconds on it. Two hand-offs are compared:
+
+- per-message: loop.call_soon_threadsafe(queue.put_nowait, msg) for every message (previous path)
+- bridge: app.core.ws_bridge.MessageBridge micro-batches with ticker conflation
+
+Reported: time until the consumer has processed everything, loop wakeups from the producer
+thread, messages the consumer had to process, and p50/p99 latency of order updates from
+producer to consumer.
+
+Usage:
+    python scripts/benchmarks/run_ws_bridge_benchmark.py --messages 200000 --work-us 20
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import threading
+
+import numpy as np
+
+# Ensure project root is in path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from app.core.ws_bridge import MessageBridge
+
+
+def make_messages(n: int, products: int):
+    messages = []
+    for i in range(n):
+        if i % 100 == 0:
+            messages.append({'type': 'user_order_update', 'order_id': f"o{i}", 'status': 'FILLED'})
+        else:
+            messages.append({'type': 'ticker', 'product_id': f"P{i % products}-USD", 'price': str(i)})
+    return messages
+
+
+async def run_case(mode: str, messages, work_us: float, queue_maxsize: int):
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=queue_maxsize if mode == "bridge" else 0)
+    bridge = MessageBridge(loop, queue) if mode == "bridge" else None
+    sent_at = {}
+    wakeups = 0
+
+    def produce():
+        nonlocal wakeups
+        for message in messages:
+            if message['type'] == 'user_order_update':
+                sent_at[message['order_id']] = time.perf_counter()
+            if bridge is not None:
+                bridge.put(message)
+            else:
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+                wakeups += 1
+
+    orders_total = sum(1 for m in messages if m['type'] == 'user_order_update')
+    latencies = []
+    processed = 0
+    work = work_us / 1e6
+    start = time.perf_counter()
+    producer = threading.Thread(target=produce)
+    producer.start()
+    while len(latencies) < orders_total or producer.is_alive() or queue.qsize() or \
+            (bridge is not None and bridge.stats()['pending']):
+        try:
+            message = await asyncio.wait_for(queue.get(), timeout=0.1)
+        except asyncio.TimeoutError:
+            continue
+        processed += 1
+        spin_until = time.perf_counter() + work
+        while time.perf_counter() < spin_until:
+            pass
+        if message['type'] == 'user_order_update':
+            latencies.append(time.perf_counter() - sent_at[message['order_id']])
+    elapsed = time.perf_counter() - start
+    producer.join()
+    if bridge is not None:
+        wakeups = bridge.stats()['wakeups']
+    lat = np.array(latencies) * 1000
+    return elapsed, wakeups, processed, np.percentile(lat, 50), np.percentile(lat, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the websocket -> asyncio hand-off under bursts")
+    parser.add_argument('--messages', type=int, default=200_000)
+    parser.add_argument('--products', type=int, default=200)
+    parser.add_argument('--work-us', type=float, default=20.0, help="Consumer work per message (microseconds)")
+    parser.add_argument('--queue-maxsize', type=int, default=10_000)
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages, args.products)
+    print(f"Burst: {args.messages:,} messages over {args.products} products, "
+          f"{args.work_us:.0f} us consumer work per message")
+    for mode in ("per-message", "bridge"):
+        elapsed, wakeups, processed, p50, p99 = asyncio.run(
+            run_case(mode, messages, args.work_us, args.queue_maxsize))
+        print(f"  {mode:12s} done in {elapsed:6.2f}s  wakeups {wakeups:8,}  processed {processed:8,}  "
+              f"order update latency p50 {p50:8.1f} ms  p99 {p99:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark for websocket frame decoding.
+
+Decodes a message corpus with the previous path (json.loads + WebsocketResponse + per-ticker
+dicts) and with app.core.ws_decoder.MessageDecoder (dict and struct output), and reports
+messages/second for each.
+
+The corpus is one raw frame per line, as received from the Advanced Trade websocket
+(e.g. captured by logging `msg` in CoinbaseWebSocketClient._on_message). Without --corpus
+a synthetic corpus in the same frame shapes is generated: mostly ticker frames, plus
+heartbeats, market_trades, l2_data and user frames.
+
+Usage:
+    python scripts/benchmarks/run_ws_decode_benchmark.py --frames 50000
+    python scripts/benchmarks/run_ws_decode_benchmark.py --corpus frames.txt
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+# Ensure project root is in path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from coinbase.websocket import WebsocketResponse
+
+from app.core import ws_decoder
+from app.core.ws_decoder import MessageDecoder
+
+DEFAULT_FRAMES = 50_000
+PRODUCTS = ["BTC-USD", "ETH-USD", "SOL-USD", "XRP-USD", "DOGE-USD", "ADA-USD", "AVAX-USD", "LINK-USD"]
+CHANNEL_MIX = {"ticker": 0.70, "heartbeats": 0.15, "market_trades": 0.06, "l2_data": 0.08, "user": 0.01}
+
+
+def synthetic_frame(channel: str, i: int, rng) -> str:
+    timestamp = f"2024-05-01T12:{(i // 60) % 60:02d}:{i % 60:02d}.{i % 1000000:06d}Z"
+    base = {"channel": channel, "client_id": "", "timestamp": timestamp, "sequence_num": i}
+    if channel == "ticker":
+        product = PRODUCTS[i % len(PRODUCTS)]
+        price = f"{100 + rng.random():.2f}"
+        events = [{"type": "update", "tickers": [{
+            "type": "ticker", "product_id": product, "price": price, "volume_24_h": "12345.678",
+            "low_24_h": "95.1", "high_24_h": "104.9", "low_52_w": "20.5", "high_52_w": "150.2",
+            "price_percent_chg_24_h": "1.2345", "best_bid": price, "best_ask": price,
+            "best_bid_quantity": "0.5", "best_ask_quantity": "0.7"}]}]
+    elif channel == "heartbeats":
+        events = [{"current_time": timestamp, "heartbeat_counter": str(i)}]
+    elif channel == "market_trades":
+        events = [{"type": "update", "trades": [
+            {"trade_id": str(i * 10 + k), "product_id": PRODUCTS[i % len(PRODUCTS)], "price": "100.01",
+             "size": "0.01", "side": "BUY" if k % 2 else "SELL", "time": timestamp} for k in range(5)]}]
+    elif channel == "l2_data":
+        events = [{"type": "update", "product_id": PRODUCTS[i % len(PRODUCTS)], "updates": [
+            {"side": "bid" if k % 2 else "offer", "event_time": timestamp,
+             "price_level": f"{100 + k / 100:.2f}", "new_quantity": "1.5"} for k in range(20)]}]
+    else:
+        events = [{"type": "update", "orders": [{
+            "order_id": f"o{i}", "client_order_id": f"c{i}", "product_id": "BTC-USD", "order_side": "BUY",
+            "status": "FILLED", "cumulative_quantity": "0.01", "total_fees": "0.1", "avg_price": "100.0"}]}]
+    base["events"] = events
+    return json.dumps(base, separators=(",", ":"))
+
+
+def synthetic_corpus(n_frames: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    channels = rng.choice(list(CHANNEL_MIX), size=n_frames, p=list(CHANNEL_MIX.values()))
+    return [synthetic_frame(channel, i, rng) for i, channel in enumerate(channels)]
+
+
+def legacy_decode(msg: str):
+    """The previous _on_message decoding, without logging and queueing."""
+    data = json.loads(msg)
+    ws_response = WebsocketResponse(data)
+    channel = ws_response.channel
+    out = []
+    if channel == "ticker":
+        for event in ws_response.events:
+            for ticker in event.tickers:
+                out.append({'type': 'ticker', 'product_id': ticker.product_id, 'price': ticker.price,
+                            'volume_24_h': ticker.volume_24_h, 'time': ws_response.timestamp})
+    elif channel == "user":
+        for event in ws_response.events:
+            if event.type == "snapshot":
+                continue
+            for order in event.orders:
+                if order.status in ["FILLED", "CANCELLED", "EXPIRED", "FAILED"]:
+                    out.append({'type': 'user_order_update', 'order_id': order.order_id,
+                                'client_order_id': order.client_order_id, 'product_id': order.product_id,
+                                'side': order.order_side, 'status': order.status,
+                                'cumulative_quantity': order.cumulative_quantity,
+                                'total_fees': order.total_fees, 'average_filled_price': order.avg_price,
+                                'time': ws_response.timestamp})
+    elif channel == "market_trades":
+        for event in ws_response.events:
+            for trade in event.trades:
+                out.append({'type': 'market_trade', 'trade_id': trade.trade_id, 'product_id': trade.product_id,
+                            'price': trade.price, 'size': trade.size, 'side': trade.side, 'time': trade.time})
+    return out
+
+
+def decoder_fn(as_dicts: bool):
+    decoder = MessageDecoder()
+
+    def decode(msg: str):
+        messages = decoder.decode(msg)[1]
+        return [m.to_dict() for m in messages] if as_dicts else messages
+    return decode
+
+
+def bench(fn, corpus, repeats: int) -> float:
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for frame in corpus:
+            fn(frame)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark websocket frame decoding")
+    parser.add_argument('--corpus', help="File with one raw websocket frame per line")
+    parser.add_argument('--frames', type=int, default=DEFAULT_FRAMES, help="Synthetic corpus size")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--stdlib-json', action='store_true', help="Force the json fallback backend")
+    args = parser.parse_args()
+
+    backend = ws_decoder.JSON_BACKEND
+    if args.stdlib_json:
+        ws_decoder._loads, backend = json.loads, "json"
+
+    if args.corpus:
+        with open(args.corpus) as f:
+            corpus = [line.rstrip('\n') for line in f if line.strip()]
+    else:
+        corpus = synthetic_corpus(args.frames)
+
+    # Both paths must produce the same queue payloads
+    new_decode = decoder_fn(as_dicts=True)
+    assert all(legacy_decode(frame) == new_decode(frame) for frame in corpus[:2000])
+
+    print(f"Corpus: {len(corpus):,} frames; JSON backend: {backend}")
+    baseline = None
+    for name, fn in [("json + WebsocketResponse", legacy_decode),
+                     ("MessageDecoder -> dict", decoder_fn(as_dicts=True)),
+                     ("MessageDecoder -> struct", decoder_fn(as_dicts=False))]:
+        elapsed = bench(fn, corpus, args.repeats)
+        baseline = baseline or elapsed
+        print(f"  {name:26s} {len(corpus) / elapsed:12,.0f} msg/s  ({baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
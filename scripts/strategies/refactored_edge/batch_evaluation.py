@@ -0,0 +1,313 @@
+"""
+Batched (vectorized) evaluation of whole parameter grids for the Edge strategy.
+
+Instead of evaluating one parameter dictionary at a time, this module computes every
+indicator variant required by a grid as one wide 2-D array per indicator (vectorbtpro's
+RSI/BBANDS/MA accept lists of windows), generates signals column-wise, and simulates all
+combinations in a single multi-column Portfolio.from_signals call. The result is the same
+per-combination score table that evaluate_single_params would produce one by one.
+"""
+import time
+import logging
+import traceback
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import vectorbtpro as vbt
+
+from scripts.strategies.refactored_edge.wfo_utils import INIT_CAPITAL, get_ohlc_columns
+from scripts.strategies.refactored_edge.indicators import compute_zone_signals
+from scripts.strategies.refactored_edge.wfo_evaluation import (
+    TRADE_SIZE, evaluate_single_params, generate_signals_with_fallback, prepare_portfolio_signals,
+    calculate_position_sizes, get_portfolio_kwargs, get_metric_score
+)
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on the number of portfolio columns simulated in one call
+DEFAULT_MAX_COLUMNS = 256
+
+# EdgeConfig fields that determine the zone flags of a parameter set
+ZONE_PARAMS = ('pivot_lookback', 'pivot_prominence', 'zone_merge_proximity', 'min_zone_width_candles',
+               'min_zone_strength', 'zone_extend_candles', 'zone_proximity_pct')
+
+SCORE_COLUMNS = ['score', 'return', 'sharpe', 'max_drawdown', 'trades', 'win_rate',
+                 'mean_return', 'return_volatility']
+
+
+def resolve_indicator_windows(params: Dict[str, Any]) -> Optional[Tuple[int, int, float, int]]:
+    """
+    Resolve the indicator windows a parameter set actually uses.
+
+    Mirrors get_cached_indicators, which builds an EdgeConfig from the params, so keys
+    that EdgeConfig does not know about (e.g. 'ma_window') fall back to config defaults.
+
+    Args:
+        params: Parameter dictionary
+
+    Returns:
+        tuple: (rsi_window, bb_window, bb_std_dev, trend_ma_window) or None if the params are invalid
+    """
+    from scripts.strategies.refactored_edge.config import EdgeConfig
+
+    try:
+        config = EdgeConfig(**params)
+    except Exception as e:
+        logger.debug(f"Invalid parameters for batched evaluation {params}: {e}")
+        return None
+    return config.rsi_window, config.bb_window, config.bb_std_dev, config.trend_ma_window
+
+
+def resolve_zone_config(params: Dict[str, Any]) -> Optional[Tuple[tuple, Any]]:
+    """
+    Resolve the zone configuration a parameter set uses for signal generation.
+
+    Like evaluate_with_params, zone flags only reach the signals when params['use_zones']
+    is set; the zone parameters themselves come from EdgeConfig (with its defaults).
+
+    Args:
+        params: Parameter dictionary
+
+    Returns:
+        tuple: (zone key, EdgeConfig) where the key holds the ZONE_PARAMS values, or
+            None if the params do not use zones or are invalid
+    """
+    from scripts.strategies.refactored_edge.config import EdgeConfig
+
+    if not params.get('use_zones', False):
+        return None
+    try:
+        config = EdgeConfig(**params)
+    except Exception as e:
+        logger.debug(f"Invalid parameters for batched evaluation {params}: {e}")
+        return None
+    return tuple(getattr(config, name) for name in ZONE_PARAMS), config
+
+
+def _as_frame(output, labels: List[Any]) -> pd.DataFrame:
+    """Convert an indicator output to a DataFrame with one column per label, in order."""
+    frame = output.to_frame() if isinstance(output, pd.Series) else output
+    frame = frame.copy(deep=False)
+    frame.columns = pd.Index(labels, tupleize_cols=False)
+    return frame
+
+
+def compute_indicator_variants(close: pd.Series, windows: List[Tuple[int, int, float, int]]) -> Dict[str, pd.DataFrame]:
+    """
+    Compute every required indicator variant in one call per indicator.
+
+    Args:
+        close: Closing prices
+        windows: List of (rsi_window, bb_window, bb_std_dev, trend_ma_window) tuples
+
+    Returns:
+        dict: Wide DataFrames keyed by 'rsi', 'bb_upper', 'bb_lower' and 'trend_ma'. Columns
+            are labelled by the window (or (window, std_dev) pair for Bollinger Bands).
+    """
+    rsi_windows = sorted({w[0] for w in windows})
+    bb_pairs = sorted({(w[1], w[2]) for w in windows})
+    ma_windows = sorted({w[3] for w in windows})
+
+    rsi = vbt.RSI.run(close, window=rsi_windows).rsi
+    bbands = vbt.BBANDS.run(
+        close,
+        window=[p[0] for p in bb_pairs],
+        alpha=[p[1] for p in bb_pairs]
+    )
+    trend_ma = vbt.MA.run(close, window=ma_windows).ma
+
+    return {
+        'rsi': _as_frame(rsi, rsi_windows),
+        'bb_upper': _as_frame(bbands.upper, bb_pairs),
+        'bb_lower': _as_frame(bbands.lower, bb_pairs),
+        'trend_ma': _as_frame(trend_ma, ma_windows),
+    }
+
+
+def _portfolio_metric(pf, name: str, columns) -> pd.Series:
+    """Read a per-column metric from a portfolio, handling property/method API differences."""
+    value = pf
+    for part in name.split('.'):
+        value = getattr(value, part)
+        if callable(value):
+            value = value()
+    if isinstance(value, pd.Series):
+        return pd.Series(value.values, index=columns)
+    return pd.Series(np.broadcast_to(np.asarray(value, dtype=float), len(columns)), index=columns)
+
+
+def _failed_stats() -> Dict[str, Any]:
+    return {
+        'return': 0.0,
+        'sharpe': -np.inf,
+        'max_drawdown': 1.0,
+        'trades': 0,
+        'win_rate': 0.0
+    }
+
+
+def _simulate_batch(close: pd.Series, columns: List[int], signal_sets: Dict[int, tuple],
+                    size_arrays: Dict[int, Optional[np.ndarray]], params_by_col: Dict[int, Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+    """
+    Run one multi-column portfolio simulation and extract stats per column.
+
+    Returns:
+        dict: Stats dictionary per column, in the format of evaluate_with_params
+    """
+    n = len(close)
+    n_cols = len(columns)
+    long_entries = np.empty((n, n_cols), dtype=bool)
+    long_exits = np.empty((n, n_cols), dtype=bool)
+    short_entries = np.empty((n, n_cols), dtype=bool)
+    short_exits = np.empty((n, n_cols), dtype=bool)
+    size = np.empty((n, n_cols), dtype=float)
+    fees = np.empty((1, n_cols), dtype=float)
+    slippage = np.empty((1, n_cols), dtype=float)
+
+    for j, col in enumerate(columns):
+        le, lx, se, sx = signal_sets[col]
+        long_entries[:, j] = np.asarray(le, dtype=bool)
+        long_exits[:, j] = np.asarray(lx, dtype=bool)
+        short_entries[:, j] = np.asarray(se, dtype=bool)
+        short_exits[:, j] = np.asarray(sx, dtype=bool)
+        size[:, j] = size_arrays[col] if size_arrays[col] is not None else TRADE_SIZE
+        pf_kwargs = get_portfolio_kwargs(params_by_col[col])
+        fees[0, j] = pf_kwargs['fees']
+        slippage[0, j] = pf_kwargs['slippage']
+
+    pf_kwargs = get_portfolio_kwargs()
+    pf_kwargs.update({'fees': fees, 'slippage': slippage, 'size': size})
+
+    col_index = pd.Index(columns, name='combination')
+    pf = vbt.Portfolio.from_signals(
+        close=close,
+        entries=pd.DataFrame(long_entries, index=close.index, columns=col_index),
+        exits=pd.DataFrame(long_exits, index=close.index, columns=col_index),
+        short_entries=pd.DataFrame(short_entries, index=close.index, columns=col_index),
+        short_exits=pd.DataFrame(short_exits, index=close.index, columns=col_index),
+        init_cash=INIT_CAPITAL,
+        **pf_kwargs
+    )
+
+    trades = _portfolio_metric(pf, 'trades.count', columns)
+    total_return = _portfolio_metric(pf, 'total_return', columns)
+    sharpe = _portfolio_metric(pf, 'sharpe_ratio', columns)
+    max_drawdown = _portfolio_metric(pf, 'max_drawdown', columns).abs()
+    win_rate = _portfolio_metric(pf, 'trades.win_rate', columns)
+    returns = pf.returns() if callable(pf.returns) else pf.returns
+    returns = pd.DataFrame(np.asarray(returns), index=close.index, columns=columns)
+
+    stats_by_col = {}
+    for col in columns:
+        trade_count = int(trades[col])
+        if trade_count == 0:
+            stats_by_col[col] = _failed_stats()
+            continue
+        stats_by_col[col] = {
+            'return': float(total_return[col]),
+            'sharpe': float(sharpe[col]),
+            'max_drawdown': float(max_drawdown[col]),
+            'trades': trade_count,
+            'win_rate': float(win_rate[col]),
+            'mean_return': float(returns[col].mean()),
+            'return_volatility': float(returns[col].std())
+        }
+    return stats_by_col
+
+
+def evaluate_params_batch(data: pd.DataFrame, param_combinations: List[Dict[str, Any]],
+                          metric: Optional[str] = None, max_columns: int = DEFAULT_MAX_COLUMNS) -> pd.DataFrame:
+    """
+    Evaluate a whole parameter grid with shared wide indicator arrays and one simulation per chunk.
+
+    Args:
+        data: Input data (must contain OHLC)
+        param_combinations: List of parameter dictionaries
+        metric: Performance metric to score on (see evaluate_single_params). Defaults to sharpe.
+        max_columns: Maximum number of combinations simulated in a single portfolio call
+
+    Returns:
+        pd.DataFrame: One row per combination (same order as param_combinations) with a
+            'params' column, a 'score' column and the stats returned by evaluate_with_params
+    """
+    start_time = time.time()
+    table = pd.DataFrame(index=pd.RangeIndex(len(param_combinations), name='combination'),
+                         columns=['params'] + SCORE_COLUMNS, dtype=object)
+    table['params'] = list(param_combinations)
+    table['score'] = -np.inf
+
+    if not param_combinations:
+        return table
+
+    _, _, _, close = get_ohlc_columns(data)
+    if close is None:
+        print("ERROR: Close price data not found for batched evaluation")
+        return table
+
+    # 1. Compute every indicator variant once, as wide arrays
+    windows_by_col = {i: resolve_indicator_windows(p) for i, p in enumerate(param_combinations)}
+    valid_cols = [i for i, w in windows_by_col.items() if w is not None]
+    if not valid_cols:
+        return table
+    variants = compute_indicator_variants(close, [windows_by_col[i] for i in valid_cols])
+    print(f"Batched indicators: {variants['rsi'].shape[1]} RSI, {variants['bb_upper'].shape[1]} BBANDS, "
+          f"{variants['trend_ma'].shape[1]} MA variants for {len(valid_cols)} combinations")
+
+    # 2. Generate signals column-wise from views into the wide arrays; zone flags are
+    # computed once per distinct zone configuration
+    signal_sets, size_arrays, params_by_col, zone_flags = {}, {}, {}, {}
+    for col in valid_cols:
+        params = param_combinations[col]
+        rsi_window, bb_window, bb_std_dev, trend_ma_window = windows_by_col[col]
+        bb_key = (bb_window, bb_std_dev)
+        try:
+            price_in_demand_zone = price_in_supply_zone = None
+            zone_config = resolve_zone_config(params)
+            if zone_config is not None:
+                zone_key, config = zone_config
+                if zone_key not in zone_flags:
+                    zone_flags[zone_key] = compute_zone_signals(data, config)
+                price_in_demand_zone = zone_flags[zone_key]['price_in_demand_zone']
+                price_in_supply_zone = zone_flags[zone_key]['price_in_supply_zone']
+            signals = generate_signals_with_fallback(
+                close=close,
+                rsi=variants['rsi'][rsi_window],
+                bb_upper=variants['bb_upper'][bb_key],
+                bb_lower=variants['bb_lower'][bb_key],
+                trend_ma=variants['trend_ma'][trend_ma_window],
+                price_in_demand_zone=price_in_demand_zone,
+                price_in_supply_zone=price_in_supply_zone,
+                params=params
+            )
+            signals = prepare_portfolio_signals(close, *signals)
+            signal_sets[col] = signals
+            size_arrays[col] = calculate_position_sizes(close, signals[0], signals[2], params, data)
+            params_by_col[col] = params
+        except Exception as e:
+            print(f"Signal generation failed for combination {col}: {e}")
+
+    # 3. Simulate all combinations, max_columns at a time
+    sim_cols = list(signal_sets.keys())
+    for chunk_start in range(0, len(sim_cols), max_columns):
+        chunk = sim_cols[chunk_start:chunk_start + max_columns]
+        try:
+            stats_by_col = _simulate_batch(close, chunk, signal_sets, size_arrays, params_by_col)
+        except Exception as e:
+            print(f"Batched simulation failed ({e}), evaluating {len(chunk)} combinations one by one")
+            traceback.print_exc()
+            stats_by_col = {}
+            for col in chunk:
+                _, _, stats = evaluate_single_params(param_combinations[col], data)
+                stats_by_col[col] = stats if stats is not None else _failed_stats()
+
+        for col, stats in stats_by_col.items():
+            score = get_metric_score(stats, metric)
+            table.at[col, 'score'] = -np.inf if (score is None or np.isnan(score)) else score
+            for key in SCORE_COLUMNS[1:]:
+                table.at[col, key] = stats.get(key, np.nan)
+
+    table[SCORE_COLUMNS] = table[SCORE_COLUMNS].astype(float)
+    print(f"[TIMING] Batched evaluation of {len(param_combinations)} combinations took "
+          f"{time.time() - start_time:.3f} seconds")
+    return table
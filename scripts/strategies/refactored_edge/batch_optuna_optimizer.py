@@ -50,6 +50,7 @@ from scripts.strategies.refactored_edge.asset_profiles import (
     generate_and_save_default_profiles
 )
 from scripts.strategies.refactored_edge.data.fetch_data import fetch_data
+from scripts.strategies.refactored_edge.shared_data import DatasetRegistry, DatasetHandle, resolve_dataset
 
 # Set up logging
 logging.basicConfig(
@@ -216,7 +217,8 @@ class BatchOptimizer:
         return f"{symbol}_{timeframe}_train{train_days}_test{test_days}"
     
     def run_single_optimization(self, symbol: str, timeframe: str, 
-                           train_days: int, test_days: int) -> Dict[str, Any]:
+                           train_days: int, test_days: int,
+                           data: Optional[Union[pd.DataFrame, DatasetHandle]] = None) -> Dict[str, Any]:
         """
         Run a single optimization case.
         
@@ -225,6 +227,8 @@ class BatchOptimizer:
             timeframe: Timeframe
             train_days: Training window in days
             test_days: Testing window in days
+            data: Pre-fetched data for the case (or a shared-memory handle to it);
+                fetched here if None
             
         Returns:
             Dictionary with optimization results
@@ -254,12 +258,15 @@ class BatchOptimizer:
             set_testing_mode(True)
             logger.info(f"Set testing mode to True for optimization")
             
-            # Fetch data for optimization
-            data = fetch_data(
-                symbol=symbol,
-                timeframe=timeframe,
-                days=train_days + test_days
-            )
+            # Fetch data for optimization unless the caller already has it
+            if data is None:
+                data = fetch_data(
+                    symbol=symbol,
+                    timeframe=timeframe,
+                    days=train_days + test_days
+                )
+            else:
+                data = resolve_dataset(data)
             
             if data is None or len(data) < 100:  # Minimum data threshold
                 logger.error(f"Insufficient data for {symbol} {timeframe}")
@@ -451,24 +458,64 @@ class BatchOptimizer:
             for timeframe in self.config.timeframes:
                 results[symbol][timeframe] = {}
         
-        with concurrent.futures.ProcessPoolExecutor(max_workers=self.config.max_workers) as executor:
-            futures = {executor.submit(self.run_single_optimization, symbol, timeframe, train_days, test_days): 
-                      (symbol, timeframe, train_days, test_days) for symbol, timeframe, train_days, test_days in cases}
-            
-            with tqdm(total=total_cases, desc="Optimizations") as pbar:
-                for future in concurrent.futures.as_completed(futures):
-                    symbol, timeframe, train_days, test_days = futures[future]
-                    try:
-                        case_result = future.result()
-                        case_key = self._get_case_key(symbol, timeframe, train_days, test_days)
-                        results[symbol][timeframe][case_key] = case_result
-                    except Exception as e:
-                        logger.error(f"Error processing result: {e}")
-                    pbar.update(1)
+        # Fetch each dataset once in this process and share it with the workers, which
+        # get the optimizer once at startup instead of a pickled copy of self per case
+        with DatasetRegistry() as registry:
+            datasets = self._prefetch_datasets(cases, registry)
+            with concurrent.futures.ProcessPoolExecutor(max_workers=self.config.max_workers,
+                                                        initializer=_init_batch_worker,
+                                                        initargs=(self.config,)) as executor:
+                futures = {executor.submit(_run_case_in_worker, symbol, timeframe, train_days, test_days,
+                                           datasets.get((symbol, timeframe, train_days + test_days))):
+                          (symbol, timeframe, train_days, test_days) for symbol, timeframe, train_days, test_days in cases}
+                
+                with tqdm(total=total_cases, desc="Optimizations") as pbar:
+                    for future in concurrent.futures.as_completed(futures):
+                        symbol, timeframe, train_days, test_days = futures[future]
+                        try:
+                            case_result = future.result()
+                            case_key = self._get_case_key(symbol, timeframe, train_days, test_days)
+                            results[symbol][timeframe][case_key] = case_result
+                        except Exception as e:
+                            logger.error(f"Error processing result: {e}")
+                        pbar.update(1)
         
         self.results = results
         return results
     
+    def _prefetch_datasets(self, cases: List[Tuple[str, str, int, int]],
+                           registry: DatasetRegistry) -> Dict[Tuple[str, str, int], DatasetHandle]:
+        """
+        Fetch the data of every case once (concurrently) and register it for sharing.
+        
+        Cases whose data cannot be fetched or shared are left out; their worker fetches
+        the data itself and reports the error as before.
+        
+        Args:
+            cases: (symbol, timeframe, train_days, test_days) tuples
+            registry: Registry that owns the shared datasets
+            
+        Returns:
+            Dictionary of dataset handles keyed by (symbol, timeframe, days)
+        """
+        keys = sorted({(symbol, timeframe, train_days + test_days)
+                       for symbol, timeframe, train_days, test_days in cases})
+        handles = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.config.max_workers) as pool:
+            futures = {pool.submit(fetch_data, symbol=symbol, timeframe=timeframe, days=days): (symbol, timeframe, days)
+                       for symbol, timeframe, days in keys}
+            for future in concurrent.futures.as_completed(futures):
+                key = futures[future]
+                try:
+                    data = future.result()
+                    if data is not None and len(data) > 0:
+                        handles[key] = registry.register(data)
+                except Exception as e:
+                    logger.warning(f"Could not prefetch data for {key}, the worker will fetch it: {e}")
+        logger.info(f"Shared {len(handles)}/{len(keys)} datasets with workers "
+                   f"({registry.bytes_written / 1e6:.1f} MB)")
+        return handles
+    
     def run_batch(self) -> Dict[str, Dict[str, Any]]:
         """
         Run all optimization cases using either sequential or parallel execution.
@@ -786,6 +833,22 @@ class BatchOptimizer:
             logger.error(f"Error saving report: {e}")
 
 
+# Optimizer of a run_batch_parallel worker process, set up once by _init_batch_worker
+_worker_optimizer: Optional[BatchOptimizer] = None
+
+
+def _init_batch_worker(config: BatchOptimizerConfig) -> None:
+    """Create the worker's BatchOptimizer once per process."""
+    global _worker_optimizer
+    _worker_optimizer = BatchOptimizer(config)
+
+
+def _run_case_in_worker(symbol: str, timeframe: str, train_days: int, test_days: int,
+                        data: Optional[DatasetHandle] = None) -> Dict[str, Any]:
+    """Run one optimization case with the worker's BatchOptimizer."""
+    return _worker_optimizer.run_single_optimization(symbol, timeframe, train_days, test_days, data=data)
+
+
 def parse_args():
     """Parse command-line arguments."""
     parser = argparse.ArgumentParser(description='Batch Optuna Optimization for Edge Strategy')
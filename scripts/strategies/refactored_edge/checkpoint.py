@@ -1 +1,318 @@
+"""
+Checkpoints for resumable walk-forward, Optuna and comprehensive evaluation runs.
 
+A multi-hour run_wfo, run_optuna_optimization or run_comprehensive_evaluation used to
+lose everything when the process died. CheckpointStore keeps a local SQLite database
+(``checkpoints.db``) with three tables:
+
+- runs: one row per run, keyed by a run id derived from everything that determines the
+  run's results (symbol, timeframe, data fingerprint, split boundaries, parameter grid...)
+- units: one row per finished unit of work (a WFO split, an Optuna trial, an evaluation
+  variant), holding its pickled result; each unit is committed as soon as it finishes
+- manifests: JSON descriptions of on-disk artifacts a run depends on, such as the
+  persistent indicator cache directory and the Optuna storage of the run
+
+Starting a run with the same identity again reopens the same run id, so the restarted
+run gets the completed units back and only does the work that is missing. Units are
+written in their own transaction, so a run killed at any point leaves every unit either
+fully recorded or absent.
+"""
+import os
+import json
+import time
+import pickle
+import shutil
+import hashlib
+import sqlite3
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+# Directory for the checkpoint database and run caches; independent of the working directory
+DEFAULT_CHECKPOINT_DIR = os.environ.get('CHECKPOINT_DIR', os.path.join(PROJECT_ROOT, 'data', 'checkpoints'))
+CHECKPOINT_DB_FILENAME = "checkpoints.db"
+
+STATUS_RUNNING = 'running'
+STATUS_COMPLETE = 'complete'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    identity TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS units (
+    run_id TEXT NOT NULL,
+    unit_kind TEXT NOT NULL,
+    unit_key TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (run_id, unit_kind, unit_key)
+);
+CREATE TABLE IF NOT EXISTS manifests (
+    run_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    entries TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (run_id, name)
+);
+"""
+
+
+def _canonical_json(value: Any) -> str:
+    # Objects without a JSON form (timestamps, config objects, ranges) are identified by str()
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def make_run_id(kind: str, **identity) -> str:
+    """
+    Build a stable run id from everything that determines a run's results.
+
+    Args:
+        kind: Run type, e.g. 'wfo', 'optuna' or 'comprehensive'
+        **identity: JSON-serializable values (others are identified by str())
+
+    Returns:
+        str: '<kind>-<hash>'; the same identity always gives the same id
+    """
+    digest = hashlib.md5(_canonical_json(identity).encode('utf-8')).hexdigest()
+    return f"{kind}-{digest[:16]}"
+
+
+class CheckpointStore:
+    """
+    SQLite store of checkpointed runs.
+
+    Each call uses its own connection, so one store can be shared by the split threads
+    of a run. Runs are opened with open_run().
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or DEFAULT_CHECKPOINT_DIR
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, CHECKPOINT_DB_FILENAME)
+        self._lock = threading.Lock()
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.executescript(_SCHEMA)
+            finally:
+                conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        # WAL keeps committed units on disk when the process is killed and lets readers run alongside writes
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    return conn.execute(sql, params).fetchall()
+            finally:
+                conn.close()
+
+    def open_run(self, kind: str, identity: Dict[str, Any]) -> 'RunCheckpoint':
+        """
+        Open the run with this identity, creating it if it does not exist yet.
+
+        Args:
+            kind: Run type
+            identity: Values that determine the run's results (see make_run_id)
+
+        Returns:
+            RunCheckpoint: Handle for recording and reading the run's units
+        """
+        run_id = make_run_id(kind, **identity)
+        now = time.time()
+        self._execute("INSERT OR IGNORE INTO runs (run_id, kind, identity, status, created_at, updated_at) "
+                      "VALUES (?, ?, ?, ?, ?, ?)",
+                      (run_id, kind, _canonical_json(identity), STATUS_RUNNING, now, now))
+        checkpoint = RunCheckpoint(self, run_id, kind)
+        n_units = self._execute("SELECT COUNT(*) FROM units WHERE run_id = ?", (run_id,))[0][0]
+        if n_units:
+            logger.info(f"Checkpoint {run_id}: resuming with {n_units} completed unit(s) ({checkpoint.status})")
+        return checkpoint
+
+    def runs(self, kind: Optional[str] = None) -> list:
+        """
+        List checkpointed runs.
+
+        Args:
+            kind: Only list runs of this type
+
+        Returns:
+            list: Dicts with run_id, kind, identity, status, created_at, updated_at and n_units
+        """
+        sql = ("SELECT r.run_id, r.kind, r.identity, r.status, r.created_at, r.updated_at, "
+               "(SELECT COUNT(*) FROM units u WHERE u.run_id = r.run_id) FROM runs r")
+        params = ()
+        if kind is not None:
+            sql += " WHERE r.kind = ?"
+            params = (kind,)
+        rows = self._execute(sql + " ORDER BY r.created_at", params)
+        return [{'run_id': row[0], 'kind': row[1], 'identity': json.loads(row[2]), 'status': row[3],
+                 'created_at': row[4], 'updated_at': row[5], 'n_units': row[6]} for row in rows]
+
+    def cache_dir(self, run_id: str, name: str) -> str:
+        """Directory for a run's persistent cache (created on demand)."""
+        path = os.path.join(self.directory, 'cache', run_id, name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def delete_run(self, run_id: str) -> None:
+        """Delete a run's units, manifests and cache directories."""
+        for table in ('units', 'manifests', 'runs'):
+            self._execute(f"DELETE FROM {table} WHERE run_id = ?", (run_id,))
+        shutil.rmtree(os.path.join(self.directory, 'cache', run_id), ignore_errors=True)
+
+
+class RunCheckpoint:
+    """
+    Checkpoint of one run: its completed units and artifact manifests.
+
+    Unit keys are JSON values (split numbers, trial numbers, variant names) and come back
+    with their original types from completed().
+    """
+
+    def __init__(self, store: CheckpointStore, run_id: str, kind: str):
+        self.store = store
+        self.run_id = run_id
+        self.kind = kind
+
+    @property
+    def status(self) -> Optional[str]:
+        rows = self.store._execute("SELECT status FROM runs WHERE run_id = ?", (self.run_id,))
+        return rows[0][0] if rows else None
+
+    def completed(self, unit_kind: str) -> Dict[Any, Any]:
+        """
+        Results of the units of this kind finished so far.
+
+        Args:
+            unit_kind: e.g. 'split', 'trial' or 'variant'
+
+        Returns:
+            dict: {unit key: result} in the order the units were recorded; units whose
+                result can no longer be unpickled are left out so they run again
+        """
+        rows = self.store._execute("SELECT unit_key, payload FROM units WHERE run_id = ? AND unit_kind = ? "
+                                   "ORDER BY created_at, rowid", (self.run_id, unit_kind))
+        completed = {}
+        for unit_key, payload in rows:
+            try:
+                completed[json.loads(unit_key)] = pickle.loads(payload)
+            except Exception as e:
+                logger.warning(f"Checkpoint {self.run_id}: cannot load {unit_kind} {unit_key}, it will run again: {e}")
+        return completed
+
+    def record(self, unit_kind: str, unit_key: Any, result: Any) -> None:
+        """
+        Record a finished unit; committed before this returns.
+
+        Args:
+            unit_kind: e.g. 'split', 'trial' or 'variant'
+            unit_key: JSON-serializable key of the unit
+            result: Picklable result of the unit
+
+        Raises:
+            pickle.PicklingError, TypeError, AttributeError: If result cannot be pickled
+        """
+        payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        self.store._execute("INSERT OR REPLACE INTO units (run_id, unit_kind, unit_key, payload, created_at) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            (self.run_id, unit_kind, json.dumps(unit_key), sqlite3.Binary(payload), now))
+        self.store._execute("UPDATE runs SET updated_at = ? WHERE run_id = ?", (now, self.run_id))
+
+    def wrap(self, unit_kind: str, fn: Callable[[Any], Any],
+             encode: Optional[Callable[[Any], Any]] = None) -> Callable[[Any], Any]:
+        """
+        Wrap fn(unit_key) so its result is recorded as soon as it returns.
+
+        Recording happens in the calling thread, so with concurrent splits every finished
+        split is saved even while earlier splits are still running.
+
+        Args:
+            unit_kind: Unit kind to record under
+            fn: Called as fn(unit_key)
+            encode: Turns a result that cannot be pickled into one that can (e.g. by
+                dropping a portfolio); tried once if recording the full result fails
+
+        Returns:
+            callable: fn with checkpointing; returns fn's result unchanged
+        """
+        def run_and_record(unit_key):
+            result = fn(unit_key)
+            try:
+                self.record(unit_kind, unit_key, result)
+            except Exception as e:
+                if encode is None:
+                    raise
+                logger.warning(f"Checkpoint {self.run_id}: recording reduced {unit_kind} {unit_key} result ({e})")
+                self.record(unit_kind, unit_key, encode(result))
+            return result
+        return run_and_record
+
+    def cache_dir(self, name: str) -> str:
+        """Persistent cache directory of this run; kept across restarts."""
+        return self.store.cache_dir(self.run_id, name)
+
+    def save_manifest(self, name: str, entries: Dict[str, Any]) -> None:
+        """Save (replace) a JSON manifest describing one of the run's artifacts."""
+        self.store._execute("INSERT OR REPLACE INTO manifests (run_id, name, entries, updated_at) VALUES (?, ?, ?, ?)",
+                            (self.run_id, name, _canonical_json(entries), time.time()))
+
+    def load_manifest(self, name: str) -> Optional[Dict[str, Any]]:
+        """Load a manifest saved with save_manifest, or None."""
+        rows = self.store._execute("SELECT entries FROM manifests WHERE run_id = ? AND name = ?", (self.run_id, name))
+        return json.loads(rows[0][0]) if rows else None
+
+    def save_cache_manifest(self, name: str) -> Dict[str, Any]:
+        """
+        Record the files currently in the run's cache directory `name`.
+
+        Returns:
+            dict: The manifest ({'directory', 'files', 'bytes'})
+        """
+        directory = self.cache_dir(name)
+        files = sorted(os.listdir(directory))
+        manifest = {'directory': os.path.abspath(directory), 'files': files,
+                    'bytes': sum(os.path.getsize(os.path.join(directory, f)) for f in files
+                                 if os.path.isfile(os.path.join(directory, f)))}
+        self.save_manifest(name, manifest)
+        return manifest
+
+    def finish(self, status: str = STATUS_COMPLETE) -> None:
+        """Mark the run as finished; its units stay available for reruns."""
+        self.store._execute("UPDATE runs SET status = ?, updated_at = ? WHERE run_id = ?",
+                            (status, time.time(), self.run_id))
+
+
+def resolve_checkpoint_store(checkpoint: Union[None, bool, str, CheckpointStore]) -> Optional[CheckpointStore]:
+    """
+    Normalize a run function's checkpoint argument.
+
+    Args:
+        checkpoint: None/False (no checkpointing), True (DEFAULT_CHECKPOINT_DIR, i.e.
+            $CHECKPOINT_DIR or data/checkpoints in the project root), a directory path or
+            a CheckpointStore
+
+    Returns:
+        CheckpointStore or None
+    """
+    if checkpoint is None or checkpoint is False:
+        return None
+    if isinstance(checkpoint, CheckpointStore):
+        return checkpoint
+    if checkpoint is True:
+        return CheckpointStore()
+    return CheckpointStore(str(checkpoint))
@@ -45,6 +45,7 @@ from scripts.strategies.refactored_edge.wfo_utils import (
 )
 from scripts.strategies.refactored_edge.utils import validate_dataframe, with_error_handling
 from scripts.strategies.refactored_edge.run_wfo_real_data import run_real_data_wfo, visualize_wfo_results
+from scripts.strategies.refactored_edge.checkpoint import resolve_checkpoint_store
 
 # Constants
 OUTPUT_DIR = 'data/results/comprehensive_evaluation'
@@ -282,7 +283,8 @@ def save_results_to_csv(
 def run_single_wfo_configuration(
     config_variant: str,
     wfo_config: Dict[str, Any],
-    grid_size: str = 'medium'
+    grid_size: str = 'medium',
+    checkpoint: Optional[Any] = None
 ) -> Tuple[List[Dict[str, Any]], Dict[int, Dict[str, Any]], List[Any]]:
     """
     Run a single WFO configuration and return the results.
@@ -291,6 +293,7 @@ def run_single_wfo_configuration(
         config_variant: Which configuration variant to use
         wfo_config: WFO parameters from configure_wfo_parameters
         grid_size: Parameter grid size
+        checkpoint: Checkpoint store passed down to run_wfo to record completed splits
         
     Returns:
         Tuple containing:
@@ -322,6 +325,9 @@ def run_single_wfo_configuration(
         config_obj = EdgeConfig(**strategy_config['edge_config'])
         wfo_params['config'] = config_obj
     
+    if checkpoint is not None:
+        wfo_params['checkpoint'] = checkpoint
+    
     logger.info(f"Running {config_variant} configuration with {grid_size} grid")
     
     # Run WFO with these parameters
@@ -350,7 +356,8 @@ def run_comparative_wfo(
     initial_capital: float = INIT_CAPITAL,
     output_dir: Optional[str] = None,
     grid_size: str = 'medium',
-    run_variants: Optional[List[str]] = None
+    run_variants: Optional[List[str]] = None,
+    checkpoint: Optional[Any] = None
 ) -> Dict[str, Any]:
     """
     Run comprehensive WFO evaluation with multiple configurations for comparison.
@@ -371,6 +378,9 @@ def run_comparative_wfo(
         output_dir: Directory to save results (created if doesn't exist)
         grid_size: Parameter grid size ('small', 'medium', 'large')
         run_variants: List of variants to run (default: all in CONFIG_VARIANTS)
+        checkpoint: Checkpoint store (or its directory, or True for data/checkpoints).
+            Finished variants are recorded and not run again when the evaluation is
+            restarted; within a variant, run_wfo skips the splits it already completed
         
     Returns:
         Dict with results from all configurations
@@ -395,6 +405,18 @@ def run_comparative_wfo(
     if run_variants is None:
         run_variants = list(CONFIG_VARIANTS.keys())
     
+    # Variants finished by an interrupted evaluation are taken from the checkpoint store
+    checkpoint_store = resolve_checkpoint_store(checkpoint)
+    run_checkpoint = None
+    completed_variants = {}
+    if checkpoint_store is not None:
+        run_checkpoint = checkpoint_store.open_run('comprehensive', {
+            'wfo_config': wfo_config, 'grid_size': grid_size, 'run_variants': run_variants,
+        })
+        completed_variants = run_checkpoint.completed('variant')
+        logger.info(f"Checkpoint {run_checkpoint.run_id}: {len(completed_variants)}/{len(run_variants)} "
+                    f"variant(s) completed")
+    
     # Initialize results dictionary
     all_results = {}
     all_portfolios = {}
@@ -402,13 +424,26 @@ def run_comparative_wfo(
     
     # Run each configuration variant
     for variant in run_variants:
-        logger.info(f"\n{'='*50}\nRunning {variant} configuration\n{'='*50}")
-        
-        results, best_params, portfolios = run_single_wfo_configuration(
-            config_variant=variant,
-            wfo_config=wfo_config,
-            grid_size=grid_size
-        )
+        if variant in completed_variants:
+            logger.info(f"Using checkpointed results of the {variant} configuration")
+            results, best_params, portfolios = completed_variants[variant]
+        else:
+            logger.info(f"\n{'='*50}\nRunning {variant} configuration\n{'='*50}")
+            
+            results, best_params, portfolios = run_single_wfo_configuration(
+                config_variant=variant,
+                wfo_config=wfo_config,
+                grid_size=grid_size,
+                checkpoint=checkpoint_store
+            )
+            
+            # Failed variants (no results) are not recorded so a restart retries them
+            if run_checkpoint is not None and results:
+                try:
+                    run_checkpoint.record('variant', variant, (results, best_params, portfolios))
+                except Exception as e:
+                    logger.warning(f"Could not checkpoint {variant} portfolios, recording results only: {e}")
+                    run_checkpoint.record('variant', variant, (results, best_params, []))
         
         # Store the results
         all_results[variant] = results
@@ -422,6 +457,9 @@ def run_comparative_wfo(
             f"{variant}_results.csv"
         )
     
+    if run_checkpoint is not None:
+        run_checkpoint.finish()
+    
     # Save combined results
     comparative_results_path = save_results_to_csv(
         all_results,
@@ -1328,7 +1366,8 @@ def run_comprehensive_evaluation(
     train_ratio: float = 0.7,
     output_dir: Optional[str] = None,
     run_variants: Optional[List[str]] = None,
-    grid_size: str = 'medium'
+    grid_size: str = 'medium',
+    checkpoint: Optional[Any] = None
 ) -> Dict[str, Any]:
     """
     Run a complete comprehensive evaluation pipeline.
@@ -1349,6 +1388,8 @@ def run_comprehensive_evaluation(
         output_dir: Directory to save results (created if doesn't exist)
         run_variants: List of variants to run (default: all in CONFIG_VARIANTS)
         grid_size: Parameter grid size ('small', 'medium', 'large')
+        checkpoint: Checkpoint store (or its directory, or True for data/checkpoints) so a
+            restarted evaluation skips the variants and WFO splits it already completed
         
     Returns:
         Dict with paths to generated files and results
@@ -1369,7 +1410,8 @@ def run_comprehensive_evaluation(
         train_ratio=train_ratio,
         output_dir=output_dir,
         run_variants=run_variants,
-        grid_size=grid_size
+        grid_size=grid_size,
+        checkpoint=checkpoint
     )
     
     results_dict = wfo_results['results']
@@ -1446,6 +1488,8 @@ def parse_arguments():
                         help="Parameter grid size (default: medium)")
     parser.add_argument('--quick-test', action='store_true',
                         help="Run a quick test with reduced parameters (for debugging)")
+    parser.add_argument('--checkpoint-dir', type=str, default=None,
+                        help="Checkpoint directory; rerunning with the same arguments resumes an interrupted evaluation")
     
     return parser.parse_args()
 
@@ -1471,7 +1515,8 @@ if __name__ == "__main__":
             train_ratio=args.train_ratio,
             output_dir=args.output_dir,
             run_variants=['standard', 'regime_aware'],  # Just two variants
-            grid_size='small'  # Smallest grid
+            grid_size='small',  # Smallest grid
+            checkpoint=args.checkpoint_dir
         )
     else:
         # Run full evaluation
@@ -1484,7 +1529,8 @@ if __name__ == "__main__":
             train_ratio=args.train_ratio,
             output_dir=args.output_dir,
             run_variants=args.variants,
-            grid_size=args.grid_size
+            grid_size=args.grid_size,
+            checkpoint=args.checkpoint_dir
         )
     
     # Show final report path
@@ -28,12 +28,13 @@ if str(project_root) not in sys.path:
 # Import local modules
 from scripts.strategies.refactored_edge.config import EdgeConfig
 from scripts.strategies.refactored_edge.balanced_signals import SignalStrictness
-from scripts.strategies.refactored_edge.wfo import run_wfo
+from scripts.strategies.refactored_edge.wfo import run_wfo, calculate_wfo_splits
 from scripts.strategies.refactored_edge.wfo_utils import (
     SYMBOL, TIMEFRAME, START_DATE, END_DATE, INIT_CAPITAL, N_JOBS,
     WFO_TRAIN_POINTS, WFO_TEST_POINTS, STEP_POINTS, ensure_output_dir
 )
 from scripts.strategies.refactored_edge.data.data_fetcher import fetch_historical_data, GRANULARITY_MAP_SECONDS
+from scripts.strategies.refactored_edge.indicator_cache import get_indicator_store
 
 # Import VectorBTpro for advanced features
 import vectorbtpro as vbt
@@ -198,6 +199,78 @@ def create_parameter_grid(size: str = 'medium', is_quick_test: bool = False) ->
         return create_parameter_grid(is_quick_test=True)
 
 
+def run_batched_grid_evaluation(
+    data: pd.DataFrame,
+    param_combinations: List[Dict[str, Any]],
+    n_splits: int = 1,
+    train_ratio: float = 0.7,
+    train_points: Optional[int] = None,
+    test_points: Optional[int] = None,
+    metric: str = 'Sharpe Ratio'
+) -> List[Dict[str, Any]]:
+    """
+    Evaluate every parameter combination on each WFO split using batched evaluation.
+    
+    Each split's train and test windows are scored for the whole grid in a single
+    vectorized pass, producing the per-split result rows consumed by run_grid_search.
+    
+    Args:
+        data: OHLC data
+        param_combinations: List of parameter dictionaries
+        n_splits: Number of WFO splits
+        train_ratio: Ratio of training to total window size
+        train_points: Custom number of data points for training window
+        test_points: Custom number of data points for testing window
+        metric: Metric used as the per-combination score
+        
+    Returns:
+        List of per-split, per-combination result dictionaries
+    """
+    # Import here to keep vectorized evaluation optional
+    from scripts.strategies.refactored_edge.batch_evaluation import evaluate_params_batch
+    
+    train_points = train_points or WFO_TRAIN_POINTS
+    test_points = test_points or WFO_TEST_POINTS
+    total_window = train_points + test_points
+    train_points = int(total_window * train_ratio)
+    test_points = total_window - train_points
+    
+    splits = calculate_wfo_splits(
+        data_length=len(data),
+        train_points=train_points,
+        test_points=test_points,
+        step_points=STEP_POINTS,
+        n_splits=n_splits
+    )
+    
+    results = []
+    for split_num, (train_indices, test_indices) in enumerate(splits):
+        logger.info(f"Batched evaluation of {len(param_combinations)} combinations on split {split_num + 1}/{len(splits)}")
+        train_table = evaluate_params_batch(data.iloc[train_indices], param_combinations, metric)
+        test_table = evaluate_params_batch(data.iloc[test_indices], param_combinations, metric)
+        
+        for i, params in enumerate(param_combinations):
+            train_sharpe = train_table.at[i, 'sharpe']
+            test_sharpe = test_table.at[i, 'sharpe']
+            robustness_ratio = np.nan
+            if np.isfinite(train_sharpe) and train_sharpe != 0 and not np.isnan(test_sharpe):
+                robustness_ratio = test_sharpe / train_sharpe if train_sharpe > 0 else -test_sharpe / train_sharpe
+            
+            results.append({
+                'params': params,
+                'split': split_num + 1,
+                'train_return': train_table.at[i, 'return'],
+                'train_sharpe': train_sharpe,
+                'train_max_drawdown': train_table.at[i, 'max_drawdown'],
+                'test_return': test_table.at[i, 'return'],
+                'test_sharpe': test_sharpe,
+                'test_max_drawdown': test_table.at[i, 'max_drawdown'],
+                'robustness_ratio': robustness_ratio
+            })
+    
+    return results
+
+
 def run_grid_search(
     symbol: str = SYMBOL,
     timeframe: str = TIMEFRAME,
@@ -212,7 +285,8 @@ def run_grid_search(
     n_jobs: int = -1,            # Default to using all available cores
     use_caching: bool = True,    # Enable VectorBTpro caching for faster repeated calculations
     use_chunking: bool = True,   # Enable chunking for large datasets
-    parallel_mode: str = 'process'  # Options: 'process', 'thread', 'ray'
+    parallel_mode: str = 'process',  # Options: 'process', 'thread', 'ray'
+    batched: bool = False        # Evaluate the whole grid per split with wide indicator arrays
 ) -> Tuple[pd.DataFrame, Dict]:
     """
     Run a grid search over parameter combinations and evaluate performance.
@@ -228,6 +302,8 @@ def run_grid_search(
         custom_train_points: Custom number of data points for training window
         custom_test_points: Custom number of data points for testing window
         max_combinations: Maximum number of parameter combinations to test
+        batched: If True, evaluate all combinations on each split's train and test data in one
+            vectorized pass (see batch_evaluation) instead of running WFO per combination
         
     Returns:
         DataFrame with evaluation results for each parameter combination,
@@ -282,7 +358,16 @@ def run_grid_search(
     results = []
     best_params = {}
     
-    for i, params in enumerate(param_combinations):
+    if batched:
+        results = run_batched_grid_evaluation(
+            data, param_combinations, n_splits=n_splits, train_ratio=0.7,
+            train_points=custom_train_points, test_points=custom_test_points
+        )
+        param_combinations_to_run = []
+    else:
+        param_combinations_to_run = param_combinations
+    
+    for i, params in enumerate(param_combinations_to_run):
         logger.info(f"Evaluating parameter combination {i+1}/{len(param_combinations)}")
         
         # Create configuration with these parameters
@@ -365,6 +450,11 @@ def run_grid_search(
             logger.error(f"Error evaluating parameter combination {i+1}: {str(e)}")
             continue
     
+    # Indicator variants are memoized per dataset, so later combinations only pay for new windows
+    store_stats = get_indicator_store().stats()
+    logger.info(f"Indicator store: {store_stats['entries']} variants cached, "
+                f"hits={store_stats['hits']}, misses={store_stats['misses']}")
+    
     # Step 4: Compile and analyze results
     if not results:
         logger.warning("No valid results were generated during grid search")
@@ -438,6 +528,7 @@ if __name__ == "__main__":
                       help='Parameter grid size: small (few combinations), medium (balanced), large (comprehensive)')
     parser.add_argument('--quick_test', action='store_true', help='Run a quick test with minimal data and parameters')
     parser.add_argument('--max_combinations', type=int, default=50, help='Maximum number of parameter combinations to test')
+    parser.add_argument('--batched', action='store_true', help='Evaluate the whole grid per split in one vectorized pass')
     
     args = parser.parse_args()
     
@@ -454,7 +545,8 @@ if __name__ == "__main__":
         n_splits=args.n_splits,
         grid_size=args.grid_size,
         is_quick_test=args.quick_test,
-        max_combinations=args.max_combinations
+        max_combinations=args.max_combinations,
+        batched=args.batched
     )
     
     # Print results
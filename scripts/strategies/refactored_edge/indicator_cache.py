@@ -0,0 +1,528 @@
+"""
+Bounded, data-fingerprinted indicator cache for Walk-Forward Optimization (WFO).
+
+Indicator frames are keyed on (data fingerprint, indicator parameters) so the same
+parameter set evaluated on two different train/test slices never collides. The
+in-memory tier is an LRU bounded by both entry count and total bytes, and an
+optional on-disk tier lets joblib worker processes share results computed by
+other workers during a single optimization run.
+
+IndicatorStore sits one level below: it memoizes individual indicator columns
+(``rsi@14``, ``atr@21``, ...) so frames for new parameter sets are assembled from
+already computed pieces. Frames registered as row windows of a longer series (see
+register_window) get causal indicators computed once on the full series and sliced.
+"""
+import os
+import json
+import pickle
+import hashlib
+import logging
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Parameters that change the output of indicators.add_indicators
+INDICATOR_PARAM_KEYS = [
+    'rsi_window', 'bb_window', 'bb_std_dev', 'ma_window', 'trend_ma_window',
+    'atr_window', 'atr_window_sizing', 'adx_window', 'sma_short', 'sma_medium', 'sma_long',
+    'use_enhanced_regimes', 'pattern_min_strength',
+    'use_zones', 'pivot_lookback', 'pivot_prominence', 'zone_merge_proximity',
+    'min_zone_width_candles', 'min_zone_strength', 'zone_extend_candles', 'zone_proximity_pct'
+]
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB
+
+
+# Fingerprints already known for live DataFrames: id -> (weakref, (shape, columns), fingerprint)
+_known_fingerprints: Dict[int, tuple] = {}
+
+
+def _frame_signature(data: pd.DataFrame) -> tuple:
+    return data.shape, tuple(data.columns)
+
+
+def remember_fingerprint(data: pd.DataFrame, fingerprint: str):
+    """
+    Record a fingerprint computed elsewhere (e.g. by the process that shared the data).
+
+    fingerprint_data returns it for this exact object while its shape and columns are
+    unchanged, instead of hashing every row again.
+
+    Args:
+        data: DataFrame the fingerprint belongs to
+        fingerprint: Value from fingerprint_data
+    """
+    key = id(data)
+    ref = weakref.ref(data, lambda _ref, key=key: _known_fingerprints.pop(key, None))
+    _known_fingerprints[key] = (ref, _frame_signature(data), fingerprint)
+
+
+def fingerprint_data(data: pd.DataFrame) -> str:
+    """
+    Compute a content fingerprint for a price DataFrame.
+
+    The fingerprint covers the index, column names and all values, so two slices
+    of the same history with different boundaries get different fingerprints.
+
+    Args:
+        data: Input DataFrame
+
+    Returns:
+        str: Hex digest identifying the data
+    """
+    known = _known_fingerprints.get(id(data))
+    if known is not None and known[0]() is data and known[1] == _frame_signature(data):
+        return known[2]
+    hasher = hashlib.md5()
+    hasher.update(str(data.shape).encode())
+    hasher.update(json.dumps([str(c) for c in data.columns]).encode())
+    if len(data) > 0:
+        row_hashes = pd.util.hash_pandas_object(data, index=True).to_numpy()
+        hasher.update(row_hashes.tobytes())
+    return hasher.hexdigest()
+
+
+class SeriesWindow(NamedTuple):
+    """Rows [start, stop) of a full series that a window frame was sliced from."""
+    data: pd.DataFrame
+    fingerprint: str
+    start: int
+    stop: int
+
+
+# Registered row windows: window fingerprint -> SeriesWindow
+_windows: Dict[str, SeriesWindow] = {}
+
+
+def register_window(window: pd.DataFrame, full_data: pd.DataFrame, start: int, stop: int,
+                    full_fingerprint: Optional[str] = None, window_fingerprint: Optional[str] = None) -> str:
+    """
+    Record that a frame holds rows [start, stop) of a longer series.
+
+    Windows are matched by content fingerprint, so copies of the window frame are
+    recognised too.
+
+    Args:
+        window: Window frame, usually full_data.iloc[start:stop]
+        full_data: The full series
+        start: First row of the window in full_data
+        stop: Row after the last row of the window
+        full_fingerprint: Known fingerprint of full_data (computed if None)
+        window_fingerprint: Known fingerprint of window (computed if None)
+
+    Returns:
+        str: Fingerprint of the window
+    """
+    full_fingerprint = full_fingerprint or fingerprint_data(full_data)
+    window_fingerprint = window_fingerprint or fingerprint_data(window)
+    remember_fingerprint(window, window_fingerprint)
+    _windows[window_fingerprint] = SeriesWindow(full_data, full_fingerprint, start, stop)
+    return window_fingerprint
+
+
+def find_window(data_fingerprint: str) -> Optional[SeriesWindow]:
+    """
+    Look up the full series a window frame was registered with.
+
+    Args:
+        data_fingerprint: Fingerprint of the window frame
+
+    Returns:
+        SeriesWindow or None if the frame is not a registered window
+    """
+    return _windows.get(data_fingerprint)
+
+
+def clear_windows(full_fingerprint: Optional[str] = None):
+    """
+    Forget registered windows.
+
+    Args:
+        full_fingerprint: Only forget windows of this full series; all windows if None
+    """
+    for key in [k for k, w in list(_windows.items()) if full_fingerprint is None or w.fingerprint == full_fingerprint]:
+        del _windows[key]
+
+
+def get_indicator_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the subset of parameters that affect indicator calculations.
+
+    Args:
+        params: Full parameter dictionary
+
+    Returns:
+        dict: Indicator-relevant parameters only
+    """
+    return {k: v for k, v in params.items() if k in INDICATOR_PARAM_KEYS}
+
+
+def make_cache_key(params: Dict[str, Any], data_fingerprint: Optional[str] = None) -> str:
+    """
+    Build a deterministic cache key from indicator parameters and a data fingerprint.
+
+    Args:
+        params: Parameter dictionary (non-indicator keys are ignored)
+        data_fingerprint: Fingerprint from fingerprint_data, or None for a params-only key
+
+    Returns:
+        str: Cache key
+    """
+    params_str = json.dumps(get_indicator_params(params), sort_keys=True, default=str)
+    params_hash = hashlib.md5(params_str.encode()).hexdigest()
+    if data_fingerprint is None:
+        return params_hash
+    return f"{data_fingerprint}-{params_hash}"
+
+
+def estimate_nbytes(value: Any) -> int:
+    """
+    Estimate the memory footprint of a cached value in bytes.
+
+    Args:
+        value: DataFrame, Series, ndarray or other object
+
+    Returns:
+        int: Approximate size in bytes
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+class IndicatorCache:
+    """
+    LRU cache for indicator frames bounded by entry count and total bytes.
+
+    Counters for hits, misses and evictions are kept so optimization runs can report
+    how effective the cache was. When a disk directory is attached, misses in memory
+    fall through to pickled entries on disk and new entries are written there too,
+    which makes the cache visible to every worker process pointed at that directory.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES,
+                 disk_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = None
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+        if disk_dir:
+            self.attach_disk_tier(disk_dir)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def attach_disk_tier(self, disk_dir: str):
+        """
+        Attach a shared on-disk tier. Safe to call repeatedly with the same path.
+
+        Args:
+            disk_dir: Directory used to exchange entries between processes
+        """
+        os.makedirs(disk_dir, exist_ok=True)
+        self.disk_dir = disk_dir
+
+    def detach_disk_tier(self):
+        """Stop reading from and writing to the on-disk tier."""
+        self.disk_dir = None
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.pkl")
+
+    def _read_disk(self, key: str) -> Optional[Any]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read cached indicators from {path}: {e}")
+            return None
+
+    def _write_disk(self, key: str, value: Any):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            return
+        try:
+            # Write to a temp file first so readers never see a partial pickle
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write cached indicators to {path}: {e}")
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes):
+            old_key, _ = self._entries.popitem(last=False)
+            self._total_bytes -= self._sizes.pop(old_key, 0)
+            self.evictions += 1
+            logger.debug(f"Evicted indicator cache entry {old_key}")
+
+    def _store(self, key: str, value: Any):
+        nbytes = estimate_nbytes(value)
+        if nbytes > self.max_bytes:
+            logger.debug(f"Indicator cache entry {key} ({nbytes} bytes) exceeds max_bytes, not caching in memory")
+            return
+        if key in self._entries:
+            self._total_bytes -= self._sizes.get(key, 0)
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self._sizes[key] = nbytes
+        self._total_bytes += nbytes
+        self._evict()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up an entry, falling back to the disk tier if one is attached.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None on a miss
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+            value = self._read_disk(key)
+            if value is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self._store(key, value)
+                return value
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Any):
+        """
+        Insert an entry, evicting least recently used entries as needed.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        with self._lock:
+            self._store(key, value)
+            self._write_disk(key, value)
+
+    def get_or_compute(self, key: str, compute_fn: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, computing and caching it on a miss.
+
+        Values of None are returned but never cached.
+
+        Args:
+            key: Cache key
+            compute_fn: Zero-argument callable producing the value
+
+        Returns:
+            Cached or freshly computed value
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = compute_fn()
+        if value is not None:
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Drop all in-memory entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.disk_hits = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report cache effectiveness counters.
+
+        Returns:
+            dict: hits, misses, evictions, disk_hits, hit_rate, entries and bytes
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'disk_hits': self.disk_hits,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self._entries),
+            'bytes': self._total_bytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+        }
+
+
+class IndicatorStore:
+    """
+    Column-level memo of individual indicator outputs per dataset.
+
+    Each indicator variant is addressed by a spec such as ``rsi@14`` or ``bbands@20,2.0``
+    and computed at most once per data fingerprint, so assembling a frame for a new
+    parameter set only pays for the variants that have not been seen before.
+    """
+
+    def __init__(self, cache: Optional[IndicatorCache] = None):
+        self.cache = cache if cache is not None else IndicatorCache(max_entries=1024)
+
+    @staticmethod
+    def make_spec(name: str, *args: Any) -> str:
+        """
+        Build the spec string for an indicator variant.
+
+        Args:
+            name: Indicator name (e.g. 'rsi', 'atr')
+            *args: Parameters of the variant
+
+        Returns:
+            str: Spec such as 'rsi@14'
+        """
+        return f"{name}@{','.join(str(a) for a in args)}"
+
+    def get(self, data_fingerprint: str, spec: str, compute_fn: Callable[[], Any]) -> Any:
+        """
+        Return the memoized output for spec on this dataset, computing it on first use.
+
+        Args:
+            data_fingerprint: Fingerprint from fingerprint_data
+            spec: Indicator spec from make_spec
+            compute_fn: Zero-argument callable producing the indicator output
+
+        Returns:
+            Indicator output (Series or DataFrame)
+        """
+        return self.cache.get_or_compute(f"{data_fingerprint}:{spec}", compute_fn)
+
+    def get_causal(self, data: pd.DataFrame, data_fingerprint: str, spec: str,
+                   compute_fn: Callable[[pd.DataFrame], Any]) -> Any:
+        """
+        Like get, for indicators whose value at a bar only depends on that bar and earlier ones.
+
+        If data is a registered window of a longer series, the indicator is computed once
+        on the full series and the window's rows are returned as a view. Values inside the
+        window then carry the history before it instead of restarting from a cold start;
+        they never depend on rows after the window.
+
+        Args:
+            data: Frame the indicator is requested for
+            data_fingerprint: Fingerprint of data
+            spec: Indicator spec from make_spec
+            compute_fn: Callable computing the indicator for a frame
+
+        Returns:
+            Indicator output aligned with data
+        """
+        window = find_window(data_fingerprint)
+        if window is None:
+            return self.get(data_fingerprint, spec, lambda: compute_fn(data))
+        full = self.get(window.fingerprint, spec, lambda: compute_fn(window.data))
+        if isinstance(full, (pd.Series, pd.DataFrame)):
+            return full.iloc[window.start:window.stop]
+        return full[window.start:window.stop]
+
+    def clear(self):
+        """Drop all memoized indicator columns."""
+        self.cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report hit/miss/eviction counters of the underlying cache.
+
+        Returns:
+            dict: Cache statistics
+        """
+        return self.cache.stats()
+
+
+# Process-wide caches used by wfo_evaluation and indicators
+_default_cache = IndicatorCache()
+_default_store = IndicatorStore()
+
+
+def get_indicator_cache() -> IndicatorCache:
+    """
+    Get the process-wide indicator cache.
+
+    Returns:
+        IndicatorCache: Shared cache instance for this process
+    """
+    return _default_cache
+
+
+def get_indicator_store() -> IndicatorStore:
+    """
+    Get the process-wide column-level indicator store.
+
+    Returns:
+        IndicatorStore: Shared store instance for this process
+    """
+    return _default_store
+
+
+def configure_indicator_cache(max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                              disk_dir: Optional[str] = None) -> IndicatorCache:
+    """
+    Adjust limits of the process-wide cache and optionally attach a disk tier.
+
+    Args:
+        max_entries: New maximum number of in-memory entries
+        max_bytes: New maximum total size of in-memory entries
+        disk_dir: Directory for the shared on-disk tier
+
+    Returns:
+        IndicatorCache: The process-wide cache
+    """
+    cache = get_indicator_cache()
+    with cache._lock:
+        if max_entries is not None:
+            cache.max_entries = max_entries
+        if max_bytes is not None:
+            cache.max_bytes = max_bytes
+        cache._evict()
+    if disk_dir is not None and cache.disk_dir != disk_dir:
+        cache.attach_disk_tier(disk_dir)
+    return cache
@@ -8,6 +8,7 @@ import logging
 from .config import EdgeConfig 
 from .zones import find_pivot_zones, add_zone_signals
 from .enhanced_indicators import add_pattern_recognition, add_volatility_indicators
+from .indicator_cache import IndicatorStore, fingerprint_data, get_indicator_store
 
 logger = logging.getLogger(__name__)
 
@@ -138,14 +139,99 @@ def add_adx(ohlc_data: pd.DataFrame, window: int = 14, column_map: dict = None)
         return result
 
 
-def add_indicators(ohlc_data: pd.DataFrame, config: EdgeConfig):
+def _compute_bbands(close: pd.Series, window: int, alpha: float) -> pd.DataFrame:
+    bbands = vbt.BBANDS.run(close, window=window, alpha=alpha)
+    return pd.DataFrame({
+        'bb_upper': bbands.upper,
+        'bb_lower': bbands.lower,
+        'bb_width': bbands.bandwidth
+    }, index=close.index)
+
+
+def compute_zone_signals(ohlc_data: pd.DataFrame, config: EdgeConfig, store: IndicatorStore = None) -> pd.DataFrame:
+    """Compute the Supply/Demand zone flags for OHLC data.
+    
+    Zone detection is memoized per dataset and zone parameters in the IndicatorStore,
+    so configs that only differ in non-zone parameters share one detection run.
+    
+    Args:
+        ohlc_data: DataFrame with OHLC data
+        config: Configuration with zone parameters
+        store: Column-level indicator store (defaults to the process-wide store)
+        
+    Returns:
+        DataFrame with boolean 'price_in_demand_zone' and 'price_in_supply_zone' columns
+        (all False if no zones are found or zone detection fails)
+    """
+    zone_signals_df = pd.DataFrame({'price_in_demand_zone': False, 'price_in_supply_zone': False},
+                                   index=ohlc_data.index)
+    try:
+        _, column_map = validate_ohlc_columns(ohlc_data)
+        close = ohlc_data[column_map['Close']]
+        high = ohlc_data[column_map['High']]
+        low = ohlc_data[column_map['Low']]
+        store = store if store is not None else get_indicator_store()
+
+        logger.debug("Calculating S/D zones...")
+        # Check for required zone parameters and use safe defaults if missing
+        pivot_lookback = getattr(config, 'pivot_lookback', 10)
+        pivot_prominence = getattr(config, 'pivot_prominence', 0.01)
+        zone_merge_proximity = getattr(config, 'zone_merge_proximity', 0.005)
+        min_zone_width_candles = getattr(config, 'min_zone_width_candles', 5)
+        min_zone_strength = getattr(config, 'min_zone_strength', 2)
+        zone_extend_candles = getattr(config, 'zone_extend_candles', 50)
+        
+        zones_df = store.get(
+            fingerprint_data(ohlc_data),
+            store.make_spec('zones', pivot_lookback, pivot_prominence, zone_merge_proximity,
+                            min_zone_width_candles, min_zone_strength, zone_extend_candles),
+            lambda: find_pivot_zones(
+                close=close,
+                high=high,
+                low=low,
+                pivot_lookback=pivot_lookback,
+                pivot_prominence=pivot_prominence,
+                zone_merge_proximity=zone_merge_proximity,
+                min_zone_width_candles=min_zone_width_candles,
+                min_zone_strength=min_zone_strength,
+                zone_extend_candles=zone_extend_candles
+            )
+        )
+        logger.debug(f"Found {len(zones_df)} zones.")
+
+        if not zones_df.empty:
+            logger.debug("Adding zone signals...")
+            signals = add_zone_signals(
+                close=close,
+                zones_df=zones_df,
+                zone_proximity_pct=config.zone_proximity_pct
+            )
+            for name in ('price_in_demand_zone', 'price_in_supply_zone'):
+                zone_signals_df[name] = signals[name].reindex(ohlc_data.index).fillna(False).astype(bool)
+            logger.debug("Zone signals added.")
+        else:
+            logger.debug("No zones found, adding placeholder columns.")
+
+    except Exception as e:
+        logger.error(f"Error calculating S/D zones or signals: {e}", exc_info=True)
+    return zone_signals_df
+
+
+def add_indicators(ohlc_data: pd.DataFrame, config: EdgeConfig, store: IndicatorStore = None):
     """Add technical indicators to OHLC data based on the provided configuration.
     
-    Handles both uppercase and lowercase OHLC column formats.
+    Handles both uppercase and lowercase OHLC column formats. Each indicator variant
+    (e.g. ``rsi@14``, ``atr@21``, ``adx@14``) is memoized per dataset in an
+    IndicatorStore, so a new config only computes the variants not seen before.
+    When ohlc_data is a registered window of a longer series (a WFO split in
+    reuse_features mode), RSI, Bollinger Bands, MA, ATR and ADX are computed once on
+    the full series and sliced; zones and pattern indicators are always computed on
+    ohlc_data itself because they can look ahead within the data they are given.
     
     Args:
         ohlc_data: DataFrame with OHLC data
         config: Configuration with indicator parameters
+        store: Column-level indicator store (defaults to the process-wide store)
         
     Returns:
         DataFrame with added indicators or None if validation fails
@@ -162,24 +248,53 @@ def add_indicators(ohlc_data: pd.DataFrame, config: EdgeConfig):
     high = ohlc_data[column_map['High']].copy()
     low = ohlc_data[column_map['Low']].copy()
 
+    store = store if store is not None else get_indicator_store()
+    data_fp = fingerprint_data(ohlc_data)
+
+    def memo(spec, compute_fn):
+        return store.get(data_fp, spec, compute_fn)
+
+    def causal_memo(spec, compute_fn):
+        # compute_fn takes the frame to compute on (ohlc_data or the full series it is a window of)
+        return store.get_causal(ohlc_data, data_fp, spec, compute_fn)
+
+    def col(frame, name):
+        return frame[column_map[name]]
+
     indicators_df = pd.DataFrame(index=ohlc_data.index)
 
     try:
-        indicators_df['rsi'] = vbt.RSI.run(close, window=config.rsi_window).rsi
+        indicators_df['rsi'] = causal_memo(
+            store.make_spec('rsi', config.rsi_window),
+            lambda frame: vbt.RSI.run(col(frame, 'Close'), window=config.rsi_window).rsi
+        )
 
-        bbands = vbt.BBANDS.run(close, window=config.bb_window, alpha=config.bb_std_dev)
-        indicators_df['bb_upper'] = bbands.upper
-        indicators_df['bb_lower'] = bbands.lower
-        indicators_df['bb_width'] = bbands.bandwidth 
+        bbands_df = causal_memo(
+            store.make_spec('bbands', config.bb_window, config.bb_std_dev),
+            lambda frame: _compute_bbands(col(frame, 'Close'), config.bb_window, config.bb_std_dev)
+        )
+        indicators_df['bb_upper'] = bbands_df['bb_upper']
+        indicators_df['bb_lower'] = bbands_df['bb_lower']
+        indicators_df['bb_width'] = bbands_df['bb_width']
 
-        indicators_df['trend_ma'] = vbt.MA.run(close, window=config.trend_ma_window).ma
+        indicators_df['trend_ma'] = causal_memo(
+            store.make_spec('ma', config.trend_ma_window),
+            lambda frame: vbt.MA.run(col(frame, 'Close'), window=config.trend_ma_window).ma
+        )
 
-        indicators_df['atr_stops'] = talib.ATR(high, low, close, timeperiod=config.atr_window)
+        indicators_df['atr_stops'] = causal_memo(
+            store.make_spec('atr', config.atr_window),
+            lambda frame: talib.ATR(col(frame, 'High'), col(frame, 'Low'), col(frame, 'Close'),
+                                    timeperiod=config.atr_window)
+        )
         indicators_df['atr'] = indicators_df['atr_stops'].copy()  # Add atr column for regime detection
         
         # Add ADX and Directional Indicators for regime detection (critical for advanced regime detection)
         adx_window = getattr(config, 'adx_window', 14)  # Default to 14 if not specified
-        adx_result = add_adx(ohlc_data, adx_window, column_map=column_map)
+        adx_result = causal_memo(
+            store.make_spec('adx', adx_window),
+            lambda frame: add_adx(frame, adx_window, column_map=column_map)
+        )
         indicators_df['adx'] = adx_result['adx']
         indicators_df['plus_di'] = adx_result['plus_di']
         indicators_df['minus_di'] = adx_result['minus_di']
@@ -196,7 +311,11 @@ def add_indicators(ohlc_data: pd.DataFrame, config: EdgeConfig):
         else:
             logger.debug(f"Using atr_window_sizing={atr_window_sizing} (same as atr_window)")
             
-        indicators_df['atr_sizing'] = talib.ATR(high, low, close, timeperiod=atr_window_sizing)
+        indicators_df['atr_sizing'] = causal_memo(
+            store.make_spec('atr', atr_window_sizing),
+            lambda frame: talib.ATR(col(frame, 'High'), col(frame, 'Low'), col(frame, 'Close'),
+                                    timeperiod=atr_window_sizing)
+        )
 
     except Exception as e:
         logger.error(f"Error calculating standard indicators: {e}", exc_info=True)
@@ -213,7 +332,10 @@ def add_indicators(ohlc_data: pd.DataFrame, config: EdgeConfig):
             
             # Add pattern recognition indicators
             pattern_min_strength = getattr(config, 'pattern_min_strength', 60)
-            pattern_df = add_pattern_recognition(ohlc_data, min_strength=pattern_min_strength)
+            pattern_df = memo(
+                store.make_spec('patterns', pattern_min_strength),
+                lambda: add_pattern_recognition(ohlc_data, min_strength=pattern_min_strength)
+            )
             
             # Extract only the pattern columns we need for regime detection
             pattern_columns = ['pattern_signal', 'pattern_strength', 'pattern_bullish', 'pattern_bearish']
@@ -222,7 +344,10 @@ def add_indicators(ohlc_data: pd.DataFrame, config: EdgeConfig):
                     indicators_df[col] = pattern_df[col]
             
             # Add volatility indicators (VHF, Choppiness Index)
-            volatility_df = add_volatility_indicators(ohlc_data)
+            volatility_df = memo(
+                store.make_spec('volatility'),
+                lambda: add_volatility_indicators(ohlc_data)
+            )
             
             # Extract only the volatility columns we need for regime detection
             volatility_columns = ['vhf', 'choppiness']
@@ -240,50 +365,9 @@ def add_indicators(ohlc_data: pd.DataFrame, config: EdgeConfig):
     logger.debug(f"Supply/Demand zone analysis {'enabled' if use_zones else 'disabled'} (use_zones={use_zones})")
     
     if use_zones:
-        try:
-            logger.debug("Calculating S/D zones...")
-            # Check for required zone parameters and use safe defaults if missing
-            pivot_lookback = getattr(config, 'pivot_lookback', 10)
-            pivot_prominence = getattr(config, 'pivot_prominence', 0.01)
-            zone_merge_proximity = getattr(config, 'zone_merge_proximity', 0.005)
-            min_zone_width_candles = getattr(config, 'min_zone_width_candles', 5)
-            min_zone_strength = getattr(config, 'min_zone_strength', 2)
-            zone_extend_candles = getattr(config, 'zone_extend_candles', 50)
-            
-            zones_df = find_pivot_zones(
-                close=close,
-                high=high,
-                low=low,
-                pivot_lookback=pivot_lookback,
-                pivot_prominence=pivot_prominence,
-                zone_merge_proximity=zone_merge_proximity,
-                min_zone_width_candles=min_zone_width_candles,
-                min_zone_strength=min_zone_strength,
-                zone_extend_candles=zone_extend_candles
-            )
-            logger.debug(f"Found {len(zones_df)} zones.")
-
-            if not zones_df.empty:
-                logger.debug("Adding zone signals...")
-                zone_signals_df = add_zone_signals(
-                    close=close,
-                    zones_df=zones_df,
-                    zone_proximity_pct=config.zone_proximity_pct
-                )
-                indicators_df = pd.merge(indicators_df, zone_signals_df, left_index=True, right_index=True, how='left')
-                # Fix chained assignment warnings by using direct assignment instead of inplace operations
-                indicators_df['price_in_demand_zone'] = indicators_df['price_in_demand_zone'].fillna(False)
-                indicators_df['price_in_supply_zone'] = indicators_df['price_in_supply_zone'].fillna(False)
-                logger.debug("Zone signals added.")
-            else:
-                logger.debug("No zones found, adding placeholder columns.")
-                indicators_df['price_in_demand_zone'] = False
-                indicators_df['price_in_supply_zone'] = False
-
-        except Exception as e:
-            logger.error(f"Error calculating S/D zones or signals: {e}", exc_info=True)
-            indicators_df['price_in_demand_zone'] = False
-            indicators_df['price_in_supply_zone'] = False
+        zone_signals_df = compute_zone_signals(ohlc_data, config, store=store)
+        indicators_df['price_in_demand_zone'] = zone_signals_df['price_in_demand_zone']
+        indicators_df['price_in_supply_zone'] = zone_signals_df['price_in_supply_zone']
     else:
         indicators_df['price_in_demand_zone'] = False
         indicators_df['price_in_supply_zone'] = False
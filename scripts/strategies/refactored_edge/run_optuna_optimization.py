@@ -43,6 +43,8 @@ from scripts.strategies.refactored_edge.config import EdgeConfig
 from scripts.strategies.refactored_edge.wfo import run_wfo
 from scripts.strategies.refactored_edge.wfo_utils import validate_ohlc_data
 from scripts.strategies.refactored_edge.balanced_signals import SignalStrictness
+from scripts.strategies.refactored_edge.checkpoint import resolve_checkpoint_store
+from scripts.strategies.refactored_edge.indicator_cache import fingerprint_data
 
 # Set up logging
 logging.basicConfig(
@@ -91,9 +93,10 @@ def fetch_historical_data(symbol, timeframe, days=120):
             logger.error(f"Invalid timeframe: {timeframe}")
             return None
             
-        if days <= 0:
+        n_days = days
+        if n_days <= 0:
             logger.warning(f"Invalid days value: {days}, defaulting to 120")
-            days = 120
+            n_days = 120
         
         # Check for mock data first for testing
         mock_file = os.path.join(project_root, 'tests', 'data', f"{symbol}_{timeframe}_mock.csv")
@@ -124,88 +127,57 @@ def fetch_historical_data(symbol, timeframe, days=120):
                 logger.error(f"Error reading mock data: {e}")
                 return None
                 
-        # Use cached data if available
-        cache_dir = os.path.join(project_root, 'data', 'cache')
-        os.makedirs(cache_dir, exist_ok=True)
-        
-        cache_file = os.path.join(cache_dir, f"{symbol}_{timeframe}_{days}days.csv")
-        
-        # Check if cache file exists and is recent (less than 1 day old)
-        if os.path.exists(cache_file):
-            file_age = time.time() - os.path.getmtime(cache_file)
-            if file_age < 86400:  # 1 day in seconds
-                logger.info(f"Using cached data from {cache_file}")
-                try:
-                    data = pd.read_csv(cache_file, index_col=0, parse_dates=True)
-                    # Validate DataFrame has required columns
-                    required_cols = ['open', 'high', 'low', 'close', 'volume']
-                    validate_dataframe(data, required_cols)
-                    return data
-                except Exception as e:
-                    logger.warning(f"Error reading cached data, will fetch fresh data: {e}")
-                    # Continue to fetch fresh data
-        
-        # If we get here, we need to fetch fresh data
-        logger.info(f"Fetching {days} days of {timeframe} data for {symbol}")
-        
-        try:
+        # Serve from the partitioned OHLCV cache; only ranges not cached yet are downloaded
+        from app.core.ohlcv_cache import OHLCVCache
+
+        def _download(gap_start, gap_end):
             # Import data fetching functionality - dynamic import to avoid circular dependencies
             import importlib
             vbt_spec = importlib.util.find_spec('vectorbtpro')
             
             if vbt_spec is None:
-                logger.error("vectorbtpro module not found")
-                return None
+                raise ImportError("vectorbtpro module not found")
                 
             vbt = importlib.import_module('vectorbtpro')
             
-            # Get time range
-            end_ts = int(time.time())
-            start_ts = end_ts - (days * 86400)  # days in seconds
-            
             # Fetch from Coinbase with timeout handling
-            try:
-                data = vbt.CCXTData.download(
-                    symbols=symbol,
-                    timeframe=timeframe,
-                    start=start_ts,
-                    end=end_ts,
-                    exchange="coinbase"
-                ).get()
-                
-                # Validate the fetched data
-                if data is None or data.empty:
-                    logger.error(f"No data returned from CCXT for {symbol} {timeframe}")
-                    return None
-                    
-                # Ensure we have all required columns (case-insensitive)
-                required_cols = ['open', 'high', 'low', 'close', 'volume']
-                if not all(col.lower() in map(str.lower, data.columns) for col in required_cols):
-                    # Try to fix column names if they're in a different case
-                    for col in required_cols:
-                        matches = [c for c in data.columns if c.lower() == col.lower()]
-                        if matches and col not in data.columns:
-                            data[col] = data[matches[0]]
-                    
-                # Final validation
-                validate_dataframe(data, required_cols)
-                
-                # Save to cache
-                try:
-                    data.to_csv(cache_file)
-                    logger.info(f"Data cached to {cache_file}")
-                except Exception as e:
-                    logger.warning(f"Could not cache data: {e}")
-                
-                return data
-                
-            except Exception as e:
+            data = vbt.CCXTData.download(
+                symbols=symbol,
+                timeframe=timeframe,
+                start=int(gap_start.timestamp()),
+                end=int(gap_end.timestamp()),
+                exchange="coinbase"
+            ).get()
+            
+            if data is None or data.empty:
+                logger.error(f"No data returned from CCXT for {symbol} {timeframe}")
+            return data
+        
+        # Get time range
+        end_ts = int(time.time())
+        start_ts = end_ts - (n_days * 86400)  # days in seconds
+        
+        cache = OHLCVCache()
+        try:
+            data = cache.get(symbol, timeframe, start_ts, end_ts, fetch_fn=_download)
+        except Exception as e:
+            if isinstance(e, ImportError):
+                logger.error(f"Required module not available: {e}")
+            else:
                 logger.error(f"Error downloading data from CCXT: {e}")
-                return None
-                
-        except ImportError as e:
-            logger.error(f"Required module not available: {e}")
+            # Fall back to whatever part of the range is already cached
+            data = cache.read(symbol, timeframe, start_ts, end_ts)
+            if not data.empty:
+                logger.warning(f"Using {len(data)} cached candles for {symbol} {timeframe} without the missing ranges")
+        
+        if data.empty:
+            logger.error(f"No data available for {symbol} {timeframe}")
             return None
+        
+        # Final validation
+        validate_dataframe(data, ['open', 'high', 'low', 'close', 'volume'])
+        logger.info(f"Loaded {len(data)} {timeframe} candles for {symbol}")
+        return data
     
     # Execute the inner function which has proper error handling
     return _fetch_data()
@@ -589,7 +561,8 @@ def save_results(result, study_name):
 
 
 def run_optuna_optimization(data, symbol, timeframe, n_trials=100, timeout=3600, n_splits=3, train_days=30, test_days=15,
-                            signal_strictness=None, trend_threshold_pct=None, zone_influence=None, min_hold_period=None):
+                            signal_strictness=None, trend_threshold_pct=None, zone_influence=None, min_hold_period=None,
+                            checkpoint=None):
     """
     Run Optuna optimization with support for asset-specific configuration.
     
@@ -610,6 +583,12 @@ def run_optuna_optimization(data, symbol, timeframe, n_trials=100, timeout=3600,
         trend_threshold_pct (float, optional): Asset-specific trend threshold percentage
         zone_influence (float, optional): Asset-specific zone influence factor
         min_hold_period (int, optional): Asset-specific minimum holding period
+        checkpoint (CheckpointStore, str or bool, optional): Checkpoint store (or its
+            directory, or True for data/checkpoints). The study then gets a stable name
+            and its Optuna storage lives in the run's checkpoint directory, every finished
+            trial is recorded in the store, and a rerun with the same data and settings
+            continues the study, running only the trials still missing from n_trials.
+            Trials left running by a killed process are failed and retried.
         
     Returns:
         dict: Optimization results including status, parameters, and metrics
@@ -728,14 +707,39 @@ def run_optuna_optimization(data, symbol, timeframe, n_trials=100, timeout=3600,
             except (ValueError, TypeError) as e:
                 logger.warning(f"Invalid min_hold_period: {e}, ignoring this parameter")
         
-        # Create unique study name with timestamp to avoid conflicts
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        study_name = f"{symbol}_{timeframe}_train{train_days}_test{test_days}_{timestamp}"
+        run_checkpoint = None
+        checkpoint_store = resolve_checkpoint_store(checkpoint)
+        if checkpoint_store is not None:
+            # n_trials is not part of the identity so a rerun can also extend a finished study
+            run_checkpoint = checkpoint_store.open_run('optuna', {
+                'symbol': symbol, 'timeframe': timeframe, 'data': fingerprint_data(data), 'n_splits': n_splits,
+                'train_days': train_days, 'test_days': test_days, 'asset_specific_params': asset_specific_params,
+            })
+            study_name = f"{symbol}_{timeframe}_train{train_days}_test{test_days}_{run_checkpoint.run_id}"
+        else:
+            # Create unique study name with timestamp to avoid conflicts
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            study_name = f"{symbol}_{timeframe}_train{train_days}_test{test_days}_{timestamp}"
         
         try:
             # Safely create Optuna study with retry logic
             try:
-                storage_name = f"sqlite:///{os.path.join(RESULTS_DIR, f'{study_name}.db')}"
+                if run_checkpoint is not None:
+                    storage_path = os.path.join(run_checkpoint.cache_dir('optuna'), f'{study_name}.db')
+                    # Heartbeats let a restarted run fail (and retry) trials of a killed process
+                    retry_callback = optuna.storages.RetryFailedTrialCallback(max_retry=3)
+                    try:
+                        storage_name = optuna.storages.RDBStorage(
+                            url=f"sqlite:///{storage_path}", heartbeat_interval=60, grace_period=120,
+                            heartbeat_stale_trial_callback=retry_callback)
+                    except TypeError:
+                        # Optuna < 4.9 names the callback failed_trial_callback
+                        storage_name = optuna.storages.RDBStorage(
+                            url=f"sqlite:///{storage_path}", heartbeat_interval=60, grace_period=120,
+                            failed_trial_callback=retry_callback)
+                    run_checkpoint.save_manifest('optuna_storage', {'storage': storage_path, 'study_name': study_name})
+                else:
+                    storage_name = f"sqlite:///{os.path.join(RESULTS_DIR, f'{study_name}.db')}"
                 study = optuna.create_study(
                     direction="maximize", 
                     study_name=study_name,
@@ -781,14 +785,32 @@ def run_optuna_optimization(data, symbol, timeframe, n_trials=100, timeout=3600,
                     logger.error(f"Error in asset_specific_objective for trial {trial.number}: {e}")
                     return -np.inf
             
+            callbacks = []
+            remaining_trials = n_trials
+            if run_checkpoint is not None:
+                finished_states = (optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED)
+                finished = len(study.get_trials(deepcopy=False, states=finished_states))
+                remaining_trials = max(0, n_trials - finished)
+                logger.info(f"Checkpoint {run_checkpoint.run_id}: {finished} trial(s) finished, "
+                            f"{remaining_trials} to run")
+                
+                def record_trial(study, trial):
+                    run_checkpoint.record('trial', trial.number, {
+                        'params': trial.params, 'value': trial.value, 'state': trial.state.name,
+                        'user_attrs': trial.user_attrs,
+                    })
+                callbacks.append(record_trial)
+            
             # Run optimization with progress tracking
             logger.info(f"Starting optimization with asset-specific parameters: {list(asset_specific_params.keys())}")
-            study.optimize(
-                asset_specific_objective, 
-                n_trials=n_trials, 
-                timeout=timeout,
-                show_progress_bar=True
-            )
+            if remaining_trials > 0:
+                study.optimize(
+                    asset_specific_objective, 
+                    n_trials=remaining_trials, 
+                    timeout=timeout,
+                    show_progress_bar=True,
+                    callbacks=callbacks
+                )
             
             # Verify we have valid results
             if len(study.trials) == 0:
@@ -850,6 +872,9 @@ def run_optuna_optimization(data, symbol, timeframe, n_trials=100, timeout=3600,
                 except Exception as e:
                     logger.warning(f"Error saving results: {e}")
                 
+                if run_checkpoint is not None:
+                    run_checkpoint.finish()
+                
                 return result
                 
             except Exception as e:
@@ -322,7 +322,8 @@ def run_real_data_wfo(
     use_regime_filter: bool = True,
     signal_strictness: SignalStrictness = SignalStrictness.BALANCED,
     grid_size: str = 'medium',
-    is_quick_test: bool = False
+    is_quick_test: bool = False,
+    checkpoint: Optional[Any] = None
 ) -> Tuple[List[Dict[str, Any]], Dict[int, Any], Dict[int, Dict[str, Any]]]:
     """
     Run Walk-Forward Optimization with real Coinbase data using refactored components.
@@ -345,6 +346,8 @@ def run_real_data_wfo(
         use_regime_filter: Whether to enable regime-aware signal adaptation
         signal_strictness: Strictness level for signal generation (STRICT, BALANCED, RELAXED)
         grid_size: Parameter grid size: small (few combinations), medium (balanced), large (comprehensive)
+        checkpoint: Checkpoint store (or its directory) passed to run_wfo so completed
+            splits are recorded and skipped when the run is restarted
         
     Returns:
         Tuple containing:
@@ -461,7 +464,8 @@ def run_real_data_wfo(
             n_splits=n_splits,
             train_ratio=train_ratio,
             n_jobs=n_jobs,
-            data=data  # Pass the fetched data
+            data=data,  # Pass the fetched data
+            checkpoint=checkpoint
         )
             
         logger.info(f"WFO completed with {len(results) if results else 0} splits")
@@ -0,0 +1,292 @@
+"""
+Shared-memory dataset registry for process-parallel optimization.
+
+joblib and ProcessPoolExecutor pickle every task's arguments, so passing a training
+DataFrame to each ``delayed(...)`` call serializes and copies the whole dataset once
+per parameter combination. DatasetRegistry writes a DataFrame (and optional
+precomputed indicator arrays) once to memory-mapped ``.npy`` files, on /dev/shm when
+it is available, and hands out a small picklable DatasetHandle. Workers resolve the
+handle with resolve_dataset, which maps the files and builds a DataFrame whose
+columns are zero-copy views of the mapped memory. Files are mapped copy-on-write, so
+a worker that modifies its frame never affects the shared data or other workers.
+
+A DataFrame registered as a window of a longer series (see SplitFeatures) is shared
+as the full series plus a row range, so workers also see the split as a window and
+compute causal indicators once on the full series.
+"""
+import os
+import uuid
+import shutil
+import logging
+import tempfile
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from scripts.strategies.refactored_edge.indicator_cache import (
+    fingerprint_data, remember_fingerprint, find_window, register_window
+)
+
+logger = logging.getLogger(__name__)
+
+SHM_DIR = '/dev/shm'
+# dtype kinds that can be stored as plain arrays: bool, int, uint, float, complex, timedelta, datetime
+SUPPORTED_KINDS = 'biufcmM'
+
+
+@dataclass(frozen=True)
+class ColumnBlock:
+    """Columns of one dtype stored together as a (n_columns, n_rows) array file."""
+    filename: str
+    dtype: str
+    columns: Tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class DatasetHandle:
+    """
+    Picklable reference to a dataset registered in a DatasetRegistry.
+
+    Only file names and metadata are pickled, so sending a handle to a worker costs a
+    few hundred bytes regardless of the dataset size.
+    """
+    key: str
+    directory: str
+    n_rows: int
+    columns: Tuple[Any, ...]
+    blocks: Tuple[ColumnBlock, ...]
+    index_kind: str  # 'range', 'datetime' or 'array'
+    index_meta: Dict[str, Any] = field(default_factory=dict)
+    arrays: Dict[str, str] = field(default_factory=dict)
+    fingerprint: Optional[str] = None
+    # Set for a window of the dataset: its rows and the fingerprint of the full dataset
+    row_range: Optional[Tuple[int, int]] = None
+    source_fingerprint: Optional[str] = None
+
+    def frame(self) -> pd.DataFrame:
+        """Attach (if needed) and return the dataset as a DataFrame of zero-copy views."""
+        return resolve_dataset(self)
+
+    def array(self, name: str) -> np.ndarray:
+        """Attach (if needed) and return a registered extra array."""
+        return _attach(self)[1][name]
+
+
+def _check_dtype(dtype: Any, what: str) -> np.dtype:
+    if not isinstance(dtype, np.dtype) or dtype.kind not in SUPPORTED_KINDS:
+        raise TypeError(f"Cannot share {what} with dtype {dtype}; only numeric, bool and "
+                        f"timezone-naive datetime/timedelta columns are supported")
+    return dtype
+
+
+def _default_directory() -> str:
+    if os.path.isdir(SHM_DIR) and os.access(SHM_DIR, os.W_OK):
+        return SHM_DIR
+    return tempfile.gettempdir()
+
+
+class DatasetRegistry:
+    """
+    Owner of shared datasets for one optimization run.
+
+    Register datasets in the parent process, pass the returned handles to workers and
+    close the registry (or use it as a context manager) once the workers are done.
+    Registering the same data twice returns the existing handle.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        base = directory or _default_directory()
+        self.directory = tempfile.mkdtemp(prefix='edge_datasets_', dir=base)
+        self._handles: Dict[str, DatasetHandle] = {}
+        self._lock = threading.Lock()
+        self.bytes_written = 0
+
+    def __enter__(self) -> 'DatasetRegistry':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def _save(self, array: np.ndarray) -> str:
+        filename = f"{uuid.uuid4().hex}.npy"
+        np.save(os.path.join(self.directory, filename), np.ascontiguousarray(array), allow_pickle=False)
+        self.bytes_written += array.nbytes
+        return filename
+
+    def register(self, data: pd.DataFrame, arrays: Optional[Dict[str, Union[np.ndarray, pd.Series]]] = None,
+                 key: Optional[str] = None) -> DatasetHandle:
+        """
+        Write a DataFrame (and optional extra arrays) to shared memory once.
+
+        Args:
+            data: DataFrame with numeric, bool or datetime64 columns and a RangeIndex,
+                DatetimeIndex or numeric index
+            arrays: Extra arrays to share with the dataset, e.g. precomputed indicators
+            key: Name for the dataset; defaults to the data fingerprint
+
+        Returns:
+            DatasetHandle: Picklable handle for resolve_dataset
+
+        Raises:
+            TypeError: If a column or the index cannot be stored as a plain array
+        """
+        fingerprint = fingerprint_data(data)
+        window = find_window(fingerprint) if not arrays else None
+        if window is not None:
+            # Share the full series once; the window is a row range of it
+            with self._lock:
+                existing = self._handles.get(key or fingerprint)
+                if existing is not None and existing.fingerprint == fingerprint:
+                    return existing
+            full = self.register(window.data, key=window.fingerprint)
+            handle = replace(full, fingerprint=fingerprint, row_range=(window.start, window.stop),
+                             source_fingerprint=full.fingerprint)
+            with self._lock:
+                self._handles[key or fingerprint] = handle
+            return handle
+
+        key = key or fingerprint
+        with self._lock:
+            existing = self._handles.get(key)
+            if existing is not None and existing.fingerprint == fingerprint and not arrays:
+                return existing
+
+            if not data.columns.is_unique:
+                raise TypeError("Cannot share a DataFrame with duplicate column names")
+
+            by_dtype: Dict[np.dtype, List[Any]] = {}
+            for column, dtype in data.dtypes.items():
+                by_dtype.setdefault(_check_dtype(dtype, f"column {column!r}"), []).append(column)
+            blocks = []
+            for dtype, columns in by_dtype.items():
+                values = np.empty((len(columns), len(data)), dtype=dtype)
+                for i, column in enumerate(columns):
+                    values[i] = data[column].to_numpy()
+                blocks.append(ColumnBlock(self._save(values), dtype.str, tuple(columns)))
+
+            index = data.index
+            if isinstance(index, pd.RangeIndex):
+                index_kind = 'range'
+                index_meta = {'start': index.start, 'stop': index.stop, 'step': index.step, 'name': index.name}
+            elif isinstance(index, pd.DatetimeIndex):
+                index_kind = 'datetime'
+                naive = index.tz_convert(None) if index.tz is not None else index
+                index_meta = {'filename': self._save(naive.asi8), 'unit': naive.unit,
+                              'tz': str(index.tz) if index.tz is not None else None,
+                              'freq': index.freqstr, 'name': index.name}
+            else:
+                _check_dtype(index.dtype, "index")
+                index_kind = 'array'
+                index_meta = {'filename': self._save(index.to_numpy()), 'name': index.name}
+
+            extra = {}
+            for name, values in (arrays or {}).items():
+                values = values.to_numpy() if isinstance(values, (pd.Series, pd.DataFrame)) else np.asarray(values)
+                _check_dtype(values.dtype, f"array {name!r}")
+                extra[name] = self._save(values)
+
+            handle = DatasetHandle(key=key, directory=self.directory, n_rows=len(data),
+                                   columns=tuple(data.columns), blocks=tuple(blocks),
+                                   index_kind=index_kind, index_meta=index_meta,
+                                   arrays=extra, fingerprint=fingerprint)
+            self._handles[key] = handle
+        logger.debug(f"Registered dataset {key[:12]} ({len(data)} rows, {len(blocks)} blocks) in {self.directory}")
+        return handle
+
+    def close(self) -> None:
+        """Delete the shared files. Workers that still map them keep their mappings."""
+        with self._lock:
+            self._handles.clear()
+            _detach_directory(self.directory)
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+# Datasets this process has attached, keyed by (directory, dataset key)
+_attached: Dict[Tuple[str, str], Tuple[pd.DataFrame, Dict[str, np.ndarray]]] = {}
+_attached_lock = threading.Lock()
+
+
+def _load(directory: str, filename: str) -> np.ndarray:
+    # Copy-on-write mapping: the frame is writable, but writes stay private to this process
+    return np.asarray(np.load(os.path.join(directory, filename), mmap_mode='c', allow_pickle=False))
+
+
+def _build_index(handle: DatasetHandle) -> pd.Index:
+    meta = handle.index_meta
+    if handle.index_kind == 'range':
+        return pd.RangeIndex(meta['start'], meta['stop'], meta['step'], name=meta['name'])
+    values = _load(handle.directory, meta['filename'])
+    if handle.index_kind == 'datetime':
+        index = pd.DatetimeIndex(values.view(f"M8[{meta['unit']}]"), freq=meta['freq'], name=meta['name'])
+        if meta['tz'] is not None:
+            index = index.tz_localize('UTC').tz_convert(meta['tz'])
+        return index
+    return pd.Index(values, name=meta['name'], copy=False)
+
+
+def _attach(handle: DatasetHandle) -> Tuple[pd.DataFrame, Dict[str, np.ndarray]]:
+    cache_key = (handle.directory, handle.key)
+    with _attached_lock:
+        attached = _attached.get(cache_key)
+        if attached is not None:
+            return attached
+        columns = {}
+        for block in handle.blocks:
+            values = _load(handle.directory, block.filename)
+            for i, column in enumerate(block.columns):
+                columns[column] = values[i]
+        frame = pd.DataFrame({c: columns[c] for c in handle.columns}, index=_build_index(handle),
+                             columns=list(handle.columns), copy=False)
+        arrays = {name: _load(handle.directory, filename) for name, filename in handle.arrays.items()}
+        attached = _attached[cache_key] = (frame, arrays)
+        return attached
+
+
+def _detach_directory(directory: str) -> None:
+    with _attached_lock:
+        for cache_key in [k for k in _attached if k[0] == directory]:
+            del _attached[cache_key]
+
+
+def resolve_dataset(data: Union[pd.DataFrame, DatasetHandle]) -> pd.DataFrame:
+    """
+    Return a DataFrame for a dataset argument that may be a DatasetHandle.
+
+    Each call returns a new shallow frame over the shared columns, so tasks running in
+    the same worker can add or modify columns without seeing each other's changes.
+    The data fingerprint is remembered for the returned frame, so indicator cache keys
+    do not need to rehash the data in every task. For a window handle the frame is a
+    view of the window's rows and is registered as a window of the full dataset.
+
+    Args:
+        data: DataFrame (returned unchanged) or DatasetHandle
+
+    Returns:
+        pd.DataFrame: The dataset
+    """
+    if not isinstance(data, DatasetHandle):
+        return data
+    frame = _attach(data)[0]
+    if data.row_range is not None:
+        start, stop = data.row_range
+        full = frame
+        frame = full.iloc[start:stop]
+        register_window(frame, full, start, stop, full_fingerprint=data.source_fingerprint,
+                        window_fingerprint=data.fingerprint)
+        return frame
+    frame = frame.copy(deep=False)
+    if data.fingerprint is not None:
+        remember_fingerprint(frame, data.fingerprint)
+    return frame
+
+
+def detach_all() -> None:
+    """Forget every dataset attached in this process (mappings close once unreferenced)."""
+    with _attached_lock:
+        _attached.clear()
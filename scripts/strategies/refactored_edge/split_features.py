@@ -0,0 +1,151 @@
+"""
+Full-series indicator and regime features for walk-forward splits.
+
+Consecutive WFO splits overlap by train_points - step_points bars, yet slicing each
+split with ``.iloc[...].copy()`` makes every split recompute the same indicators from a
+cold start. SplitFeatures hands out split windows as zero-copy views of the full series
+and registers them with indicator_cache, so add_indicators computes causal indicators
+(RSI, Bollinger Bands, MA, ATR, ADX) once on the full series and slices them for every
+split. Regime labels are computed once per configuration and sliced the same way.
+
+There is no look-ahead: an indicator value at a bar only uses bars up to that bar, so
+values inside a split never depend on data after the split. What changes is the start
+of each split, which now sees the history before it instead of a warm-up of NaNs and
+back-filled values. After warmup_bars() bars a split gets the same values as the old
+per-split computation (exactly for rolling-window indicators, to within 1e-8 relative
+for recursively smoothed ones, so signals and regime labels are identical).
+"""
+import math
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Union
+
+import pandas as pd
+
+from scripts.strategies.refactored_edge.indicator_cache import fingerprint_data, register_window, clear_windows
+
+logger = logging.getLogger(__name__)
+
+# Parameters that are plain rolling windows: a window of n bars is fully warm after n - 1 bars
+ROLLING_WINDOW_PARAMS = {'bb_window': 20, 'trend_ma_window': 50, 'ma_window': 50, 'momentum_lookback': 5}
+# Parameters of Wilder-smoothed indicators and how many smoothing stages they chain
+RECURSIVE_WINDOW_PARAMS = {'rsi_window': (14, 1), 'atr_window': (14, 1), 'atr_window_sizing': (14, 1),
+                           'adx_window': (14, 2)}
+# A Wilder average of window n forgets its starting value by a factor (1 - 1/n) per bar;
+# after 20 * n bars what is left is below 1e-8 of the initial difference
+RECURSIVE_WARMUP_FACTOR = 20
+
+
+def _param(params: Union[Dict[str, Any], Any], name: str, default: Any) -> Any:
+    if isinstance(params, dict):
+        return params.get(name, default)
+    return getattr(params, name, default)
+
+
+def warmup_bars(param_sets: Iterable[Union[Dict[str, Any], Any]]) -> int:
+    """
+    Number of bars after which split indicators no longer depend on where the split starts.
+
+    Args:
+        param_sets: Parameter dicts or config objects used in the run
+
+    Returns:
+        int: Warm-up length in bars for the slowest indicator of any parameter set
+    """
+    warmup = 0
+    for params in param_sets:
+        for name, default in ROLLING_WINDOW_PARAMS.items():
+            window = _param(params, name, default)
+            if isinstance(window, (int, float)):
+                warmup = max(warmup, int(window) - 1)
+        for name, (default, stages) in RECURSIVE_WINDOW_PARAMS.items():
+            window = _param(params, name, default)
+            if isinstance(window, (int, float)):
+                warmup = max(warmup, int(math.ceil(window * stages * RECURSIVE_WARMUP_FACTOR)))
+    return warmup
+
+
+def window_bounds(indices: Union[range, slice, Tuple[int, int]]) -> Tuple[int, int]:
+    """
+    Convert split indices to (start, stop) row bounds.
+
+    Args:
+        indices: Contiguous range (as returned by calculate_wfo_splits), slice or (start, stop)
+
+    Returns:
+        tuple: (start, stop)
+
+    Raises:
+        ValueError: If the indices are not contiguous, so the split cannot be a view
+    """
+    if isinstance(indices, tuple):
+        return int(indices[0]), int(indices[1])
+    if isinstance(indices, (range, slice)) and indices.step in (None, 1):
+        return int(indices.start or 0), int(indices.stop)
+    raise ValueError(f"Split indices must be a contiguous range to be sliced as a view, got {indices!r}")
+
+
+class SplitFeatures:
+    """
+    Full-series features shared by all WFO splits of one run.
+
+    Use window() instead of ``price_data.iloc[indices].copy()`` for split data and
+    regime_labels() for per-split regime labels. Call close() (or use the object as a
+    context manager) when the run is done so the registered windows are released.
+    """
+
+    def __init__(self, price_data: pd.DataFrame, warmup: int = 0):
+        self.price_data = price_data
+        self.fingerprint = fingerprint_data(price_data)
+        self.warmup = warmup
+        self._regimes: Dict[Any, Optional[pd.Series]] = {}
+        # Splits may run concurrently; labels for a key are computed by the first caller only
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> 'SplitFeatures':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def window(self, indices: Union[range, slice, Tuple[int, int]]) -> pd.DataFrame:
+        """
+        Return the split rows as a view of the full series.
+
+        Args:
+            indices: Contiguous split indices
+
+        Returns:
+            pd.DataFrame: Split data sharing memory with the full series
+        """
+        start, stop = window_bounds(indices)
+        view = self.price_data.iloc[start:stop]
+        register_window(view, self.price_data, start, stop, full_fingerprint=self.fingerprint)
+        return view
+
+    def regime_labels(self, indices: Union[range, slice, Tuple[int, int]], key: Any,
+                      compute_fn: Callable[[pd.DataFrame], Optional[pd.Series]]) -> Optional[pd.Series]:
+        """
+        Return regime labels for the split rows, computed once on the full series per key.
+
+        Args:
+            indices: Contiguous split indices
+            key: Hashable identifying the regime configuration
+            compute_fn: Computes labels for a frame (called with the full series)
+
+        Returns:
+            pd.Series or None if compute_fn could not produce labels
+        """
+        with self._lock:
+            if key not in self._regimes:
+                self._regimes[key] = compute_fn(self.price_data)
+            labels = self._regimes[key]
+        if labels is None:
+            return None
+        start, stop = window_bounds(indices)
+        return labels.iloc[start:stop]
+
+    def close(self) -> None:
+        """Release the registered windows and cached regime labels."""
+        clear_windows(self.fingerprint)
+        self._regimes.clear()
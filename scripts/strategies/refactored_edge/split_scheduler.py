@@ -0,0 +1,136 @@
+"""
+Two-level scheduling of walk-forward splits.
+
+run_wfo used to process splits one after another and only parallelize the parameter
+grid inside a split. With small grids the worker pool drains at the end of every
+split's grid, and sits idle while the split evaluates its test period. run_splits keeps
+several splits in flight at once: each split runs in a lightweight thread that
+orchestrates it (regime detection, optimization, test evaluation), while the grid
+evaluations of every split in flight are sent to the same joblib worker pool of
+n_jobs processes. Split-level and combination-level work therefore share one worker
+budget instead of multiplying it.
+
+Results are handed to the caller strictly in split order, whatever order splits finish
+in, so results_list and interim saves are the same as in a sequential run. Splits
+already completed by an earlier run can be passed in and are not run again.
+"""
+import math
+import time
+import logging
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from joblib import effective_n_jobs
+
+logger = logging.getLogger(__name__)
+
+# Auto mode keeps enough splits in flight to give every worker this many grid tasks
+DEFAULT_MIN_TASKS_PER_WORKER = 2
+
+
+@dataclass(frozen=True)
+class SplitBudget:
+    """How a run's worker budget is shared between splits and parameter combinations."""
+    n_workers: int      # Worker processes shared by all splits in flight
+    split_workers: int  # Splits processed concurrently
+    inner_jobs: int     # n_jobs each split passes to the combination level
+
+    def describe(self) -> str:
+        return (f"{self.split_workers} split(s) in flight sharing {self.n_workers} worker(s) "
+                f"(combination level n_jobs={self.inner_jobs})")
+
+
+def plan_split_budget(n_jobs: int, n_splits: int, n_combinations: int, split_jobs: Optional[int] = None,
+                      min_tasks_per_worker: int = DEFAULT_MIN_TASKS_PER_WORKER) -> SplitBudget:
+    """
+    Decide how many splits to run concurrently for a worker budget.
+
+    Every split in flight submits its grid to the same pool of n_jobs workers, so running
+    more splits never starts more worker processes; it only keeps the pool fed when one
+    split's grid is too small to occupy every worker.
+
+    Args:
+        n_jobs: joblib n_jobs for the whole run
+        n_splits: Number of splits still to run
+        n_combinations: Parameter combinations evaluated per split
+        split_jobs: Splits to run concurrently; None picks enough splits that their grids
+            give every worker at least min_tasks_per_worker tasks
+        min_tasks_per_worker: Target number of grid tasks per worker in auto mode
+
+    Returns:
+        SplitBudget
+    """
+    n_workers = effective_n_jobs(n_jobs)
+    if split_jobs is None:
+        split_jobs = math.ceil(n_workers * min_tasks_per_worker / max(1, n_combinations))
+    elif split_jobs < 1:
+        split_jobs = n_workers
+    # With a single worker the grid runs in the split thread itself; overlapping splits buys nothing
+    split_workers = max(1, min(split_jobs, n_splits, n_workers))
+    return SplitBudget(n_workers=n_workers, split_workers=split_workers, inner_jobs=n_jobs)
+
+
+def run_splits(split_fn: Callable[[int], Any], split_nums: Sequence[int], split_workers: int = 1,
+               on_result: Optional[Callable[[int, Any, bool], None]] = None,
+               completed: Optional[Dict[int, Any]] = None) -> List[Any]:
+    """
+    Run split_fn for every split with up to split_workers splits in flight.
+
+    Args:
+        split_fn: Called as split_fn(split_num); returns the split's result
+        split_nums: Splits in the order results must be delivered
+        split_workers: Maximum number of splits running concurrently
+        on_result: Called as on_result(split_num, result, resumed) for every split in
+            split order, as soon as it and all splits before it are done
+        completed: Results of splits finished by an earlier run; these are delivered
+            with resumed=True and not run again
+
+    Returns:
+        list: Results in the order of split_nums
+
+    Raises:
+        Exception: The first exception raised by split_fn; splits not yet started are cancelled
+    """
+    order = list(split_nums)
+    completed = dict(completed or {})
+    results: Dict[int, Any] = {}
+    emitted = 0
+
+    def deliver(split_num, result):
+        nonlocal emitted
+        results[split_num] = result
+        while emitted < len(order) and order[emitted] in results:
+            num = order[emitted]
+            emitted += 1
+            if on_result is not None:
+                on_result(num, results[num], num in completed)
+
+    pending = [num for num in order if num not in completed]
+    for num in order:
+        if num in completed:
+            deliver(num, completed[num])
+    if completed:
+        logger.info(f"Resuming: {len(completed)} split(s) already completed, {len(pending)} to run")
+
+    if split_workers <= 1 or len(pending) <= 1:
+        for num in pending:
+            deliver(num, split_fn(num))
+        return [results[num] for num in order]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=split_workers, thread_name_prefix='wfo-split') as executor:
+        futures = {executor.submit(split_fn, num): num for num in pending}
+        not_done = set(futures)
+        try:
+            while not_done:
+                done, not_done = wait(not_done, return_when=FIRST_COMPLETED)
+                # Deliver in split order so on_result sees the same sequence as a sequential run
+                for future in sorted(done, key=lambda f: order.index(futures[f])):
+                    deliver(futures[future], future.result())
+        except BaseException:
+            for future in not_done:
+                future.cancel()
+            raise
+    logger.info(f"Ran {len(pending)} split(s) with {split_workers} in flight in {time.perf_counter() - start:.1f}s")
+    return [results[num] for num in order]
@@ -0,0 +1,469 @@
+"""
+Incremental Supply/Demand zone detection for streaming candles.
+
+zones.find_pivot_zones re-runs scipy.signal.find_peaks over the whole history, which is
+wasteful in live trading where candles arrive one at a time. StreamingZoneEngine keeps
+the state the batch function derives from the history -- local maxima, their distance
+clusters and prominences, the valid pivots, the zones built from them and their extension
+windows -- and updates only what a new candle can change.
+
+After any number of candles, the engine's zones and flags are the ones
+find_pivot_zones/add_zone_signals return for the same data, and the flags returned by
+update() are the last row the batch functions would produce for the history so far.
+"""
+import bisect
+import heapq
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts.strategies.refactored_edge.zones import ZONE_COLUMNS, add_zone_signals
+
+logger = logging.getLogger(__name__)
+
+
+class _PivotTracker:
+    """
+    Incremental equivalent of find_peaks(x, distance=..., prominence=threshold) for one series.
+
+    - Local maxima (including plateau midpoints) are detected as soon as the first lower
+      value after them arrives, exactly like scipy's _local_maxima_1d.
+    - The distance filter keeps a maximum iff no kept maximum of higher priority (height,
+      then later position, see zones.select_by_peak_distance) lies closer than `distance`.
+      A new maximum only re-evaluates the maxima whose decision can actually change,
+      walking down in priority from it.
+    - Prominence = peak - max(left base, right base). The left base is known when the peak
+      is pushed (monotonic stack); the right base is a running minimum until a strictly
+      higher value arrives, after which the prominence is frozen.
+    """
+
+    def __init__(self, distance: int):
+        self.distance = int(np.ceil(distance))
+        self.x: List[float] = []
+        self.left_min: List[float] = []  # min of x back to the previous strictly greater value
+        self._left_stack: List[List[float]] = []  # [value, segment min], strictly decreasing values
+        self._plateau_start: Optional[int] = None
+        self._maxima: List[int] = []  # all local maxima, in position order
+        self.selected: Set[int] = set()  # local maxima kept by the distance filter
+        self._unresolved: List[List[Any]] = []  # [pos, running min] of peaks not yet exceeded
+        self._unresolved_by_pos: Dict[int, List[Any]] = {}
+        self._prominence: Dict[int, float] = {}  # frozen prominence of resolved peaks
+        self._resolved_heap: List[Tuple[float, int]] = []
+        self.valid: Set[int] = set()
+
+    def prominence(self, pos: int) -> float:
+        """Current prominence of a local maximum."""
+        if pos in self._prominence:
+            return self._prominence[pos]
+        running_min = self._unresolved_by_pos[pos][1]
+        return self.x[pos] - max(self.left_min[pos], running_min)
+
+    def append(self, value: float) -> Set[int]:
+        """
+        Add the next value.
+
+        Returns:
+            set: Local maxima whose validity may have changed
+        """
+        t = len(self.x)
+        self.x.append(value)
+        touched = set()
+
+        # Left base: pop every value <= this one, the remaining top is strictly greater
+        seg_min = value
+        while self._left_stack and self._left_stack[-1][0] <= value:
+            seg_min = min(seg_min, self._left_stack.pop()[1])
+        self._left_stack.append([value, seg_min])
+        self.left_min.append(seg_min)
+
+        # Right base: peaks exceeded by this value have their prominence frozen
+        while self._unresolved and self.x[self._unresolved[-1][0]] < value:
+            pos, running_min = self._unresolved.pop()
+            del self._unresolved_by_pos[pos]
+            prominence = self.x[pos] - max(self.left_min[pos], running_min)
+            self._prominence[pos] = prominence
+            heapq.heappush(self._resolved_heap, (prominence, pos))
+        # Older peaks have lower (or equal) running minimums, so stop at the first unaffected one
+        for entry in reversed(self._unresolved):
+            if value >= entry[1]:
+                break
+            entry[1] = value
+            touched.add(entry[0])
+
+        # Local maxima: a rise starts a candidate, equal values extend its plateau
+        if t >= 1:
+            prev = self.x[t - 1]
+            if value > prev:
+                self._plateau_start = t
+            elif value != prev:
+                if value < prev and self._plateau_start is not None:
+                    touched |= self._add_local_max((self._plateau_start + t - 1) // 2, t)
+                self._plateau_start = None
+        return touched
+
+    def _add_local_max(self, pos: int, t: int) -> Set[int]:
+        entry = [pos, min(self.x[pos], self.x[t])]
+        self._unresolved.append(entry)
+        self._unresolved_by_pos[pos] = entry
+        self._maxima.append(pos)
+        return self._update_selection(len(self._maxima) - 1)
+
+    def _priority(self, i: int) -> Tuple[float, int]:
+        pos = self._maxima[i]
+        return self.x[pos], pos
+
+    def _neighbours(self, i: int) -> List[int]:
+        pos = self._maxima[i]
+        neighbours = []
+        k = i - 1
+        while k >= 0 and pos - self._maxima[k] < self.distance:
+            neighbours.append(k)
+            k -= 1
+        k = i + 1
+        while k < len(self._maxima) and self._maxima[k] - pos < self.distance:
+            neighbours.append(k)
+            k += 1
+        return neighbours
+
+    def _update_selection(self, new_index: int) -> Set[int]:
+        """Propagate the distance filter from a new maximum, highest priority first."""
+        touched = {self._maxima[new_index]}
+        heap = [(tuple(-v for v in self._priority(new_index)), new_index)]
+        queued = {new_index}
+        while heap:
+            _, i = heapq.heappop(heap)
+            queued.discard(i)
+            pos, priority = self._maxima[i], self._priority(i)
+            neighbours = self._neighbours(i)
+            kept = not any(self._maxima[k] in self.selected and self._priority(k) > priority for k in neighbours)
+            if kept == (pos in self.selected):
+                continue
+            if kept:
+                self.selected.add(pos)
+            else:
+                self.selected.discard(pos)
+            touched.add(pos)
+            for k in neighbours:
+                if k not in queued and self._priority(k) < priority:
+                    queued.add(k)
+                    heapq.heappush(heap, (tuple(-v for v in self._priority(k)), k))
+        return touched
+
+    def expire(self, threshold: float) -> Set[int]:
+        """
+        Collect peaks affected by a higher prominence threshold.
+
+        Resolved peaks have a fixed prominence and the threshold never decreases, so each
+        one is popped from the heap at most once.
+        """
+        touched = {entry[0] for entry in self._unresolved}
+        while self._resolved_heap and self._resolved_heap[0][0] < threshold:
+            touched.add(heapq.heappop(self._resolved_heap)[1])
+        return touched
+
+    def refresh(self, touched: Set[int], threshold: float) -> List[Tuple[int, bool]]:
+        """
+        Re-check validity of touched peaks.
+
+        Returns:
+            list: (position, is_valid) for peaks whose validity changed, in position order
+        """
+        changes = []
+        for pos in sorted(touched):
+            is_valid = pos in self.selected and self.prominence(pos) >= threshold
+            if is_valid != (pos in self.valid):
+                if is_valid:
+                    self.valid.add(pos)
+                else:
+                    self.valid.discard(pos)
+                changes.append((pos, is_valid))
+        return changes
+
+
+class _ZoneGrouper:
+    """
+    Maintains zones built from consecutive valid pivots of one side.
+
+    Grouping only depends on adjacent pivots, so inserting or removing a pivot only
+    regroups the zones around it.
+    """
+
+    def __init__(self, prices: List[float], highs: List[float], lows: List[float],
+                 zone_merge_proximity: float, min_zone_width_candles: int, min_zone_strength: int):
+        self.prices = prices
+        self.highs = highs
+        self.lows = lows
+        self.zone_merge_proximity = zone_merge_proximity
+        self.min_zone_width_candles = min_zone_width_candles
+        self.min_zone_strength = min_zone_strength
+        self.pivots: List[int] = []
+        self.zones: Dict[int, Tuple[int, int, float, float, int]] = {}  # first pivot -> zone
+        self._zone_by_last: Dict[int, Tuple[int, int, float, float, int]] = {}
+
+    def _is_close(self, a: int, b: int) -> bool:
+        return abs(self.prices[b] - self.prices[a]) <= self.prices[a] * self.zone_merge_proximity
+
+    def apply(self, changes: List[Tuple[int, bool]]):
+        """Insert or remove pivots and regroup the zones around each change."""
+        for pos, is_valid in changes:
+            i = bisect.bisect_left(self.pivots, pos)
+            if is_valid:
+                self.pivots.insert(i, pos)
+                self._regroup(i - 1, i + 1, removed=None)
+            else:
+                del self.pivots[i]
+                self._regroup(i - 1, i, removed=pos)
+
+    def _drop_zone(self, first: int):
+        zone = self.zones.pop(first, None)
+        if zone is not None:
+            self._zone_by_last.pop(zone[1], None)
+
+    def _regroup(self, lo: int, hi: int, removed: Optional[int]):
+        if removed is not None:
+            self._drop_zone(removed)
+        n = len(self.pivots)
+        if n == 0:
+            return
+        lo, hi = max(lo, 0), min(hi, n - 1)
+        while lo > 0 and self._is_close(self.pivots[lo - 1], self.pivots[lo]):
+            lo -= 1
+        while hi < n - 1 and self._is_close(self.pivots[hi], self.pivots[hi + 1]):
+            hi += 1
+
+        for k in range(lo, hi + 1):
+            self._drop_zone(self.pivots[k])
+
+        start = lo
+        for k in range(lo, hi + 1):
+            if k == hi or not self._is_close(self.pivots[k], self.pivots[k + 1]):
+                self._add_zone(self.pivots[start:k + 1])
+                start = k + 1
+
+    def _add_zone(self, members: List[int]):
+        first, last = members[0], members[-1]
+        if len(members) < self.min_zone_strength or last - first + 1 < self.min_zone_width_candles:
+            return
+        zone = (first, last, min(self.lows[m] for m in members), max(self.highs[m] for m in members), len(members))
+        self.zones[first] = zone
+        self._zone_by_last[last] = zone
+
+    def active_zones(self, t: int, zone_extend_candles: int) -> List[Tuple[int, int, float, float, int]]:
+        """Zones whose extension window covers candle t (the latest candle)."""
+        i = bisect.bisect_left(self.pivots, t - zone_extend_candles)
+        return [self._zone_by_last[p] for p in self.pivots[i:] if p in self._zone_by_last]
+
+
+def _price_near_zone(price: float, zone_low: float, zone_high: float, zone_proximity_pct: float) -> bool:
+    """Proximity test of add_zone_signals for a single price."""
+    zone_height = zone_high - zone_low
+    if zone_height > 1e-9:
+        proximity_value = zone_height * zone_proximity_pct
+    else:
+        proximity_value = zone_high * zone_proximity_pct
+    return (zone_low - proximity_value) <= price <= (zone_high + proximity_value)
+
+
+class StreamingZoneEngine:
+    """
+    Incremental Supply/Demand zone engine for live candles.
+
+    Each update costs amortized constant time plus the number of unresolved peaks (peaks
+    not yet exceeded by a higher price, typically a handful) and the size of the zones
+    around pivots that changed. A new all-time high or low raises the prominence threshold;
+    resolved peaks that fall below it are found through a heap, each at most once.
+
+    Example:
+        engine = StreamingZoneEngine.from_config(config)
+        for ts, candle in ohlc.iterrows():
+            flags = engine.update(ts, candle['high'], candle['low'], candle['close'])
+    """
+
+    def __init__(self, pivot_lookback: int, pivot_prominence: float, zone_merge_proximity: float,
+                 min_zone_width_candles: int, min_zone_strength: int, zone_extend_candles: int,
+                 zone_proximity_pct: float):
+        """
+        Args:
+            pivot_lookback (int): Minimum distance between pivots.
+            pivot_prominence (float): Required prominence of pivots relative to price range.
+            zone_merge_proximity (float): Price proximity pct to merge pivots into a zone.
+            min_zone_width_candles (int): Minimum candle width for a valid zone.
+            min_zone_strength (int): Minimum pivots required for a valid zone.
+            zone_extend_candles (int): How many candles a zone remains valid after its last pivot.
+            zone_proximity_pct (float): Percentage threshold for price proximity to zone.
+        """
+        if pivot_lookback < 1:
+            raise ValueError('pivot_lookback must be greater or equal to 1')
+        self.pivot_prominence = pivot_prominence
+        self.zone_extend_candles = zone_extend_candles
+        self.zone_proximity_pct = zone_proximity_pct
+
+        self.timestamps: List[Any] = []
+        self.highs: List[float] = []
+        self.lows: List[float] = []
+        self.closes: List[float] = []
+        self._max_high = -np.inf
+        self._min_low = np.inf
+        self._threshold: Optional[float] = None
+
+        self._supply = _PivotTracker(pivot_lookback)
+        self._demand = _PivotTracker(pivot_lookback)
+        grouper_kwargs = dict(
+            highs=self.highs, lows=self.lows,
+            zone_merge_proximity=zone_merge_proximity,
+            min_zone_width_candles=min_zone_width_candles,
+            min_zone_strength=min_zone_strength
+        )
+        self._supply_zones = _ZoneGrouper(prices=self.highs, **grouper_kwargs)
+        self._demand_zones = _ZoneGrouper(prices=self.lows, **grouper_kwargs)
+
+    @classmethod
+    def from_config(cls, config) -> 'StreamingZoneEngine':
+        """
+        Create an engine from an EdgeConfig (or any object with the same zone attributes).
+
+        Args:
+            config: Configuration with pivot/zone parameters
+
+        Returns:
+            StreamingZoneEngine: New engine
+        """
+        return cls(
+            pivot_lookback=config.pivot_lookback,
+            pivot_prominence=config.pivot_prominence,
+            zone_merge_proximity=config.zone_merge_proximity,
+            min_zone_width_candles=config.min_zone_width_candles,
+            min_zone_strength=config.min_zone_strength,
+            zone_extend_candles=config.zone_extend_candles,
+            zone_proximity_pct=config.zone_proximity_pct
+        )
+
+    def __len__(self) -> int:
+        return len(self.closes)
+
+    def update(self, timestamp: Any, high: float, low: float, close: float) -> Dict[str, bool]:
+        """
+        Add one candle and return the zone flags for it.
+
+        Args:
+            timestamp: Candle timestamp
+            high (float): High price
+            low (float): Low price
+            close (float): Closing price
+
+        Returns:
+            dict: 'price_in_demand_zone' and 'price_in_supply_zone' for this candle
+        """
+        high, low, close = float(high), float(low), float(close)
+        self.timestamps.append(timestamp)
+        self.highs.append(high)
+        self.lows.append(low)
+        self.closes.append(close)
+
+        # Same threshold as find_pivot_zones: a fraction of the total price range so far
+        if not np.isnan(high):
+            self._max_high = max(self._max_high, high)
+        if not np.isnan(low):
+            self._min_low = min(self._min_low, low)
+        price_range = self._max_high - self._min_low
+        threshold = 0 if (price_range == 0 or not np.isfinite(price_range)) else price_range * self.pivot_prominence
+
+        supply_touched = self._supply.append(high)
+        demand_touched = self._demand.append(-low)
+        if threshold != self._threshold:
+            supply_touched |= self._supply.expire(threshold)
+            demand_touched |= self._demand.expire(threshold)
+            self._threshold = threshold
+
+        self._supply_zones.apply(self._supply.refresh(supply_touched, threshold))
+        self._demand_zones.apply(self._demand.refresh(demand_touched, threshold))
+
+        return self.current_flags()
+
+    def update_many(self, ohlc: pd.DataFrame) -> pd.DataFrame:
+        """
+        Feed a block of candles and return the flags emitted for each one.
+
+        Args:
+            ohlc (pd.DataFrame): Candles with high/low/close columns (any case)
+
+        Returns:
+            pd.DataFrame: Per-candle 'price_in_demand_zone'/'price_in_supply_zone' flags
+        """
+        columns = {c.lower(): c for c in ohlc.columns}
+        highs = ohlc[columns['high']].to_numpy(dtype=float)
+        lows = ohlc[columns['low']].to_numpy(dtype=float)
+        closes = ohlc[columns['close']].to_numpy(dtype=float)
+        demand = np.zeros(len(ohlc), dtype=bool)
+        supply = np.zeros(len(ohlc), dtype=bool)
+        for i, ts in enumerate(ohlc.index):
+            flags = self.update(ts, highs[i], lows[i], closes[i])
+            demand[i] = flags['price_in_demand_zone']
+            supply[i] = flags['price_in_supply_zone']
+        return pd.DataFrame({'price_in_demand_zone': demand, 'price_in_supply_zone': supply}, index=ohlc.index)
+
+    def current_flags(self) -> Dict[str, bool]:
+        """
+        Zone flags for the latest candle.
+
+        Returns:
+            dict: 'price_in_demand_zone' and 'price_in_supply_zone'
+        """
+        if not self.closes:
+            return {'price_in_demand_zone': False, 'price_in_supply_zone': False}
+        t = len(self.closes) - 1
+        price = self.closes[t]
+        flags = {}
+        for key, grouper in (('price_in_demand_zone', self._demand_zones),
+                             ('price_in_supply_zone', self._supply_zones)):
+            flags[key] = any(
+                _price_near_zone(price, zone[2], zone[3], self.zone_proximity_pct)
+                for zone in grouper.active_zones(t, self.zone_extend_candles)
+            )
+        return flags
+
+    def zones(self) -> pd.DataFrame:
+        """
+        Current zones in the format of find_pivot_zones.
+
+        'candles' is counted positionally, which matches find_pivot_zones for a regular index.
+
+        Returns:
+            pd.DataFrame: Zone information, one row per zone
+        """
+        last_loc = len(self.closes) - 1
+        zones_data = []
+        for zone_type, grouper in (('supply', self._supply_zones), ('demand', self._demand_zones)):
+            for first in sorted(grouper.zones):
+                first, last, zone_low, zone_high, strength = grouper.zones[first]
+                zones_data.append({
+                    'zone_type': zone_type,
+                    'start_idx': self.timestamps[first],
+                    'end_idx': self.timestamps[min(last + self.zone_extend_candles, last_loc)],
+                    'first_pivot_idx': self.timestamps[first],
+                    'last_pivot_idx': self.timestamps[last],
+                    'low_price': zone_low,
+                    'high_price': zone_high,
+                    'strength': strength,
+                    'candles': last - first + 1
+                })
+
+        all_zones = pd.DataFrame(zones_data)
+        if all_zones.empty:
+            return pd.DataFrame(columns=ZONE_COLUMNS)
+        return all_zones.sort_values(by='start_idx').reset_index(drop=True)
+
+    def flags(self) -> pd.DataFrame:
+        """
+        Zone flags for the whole history, as add_zone_signals computes them from the current zones.
+
+        Unlike the flags returned by update(), earlier candles can be flagged here by zones
+        that were only confirmed later.
+
+        Returns:
+            pd.DataFrame: 'price_in_demand_zone' and 'price_in_supply_zone' per candle
+        """
+        close = pd.Series(self.closes, index=pd.Index(self.timestamps), dtype=float)
+        return add_zone_signals(close, self.zones(), self.zone_proximity_pct)
@@ -0,0 +1,201 @@
+"""
+Chunked, cache-affine task scheduling for parameter grid evaluation.
+
+Dispatching one joblib task per parameter combination scatters combinations that share
+indicator windows across workers, so every worker computes the same indicators in a
+cold cache. plan_chunks groups combinations by a key (their indicator parameters) and
+cuts the groups into chunks; run_chunks sends each chunk to one worker as a single task,
+so after the first combination of a group the rest hit that worker's warm cache.
+
+Chunk sizes are guided: each chunk takes a share of the remaining work, so early chunks
+are large (few dispatches, long cache-warm runs) and the tail is made of small chunks
+that keep every worker busy until the end.
+"""
+import os
+import math
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from joblib import Parallel, delayed, effective_n_jobs
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNKS_PER_WORKER = 4
+
+
+def plan_chunks(group_keys: Sequence[Hashable], n_workers: int, chunk_size: Optional[int] = None,
+                min_chunk_size: Optional[int] = None, chunks_per_worker: int = DEFAULT_CHUNKS_PER_WORKER) -> List[List[int]]:
+    """
+    Split item positions into chunks that keep items with the same key together.
+
+    Groups are taken largest first. Cuts follow group boundaries where possible: a chunk
+    that is at least half full is closed rather than splitting the next group, and a
+    group is never left with a remainder under half a chunk.
+
+    Args:
+        group_keys: One key per item; items with equal keys share cached state
+        n_workers: Number of workers the chunks are spread over
+        chunk_size: Fixed chunk size; if None, sizes are guided by the remaining work
+        min_chunk_size: Smallest guided chunk size; defaults to half the median group size,
+            so the small chunks at the end do not shatter groups
+        chunks_per_worker: Guided sizing aims for about this many chunks per worker over
+            the remaining work, so the tail stays balanced
+
+    Returns:
+        list: Chunks as lists of item positions; every position appears exactly once
+    """
+    groups: Dict[Hashable, List[int]] = {}
+    for position, key in enumerate(group_keys):
+        groups.setdefault(key, []).append(position)
+    queue = sorted(groups.values(), key=len, reverse=True)
+    if min_chunk_size is None:
+        sizes = sorted(len(group) for group in queue)
+        min_chunk_size = math.ceil(sizes[len(sizes) // 2] / 2) if sizes else 1
+
+    remaining = len(group_keys)
+    divisor = max(1, n_workers * chunks_per_worker)
+    chunks: List[List[int]] = []
+    current: List[int] = []
+    target = 0
+    for group in queue:
+        while group:
+            if not current:
+                target = chunk_size or max(min_chunk_size, math.ceil(remaining / divisor))
+            room = target - len(current)
+            if current and len(group) > room and len(current) * 2 >= target:
+                chunks.append(current)
+                current = []
+                continue
+            take_n = len(group) if chunk_size is None and len(group) - room <= target // 2 else room
+            take = group[:take_n]
+            group = group[len(take):]
+            current.extend(take)
+            remaining -= len(take)
+            if len(current) >= target:
+                chunks.append(current)
+                current = []
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+@dataclass
+class WorkerStats:
+    """Work done by one worker process during a run_chunks call."""
+    chunks: int = 0
+    tasks: int = 0
+    busy_seconds: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+    @property
+    def cache_hit_rate(self) -> float:
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else 0.0
+
+
+@dataclass
+class ScheduleReport:
+    """Per-worker utilization and cache effectiveness of a run_chunks call."""
+    n_tasks: int
+    n_chunks: int
+    n_workers: int
+    wall_seconds: float = 0.0
+    workers: Dict[int, WorkerStats] = field(default_factory=dict)
+
+    @property
+    def busy_seconds(self) -> float:
+        return sum(w.busy_seconds for w in self.workers.values())
+
+    @property
+    def utilization(self) -> float:
+        """Busy time over available worker time (wall time x workers)."""
+        available = self.wall_seconds * self.n_workers
+        return self.busy_seconds / available if available else 0.0
+
+    @property
+    def cache_hit_rate(self) -> float:
+        hits = sum(w.cache_hits for w in self.workers.values())
+        lookups = hits + sum(w.cache_misses for w in self.workers.values())
+        return hits / lookups if lookups else 0.0
+
+    def worker_utilization(self) -> Dict[int, float]:
+        """Busy fraction of the wall time for each worker pid."""
+        if not self.wall_seconds:
+            return {pid: 0.0 for pid in self.workers}
+        return {pid: w.busy_seconds / self.wall_seconds for pid, w in self.workers.items()}
+
+    def summary(self) -> str:
+        lines = [f"Scheduler: {self.n_tasks} tasks in {self.n_chunks} chunks on {self.n_workers} workers, "
+                 f"wall {self.wall_seconds:.2f}s, utilization {self.utilization:.0%}, "
+                 f"cache hit rate {self.cache_hit_rate:.0%}"]
+        utilization = self.worker_utilization()
+        for pid, stats in sorted(self.workers.items()):
+            lines.append(f"  worker {pid}: {stats.tasks} tasks / {stats.chunks} chunks, busy {stats.busy_seconds:.2f}s "
+                         f"({utilization[pid]:.0%}), cache hits {stats.cache_hits}/{stats.cache_hits + stats.cache_misses}")
+        return "\n".join(lines)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'n_tasks': self.n_tasks,
+            'n_chunks': self.n_chunks,
+            'n_workers': self.n_workers,
+            'wall_seconds': self.wall_seconds,
+            'utilization': self.utilization,
+            'cache_hit_rate': self.cache_hit_rate,
+            'workers': {pid: dict(vars(stats), utilization=self.worker_utilization()[pid])
+                        for pid, stats in self.workers.items()},
+        }
+
+
+def _run_chunk(evaluate_fn: Callable, items: List[Any], args: Tuple, counters_fn: Optional[Callable]):
+    """Evaluate one chunk in a worker; returns results plus the worker's timing and cache counters."""
+    start = time.perf_counter()
+    before = counters_fn() if counters_fn is not None else None
+    results = [evaluate_fn(item, *args) for item in items]
+    after = counters_fn() if counters_fn is not None else None
+    hits = misses = 0
+    if before is not None and after is not None:
+        hits = after['hits'] - before['hits']
+        misses = after['misses'] - before['misses']
+    return results, os.getpid(), time.perf_counter() - start, hits, misses
+
+
+def run_chunks(evaluate_fn: Callable, items: Sequence[Any], chunks: List[List[int]], n_jobs: int = -1,
+               args: Tuple = (), counters_fn: Optional[Callable[[], Dict[str, int]]] = None) -> Tuple[List[Any], ScheduleReport]:
+    """
+    Evaluate items chunk by chunk, one joblib task per chunk.
+
+    Args:
+        evaluate_fn: Called as evaluate_fn(item, *args) in the worker; must be picklable
+        items: Items to evaluate
+        chunks: Item positions per chunk, e.g. from plan_chunks
+        n_jobs: joblib n_jobs
+        args: Extra arguments for evaluate_fn, sent once per chunk
+        counters_fn: Returns the worker's cumulative {'hits', 'misses'} cache counters
+
+    Returns:
+        tuple: (results in the order of items, ScheduleReport)
+    """
+    n_workers = effective_n_jobs(n_jobs)
+    report = ScheduleReport(n_tasks=len(items), n_chunks=len(chunks), n_workers=n_workers)
+    start = time.perf_counter()
+    outputs = Parallel(n_jobs=n_jobs, batch_size=1)(
+        delayed(_run_chunk)(evaluate_fn, [items[i] for i in chunk], args, counters_fn)
+        for chunk in chunks
+    )
+    report.wall_seconds = time.perf_counter() - start
+
+    results: List[Any] = [None] * len(items)
+    for chunk, (chunk_results, pid, busy, hits, misses) in zip(chunks, outputs):
+        for position, result in zip(chunk, chunk_results):
+            results[position] = result
+        stats = report.workers.setdefault(pid, WorkerStats())
+        stats.chunks += 1
+        stats.tasks += len(chunk)
+        stats.busy_seconds += busy
+        stats.cache_hits += hits
+        stats.cache_misses += misses
+    return results, report
@@ -22,12 +22,18 @@ from scripts.strategies.refactored_edge.wfo_utils import (
 )
 from scripts.strategies.refactored_edge.wfo_evaluation import evaluate_with_params
 from scripts.strategies.refactored_edge.wfo_optimization import (
-    optimize_params_parallel, determine_market_regime_for_params
+    optimize_params_parallel, determine_market_regime_for_params, compute_market_regimes
 )
+from scripts.strategies.refactored_edge.split_features import SplitFeatures, warmup_bars
+from scripts.strategies.refactored_edge.split_scheduler import plan_split_budget, run_splits
+from scripts.strategies.refactored_edge.checkpoint import make_run_id, resolve_checkpoint_store
+from scripts.strategies.refactored_edge.indicator_cache import fingerprint_data
 from scripts.strategies.refactored_edge.wfo_results import (
     initialize_results_storage, save_wfo_results, save_interim_results,
+    load_interim_results, match_interim_results, parse_best_params,
     print_performance_metrics, generate_summary_report
 )
+from app.core.ohlcv_cache import OHLCVCache
 
 # Import data fetcher
 fetch_historical_data, DATA_FETCHER_AVAILABLE = import_data_fetcher()
@@ -99,7 +105,7 @@ def calculate_wfo_splits(data_length, train_points, test_points, step_points, n_
     return split_indices_list
 
 
-def fetch_data(symbol, timeframe, start_date, end_date, data=None):
+def fetch_data(symbol, timeframe, start_date, end_date, data=None, use_cache=True):
     """
     Fetch or validate data for WFO.
     
@@ -109,6 +115,7 @@ def fetch_data(symbol, timeframe, start_date, end_date, data=None):
         start_date (str): Start date
         end_date (str): End date
         data (pd.DataFrame, optional): Data to use if provided
+        use_cache (bool): Serve the range from the local OHLCV cache, fetching only missing gaps
         
     Returns:
         pd.DataFrame: Price data
@@ -126,19 +133,30 @@ def fetch_data(symbol, timeframe, start_date, end_date, data=None):
         print(f"Data validated: {len(data)} data points with columns {list(data.columns)}")
         return data
     
-    if not DATA_FETCHER_AVAILABLE:
+    cache = OHLCVCache() if use_cache else None
+    if not DATA_FETCHER_AVAILABLE and (cache is None or cache.missing_ranges(symbol, timeframe, start_date, end_date)):
         raise ImportError("Data fetcher is not available. Cannot fetch historical data.")
     
     print(f"Fetching data for {symbol} {timeframe} from {start_date} to {end_date}...")
     
     try:
         # Fetch historical data using data_fetcher
-        price_data = fetch_historical_data(
-            product_id=symbol,  # Use product_id parameter for Coinbase Advanced API
-            granularity=timeframe,
-            start=start_date,
-            end=end_date
-        )
+        def _fetch(start, end):
+            return fetch_historical_data(
+                product_id=symbol,  # Use product_id parameter for Coinbase Advanced API
+                granularity=timeframe,
+                start=start,
+                end=end
+            )
+        
+        if cache is not None:
+            price_data = cache.get(
+                symbol, timeframe, start_date, end_date,
+                fetch_fn=lambda gap_start, gap_end: _fetch(gap_start.strftime('%Y-%m-%d %H:%M:%S'),
+                                                           gap_end.strftime('%Y-%m-%d %H:%M:%S'))
+            )
+        else:
+            price_data = _fetch(start_date, end_date)
         
         # Validate that the data has the required columns
         is_valid, _ = validate_ohlc_data(price_data)
@@ -155,9 +173,223 @@ def fetch_data(symbol, timeframe, start_date, end_date, data=None):
         raise
 
 
+def run_wfo_split(split_num, n_splits_total, train_indices, test_indices, price_data, param_config,
+                  param_grid_list, n_jobs=N_JOBS, features=None, cache_dir=None):
+    """
+    Optimize on one split's training window and evaluate the best parameters on its test window.
+    
+    Splits do not share mutable state, so several can run concurrently (see run_wfo's split_jobs).
+    
+    Args:
+        split_num (int): Zero-based split number
+        n_splits_total (int): Total number of splits in the run (for progress output)
+        train_indices (range): Row indices of the training window
+        test_indices (range): Row indices of the test window
+        price_data (pd.DataFrame): Full price series
+        param_config (EdgeConfig): Configuration used for regime detection
+        param_grid_list (list): Parameter combinations to evaluate
+        n_jobs (int): n_jobs for the parameter grid evaluation
+        features (SplitFeatures, optional): Full-series features to slice the split from
+        cache_dir (str, optional): Persistent indicator cache directory for the grid
+            evaluation (kept across restarts of a checkpointed run)
+        
+    Returns:
+        tuple: (split_results, test_portfolio, best_params); test_portfolio and best_params
+            are None if no valid parameters were found
+    """
+    # Create descriptive split information
+    split_info = f"Split {split_num + 1}/{n_splits_total}"
+    print(f"\nProcessing {split_info}")
+    
+    # Get training and test data
+    if features is not None:
+        train_data = features.window(train_indices)
+        test_data = features.window(test_indices)
+    else:
+        train_data = price_data.iloc[train_indices].copy()
+        test_data = price_data.iloc[test_indices].copy()
+    
+    # Print split details
+    print(f"Train: {len(train_data)} points, Test: {len(test_data)} points")
+    
+    # Convert indices to dates if datetime index is available
+    if hasattr(price_data.index, 'min') and hasattr(price_data.index, 'max'):
+        train_start_date = train_data.index.min()
+        train_end_date = train_data.index.max()
+        test_start_date = test_data.index.min()
+        test_end_date = test_data.index.max()
+        
+        print(f"Train Period: {train_start_date} to {train_end_date}")
+        print(f"Test Period: {test_start_date} to {test_end_date}")
+    
+    # --- 4a. Parameter Optimization ---
+    print(f"Starting parameter optimization for split {split_num + 1}...")
+    
+    # Add market regime information to each parameter set
+    # This requires the wfo_optimization module
+    from scripts.strategies.refactored_edge.wfo_optimization import determine_market_regime_for_params
+    
+    # Assuming param_config is the correct EdgeConfig instance for this split
+    # Pass the config object to the regime determination function
+    split_regimes = None
+    if features is not None:
+        split_regimes = features.regime_labels(
+            train_indices, 'param_config', lambda full_data: compute_market_regimes(full_data, param_config)
+        )
+    regime_info = determine_market_regime_for_params(train_data, param_config, regimes=split_regimes)
+    
+    # Add regime info to the parameters dictionary if needed for evaluation?
+    # The current evaluate_single_params doesn't seem to use it directly,
+    # but it might be logged or used later.
+    # If evaluate_single_params needed it, we'd modify param_grid_list here.
+    # For now, we just determine it as per the original structure.
+    
+    # Add regime information to this split's copy of each parameter set
+    # (splits may run concurrently, so the shared grid is never modified)
+    split_param_grid = [dict(params, _regime_info=regime_info) for params in param_grid_list]
+    
+    # Optimize parameters on training data
+    best_params, best_score, best_params_by_regime = optimize_params_parallel(
+        data=train_data,
+        param_combinations=split_param_grid,
+        metric='Sharpe Ratio',
+        n_jobs=n_jobs,
+        cache_dir=cache_dir
+    )
+    
+    # Check if optimization failed
+    if best_params is None:
+        print(f"No valid parameters found for split {split_num + 1}. Skipping to next split.")
+        
+        # Return an empty result to maintain split tracking
+        return {
+            'split': split_num + 1,
+            'train_start': train_start_date if 'train_start_date' in locals() else None,
+            'train_end': train_end_date if 'train_end_date' in locals() else None,
+            'test_start': test_start_date if 'test_start_date' in locals() else None,
+            'test_end': test_end_date if 'test_end_date' in locals() else None,
+            'best_params': str({}),
+            'train_return': np.nan,
+            'train_sharpe': np.nan,
+            'train_max_drawdown': np.nan,
+            'test_return': np.nan,
+            'test_sharpe': np.nan,
+            'test_max_drawdown': np.nan,
+            'regime_aware_improvement': np.nan,
+            'robustness_ratio': np.nan,
+            'return_std': np.nan,
+            'sharpe_std': np.nan,
+            'consistent_sign': False,
+            'regime_breakdown': {}
+        }, None, best_params
+    
+    # Print detailed parameter information
+    print(f"Best parameters for split {split_num + 1}:")
+    for param, value in best_params.items():
+        if not param.startswith('_'):  # Skip internal keys like _regime_info
+            print(f"  {param}: {value}")
+    
+    # Check if we have regime-specific parameters and display them
+    if len(best_params_by_regime) > 1:  # More than just 'overall'
+        if 'trending' in best_params_by_regime:
+            trending_params = best_params_by_regime['trending']
+            print("Trending regime parameters:")
+            for param, value in trending_params.items():
+                if 'ranging' in best_params_by_regime and param in best_params_by_regime['ranging'] and best_params_by_regime['ranging'][param] != value:
+                    print(f"  {param}: {value} (ranging: {best_params_by_regime['ranging'][param]})")
+    
+    # --- 4b. Test Period Evaluation with Best Parameters ---
+    print(f"Evaluating test period with best parameters...")
+    
+    # Standard evaluation with overall best parameters
+    test_pf, test_stats = evaluate_with_params(test_data, best_params)
+    
+    # Get standard (non-regime) performance metrics
+    standard_return = test_stats.get('return', 0)
+    standard_sharpe = test_stats.get('sharpe', -np.inf)
+    standard_drawdown = test_stats.get('max_drawdown', 1.0)
+    
+    print(f"Test period results with best parameters:")
+    print(f"  Return: {standard_return:.4f}")
+    print(f"  Sharpe: {standard_sharpe:.4f}")
+    print(f"  Max Drawdown: {standard_drawdown:.4f}")
+    
+    # --- 4c. Anti-Overfitting Analysis ---
+    print("Performing anti-overfitting analysis...")
+    
+    # Check if best_train_stats is a dictionary or scalar
+    train_return = np.nan
+    train_sharpe = np.nan
+    train_max_drawdown = np.nan
+    return_std = np.nan
+    sharpe_std = np.nan
+    consistent_sign = False
+    
+    print(f"DEBUG: best_train_stats type: {type(best_score)}")
+    
+    # Extract metrics if best_train_stats is a dictionary
+    if isinstance(best_score, dict):
+        train_return = best_score.get('return', np.nan)
+        train_sharpe = best_score.get('sharpe', np.nan)
+        train_max_drawdown = best_score.get('max_drawdown', np.nan)
+        
+        # Get cross-validation metrics from optimization (if available)
+        return_std = best_score.get('return_std', np.nan)
+        sharpe_std = best_score.get('sharpe_std', np.nan)
+        consistent_sign = best_score.get('consistent_sign', False)
+    elif hasattr(best_score, 'item'):
+        # If it's a numpy scalar, use it as Sharpe ratio
+        print("Using scalar best_train_stats as Sharpe ratio")
+        train_sharpe = best_score.item() if hasattr(best_score, 'item') else float(best_score)
+    
+    # Calculate robustness ratio (test/train performance)
+    robustness_ratio = np.nan
+    
+    if not np.isnan(train_sharpe) and train_sharpe != 0 and not np.isnan(standard_sharpe):
+        robustness_ratio = standard_sharpe / train_sharpe if train_sharpe > 0 else -standard_sharpe / train_sharpe
+    
+    # Calculate improvement from regime-aware adaptation
+    regime_improvement = 0.0  # Default if not using regime-aware params
+    
+    # --- 4e. Save Results for this Split ---
+    # Compile the results for this split
+    # Handle the case where best_params might be None (no valid parameter combinations found)
+    params_str = "No valid parameters found"
+    if best_params is not None:
+        try:
+            params_str = str({k: v for k, v in best_params.items() if not k.startswith('_')})
+        except (AttributeError, TypeError) as e:
+            print(f"Error formatting best_params: {e}")
+            params_str = str(best_params)
+    
+    split_results = {
+        'split': split_num + 1,
+        'train_start': train_start_date if 'train_start_date' in locals() else None,
+        'train_end': train_end_date if 'train_end_date' in locals() else None,
+        'test_start': test_start_date if 'test_start_date' in locals() else None,
+        'test_end': test_end_date if 'test_end_date' in locals() else None,
+        'best_params': params_str,
+        'train_return': train_return,
+        'train_sharpe': train_sharpe,
+        'train_max_drawdown': train_max_drawdown,
+        'test_return': standard_return,
+        'test_sharpe': standard_sharpe, 
+        'test_max_drawdown': standard_drawdown,
+        'regime_aware_improvement': regime_improvement,
+        'robustness_ratio': robustness_ratio,
+        'return_std': return_std,
+        'sharpe_std': sharpe_std,
+        'consistent_sign': consistent_sign,
+        'regime_breakdown': best_score.get('regime_breakdown', {}) if isinstance(best_score, dict) else {}
+    }
+    
+    return split_results, test_pf, best_params
+
+
 def run_wfo(symbol=SYMBOL, timeframe=TIMEFRAME, start_date=START_DATE, end_date=END_DATE, 
             initial_capital=INIT_CAPITAL, config=None, n_splits=4, train_ratio=0.8, 
-            n_jobs=N_JOBS, data=None):
+            n_jobs=N_JOBS, data=None, reuse_features=False, split_jobs=None, resume=False,
+            checkpoint=None):
     """
     Run Walk-Forward Optimization with the Edge Multi-Factor strategy.
     
@@ -172,6 +404,24 @@ def run_wfo(symbol=SYMBOL, timeframe=TIMEFRAME, start_date=START_DATE, end_date=
         train_ratio (float): Ratio of training to total window size
         n_jobs (int): Number of parallel jobs for optimization
         data (pd.DataFrame, optional): Data to use if already fetched
+        reuse_features (bool): Compute causal indicators (RSI, BBands, MA, ATR, ADX) and
+            regime labels once on the full series and slice each split as a zero-copy view,
+            instead of recomputing them from a cold start for every split. Split results
+            match the per-split computation after the indicator warm-up (warmup_bars);
+            before it, splits see the real history instead of NaNs and back-filled values.
+        split_jobs (int, optional): Splits to process concurrently. All splits in flight
+            share the same pool of n_jobs workers for their parameter grids. None picks
+            enough splits to keep every worker busy when grids are small; 1 runs splits
+            one after another. Results and interim saves keep split order either way.
+        resume (bool): Reuse splits already saved in the interim results of an interrupted
+            run with the same identity (symbol, timeframe, data, split boundaries,
+            parameter grid, config and initial capital) instead of running them again.
+            Test portfolios are not saved, so they are only returned for splits run now.
+        checkpoint (CheckpointStore, str or bool, optional): Record every finished split
+            (results, test portfolio, best parameters) in a SQLite checkpoint store (a
+            CheckpointStore, its directory, or True for data/checkpoints). A rerun with
+            the same data, splits and parameter grid skips the recorded splits and
+            reuses the run's persistent indicator cache. Takes precedence over resume.
         
     Returns:
         tuple: (all_results, test_portfolios, best_params)
@@ -229,6 +479,12 @@ def run_wfo(symbol=SYMBOL, timeframe=TIMEFRAME, start_date=START_DATE, end_date=
     
     print(f"Total parameter combinations to evaluate per split: {len(param_grid_list)}")
     
+    # Full-series indicators and regimes shared by all splits
+    features = None
+    if reuse_features:
+        features = SplitFeatures(price_data, warmup=warmup_bars(param_grid_list + [param_config]))
+        print(f"Reusing full-series indicators across splits (warm-up: {features.warmup} bars)")
+    
     # --- Prepare for Walk-Forward Loop ---
     results_list = []  # To store all split results
     test_portfolios = {}  # To store test portfolios
@@ -237,199 +493,71 @@ def run_wfo(symbol=SYMBOL, timeframe=TIMEFRAME, start_date=START_DATE, end_date=
     print("\n--- Starting Walk-Forward Optimization Loop ---\n")
     
     # --- Walk-Forward Optimization Loop ---
-    for split_num, (train_indices, test_indices) in enumerate(split_indices_list):
-        # Create descriptive split information
-        split_info = f"Split {split_num + 1}/{len(split_indices_list)}"
-        print(f"\nProcessing {split_info}")
-        
-        # Get training and test data
-        train_data = price_data.iloc[train_indices].copy()
-        test_data = price_data.iloc[test_indices].copy()
-        
-        # Print split details
-        print(f"Train: {len(train_data)} points, Test: {len(test_data)} points")
-        
-        # Convert indices to dates if datetime index is available
-        if hasattr(price_data.index, 'min') and hasattr(price_data.index, 'max'):
-            train_start_date = train_data.index.min()
-            train_end_date = train_data.index.max()
-            test_start_date = test_data.index.min()
-            test_end_date = test_data.index.max()
-            
-            print(f"Train Period: {train_start_date} to {train_end_date}")
-            print(f"Test Period: {test_start_date} to {test_end_date}")
-        
-        # --- 4a. Parameter Optimization ---
-        print(f"Starting parameter optimization for split {split_num + 1}...")
-        
-        # Add market regime information to each parameter set
-        # This requires the wfo_optimization module
-        from scripts.strategies.refactored_edge.wfo_optimization import determine_market_regime_for_params
-        
-        # Assuming param_config is the correct EdgeConfig instance for this split
-        # Pass the config object to the regime determination function
-        regime_info = determine_market_regime_for_params(train_data, param_config)
-        
-        # Add regime info to the parameters dictionary if needed for evaluation?
-        # The current evaluate_single_params doesn't seem to use it directly,
-        # but it might be logged or used later.
-        # If evaluate_single_params needed it, we'd modify param_grid_list here.
-        # For now, we just determine it as per the original structure.
-        
-        # Prepare arguments for parallel execution
-        for params in param_grid_list:
-            # Add regime information to parameters
-            params['_regime_info'] = regime_info
-        
-        # Optimize parameters on training data
-        best_params, best_score, best_params_by_regime = optimize_params_parallel(
-            data=train_data,
-            param_combinations=param_grid_list,
-            metric='Sharpe Ratio',
-            n_jobs=n_jobs
-        )
-        
-        # Store best parameters
-        all_best_params[split_num] = best_params
-        
-        # Check if optimization failed
-        if best_params is None:
-            print(f"No valid parameters found for split {split_num + 1}. Skipping to next split.")
-            
-            # Add empty result to maintain split tracking
-            results_list.append({
-                'split': split_num + 1,
-                'train_start': train_start_date if 'train_start_date' in locals() else None,
-                'train_end': train_end_date if 'train_end_date' in locals() else None,
-                'test_start': test_start_date if 'test_start_date' in locals() else None,
-                'test_end': test_end_date if 'test_end_date' in locals() else None,
-                'best_params': str({}),
-                'train_return': np.nan,
-                'train_sharpe': np.nan,
-                'train_max_drawdown': np.nan,
-                'test_return': np.nan,
-                'test_sharpe': np.nan,
-                'test_max_drawdown': np.nan,
-                'regime_aware_improvement': np.nan,
-                'robustness_ratio': np.nan,
-                'return_std': np.nan,
-                'sharpe_std': np.nan,
-                'consistent_sign': False,
-                'regime_breakdown': {}
-            })
-            
-            # Save interim results
-            save_interim_results(results_list, split_num + 1)
-            continue
-        
-        # Print detailed parameter information
-        print(f"Best parameters for split {split_num + 1}:")
-        for param, value in best_params.items():
-            if not param.startswith('_'):  # Skip internal keys like _regime_info
-                print(f"  {param}: {value}")
-        
-        # Check if we have regime-specific parameters and display them
-        if len(best_params_by_regime) > 1:  # More than just 'overall'
-            if 'trending' in best_params_by_regime:
-                trending_params = best_params_by_regime['trending']
-                print("Trending regime parameters:")
-                for param, value in trending_params.items():
-                    if 'ranging' in best_params_by_regime and param in best_params_by_regime['ranging'] and best_params_by_regime['ranging'][param] != value:
-                        print(f"  {param}: {value} (ranging: {best_params_by_regime['ranging'][param]})")
-        
-        # --- 4b. Test Period Evaluation with Best Parameters ---
-        print(f"Evaluating test period with best parameters...")
-        
-        # Standard evaluation with overall best parameters
-        test_pf, test_stats = evaluate_with_params(test_data, best_params)
-        
-        # Get standard (non-regime) performance metrics
-        standard_return = test_stats.get('return', 0)
-        standard_sharpe = test_stats.get('sharpe', -np.inf)
-        standard_drawdown = test_stats.get('max_drawdown', 1.0)
-        
-        print(f"Test period results with best parameters:")
-        print(f"  Return: {standard_return:.4f}")
-        print(f"  Sharpe: {standard_sharpe:.4f}")
-        print(f"  Max Drawdown: {standard_drawdown:.4f}")
-        
-        # Store the portfolio for this split
-        test_portfolios[split_num] = test_pf
-        
-        # --- 4c. Anti-Overfitting Analysis ---
-        print("Performing anti-overfitting analysis...")
-        
-        # Check if best_train_stats is a dictionary or scalar
-        train_return = np.nan
-        train_sharpe = np.nan
-        train_max_drawdown = np.nan
-        return_std = np.nan
-        sharpe_std = np.nan
-        consistent_sign = False
-        
-        print(f"DEBUG: best_train_stats type: {type(best_score)}")
-        
-        # Extract metrics if best_train_stats is a dictionary
-        if isinstance(best_score, dict):
-            train_return = best_score.get('return', np.nan)
-            train_sharpe = best_score.get('sharpe', np.nan)
-            train_max_drawdown = best_score.get('max_drawdown', np.nan)
-            
-            # Get cross-validation metrics from optimization (if available)
-            return_std = best_score.get('return_std', np.nan)
-            sharpe_std = best_score.get('sharpe_std', np.nan)
-            consistent_sign = best_score.get('consistent_sign', False)
-        elif hasattr(best_score, 'item'):
-            # If it's a numpy scalar, use it as Sharpe ratio
-            print("Using scalar best_train_stats as Sharpe ratio")
-            train_sharpe = best_score.item() if hasattr(best_score, 'item') else float(best_score)
-        
-        # Calculate robustness ratio (test/train performance)
-        robustness_ratio = np.nan
-        
-        if not np.isnan(train_sharpe) and train_sharpe != 0 and not np.isnan(standard_sharpe):
-            robustness_ratio = standard_sharpe / train_sharpe if train_sharpe > 0 else -standard_sharpe / train_sharpe
-        
-        # Calculate improvement from regime-aware adaptation
-        regime_improvement = 0.0  # Default if not using regime-aware params
-        
-        # --- 4e. Save Results for this Split ---
-        # Compile the results for this split
-        # Handle the case where best_params might be None (no valid parameter combinations found)
-        params_str = "No valid parameters found"
-        if best_params is not None:
-            try:
-                params_str = str({k: v for k, v in best_params.items() if not k.startswith('_')})
-            except (AttributeError, TypeError) as e:
-                print(f"Error formatting best_params: {e}")
-                params_str = str(best_params)
-        
-        split_results = {
-            'split': split_num + 1,
-            'train_start': train_start_date if 'train_start_date' in locals() else None,
-            'train_end': train_end_date if 'train_end_date' in locals() else None,
-            'test_start': test_start_date if 'test_start_date' in locals() else None,
-            'test_end': test_end_date if 'test_end_date' in locals() else None,
-            'best_params': params_str,
-            'train_return': train_return,
-            'train_sharpe': train_sharpe,
-            'train_max_drawdown': train_max_drawdown,
-            'test_return': standard_return,
-            'test_sharpe': standard_sharpe, 
-            'test_max_drawdown': standard_drawdown,
-            'regime_aware_improvement': regime_improvement,
-            'robustness_ratio': robustness_ratio,
-            'return_std': return_std,
-            'sharpe_std': sharpe_std,
-            'consistent_sign': consistent_sign,
-            'regime_breakdown': best_score.get('regime_breakdown', {}) if isinstance(best_score, dict) else {}
-        }
-        
-        # Add to the list of results
+    # Splits already completed by an interrupted run are taken from the checkpoint store,
+    # or with resume from the interim results
+    # Everything that determines the split results; saved results of other runs are never reused
+    data_fingerprint = fingerprint_data(price_data)
+    run_identity = {
+        'symbol': symbol, 'timeframe': timeframe, 'data': data_fingerprint,
+        'splits': [(train.start, train.stop, test.start, test.stop) for train, test in split_indices_list],
+        'param_grid': param_grid_list, 'config': param_config, 'reuse_features': reuse_features,
+        'initial_capital': initial_capital,
+    }
+    run_id = make_run_id('wfo', **run_identity)
+    completed = {}
+    run_checkpoint = None
+    checkpoint_store = resolve_checkpoint_store(checkpoint)
+    if checkpoint_store is not None:
+        run_checkpoint = checkpoint_store.open_run('wfo', run_identity)
+        completed = run_checkpoint.completed('split')
+        run_checkpoint.save_manifest('data', {'fingerprint': data_fingerprint, 'rows': len(price_data),
+                                              'start': price_data.index[0], 'end': price_data.index[-1]})
+        print(f"Checkpoint {run_checkpoint.run_id}: {len(completed)}/{len(split_indices_list)} split(s) completed")
+    elif resume:
+        matched = match_interim_results(load_interim_results(), price_data, split_indices_list, run_id=run_id)
+        completed = {split_num: (split_results, None, parse_best_params(split_results.get('best_params')))
+                     for split_num, split_results in matched.items()}
+    
+    budget = plan_split_budget(n_jobs, len(split_indices_list) - len(completed), len(param_grid_list),
+                               split_jobs=split_jobs)
+    print(f"Split scheduling: {budget.describe()}")
+    
+    # Checkpointed runs keep their indicator cache on disk so a restart does not recompute it
+    cache_dir = run_checkpoint.cache_dir('indicator_cache') if run_checkpoint is not None else None
+    
+    def _run_split(split_num):
+        train_indices, test_indices = split_indices_list[split_num]
+        return run_wfo_split(split_num, len(split_indices_list), train_indices, test_indices, price_data,
+                             param_config, param_grid_list, n_jobs=budget.inner_jobs, features=features,
+                             cache_dir=cache_dir)
+    
+    split_fn = _run_split
+    if run_checkpoint is not None:
+        # Splits are recorded as soon as they finish; a portfolio that cannot be pickled is dropped
+        split_fn = run_checkpoint.wrap('split', _run_split,
+                                       encode=lambda result: (result[0], None, result[2]))
+    
+    def _collect(split_num, result, resumed):
+        split_results, test_pf, best_params = result
         results_list.append(split_results)
-        
-        # Save interim results after each split (in case of early termination)
-        save_interim_results(results_list, split_num + 1)
+        all_best_params[split_num] = best_params
+        if test_pf is not None:
+            test_portfolios[split_num] = test_pf
+        if resumed:
+            print(f"Split {split_num + 1}: using results of the interrupted run")
+        else:
+            if run_checkpoint is not None:
+                run_checkpoint.save_cache_manifest('indicator_cache')
+            # Save interim results after each split (in case of early termination);
+            # results arrive in split order, so the file always holds a complete prefix
+            save_interim_results(results_list, split_num + 1, run_id=run_id)
+    
+    try:
+        run_splits(split_fn, range(len(split_indices_list)), split_workers=budget.split_workers,
+                   on_result=_collect, completed=completed)
+    finally:
+        if features is not None:
+            features.close()
     
     # --- End of WFO Loop, Final Processing ---
     
@@ -437,6 +565,9 @@ def run_wfo(symbol=SYMBOL, timeframe=TIMEFRAME, start_date=START_DATE, end_date=
     if results_list:
         save_wfo_results(results_list)
     
+    if run_checkpoint is not None:
+        run_checkpoint.finish()
+    
     # Print performance summary
     print_performance_metrics(results_list)
     
@@ -27,31 +27,24 @@ from scripts.strategies.refactored_edge.wfo_utils import INIT_CAPITAL, is_testin
 from scripts.strategies.refactored_edge.position_sizing import calculate_integrated_position_size, get_regime_position_multiplier
 from scripts.strategies.refactored_edge.regime import MarketRegimeType
 
-# Indicator cache to avoid redundant calculations
-_indicator_cache = {}
+from scripts.strategies.refactored_edge.indicator_cache import (
+    fingerprint_data, make_cache_key, get_indicator_cache
+)
 
-def get_cache_key(params):
+def get_cache_key(params, data=None):
     """
     Generate a cache key from parameters that affect indicator calculations.
     
     Args:
         params (dict): Parameter dictionary
+        data (pd.DataFrame, optional): Data the indicators are computed on. When given,
+            the key also includes a fingerprint of the data so different slices never collide.
     
     Returns:
-        str: Cache key as a hash of param values
+        str: Cache key as a hash of param values (and data fingerprint)
     """
-    # Extract only parameters that affect indicator calculations
-    indicator_params = {
-        k: v for k, v in params.items()
-        if k in [
-            'rsi_window', 'bb_window', 'bb_std_dev', 'ma_window', 
-            'atr_window', 'adx_window', 'sma_short', 'sma_medium', 'sma_long'
-        ]
-    }
-    
-    # Convert to a deterministic string representation and hash it
-    params_str = json.dumps(indicator_params, sort_keys=True)
-    return hashlib.md5(params_str.encode()).hexdigest()
+    data_fingerprint = fingerprint_data(data) if data is not None else None
+    return make_cache_key(params, data_fingerprint)
 
 def get_cached_indicators(data, params):
     """
@@ -66,11 +59,12 @@ def get_cached_indicators(data, params):
     """
     from scripts.strategies.refactored_edge.config import EdgeConfig
     
-    cache_key = get_cache_key(params)
+    cache = get_indicator_cache()
+    cache_key = get_cache_key(params, data)
     
-    if cache_key in _indicator_cache:
+    indicators_df = cache.get(cache_key)
+    if indicators_df is not None:
         # Return cached indicators if available
-        indicators_df = _indicator_cache[cache_key]
         logger.debug(f"Using cached indicators for cache key: {cache_key}")
         return indicators_df
     
@@ -83,8 +77,9 @@ def get_cached_indicators(data, params):
         indicators_df = indicators.add_indicators(data, config)
         
         # Add to cache for future use
-        _indicator_cache[cache_key] = indicators_df
-        logger.debug(f"Added indicators to cache with key: {cache_key}")
+        if indicators_df is not None:
+            cache.put(cache_key, indicators_df)
+            logger.debug(f"Added indicators to cache with key: {cache_key}")
         
         return indicators_df
     except Exception as e:
@@ -97,19 +92,33 @@ def get_cached_indicators(data, params):
 def clear_indicator_cache():
     """
     Clear the indicator cache to free memory.
-    Call this between WFO splits or when changing datasets.
+    Entries are keyed on the data fingerprint, so this is no longer required
+    between WFO splits; the cache is bounded and evicts on its own.
+    """
+    cache = get_indicator_cache()
+    cache_stats = cache.stats()
+    cache.clear()
+    logger.info(f"Cleared indicator cache with {cache_stats['entries']} entries "
+                f"(hits={cache_stats['hits']}, misses={cache_stats['misses']}, evictions={cache_stats['evictions']})")
+
+def get_indicator_cache_stats():
     """
-    global _indicator_cache
-    cache_size = len(_indicator_cache)
-    _indicator_cache = {}
-    logger.info(f"Cleared indicator cache with {cache_size} entries")
+    Get hit/miss/eviction counters for this process's indicator cache.
+    
+    Returns:
+        dict: Cache statistics
+    """
+    return get_indicator_cache().stats()
 
 
 
-def create_portfolio(close, long_entries, long_exits, short_entries, short_exits, params=None, data=None):
+# Default trade size used when dynamic position sizing is disabled or fails
+TRADE_SIZE = 1.0  # Default to 1.0 BTC per trade
+
+
+def prepare_portfolio_signals(close, long_entries, long_exits, short_entries, short_exits):
     """
-    Helper function to create a portfolio with consistent parameters.
-    This avoids passing invalid parameters to vectorbtpro's Portfolio.from_signals method.
+    Add final exits and resolve entry/exit conflicts before portfolio simulation.
     
     Args:
         close (pd.Series): Series of closing prices
@@ -117,26 +126,10 @@ def create_portfolio(close, long_entries, long_exits, short_entries, short_exits
         long_exits (pd.Series): Boolean series of long exit signals
         short_entries (pd.Series): Boolean series of short entry signals
         short_exits (pd.Series): Boolean series of short exit signals
-        params (dict, optional): Strategy parameters
-        data (pd.DataFrame, optional): Full data frame with indicators for dynamic position sizing
         
     Returns:
-        vbt.Portfolio: Portfolio object
+        tuple: (long_entries, long_exits, short_entries, short_exits) ready for simulation
     """
-    params = params or {}
-    
-    # Define constants for trading
-    TRADE_SIZE = 1.0  # Default to 1.0 BTC per trade
-    
-    # Get fees and slippage from params if available
-    commission = params.get('commission_pct', 0.0015)  # Default 0.15%
-    slippage = params.get('slippage_pct', 0.0005)  # Default 0.05%
-    
-    # Position sizing parameters
-    use_dynamic_sizing = params.get('use_dynamic_sizing', True)
-    risk_percentage = params.get('risk_percentage', 0.01)  # Default 1% risk per trade
-    initial_capital = params.get('initial_capital', INIT_CAPITAL)
-    
     # Add a final exit signal to ensure all positions are closed at the end
     # This helps avoid NaN returns and ensures proper final trade accounting
     if len(close) > 0:
@@ -171,9 +164,31 @@ def create_portfolio(close, long_entries, long_exits, short_entries, short_exits
     # Count entry and exit signals for debugging
     print(f"Signals: Long entries: {long_entries.sum()}, Long exits: {long_exits.sum()}, "
           f"Short entries: {short_entries.sum()}, Short exits: {short_exits.sum()}")
-            
-    # Check if we should use dynamic position sizing
-    position_size = TRADE_SIZE
+    
+    return long_entries, long_exits, short_entries, short_exits
+
+
+def calculate_position_sizes(close, long_entries, short_entries, params=None, data=None):
+    """
+    Calculate per-bar position sizes for long entries using integrated position sizing.
+    
+    Args:
+        close (pd.Series): Series of closing prices
+        long_entries (pd.Series): Boolean series of long entry signals
+        short_entries (pd.Series): Boolean series of short entry signals
+        params (dict, optional): Strategy parameters
+        data (pd.DataFrame, optional): Full data frame with indicators for dynamic position sizing
+        
+    Returns:
+        np.ndarray or None: Size array aligned with close, or None to use the fixed TRADE_SIZE
+    """
+    params = params or {}
+    
+    # Position sizing parameters
+    use_dynamic_sizing = params.get('use_dynamic_sizing', True)
+    risk_percentage = params.get('risk_percentage', 0.01)  # Default 1% risk per trade
+    initial_capital = params.get('initial_capital', INIT_CAPITAL)
+    
     size_array = None
     
     # Before trying dynamic sizing, check if we have entries
@@ -279,25 +294,67 @@ def create_portfolio(close, long_entries, long_exits, short_entries, short_exits
             traceback.print_exc()
             size_array = None
     
+    return size_array
+
+
+def get_portfolio_kwargs(params=None):
+    """
+    Build the keyword arguments passed to Portfolio.from_signals (besides signals and size).
+    
+    Args:
+        params (dict, optional): Strategy parameters
+        
+    Returns:
+        dict: Valid keyword arguments for vectorbtpro's Portfolio.from_signals
+    """
+    params = params or {}
+    
+    # Get fees and slippage from params if available
+    commission = params.get('commission_pct', 0.0015)  # Default 0.15%
+    slippage = params.get('slippage_pct', 0.0005)  # Default 0.05%
+    
     # Only include valid parameters for vectorbtpro's Portfolio.from_signals
     # This avoids warnings about unexpected parameters like sl_pct
-    pf_kwargs = {
-        'size': size_array if size_array is not None else TRADE_SIZE,
+    # Note on ATR-based stops:
+    # Instead of passing sl_pct, sl_atr_multiplier, etc. directly to Portfolio.from_signals
+    # (which causes parameter warnings), we implement custom exit logic in the signal generation.
+    return {
         'freq': '1h',  # Assuming 1-hour timeframe
         'fees': commission,
         'slippage': slippage,
         # Add trade size constraints if supported
         'size_granularity': 0.001  # Allow fractional trade sizes with 3 decimal precision
     }
+
+
+def create_portfolio(close, long_entries, long_exits, short_entries, short_exits, params=None, data=None):
+    """
+    Helper function to create a portfolio with consistent parameters.
+    This avoids passing invalid parameters to vectorbtpro's Portfolio.from_signals method.
+    
+    Args:
+        close (pd.Series): Series of closing prices
+        long_entries (pd.Series): Boolean series of long entry signals
+        long_exits (pd.Series): Boolean series of long exit signals
+        short_entries (pd.Series): Boolean series of short entry signals
+        short_exits (pd.Series): Boolean series of short exit signals
+        params (dict, optional): Strategy parameters
+        data (pd.DataFrame, optional): Full data frame with indicators for dynamic position sizing
+        
+    Returns:
+        vbt.Portfolio: Portfolio object
+    """
+    params = params or {}
     
-    # Remove any parameters that might not be supported by all vectorbtpro versions
-    # The close_at_end parameter is not available in some versions
-    if 'close_at_end' in pf_kwargs:
-        del pf_kwargs['close_at_end']
+    long_entries, long_exits, short_entries, short_exits = prepare_portfolio_signals(
+        close, long_entries, long_exits, short_entries, short_exits
+    )
     
-    # Note on ATR-based stops:
-    # Instead of passing sl_pct, sl_atr_multiplier, etc. directly to Portfolio.from_signals
-    # (which causes parameter warnings), we implement custom exit logic in the signal generation.
+    # Check if we should use dynamic position sizing
+    size_array = calculate_position_sizes(close, long_entries, short_entries, params, data)
+    
+    pf_kwargs = get_portfolio_kwargs(params)
+    pf_kwargs['size'] = size_array if size_array is not None else TRADE_SIZE
     
     try:
         portfolio = vbt.Portfolio.from_signals(
@@ -340,6 +397,64 @@ def create_portfolio(close, long_entries, long_exits, short_entries, short_exits
         return None
 
 
+def generate_signals_with_fallback(close, rsi, bb_upper, bb_lower, trend_ma,
+                                   price_in_demand_zone, price_in_supply_zone, params):
+    """
+    Generate signals and retry in ULTRA_RELAXED mode when no entries are produced.
+    
+    Args:
+        close (pd.Series): Series of closing prices
+        rsi (pd.Series): RSI values
+        bb_upper (pd.Series): Upper Bollinger Band values
+        bb_lower (pd.Series): Lower Bollinger Band values
+        trend_ma (pd.Series): Trend moving average values
+        price_in_demand_zone (pd.Series or None): Demand zone flags
+        price_in_supply_zone (pd.Series or None): Supply zone flags
+        params (dict): Strategy parameters
+        
+    Returns:
+        tuple: (long_entries, long_exits, short_entries, short_exits)
+    """
+    # First try with normal parameters
+    long_entries, long_exits, short_entries, short_exits = generate_signals(
+        close=close, 
+        rsi=rsi,
+        bb_upper=bb_upper,
+        bb_lower=bb_lower,
+        trend_ma=trend_ma,
+        price_in_demand_zone=price_in_demand_zone,
+        price_in_supply_zone=price_in_supply_zone,
+        params=params
+    )
+    
+    # Check if we have any entry signals, if not, retry with ULTRA_RELAXED mode for WFO
+    if long_entries.sum() == 0 and short_entries.sum() == 0:
+        print("WARNING: No entry signals detected with normal parameters! Trying ULTRA_RELAXED mode...")
+        # Clone params and modify for ultra-relaxed mode
+        wfo_params = params.copy()
+        wfo_params['signal_strictness'] = SignalStrictness.ULTRA_RELAXED
+        # Make more lenient to ensure trades
+        wfo_params['rsi_lower_threshold'] = 20  # More aggressive entries
+        wfo_params['rsi_upper_threshold'] = 80  # More relaxed exits
+        wfo_params['use_regime_filter'] = False  # Disable regime filtering
+        wfo_params['use_zones'] = False  # Disable zone filtering
+        
+        # Try again with ultra-relaxed settings
+        long_entries, long_exits, short_entries, short_exits = generate_signals(
+            close=close, 
+            rsi=rsi,
+            bb_upper=bb_upper,
+            bb_lower=bb_lower,
+            trend_ma=trend_ma,
+            price_in_demand_zone=price_in_demand_zone,
+            price_in_supply_zone=price_in_supply_zone,
+            params=wfo_params
+        )
+        print(f"ULTRA_RELAXED mode generated {long_entries.sum()} long entries and {short_entries.sum()} short entries")
+    
+    return long_entries, long_exits, short_entries, short_exits
+
+
 def evaluate_with_params(data, params):
     """
     Evaluate strategy with given parameters and return portfolio and performance stats.
@@ -391,9 +506,12 @@ def evaluate_with_params(data, params):
             setattr(temp_config, 'use_zones', params.get('use_zones', False))
         
         # Calculate indicators (this is where a lot of time is spent) - now using cache
-        data_with_indicators = get_cached_indicators(data.copy(), params)
+        cache_hits_before = get_indicator_cache().hits
+        # add_indicators never modifies its input, so pass the task's frame as is: a copy would
+        # duplicate a shared-memory dataset and lose its known fingerprint (rehashing every row)
+        data_with_indicators = get_cached_indicators(data, params)
         indicators_end = time.time()
-        print(f"[TIMING] Indicator calculation took {indicators_end - indicators_start:.3f} seconds (PID={proc_id}), cached={get_cache_key(params) in _indicator_cache}")
+        print(f"[TIMING] Indicator calculation took {indicators_end - indicators_start:.3f} seconds (PID={proc_id}), cached={get_indicator_cache().hits > cache_hits_before}")
         
         # Extract required indicators
         indicators_df = data_with_indicators
@@ -401,8 +519,10 @@ def evaluate_with_params(data, params):
         bb_upper = indicators_df.get('bb_upper', None)
         bb_lower = indicators_df.get('bb_lower', None)
         trend_ma = indicators_df.get('trend_ma', None)
-        price_in_demand_zone = indicators_df.get('demand_zone', None)
-        price_in_supply_zone = indicators_df.get('supply_zone', None)
+        # add_indicators names the zone flags price_in_*_zone; they only apply when the params use zones
+        use_zones = params.get('use_zones', False)
+        price_in_demand_zone = indicators_df.get('price_in_demand_zone', None) if use_zones else None
+        price_in_supply_zone = indicators_df.get('price_in_supply_zone', None) if use_zones else None
         
         # Check if any mandatory indicator is missing
         for name, indicator in {'rsi': rsi, 'bb_upper': bb_upper, 'bb_lower': bb_lower, 'trend_ma': trend_ma}.items():
@@ -422,12 +542,8 @@ def evaluate_with_params(data, params):
         signal_start = time.time()
         print(f"[TIMING] Signal generation START (PID={proc_id})")
         
-        # Import SignalStrictness here to avoid circular imports
-        from scripts.strategies.refactored_edge.balanced_signals import SignalStrictness
-        
-        # First try with normal parameters
-        long_entries, long_exits, short_entries, short_exits = generate_signals(
-            close=close, 
+        long_entries, long_exits, short_entries, short_exits = generate_signals_with_fallback(
+            close=close,
             rsi=indicators_df.rsi,
             bb_upper=indicators_df.bb_upper,
             bb_lower=indicators_df.bb_lower,
@@ -438,31 +554,6 @@ def evaluate_with_params(data, params):
         )
         signal_end = time.time()
         print(f"[TIMING] Signal generation took {signal_end - signal_start:.3f} seconds (PID={proc_id})")
-        
-        # Check if we have any entry signals, if not, retry with ULTRA_RELAXED mode for WFO
-        if long_entries.sum() == 0 and short_entries.sum() == 0:
-            print("WARNING: No entry signals detected with normal parameters! Trying ULTRA_RELAXED mode...")
-            # Clone params and modify for ultra-relaxed mode
-            wfo_params = params.copy()
-            wfo_params['signal_strictness'] = SignalStrictness.ULTRA_RELAXED
-            # Make more lenient to ensure trades
-            wfo_params['rsi_lower_threshold'] = 20  # More aggressive entries
-            wfo_params['rsi_upper_threshold'] = 80  # More relaxed exits
-            wfo_params['use_regime_filter'] = False  # Disable regime filtering
-            wfo_params['use_zones'] = False  # Disable zone filtering
-            
-            # Try again with ultra-relaxed settings
-            long_entries, long_exits, short_entries, short_exits = generate_signals(
-                close=close, 
-                rsi=indicators_df.rsi,
-                bb_upper=indicators_df.bb_upper,
-                bb_lower=indicators_df.bb_lower,
-                trend_ma=indicators_df.trend_ma,
-                price_in_demand_zone=price_in_demand_zone,
-                price_in_supply_zone=price_in_supply_zone,
-                params=wfo_params
-            )
-            print(f"ULTRA_RELAXED mode generated {long_entries.sum()} long entries and {short_entries.sum()} short entries")
             
         # 3. Create Portfolio using helper function
         # This ensures we only pass valid parameters
@@ -606,6 +697,27 @@ def evaluate_with_params(data, params):
         }
 
 
+def get_metric_score(stats, metric=None):
+    """
+    Pick the optimization score out of a stats dictionary.
+    
+    Args:
+        stats (dict): Stats as returned by evaluate_with_params
+        metric (str, optional): Metric name (e.g., 'Sharpe Ratio'). Defaults to sharpe.
+        
+    Returns:
+        float: Score, or -np.inf if the metric is unavailable
+    """
+    if metric is None or metric.lower() == 'sharpe ratio':
+        return stats.get('sharpe', -np.inf)
+    elif metric.lower() == 'return':
+        return stats.get('return', -np.inf)
+    # For other metrics, try to get from stats dictionary
+    # Convert from potential format like 'Max Drawdown [%]' to 'max_drawdown'
+    metric_key = metric.lower().replace(' ', '_').replace('[%]', '').strip('_')
+    return stats.get(metric_key, -np.inf)
+
+
 def evaluate_single_params(params, data, metric=None):
     """
     Evaluates a single parameter set using indicators and signals directly.
@@ -642,15 +754,7 @@ def evaluate_single_params(params, data, metric=None):
                 return -np.inf
                 
         # Get the score based on metric or default to sharpe ratio
-        if metric is None or metric.lower() == 'sharpe ratio':
-            score = stats.get('sharpe', -np.inf)
-        elif metric.lower() == 'return':
-            score = stats.get('return', -np.inf)
-        else:
-            # For other metrics, try to get from stats dictionary
-            # Convert from potential format like 'Max Drawdown [%]' to 'max_drawdown'
-            metric_key = metric.lower().replace(' ', '_').replace('[%]', '').strip('_')
-            score = stats.get(metric_key, -np.inf)
+        score = get_metric_score(stats, metric)
         
         # Validate score
         if np.isnan(score) or score == -np.inf:
@@ -4,9 +4,12 @@ Parameter optimization functions for Walk-Forward Optimization (WFO).
 This module contains functions for optimizing strategy parameters, including
 parallel processing, regime-aware optimization, and parameter grid handling.
 """
+import os
+import shutil
+import tempfile
 import pandas as pd
 import numpy as np
-from joblib import Parallel, delayed
+from joblib import Parallel, delayed, effective_n_jobs
 from tqdm import tqdm
 import traceback
 import logging
@@ -15,32 +18,171 @@ from typing import Dict, Any, Union, List, Optional, Tuple
 # Local imports
 from scripts.strategies.refactored_edge import regime
 from scripts.strategies.refactored_edge.wfo_evaluation import evaluate_single_params
+from scripts.strategies.refactored_edge.indicator_cache import get_indicator_cache, configure_indicator_cache, make_cache_key
+from scripts.strategies.refactored_edge.shared_data import DatasetRegistry, resolve_dataset
+from scripts.strategies.refactored_edge.task_scheduler import plan_chunks, run_chunks
 from scripts.strategies.refactored_edge.config import EdgeConfig
 from scripts.strategies.refactored_edge import indicators
 
 # Configure logger
 log = logging.getLogger(__name__)
 
-def optimize_params_parallel(data, param_combinations, metric, n_jobs=-1):
+# ScheduleReport of the most recent chunked optimize_params_parallel run
+_last_schedule_report = None
+
+
+def get_last_schedule_report():
+    """
+    Get per-worker utilization and cache hit rate of the last chunked optimization.
+
+    Returns:
+        ScheduleReport or None if no chunked run has happened in this process
+    """
+    return _last_schedule_report
+
+
+def _indicator_cache_counters():
+    """Cumulative indicator cache counters of the current (worker) process."""
+    return get_indicator_cache().stats()
+
+def _evaluate_with_shared_cache(params, data, metric, cache_dir=None):
+    """
+    Evaluate a parameter set in a worker, pointing its indicator cache at the shared disk tier.
+
+    Args:
+        params (dict): Parameter dictionary
+        data (pd.DataFrame or DatasetHandle): Training data, or a handle to it in shared memory
+        metric (str): Performance metric to optimize
+        cache_dir (str, optional): Shared indicator cache directory for this run
+
+    Returns:
+        float: Score for the parameter set
+    """
+    if cache_dir:
+        configure_indicator_cache(disk_dir=cache_dir)
+    else:
+        get_indicator_cache().detach_disk_tier()
+    return evaluate_single_params(params, resolve_dataset(data), metric)
+
+
+def _run_parallel_evaluations(data, param_combinations, metric, n_jobs, cache_dir, share_data=True,
+                              schedule='chunked', chunk_size=None):
+    """
+    Evaluate parameter combinations with joblib.
+
+    With schedule='chunked', combinations with the same indicator parameters are grouped
+    into chunks and each chunk runs as one task, so a worker computes a group's
+    indicators once and serves the rest of the chunk from its warm cache. With
+    schedule='per_combination' every combination is its own task.
+
+    With more than one job and share_data enabled, the training data is written to
+    shared memory once and tasks receive a DatasetHandle instead of a pickled copy
+    of the DataFrame.
+
+    Args:
+        data (pd.DataFrame): Training data.
+        param_combinations (list): List of parameter dictionaries.
+        metric (str): Performance metric to optimize.
+        n_jobs (int): Number of parallel jobs.
+        cache_dir (str, optional): Directory for the shared indicator cache.
+        share_data (bool): Send workers a shared-memory handle instead of the DataFrame.
+        schedule (str): 'chunked' or 'per_combination'.
+        chunk_size (int, optional): Fixed chunk size; guided sizing if None.
+
+    Returns:
+        list: Scores in the order of param_combinations
+    """
+    global _last_schedule_report
+    # Share indicator results between worker processes through a disk tier
+    owns_cache_dir = False
+    if cache_dir is None and n_jobs != 1:
+        cache_dir = tempfile.mkdtemp(prefix='wfo_indicator_cache_')
+        owns_cache_dir = True
+
+    registry = None
+    task_data = data
+    if share_data and n_jobs != 1:
+        registry = DatasetRegistry()
+        try:
+            task_data = registry.register(data)
+        except TypeError as e:
+            log.warning(f"Passing training data to workers by value, it cannot be shared: {e}")
+    
+    try:
+        if schedule == 'chunked':
+            # Group by indicator parameters (params-only cache key)
+            chunks = plan_chunks([make_cache_key(params) for params in param_combinations],
+                                 n_workers=effective_n_jobs(n_jobs), chunk_size=chunk_size)
+            results, report = run_chunks(
+                _evaluate_with_shared_cache, param_combinations, chunks, n_jobs=n_jobs,
+                args=(task_data, metric, cache_dir), counters_fn=_indicator_cache_counters
+            )
+            _last_schedule_report = report
+            print(report.summary())
+        else:
+            # Run evaluations in parallel, one task per combination
+            results = Parallel(n_jobs=n_jobs)(
+                delayed(_evaluate_with_shared_cache)(params, task_data, metric, cache_dir)
+                for params in tqdm(param_combinations, desc="Evaluating parameters")
+            )
+        
+        if cache_dir and os.path.isdir(cache_dir):
+            n_computed = len([f for f in os.listdir(cache_dir) if f.endswith('.pkl')])
+            print(f"Indicator cache: {n_computed} distinct indicator sets computed for "
+                  f"{len(param_combinations)} combinations")
+        else:
+            cache_stats = get_indicator_cache().stats()
+            print(f"Indicator cache: hits={cache_stats['hits']}, misses={cache_stats['misses']}, "
+                  f"evictions={cache_stats['evictions']}")
+    finally:
+        if registry is not None:
+            registry.close()
+        if owns_cache_dir:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+    
+    return results
+
+
+def optimize_params_parallel(data, param_combinations, metric, n_jobs=-1, cache_dir=None, batched=False,
+                             share_data=True, schedule='chunked', chunk_size=None):
     """
     Finds the best parameters using parallel processing.
 
+    Indicator frames are cached per (data fingerprint, indicator params). When running
+    with more than one job, workers share computed indicators through an on-disk cache
+    tier so combinations that only differ in signal thresholds reuse the same RSI/BBANDS/
+    ATR/ADX calculations.
+
     Args:
         data (pd.DataFrame): Training data.
         param_combinations (list): List of parameter dictionaries.
         metric (str): Performance metric to optimize.
         n_jobs (int): Number of parallel jobs.
+        cache_dir (str, optional): Directory for the shared indicator cache. If None and
+            n_jobs != 1, a temporary directory is created and removed after the run.
+        batched (bool): If True, evaluate the whole grid with wide indicator arrays and a
+            single multi-column portfolio simulation instead of one task per combination.
+        share_data (bool): Put the training data in shared memory once and send workers a
+            handle instead of pickling the DataFrame into every task.
+        schedule (str): 'chunked' (default) groups combinations that share indicator windows
+            into chunks run by one worker each, with guided chunk sizes; 'per_combination'
+            dispatches one task per combination. Chunked runs print per-worker utilization
+            and cache hit rate (see get_last_schedule_report).
+        chunk_size (int, optional): Fixed chunk size for schedule='chunked'.
 
     Returns:
         tuple: (best_params, best_score, best_params_by_regime) or (None, None, None) if no valid results
     """
     print(f"Optimizing {len(param_combinations)} parameter combinations using metric '{metric}'...")
     
-    # Run evaluations in parallel
-    results = Parallel(n_jobs=n_jobs)(
-        delayed(evaluate_single_params)(params, data, metric)
-        for params in tqdm(param_combinations, desc="Evaluating parameters")
-    )
+    if batched:
+        # Import here to keep vectorized evaluation optional
+        from scripts.strategies.refactored_edge.batch_evaluation import evaluate_params_batch
+        score_table = evaluate_params_batch(data, param_combinations, metric)
+        results = score_table['score'].tolist()
+    else:
+        results = _run_parallel_evaluations(data, param_combinations, metric, n_jobs, cache_dir, share_data,
+                                            schedule, chunk_size)
     
     # Combine parameters with their scores
     param_scores = list(zip(param_combinations, results))
@@ -113,26 +255,24 @@ def optimize_params_parallel(data, param_combinations, metric, n_jobs=-1):
     return best_params, best_score, best_params_by_regime
 
 
-def determine_market_regime_for_params(data, config):
+def compute_market_regimes(data, config):
     """
-    Determine the market regime for the given data using the provided configuration.
+    Classify every bar of the data into a market regime using the provided configuration.
     
     Args:
         data (pd.DataFrame): The price data
         config: The configuration object for the current trial/split
         
     Returns:
-        dict: Regime information including percentages and predominant regime
+        pd.Series or None: Regime label per bar, or None if the required indicators are missing
     """
     # Import modules inside function to avoid circular dependencies
     from scripts.strategies.refactored_edge.utils import (
-        safe_get_column, get_numeric_column, ensure_config_attributes,
-        calculate_regime_percentages, determine_predominant_regime,
-        logger, with_error_handling, normalize_regime_type
+        safe_get_column, ensure_config_attributes, logger, with_error_handling
     )
     
-    @with_error_handling(default_return={'trending_pct': 0, 'ranging_pct': 100, 'predominant_regime': 'ranging'})
-    def _determine_regime():
+    @with_error_handling(default_return=None)
+    def _compute_regimes():
         # Validate configuration attributes first
         required_config_attrs = [
             'use_enhanced_regimes', 'adx_threshold', 'volatility_threshold', 
@@ -155,13 +295,13 @@ def determine_market_regime_for_params(data, config):
             # Import here to avoid circular dependencies
             from scripts.strategies.refactored_edge import indicators
             
-            # Get indicators using the passed config - make a copy to avoid side effects
-            indicator_df = indicators.add_indicators(data.copy(), config)
+            # Get indicators using the passed config (add_indicators returns a new frame)
+            indicator_df = indicators.add_indicators(data, config)
             
             # Verify indicators were properly generated
             if not all(col in indicator_df.columns for col in required_indicators):
                 logger.error(f"Required regime indicators {required_indicators} not generated by add_indicators")
-                return {'trending_pct': 0, 'ranging_pct': 100, 'predominant_regime': 'ranging'}
+                return None
             
             # Extract the required indicators safely
             adx = safe_get_column(indicator_df, 'adx')
@@ -180,7 +320,7 @@ def determine_market_regime_for_params(data, config):
         # Validate required data
         if close is None or adx is None:
             logger.warning("Missing critical data for regime detection (close price or ADX)")
-            return {'trending_pct': 0, 'ranging_pct': 100, 'predominant_regime': 'ranging'}
+            return None
         
         # Import regime module here to avoid circular dependencies
         from scripts.strategies.refactored_edge import regime
@@ -225,12 +365,42 @@ def determine_market_regime_for_params(data, config):
             # Use simple regime detection with just ADX
             regimes = regime.determine_market_regime(adx, adx_threshold)
         
+        return regimes
+    
+    # Execute the inner function with error handling
+    return _compute_regimes()
+
+
+def determine_market_regime_for_params(data, config, regimes=None):
+    """
+    Determine the market regime for the given data using the provided configuration.
+    
+    Args:
+        data (pd.DataFrame): The price data
+        config: The configuration object for the current trial/split
+        regimes (pd.Series, optional): Precomputed regime labels for the rows of data,
+            e.g. sliced from labels computed once on the full series (SplitFeatures)
+        
+    Returns:
+        dict: Regime information including percentages and predominant regime
+    """
+    # Import modules inside function to avoid circular dependencies
+    from scripts.strategies.refactored_edge.utils import (
+        calculate_regime_percentages, logger, with_error_handling, normalize_regime_type
+    )
+    
+    @with_error_handling(default_return={'trending_pct': 0, 'ranging_pct': 100, 'predominant_regime': 'ranging'})
+    def _determine_regime():
+        regime_labels = regimes if regimes is not None else compute_market_regimes(data, config)
+        if regime_labels is None:
+            return {'trending_pct': 0, 'ranging_pct': 100, 'predominant_regime': 'ranging'}
+        
         # Log raw regime counts
-        if not regimes.empty:
-            logger.debug(f"Raw regime counts: {regimes.value_counts().to_dict()}")
+        if not regime_labels.empty:
+            logger.debug(f"Raw regime counts: {regime_labels.value_counts().to_dict()}")
         
         # Calculate regime distribution
-        regime_percentages = calculate_regime_percentages(regimes)
+        regime_percentages = calculate_regime_percentages(regime_labels)
         
         # Initialize result with default values
         result = {
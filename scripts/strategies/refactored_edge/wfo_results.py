@@ -5,6 +5,7 @@ This module handles saving, formatting, and analyzing WFO results, including CSV
 performance metrics calculations, and summary report generation.
 """
 import os
+import ast
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -66,7 +67,7 @@ def save_wfo_results(results_list, output_dir=None, filename=None):
         return None
 
 
-def save_interim_results(results_list, split_num, output_dir=None):
+def save_interim_results(results_list, split_num, output_dir=None, run_id=None):
     """
     Save interim results after a specific split.
     
@@ -74,6 +75,8 @@ def save_interim_results(results_list, split_num, output_dir=None):
         results_list (list): List of result dictionaries
         split_num (int): Current split number
         output_dir (str, optional): Directory to save results. Defaults to OUTPUT_DIR.
+        run_id (str, optional): Identity of the run (see checkpoint.make_run_id), saved
+            with every row so a resumed run only reuses results of the same run
         
     Returns:
         str: Path to the saved interim file or None if error
@@ -88,6 +91,8 @@ def save_interim_results(results_list, split_num, output_dir=None):
         
         try:
             interim_df = pd.DataFrame(results_list)
+            if run_id is not None:
+                interim_df['run_id'] = run_id
             interim_df.to_csv(interim_output_path, index=False)
             print(f"Saved interim results to {interim_output_path}")
             return interim_output_path
@@ -97,6 +102,98 @@ def save_interim_results(results_list, split_num, output_dir=None):
     return None
 
 
+def load_interim_results(output_dir=None):
+    """
+    Load the interim results written by save_interim_results.
+    
+    Args:
+        output_dir (str, optional): Directory the results were saved to. Defaults to OUTPUT_DIR.
+        
+    Returns:
+        list: Result dictionaries in split order (empty if there are none)
+    """
+    dir_path = output_dir or OUTPUT_DIR
+    interim_path = os.path.join(dir_path, "interim_wfo_results.csv")
+    if not os.path.exists(interim_path):
+        return []
+    
+    try:
+        interim_df = pd.read_csv(interim_path)
+    except Exception as e:
+        print(f"Error loading interim results from {interim_path}: {e}")
+        return []
+    
+    results_list = interim_df.to_dict('records')
+    for result in results_list:
+        # Dictionaries are written as their str() form
+        breakdown = result.get('regime_breakdown')
+        if isinstance(breakdown, str):
+            try:
+                result['regime_breakdown'] = ast.literal_eval(breakdown)
+            except (ValueError, SyntaxError):
+                pass
+    return results_list
+
+
+def parse_best_params(params_str):
+    """
+    Parse the best_params column of a saved result back into a dictionary.
+    
+    Args:
+        params_str (str): Value written by run_wfo
+        
+    Returns:
+        dict or None: Parameters, or None if the split found no valid parameters
+    """
+    try:
+        params = ast.literal_eval(params_str) if isinstance(params_str, str) else None
+    except (ValueError, SyntaxError):
+        return None
+    return params if isinstance(params, dict) and params else None
+
+
+def match_interim_results(results_list, price_data, split_indices_list, run_id=None):
+    """
+    Select saved split results that belong to the splits of the current run.
+    
+    A saved result is only reused if it was saved with the same run_id (same symbol,
+    data, parameter grid and config), its split number exists in split_indices_list and
+    its train/test period boundaries equal those of that split on price_data.
+    
+    Args:
+        results_list (list): Result dictionaries, e.g. from load_interim_results
+        price_data (pd.DataFrame): Full price series of the current run
+        split_indices_list (list): (train_indices, test_indices) per split
+        run_id (str, optional): Identity of the current run; if given, results saved
+            without it or with another run's id are never reused
+        
+    Returns:
+        dict: Zero-based split number -> result dictionary
+    """
+    matched = {}
+    for result in results_list:
+        try:
+            split_num = int(result['split']) - 1
+        except (KeyError, TypeError, ValueError):
+            continue
+        if not 0 <= split_num < len(split_indices_list):
+            continue
+        if run_id is not None and result.get('run_id') != run_id:
+            continue
+        
+        train_indices, test_indices = split_indices_list[split_num]
+        boundaries = {
+            'train_start': price_data.index[train_indices[0]],
+            'train_end': price_data.index[train_indices[-1]],
+            'test_start': price_data.index[test_indices[0]],
+            'test_end': price_data.index[test_indices[-1]],
+        }
+        if any(str(result.get(key)) != str(value) for key, value in boundaries.items()):
+            continue
+        matched[split_num] = {key: value for key, value in dict(result, **boundaries).items() if key != 'run_id'}
+    return matched
+
+
 def save_test_results(result_entry, identifier, output_dir=None):
     """
     Save individual test results for a specific symbol/timeframe combination.
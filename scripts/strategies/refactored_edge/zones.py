@@ -2,8 +2,288 @@
 
 import pandas as pd
 import numpy as np
-import vectorbtpro as vbt
-from scipy.signal import find_peaks # Added import
+from scipy.signal import find_peaks, peak_prominences # Added import
+
+ZONE_COLUMNS = [
+    'zone_type', 'start_idx', 'end_idx', 'first_pivot_idx',
+    'last_pivot_idx', 'low_price', 'high_price', 'strength', 'candles'
+]
+
+
+def select_by_peak_distance(peaks: np.ndarray, priority: np.ndarray, distance: int) -> np.ndarray:
+    """
+    Distance filter of scipy.signal.find_peaks with a deterministic tie-break.
+
+    Peaks are visited from highest to lowest priority and remove every lower-priority peak
+    closer than `distance`. scipy orders peaks with an unstable sort, so which of two
+    equal-height peaks survives depends on the rest of the array; here the order is
+    stable (the later peak wins), which also lets the streaming engine reproduce it.
+
+    Args:
+        peaks (np.ndarray): Peak positions in increasing order
+        priority (np.ndarray): Priority per peak (the peak heights)
+        distance (int): Minimum distance between kept peaks
+
+    Returns:
+        np.ndarray: Boolean mask of peaks to keep
+    """
+    distance = int(np.ceil(distance))
+    n_peaks = len(peaks)
+    keep = np.ones(n_peaks, dtype=bool)
+    peaks = np.asarray(peaks).tolist()
+    for j in np.argsort(priority, kind='stable')[::-1].tolist():
+        if not keep[j]:
+            continue
+        k = j - 1
+        while k >= 0 and peaks[j] - peaks[k] < distance:
+            keep[k] = False
+            k -= 1
+        k = j + 1
+        while k < n_peaks and peaks[k] - peaks[j] < distance:
+            keep[k] = False
+            k += 1
+    return keep
+
+
+def _find_peaks(x: np.ndarray, distance: int, prominence: float) -> np.ndarray:
+    """find_peaks(x, distance=distance, prominence=prominence) with a stable distance tie-break."""
+    if distance < 1:
+        raise ValueError('`distance` must be greater or equal to 1')
+    peaks, _ = find_peaks(x)
+    peaks = peaks[select_by_peak_distance(peaks, x[peaks], distance)]
+    prominences = peak_prominences(x, peaks)[0]
+    return peaks[prominences >= prominence]
+
+
+def _find_pivots(high: pd.Series, low: pd.Series, pivot_lookback: int, pivot_prominence: float):
+    """
+    Locate pivot highs (supply) and pivot lows (demand) with scipy.signal.find_peaks.
+
+    Returns:
+        tuple: (supply_pivots_idx, demand_pivots_idx) as integer position arrays
+    """
+    price_range = high.max() - low.min()
+    if price_range == 0: # Avoid division by zero if price is flat
+        prominence_threshold = 0
+    else:
+        prominence_threshold = price_range * pivot_prominence
+
+    # 1. Identify Pivot Highs (for Supply Zones)
+    supply_pivots_idx = _find_peaks(high.to_numpy(dtype=float), pivot_lookback, prominence_threshold)
+
+    # 2. Identify Pivot Lows (for Demand Zones)
+    # Invert price to find lows as peaks
+    demand_pivots_idx = _find_peaks(-low.to_numpy(dtype=float), pivot_lookback, prominence_threshold)
+    return supply_pivots_idx, demand_pivots_idx
+
+
+def group_pivots(
+    pivot_indices: np.ndarray,
+    prices: pd.Series,
+    zone_type: str,
+    close: pd.Series,
+    high: pd.Series,
+    low: pd.Series,
+    zone_merge_proximity: float,
+    min_zone_width_candles: int,
+    min_zone_strength: int,
+    zone_extend_candles: int
+) -> list:
+    """
+    Group consecutive pivots into zones with a single array pass.
+
+    A pivot joins the current zone when it is within zone_merge_proximity of the previous
+    pivot, otherwise it starts a new zone. Because the comparison is always against the
+    immediately preceding pivot, zone boundaries reduce to one vectorized diff, and the
+    per-zone aggregates are computed with ufunc.reduceat over preallocated arrays.
+
+    Args:
+        pivot_indices (np.ndarray): Integer positions of the pivots
+        prices (pd.Series): Prices the pivots were found on (high for supply, low for demand)
+        zone_type (str): 'supply' or 'demand'
+        close, high, low (pd.Series): Price series used for zone width and boundaries
+        zone_merge_proximity, min_zone_width_candles, min_zone_strength, zone_extend_candles:
+            See find_pivot_zones
+
+    Returns:
+        list: Zone dictionaries in the format of find_pivot_zones
+    """
+    n_pivots = pivot_indices.size
+    if n_pivots == 0:
+        return []
+
+    pivot_indices = np.asarray(pivot_indices, dtype=np.int64)
+    pivot_prices = np.asarray(prices.to_numpy()[pivot_indices], dtype=float)
+    candle_highs = np.asarray(high.to_numpy()[pivot_indices], dtype=float)
+    candle_lows = np.asarray(low.to_numpy()[pivot_indices], dtype=float)
+
+    # A new zone starts wherever a pivot is not close to the previous one
+    # (written as "not <=" so NaN prices break a zone just like the comparison above)
+    is_close = np.abs(np.diff(pivot_prices)) <= pivot_prices[:-1] * zone_merge_proximity
+    group_starts = np.empty(n_pivots, dtype=bool)
+    group_starts[0] = True
+    group_starts[1:] = ~is_close
+    starts = np.flatnonzero(group_starts)
+    ends = np.empty_like(starts)
+    ends[:-1] = starts[1:] - 1
+    ends[-1] = n_pivots - 1
+    strength = ends - starts + 1
+
+    zone_lows = np.minimum.reduceat(candle_lows, starts)
+    zone_highs = np.maximum.reduceat(candle_highs, starts)
+
+    keep = strength >= min_zone_strength
+    if not keep.any():
+        return []
+    starts, ends, strength = starts[keep], ends[keep], strength[keep]
+    zone_lows, zone_highs = zone_lows[keep], zone_highs[keep]
+
+    first_locs = pivot_indices[starts]
+    last_locs = pivot_indices[ends]
+    first_ts = prices.index[first_locs]
+    last_ts = prices.index[last_locs]
+
+    # Zone width in candles, from the index frequency when available
+    zone_candles = None
+    if close.index.freq:
+        try:
+            freq_seconds = pd.Timedelta(close.index.freq).total_seconds()
+            zone_candles = (last_ts - first_ts).total_seconds().to_numpy() / freq_seconds + 1
+        except AttributeError:
+            zone_candles = None
+    if zone_candles is None:
+        if close.index.is_monotonic_increasing:
+            zone_candles = (close.index.searchsorted(last_ts, side='right')
+                            - close.index.searchsorted(first_ts, side='left'))
+        else:
+            zone_candles = np.array([len(close.loc[f:l]) for f, l in zip(first_ts, last_ts)])
+
+    # Extend the zone validity
+    extended_end_locs = np.minimum(last_locs + zone_extend_candles, len(prices) - 1)
+    end_ts = prices.index[extended_end_locs]
+
+    final_zones_data = []
+    for z in np.flatnonzero(zone_candles >= min_zone_width_candles):
+        final_zones_data.append({
+            'zone_type': zone_type,
+            'start_idx': first_ts[z],
+            'end_idx': end_ts[z], # Use extended end
+            'first_pivot_idx': first_ts[z],
+            'last_pivot_idx': last_ts[z],
+            'low_price': zone_lows[z],
+            'high_price': zone_highs[z],
+            'strength': int(strength[z]),
+            'candles': zone_candles[z].item()
+        })
+    return final_zones_data
+
+
+def group_pivots_reference(
+    pivot_indices: np.ndarray,
+    prices: pd.Series,
+    zone_type: str,
+    close: pd.Series,
+    high: pd.Series,
+    low: pd.Series,
+    zone_merge_proximity: float,
+    min_zone_width_candles: int,
+    min_zone_strength: int,
+    zone_extend_candles: int
+) -> list:
+    """
+    Original row-by-row pivot grouping, kept as the reference for parity tests and benchmarks.
+
+    Same arguments and output as group_pivots.
+    """
+    if pivot_indices.size == 0:
+        return []
+
+    # Create DataFrame with pivot info including original high/low for zone boundary calc
+    pivot_df = pd.DataFrame({
+        'idx_loc': pivot_indices,
+        'timestamp': prices.index[pivot_indices],
+        'price': prices.iloc[pivot_indices].values,
+        'candle_high': high.iloc[pivot_indices].values, # Get original high
+        'candle_low': low.iloc[pivot_indices].values   # Get original low
+    })
+
+    grouped_zones_list = []
+    current_zone_pivots_df = pd.DataFrame()
+
+    for i, pivot in pivot_df.iterrows():
+        if current_zone_pivots_df.empty:
+            current_zone_pivots_df = pd.concat([current_zone_pivots_df, pivot.to_frame().T])
+            continue
+
+        # Get the last pivot in the current zone
+        last_pivot_in_zone = current_zone_pivots_df.iloc[-1]
+        last_pivot_price = last_pivot_in_zone['price']
+
+        # Calculate proximity threshold based on the last pivot's price
+        proximity_threshold_abs = last_pivot_price * zone_merge_proximity
+
+        # Check if the new pivot's price is close to the last pivot's price
+        is_close = abs(pivot['price'] - last_pivot_price) <= proximity_threshold_abs
+
+        if is_close:
+            current_zone_pivots_df = pd.concat([current_zone_pivots_df, pivot.to_frame().T])
+        else:
+            # Finalize the previous zone if it's valid (enough strength)
+            if not current_zone_pivots_df.empty:
+                if len(current_zone_pivots_df) >= min_zone_strength:
+                    grouped_zones_list.append(current_zone_pivots_df)
+            # Start a new zone with the current pivot
+            current_zone_pivots_df = pivot.to_frame().T
+
+    # Add the last processed zone if it's not empty and meets strength requirement
+    if not current_zone_pivots_df.empty and len(current_zone_pivots_df) >= min_zone_strength:
+        grouped_zones_list.append(current_zone_pivots_df)
+
+    # Process the grouped zones into the final format
+    final_zones_data = []
+    for idx, zone_df in enumerate(grouped_zones_list):
+        first_pivot = zone_df.iloc[0]
+        last_pivot = zone_df.iloc[-1]
+        first_pivot_ts = first_pivot['timestamp']
+        last_pivot_ts = last_pivot['timestamp']
+        # Ensure frequency is available for calculation, otherwise fallback
+        zone_candles = 1 # Default if freq is None or calculation fails
+        if close.index.freq:
+             try:
+                zone_candles = (last_pivot_ts - first_pivot_ts).total_seconds() / (pd.Timedelta(close.index.freq).total_seconds()) + 1
+             except AttributeError:
+                 # Fallback if freq.delta is not available (e.g., complex freq)
+                 zone_candles = len(close.loc[first_pivot_ts:last_pivot_ts])
+        else:
+            zone_candles = len(close.loc[first_pivot_ts:last_pivot_ts])
+
+        if zone_candles >= min_zone_width_candles:
+            # Determine actual zone boundaries from the candles involved
+            zone_low = zone_df['candle_low'].min()
+            zone_high = zone_df['candle_high'].max()
+
+            # Determine start/end indices based on pivots
+            start_idx = first_pivot['timestamp']
+            # Extend the zone validity
+            end_idx_pivot = last_pivot['timestamp']
+            end_idx_loc = prices.index.get_loc(end_idx_pivot)
+            extended_end_loc = min(end_idx_loc + zone_extend_candles, len(prices) - 1)
+            end_idx_extended = prices.index[extended_end_loc]
+
+            final_zones_data.append({
+                'zone_type': zone_type,
+                'start_idx': start_idx,
+                'end_idx': end_idx_extended, # Use extended end
+                'first_pivot_idx': first_pivot['timestamp'],
+                'last_pivot_idx': last_pivot['timestamp'],
+                'low_price': zone_low,
+                'high_price': zone_high,
+                'strength': len(zone_df),
+                'candles': zone_candles
+            })
+
+    return final_zones_data
+
 
 def find_pivot_zones(
     close: pd.Series,
@@ -14,7 +294,8 @@ def find_pivot_zones(
     zone_merge_proximity: float,
     min_zone_width_candles: int,
     min_zone_strength: int,
-    zone_extend_candles: int
+    zone_extend_candles: int,
+    use_reference: bool = False
 ) -> pd.DataFrame:
     """
     Identifies potential Supply (Resistance) and Demand (Support) zones
@@ -30,6 +311,8 @@ def find_pivot_zones(
         min_zone_width_candles (int): Minimum candle width for a valid zone.
         min_zone_strength (int): Minimum pivots required for a valid zone.
         zone_extend_candles (int): How many candles a zone remains valid after its last pivot.
+        use_reference (bool): Group pivots with the original row-by-row implementation
+            (group_pivots_reference) instead of the array pass. Only useful for parity checks.
 
     Returns:
         pd.DataFrame: DataFrame containing zone information:
@@ -43,140 +326,27 @@ def find_pivot_zones(
             - 'strength': Number of pivots forming the zone
             - 'candles': Number of candles between first and last pivot
     """
-    zones_data = []
-    price_range = high.max() - low.min()
-    if price_range == 0: # Avoid division by zero if price is flat
-        prominence_threshold = 0
-    else:
-        prominence_threshold = price_range * pivot_prominence
-
-    # 1. Identify Pivot Highs (for Supply Zones)
-    supply_pivots_idx, supply_props = find_peaks(
-        high, distance=pivot_lookback, prominence=prominence_threshold
-    )
-    # print(f"DEBUG: Raw supply pivots indices: {supply_pivots_idx}") # DEBUG
-
-    # 2. Identify Pivot Lows (for Demand Zones)
-    # Invert price to find lows as peaks
-    demand_pivots_idx, demand_props = find_peaks(
-        -low, distance=pivot_lookback, prominence=prominence_threshold
-    )
-    # print(f"DEBUG: Raw demand pivots indices: {demand_pivots_idx}") # DEBUG
+    supply_pivots_idx, demand_pivots_idx = _find_pivots(high, low, pivot_lookback, pivot_prominence)
 
     # 3. Group Pivots into Zones
-    def group_pivots(pivot_indices, prices, zone_type):
-        if pivot_indices.size == 0:
-            return []
-
-        # Create DataFrame with pivot info including original high/low for zone boundary calc
-        pivot_df = pd.DataFrame({
-            'idx_loc': pivot_indices,
-            'timestamp': prices.index[pivot_indices],
-            'price': prices.iloc[pivot_indices].values,
-            'candle_high': high.iloc[pivot_indices].values, # Get original high
-            'candle_low': low.iloc[pivot_indices].values   # Get original low
-        })
-
-        grouped_zones_list = []
-        current_zone_pivots_df = pd.DataFrame()
-
-        for i, pivot in pivot_df.iterrows():
-            if current_zone_pivots_df.empty:
-                current_zone_pivots_df = pd.concat([current_zone_pivots_df, pivot.to_frame().T])
-                # print(f"DEBUG group_pivots ({zone_type}): Started zone with pivot {i} @ {pivot['timestamp']}") # DEBUG
-                continue
-
-            # Get the last pivot in the current zone
-            last_pivot_in_zone = current_zone_pivots_df.iloc[-1]
-            last_pivot_price = last_pivot_in_zone['price']
-
-            # Calculate proximity threshold based on the last pivot's price
-            proximity_threshold_abs = last_pivot_price * zone_merge_proximity
-
-            # Check if the new pivot's price is close to the last pivot's price
-            is_close = abs(pivot['price'] - last_pivot_price) <= proximity_threshold_abs
-
-            if is_close:
-                current_zone_pivots_df = pd.concat([current_zone_pivots_df, pivot.to_frame().T])
-                # print(f"DEBUG group_pivots ({zone_type}): Added pivot {i} @ {pivot['timestamp']} to zone. Size: {len(current_zone_pivots_df)}") # DEBUG
-            else:
-                # Finalize the previous zone if it's valid (enough strength)
-                if not current_zone_pivots_df.empty:
-                    if len(current_zone_pivots_df) >= min_zone_strength:
-                        grouped_zones_list.append(current_zone_pivots_df)
-                    else:
-                        pass # Discard zone silently or log if needed
-                # Start a new zone with the current pivot
-                current_zone_pivots_df = pivot.to_frame().T
-                # print(f"DEBUG group_pivots ({zone_type}): Started NEW zone with pivot {i} @ {pivot['timestamp']} (Not close)") # DEBUG
-
-        # Add the last processed zone if it's not empty and meets strength requirement
-        if not current_zone_pivots_df.empty and len(current_zone_pivots_df) >= min_zone_strength:
-            grouped_zones_list.append(current_zone_pivots_df)
-        elif not current_zone_pivots_df.empty:
-             pass # Discard zone silently or log if needed
-
-        # Process the grouped zones into the final format
-        final_zones_data = []
-        # print(f"DEBUG group_pivots ({zone_type}): Processing {len(grouped_zones_list)} grouped zones...") # DEBUG
-        for idx, zone_df in enumerate(grouped_zones_list):
-            first_pivot = zone_df.iloc[0]
-            last_pivot = zone_df.iloc[-1]
-            first_pivot_ts = first_pivot['timestamp']
-            last_pivot_ts = last_pivot['timestamp']
-            # Ensure frequency is available for calculation, otherwise fallback
-            zone_candles = 1 # Default if freq is None or calculation fails
-            if close.index.freq:
-                 try:
-                    zone_candles = (last_pivot_ts - first_pivot_ts).total_seconds() / (pd.Timedelta(close.index.freq).total_seconds()) + 1
-                 except AttributeError:
-                     # Fallback if freq.delta is not available (e.g., complex freq)
-                     zone_candles = len(close.loc[first_pivot_ts:last_pivot_ts])
-            else:
-                zone_candles = len(close.loc[first_pivot_ts:last_pivot_ts])
-
-            # print(f"DEBUG group_pivots ({zone_type}): Zone {idx} Candidate: Start={first_pivot_ts}, End={last_pivot_ts}, Strength={len(zone_df)}, Candles={zone_candles:.2f}") # DEBUG
-            if zone_candles >= min_zone_width_candles:
-                # Determine actual zone boundaries from the candles involved
-                zone_low = zone_df['candle_low'].min()
-                zone_high = zone_df['candle_high'].max()
-
-                # Determine start/end indices based on pivots
-                start_idx = first_pivot['timestamp']
-                # Extend the zone validity
-                end_idx_pivot = last_pivot['timestamp']
-                end_idx_loc = prices.index.get_loc(end_idx_pivot)
-                extended_end_loc = min(end_idx_loc + zone_extend_candles, len(prices) - 1)
-                end_idx_extended = prices.index[extended_end_loc]
-
-                final_zones_data.append({
-                    'zone_type': zone_type,
-                    'start_idx': start_idx,
-                    'end_idx': end_idx_extended, # Use extended end
-                    'first_pivot_idx': first_pivot['timestamp'],
-                    'last_pivot_idx': last_pivot['timestamp'],
-                    'low_price': zone_low,
-                    'high_price': zone_high,
-                    'strength': len(zone_df),
-                    'candles': zone_candles
-                })
-            else:
-                pass # Skip zone if width requirement not met
-
-        return final_zones_data
+    grouper = group_pivots_reference if use_reference else group_pivots
+    group_kwargs = dict(
+        close=close, high=high, low=low,
+        zone_merge_proximity=zone_merge_proximity,
+        min_zone_width_candles=min_zone_width_candles,
+        min_zone_strength=min_zone_strength,
+        zone_extend_candles=zone_extend_candles
+    )
 
     # Group supply and demand pivots
-    supply_zones_list = group_pivots(supply_pivots_idx, high, 'supply') # Use high prices for supply pivots
-    demand_zones_list = group_pivots(demand_pivots_idx, low, 'demand') # Use low prices for demand pivots
+    supply_zones_list = grouper(supply_pivots_idx, high, 'supply', **group_kwargs) # Use high prices for supply pivots
+    demand_zones_list = grouper(demand_pivots_idx, low, 'demand', **group_kwargs) # Use low prices for demand pivots
 
     # Combine and format into DataFrame
     all_zones = pd.DataFrame(supply_zones_list + demand_zones_list)
 
     if all_zones.empty:
-        return pd.DataFrame(columns=[
-            'zone_type', 'start_idx', 'end_idx', 'first_pivot_idx',
-            'last_pivot_idx', 'low_price', 'high_price', 'strength', 'candles'
-        ])
+        return pd.DataFrame(columns=ZONE_COLUMNS)
 
     all_zones = all_zones.sort_values(by='start_idx').reset_index(drop=True)
 
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test checkpointed runs: recording units, manifests, and resuming a run killed mid-split.
+"""
+import os
+import sys
+import time
+import signal
+import multiprocessing as mp
+
+import pytest
+import pandas as pd
+import numpy as np
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from scripts.strategies.refactored_edge.checkpoint import (
+    CheckpointStore, make_run_id, resolve_checkpoint_store, DEFAULT_CHECKPOINT_DIR, PROJECT_ROOT,
+    STATUS_COMPLETE, STATUS_RUNNING
+)
+from scripts.strategies.refactored_edge.indicator_cache import fingerprint_data
+from scripts.strategies.refactored_edge.split_scheduler import run_splits
+
+N_ROWS, TRAIN_POINTS, TEST_POINTS, STEP_POINTS = 3000, 1000, 250, 250
+WINDOWS = [10, 20, 40, 80]
+KILL_SPLIT = 3
+
+
+def _price_data():
+    rng = np.random.default_rng(5)
+    index = pd.date_range('2024-01-01', periods=N_ROWS, freq='1h', tz='UTC')
+    return pd.DataFrame({'close': 100 * np.exp(rng.normal(0, 0.01, N_ROWS).cumsum())}, index=index)
+
+
+def _splits():
+    return [(range(s, s + TRAIN_POINTS), range(s + TRAIN_POINTS, s + TRAIN_POINTS + TEST_POINTS))
+            for s in range(0, N_ROWS - TRAIN_POINTS - TEST_POINTS + 1, STEP_POINTS)]
+
+
+def _score(close, window):
+    # Moving-average trend filter: returns of the bars where close was above its MA
+    returns = close.pct_change().shift(-1)
+    return float(returns[close > close.rolling(window).mean()].sum())
+
+
+def _run_checkpointed_wfo(directory, split_workers=1, kill_split=None, ran=None):
+    """WFO-style run wired like run_wfo: splits recorded as they finish, completed splits skipped."""
+    price_data = _price_data()
+    splits = _splits()
+    checkpoint = CheckpointStore(directory).open_run('wfo', {
+        'data': fingerprint_data(price_data), 'windows': WINDOWS,
+        'splits': [(train.start, train.stop, test.start, test.stop) for train, test in splits],
+    })
+
+    def split_fn(split_num):
+        if ran is not None:
+            ran.append(split_num)
+        train, test = (price_data['close'].iloc[indices] for indices in splits[split_num])
+        scores = {window: _score(train, window) for window in WINDOWS}
+        if split_num == kill_split:
+            # Concurrent splits may still be running; let the earlier ones be recorded first
+            deadline = time.monotonic() + 30
+            while not set(range(kill_split)) <= set(checkpoint.completed('split')) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            # Die mid-split, after the training grid and before the split is recorded
+            os.kill(os.getpid(), signal.SIGKILL)
+        best = max(scores, key=scores.get)
+        return {'split': split_num + 1, 'best_window': best, 'train_score': scores[best],
+                'test_score': _score(test, best)}
+
+    results = run_splits(checkpoint.wrap('split', split_fn), range(len(splits)), split_workers=split_workers,
+                         completed=checkpoint.completed('split'))
+    checkpoint.finish()
+    return results
+
+
+def test_store_records_units_and_manifests(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    identity = {'symbol': 'BTC-USD', 'start': pd.Timestamp('2024-01-01'), 'splits': [(0, 10, 10, 15)]}
+    run = store.open_run('wfo', identity)
+    assert run.run_id == make_run_id('wfo', **identity) != make_run_id('wfo', **dict(identity, symbol='ETH-USD'))
+    assert run.completed('split') == {} and run.status == STATUS_RUNNING
+
+    run.record('split', 1, ({'split': 2}, None, {'rsi_window': 14}))
+    run.record('split', 0, ({'split': 1}, None, None))
+    run.record('trial', 0, {'value': 1.5})
+    run.save_manifest('data', {'rows': 10})
+    cache_dir = run.cache_dir('indicator_cache')
+    with open(os.path.join(cache_dir, 'entry.pkl'), 'wb') as f:
+        f.write(b'12345')
+    assert run.save_cache_manifest('indicator_cache')['files'] == ['entry.pkl']
+    run.finish()
+
+    # A new store on the same directory (a restarted process) sees everything
+    reopened = CheckpointStore(str(tmp_path)).open_run('wfo', identity)
+    assert reopened.status == STATUS_COMPLETE
+    assert reopened.completed('split') == {1: ({'split': 2}, None, {'rsi_window': 14}), 0: ({'split': 1}, None, None)}
+    assert reopened.completed('trial') == {0: {'value': 1.5}}
+    assert reopened.load_manifest('data') == {'rows': 10}
+    assert reopened.load_manifest('indicator_cache')['bytes'] == 5
+    assert [run['n_units'] for run in store.runs('wfo')] == [3]
+
+    store.delete_run(run.run_id)
+    assert store.runs() == [] and not os.path.exists(cache_dir)
+    assert resolve_checkpoint_store(None) is None and resolve_checkpoint_store(store) is store
+
+
+def test_default_directory_does_not_depend_on_cwd():
+    assert os.path.isabs(DEFAULT_CHECKPOINT_DIR)
+    if 'CHECKPOINT_DIR' not in os.environ:
+        assert DEFAULT_CHECKPOINT_DIR == os.path.join(PROJECT_ROOT, 'data', 'checkpoints')
+    assert os.path.isfile(os.path.join(PROJECT_ROOT, 'scripts', 'strategies', 'refactored_edge', 'checkpoint.py'))
+
+
+def test_wrap_falls_back_to_encoded_result(tmp_path):
+    run = CheckpointStore(str(tmp_path)).open_run('wfo', {})
+    wrapped = run.wrap('split', lambda num: ({'split': num}, lambda: None, {}),
+                       encode=lambda result: (result[0], None, result[2]))
+    result = wrapped(0)
+    # The caller gets the full result; the checkpoint holds the picklable part
+    assert callable(result[1])
+    assert run.completed('split') == {0: ({'split': 0}, None, {})}
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGKILL') or 'fork' not in mp.get_all_start_methods(),
+                    reason="needs SIGKILL and fork")
+@pytest.mark.parametrize('split_workers', [1, 3])
+def test_run_killed_mid_split_resumes_with_identical_results(tmp_path, split_workers):
+    reference = _run_checkpointed_wfo(str(tmp_path / 'reference'))
+    assert len(reference) == len(_splits()) > KILL_SPLIT
+
+    directory = str(tmp_path / 'interrupted')
+    process = mp.get_context('fork').Process(target=_run_checkpointed_wfo,
+                                             args=(directory, split_workers, KILL_SPLIT))
+    process.start()
+    process.join(60)
+    assert process.exitcode == -signal.SIGKILL
+
+    store = CheckpointStore(directory)
+    [run] = store.runs('wfo')
+    assert run['status'] == STATUS_RUNNING
+    checkpoint = store.open_run('wfo', run['identity'])
+    recorded = set(checkpoint.completed('split'))
+    assert KILL_SPLIT not in recorded and set(range(KILL_SPLIT)) <= recorded
+
+    ran = []
+    resumed = _run_checkpointed_wfo(directory, split_workers, ran=ran)
+    assert resumed == reference
+    # Only the splits missing from the checkpoint ran again
+    assert sorted(ran) == sorted(set(range(len(reference))) - recorded)
+    assert checkpoint.status == STATUS_COMPLETE
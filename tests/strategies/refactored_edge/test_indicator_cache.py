@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test the bounded, data-fingerprinted indicator cache used by WFO evaluation.
+"""
+import os
+import sys
+import pytest
+import pandas as pd
+import numpy as np
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from scripts.strategies.refactored_edge.indicator_cache import (
+    IndicatorCache, IndicatorStore, fingerprint_data, make_cache_key, estimate_nbytes
+)
+
+
+@pytest.fixture
+def price_data():
+    """Create a small OHLC DataFrame."""
+    np.random.seed(42)
+    index = pd.date_range('2024-01-01', periods=200, freq='1h')
+    close = 100 + np.random.randn(200).cumsum()
+    return pd.DataFrame({
+        'open': close + 0.1,
+        'high': close + 1.0,
+        'low': close - 1.0,
+        'close': close
+    }, index=index)
+
+
+def test_fingerprint_differs_between_slices(price_data):
+    """Different slices of the same history must not share a fingerprint."""
+    assert fingerprint_data(price_data.iloc[:100]) != fingerprint_data(price_data.iloc[50:150])
+    assert fingerprint_data(price_data.iloc[:100]) == fingerprint_data(price_data.iloc[:100].copy())
+
+
+def test_cache_key_ignores_non_indicator_params(price_data):
+    """Signal thresholds do not change the indicator cache key, windows do."""
+    fp = fingerprint_data(price_data)
+    base = {'rsi_window': 14, 'bb_window': 20, 'rsi_entry_threshold': 30}
+    assert make_cache_key(base, fp) == make_cache_key({**base, 'rsi_entry_threshold': 40}, fp)
+    assert make_cache_key(base, fp) != make_cache_key({**base, 'rsi_window': 21}, fp)
+    assert make_cache_key(base, fp) != make_cache_key(base, fingerprint_data(price_data.iloc[1:]))
+
+
+def test_lru_eviction_by_entries(price_data):
+    """Least recently used entries are evicted once max_entries is exceeded."""
+    cache = IndicatorCache(max_entries=2)
+    cache.put('a', price_data)
+    cache.put('b', price_data)
+    assert cache.get('a') is not None  # 'a' becomes most recently used
+    cache.put('c', price_data)
+
+    assert 'b' not in cache
+    assert 'a' in cache and 'c' in cache
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['hits'] == 1
+
+
+def test_eviction_by_bytes(price_data):
+    """Total size stays under max_bytes."""
+    nbytes = estimate_nbytes(price_data)
+    cache = IndicatorCache(max_entries=100, max_bytes=int(nbytes * 2.5))
+    for key in ['a', 'b', 'c', 'd']:
+        cache.put(key, price_data)
+
+    assert len(cache) == 2
+    assert cache.total_bytes <= cache.max_bytes
+    assert cache.stats()['evictions'] == 2
+
+
+def test_get_or_compute_counts_hits_and_misses(price_data):
+    """Computation runs only on the first lookup."""
+    cache = IndicatorCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return price_data
+
+    cache.get_or_compute('key', compute)
+    cache.get_or_compute('key', compute)
+
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['hit_rate'] == pytest.approx(0.5)
+
+
+def test_disk_tier_shared_between_instances(price_data, tmp_path):
+    """An entry written by one cache is visible to another pointed at the same directory."""
+    writer = IndicatorCache(disk_dir=str(tmp_path))
+    reader = IndicatorCache(disk_dir=str(tmp_path))
+
+    writer.put('shared', price_data)
+    result = reader.get('shared')
+
+    assert result is not None
+    pd.testing.assert_frame_equal(result, price_data)
+    assert reader.stats()['disk_hits'] == 1
+
+
+def test_indicator_store_computes_each_variant_once(price_data):
+    """Each indicator variant is computed once per dataset and reused afterwards."""
+    store = IndicatorStore()
+    fp = fingerprint_data(price_data)
+    calls = {}
+
+    def rolling_mean(window):
+        def compute():
+            calls[window] = calls.get(window, 0) + 1
+            return price_data['close'].rolling(window).mean()
+        return compute
+
+    for window in [10, 20, 10, 20, 10]:
+        store.get(fp, store.make_spec('ma', window), rolling_mean(window))
+
+    assert calls == {10: 1, 20: 1}
+    assert store.make_spec('bbands', 20, 2.0) == 'bbands@20,2.0'
+
+    # A different dataset does not reuse the columns
+    other_fp = fingerprint_data(price_data.iloc[10:])
+    store.get(other_fp, store.make_spec('ma', 10), rolling_mean(10))
+    assert calls[10] == 2
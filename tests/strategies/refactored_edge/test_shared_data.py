@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test the shared-memory dataset registry used to hand training data to optimizer workers.
+"""
+import os
+import sys
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+import pandas as pd
+import numpy as np
+from joblib import Parallel, delayed
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from scripts.strategies.refactored_edge.indicator_cache import fingerprint_data, make_cache_key
+from scripts.strategies.refactored_edge.shared_data import DatasetRegistry, resolve_dataset
+
+
+@pytest.fixture
+def price_data():
+    """OHLCV frame with a tz-aware DatetimeIndex and mixed column dtypes."""
+    np.random.seed(7)
+    n = 5000
+    index = pd.date_range('2024-01-01', periods=n, freq='1h', tz='UTC', name='timestamp')
+    close = 100 + np.random.randn(n).cumsum()
+    return pd.DataFrame({
+        'open': close + 0.1,
+        'high': close + 1.0,
+        'low': close - 1.0,
+        'close': close,
+        'volume': np.random.randint(1, 1000, n),
+        'is_up': np.random.rand(n) > 0.5,
+    }, index=index)
+
+
+def _worker_summary(data, params):
+    frame = resolve_dataset(data)
+    # Tasks may add columns to their frame without affecting other tasks in the worker
+    frame['sma'] = frame['close'].rolling(params['window']).mean()
+    return params['window'], float(frame['sma'].iloc[-1]), list(frame.columns), fingerprint_data(frame.drop(columns='sma'))
+
+
+def _count_row_hashes(fn):
+    """Run fn() and return (result, number of hash_pandas_object calls it made)."""
+    calls = []
+    original = pd.util.hash_pandas_object
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return original(*args, **kwargs)
+
+    pd.util.hash_pandas_object = counting
+    try:
+        return fn(), len(calls)
+    finally:
+        pd.util.hash_pandas_object = original
+
+
+def _task_cache_key(handle, params):
+    # What an optimizer task does before computing indicators: resolve, then build the cache key
+    frame = resolve_dataset(handle)
+    return _count_row_hashes(lambda: make_cache_key(params, fingerprint_data(frame)))
+
+
+def test_round_trip_is_zero_copy(price_data):
+    with DatasetRegistry() as registry:
+        handle = registry.register(price_data, arrays={'rsi@14': price_data['close'].diff().to_numpy()})
+        assert len(pickle.dumps(handle)) < 2000 < len(pickle.dumps(price_data))
+        assert registry.register(price_data) is handle
+
+        first, second = resolve_dataset(handle), resolve_dataset(handle)
+        pd.testing.assert_frame_equal(first, price_data)
+        assert first.index.freqstr == 'h' and str(first.index.tz) == 'UTC'
+        # Both frames view the same mapped memory, and writes stay private to the frame
+        assert np.shares_memory(first['close'].to_numpy(), second['close'].to_numpy())
+        first.loc[first.index[0], 'close'] = -1.0
+        assert second['close'].iloc[0] == price_data['close'].iloc[0]
+        np.testing.assert_array_equal(handle.array('rsi@14'), price_data['close'].diff().to_numpy())
+
+        assert fingerprint_data(second) == fingerprint_data(price_data)
+        directory = registry.directory
+    assert not os.path.exists(directory)
+
+
+def test_unsupported_columns_raise(price_data):
+    with DatasetRegistry() as registry:
+        with pytest.raises(TypeError):
+            registry.register(price_data.assign(symbol='BTC-USD'))
+    assert resolve_dataset(price_data) is price_data
+
+
+@pytest.mark.parametrize("backend", ["joblib", "process_pool"])
+def test_workers_see_the_same_data(price_data, backend):
+    windows = [5, 10, 20, 50]
+    expected = {w: float(price_data['close'].rolling(w).mean().iloc[-1]) for w in windows}
+    with DatasetRegistry() as registry:
+        handle = registry.register(price_data)
+        if backend == "joblib":
+            results = Parallel(n_jobs=2)(delayed(_worker_summary)(handle, {'window': w}) for w in windows)
+        else:
+            with ProcessPoolExecutor(max_workers=2) as pool:
+                results = list(pool.map(_worker_summary, [handle] * len(windows), [{'window': w} for w in windows]))
+    for window, last_sma, columns, fingerprint in results:
+        assert last_sma == pytest.approx(expected[window])
+        assert columns == list(price_data.columns) + ['sma']
+        assert fingerprint == handle.fingerprint
+
+
+def test_tasks_do_not_rehash_shared_data(price_data):
+    with DatasetRegistry() as registry:
+        handle = registry.register(price_data)
+        results = Parallel(n_jobs=2)(delayed(_task_cache_key)(handle, {'rsi_window': w}) for w in (7, 14, 21))
+    assert [calls for _, calls in results] == [0, 0, 0]
+    assert [key for key, _ in results] == [make_cache_key({'rsi_window': w}, handle.fingerprint) for w in (7, 14, 21)]
+
+
+def test_evaluation_passes_the_resolved_frame_through(price_data, monkeypatch):
+    wfo_evaluation = pytest.importorskip('scripts.strategies.refactored_edge.wfo_evaluation')
+    seen = []
+
+    def fake_cached_indicators(data, params):
+        seen.append(data)
+        # No indicator columns: evaluate_with_params stops right after this call
+        return data
+
+    monkeypatch.setattr(wfo_evaluation, 'get_cached_indicators', fake_cached_indicators)
+    with DatasetRegistry() as registry:
+        frame = resolve_dataset(registry.register(price_data))
+        _, calls = _count_row_hashes(lambda: wfo_evaluation.get_cache_key({'rsi_window': 14}, frame))
+        wfo_evaluation.evaluate_with_params(frame, {'rsi_window': 14, 'bb_window': 20})
+    assert calls == 0
+    assert len(seen) == 1 and seen[0] is frame
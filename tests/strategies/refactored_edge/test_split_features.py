@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test reuse of full-series indicators and regime labels across overlapping WFO splits.
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+import pandas as pd
+import numpy as np
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from scripts.strategies.refactored_edge.indicator_cache import IndicatorStore, fingerprint_data, find_window, clear_windows
+from scripts.strategies.refactored_edge.regime import determine_market_regime_advanced
+from scripts.strategies.refactored_edge.shared_data import DatasetRegistry, resolve_dataset
+from scripts.strategies.refactored_edge.split_features import SplitFeatures, warmup_bars
+
+PARAMS = {'rsi_window': 14, 'bb_window': 20, 'trend_ma_window': 50, 'atr_window': 14, 'adx_window': 14,
+          'momentum_lookback': 5}
+TRAIN_POINTS, TEST_POINTS, STEP_POINTS = 900, 200, 200
+
+
+@pytest.fixture
+def price_data():
+    """Hourly OHLC random walk."""
+    np.random.seed(11)
+    n = 2500
+    index = pd.date_range('2024-01-01', periods=n, freq='1h', tz='UTC')
+    close = 100 * np.exp(np.random.randn(n).cumsum() * 0.01)
+    return pd.DataFrame({
+        'open': close * (1 + np.random.randn(n) * 0.001),
+        'high': close * (1 + np.abs(np.random.randn(n)) * 0.004),
+        'low': close * (1 - np.abs(np.random.randn(n)) * 0.004),
+        'close': close,
+    }, index=index)
+
+
+def _splits(n):
+    return [(range(s, s + TRAIN_POINTS), range(s + TRAIN_POINTS, s + TRAIN_POINTS + TEST_POINTS))
+            for s in range(0, n - TRAIN_POINTS - TEST_POINTS + 1, STEP_POINTS)]
+
+
+def _wilder(series, window):
+    return series.ewm(alpha=1.0 / window, adjust=False).mean()
+
+
+def _indicators(frame, params=PARAMS):
+    """Causal indicators: rolling (SMA, Bollinger) and Wilder-smoothed (RSI, ATR, DI/ADX)."""
+    close, high, low = frame['close'], frame['high'], frame['low']
+    delta = close.diff()
+    gain = _wilder(delta.clip(lower=0), params['rsi_window'])
+    loss = _wilder(-delta.clip(upper=0), params['rsi_window'])
+    true_range = pd.concat([high - low, (high - close.shift()).abs(), (low - close.shift()).abs()], axis=1).max(axis=1)
+    atr = _wilder(true_range, params['atr_window'])
+    up, down = high.diff(), -low.diff()
+    plus_dm = up.where((up > down) & (up > 0), 0.0)
+    minus_dm = down.where((down > up) & (down > 0), 0.0)
+    dm_atr = _wilder(true_range, params['adx_window'])
+    plus_di = 100 * _wilder(plus_dm, params['adx_window']) / dm_atr
+    minus_di = 100 * _wilder(minus_dm, params['adx_window']) / dm_atr
+    adx = _wilder(100 * (plus_di - minus_di).abs() / (plus_di + minus_di), params['adx_window'])
+    mid = close.rolling(params['bb_window']).mean()
+    std = close.rolling(params['bb_window']).std()
+    return pd.DataFrame({
+        'rsi': 100 - 100 / (1 + gain / loss),
+        'bb_upper': mid + 2 * std,
+        'bb_lower': mid - 2 * std,
+        'trend_ma': close.rolling(params['trend_ma_window']).mean(),
+        'atr': atr, 'adx': adx, 'plus_di': plus_di, 'minus_di': minus_di,
+    }, index=frame.index)
+
+
+def _regimes(frame):
+    ind = _indicators(frame)
+    return determine_market_regime_advanced(ind['adx'], ind['plus_di'], ind['minus_di'], ind['atr'], frame['close'],
+                                            momentum_lookback=PARAMS['momentum_lookback'])
+
+
+def _signals(frame, ind):
+    long_entries = (ind['rsi'] < 35) & (frame['close'] < ind['bb_lower'] * 1.01) & (frame['close'] > ind['trend_ma'] * 0.97)
+    short_entries = (ind['rsi'] > 65) & (frame['close'] > ind['bb_upper'] * 0.99)
+    return long_entries, short_entries
+
+
+def test_windows_are_views_computed_once_without_look_ahead(price_data):
+    store = IndicatorStore()
+    calls = []
+
+    def compute(frame):
+        calls.append(len(frame))
+        return _indicators(frame)
+
+    with SplitFeatures(price_data, warmup=warmup_bars([PARAMS])) as features:
+        for train_indices, test_indices in _splits(len(price_data)):
+            for indices in (train_indices, test_indices):
+                window = features.window(indices)
+                assert np.shares_memory(window['close'].to_numpy(), price_data['close'].to_numpy())
+                # Copies of the window (as evaluation makes) are recognised by content
+                copy = window.copy()
+                result = store.get_causal(copy, fingerprint_data(copy), 'all@default', compute)
+                # Values only use bars up to the end of the window
+                truncated = _indicators(price_data.iloc[:indices.stop]).iloc[indices.start:]
+                pd.testing.assert_frame_equal(result, truncated)
+        assert calls == [len(price_data)]
+        fingerprint = fingerprint_data(features.window(range(0, 10)))
+    assert find_window(fingerprint) is None
+
+
+def test_split_results_match_per_split_computation_after_warmup(price_data):
+    warmup = warmup_bars([PARAMS])
+    assert 0 < warmup < TRAIN_POINTS
+    store = IndicatorStore()
+    with SplitFeatures(price_data, warmup=warmup) as features:
+        for train_indices, _ in _splits(len(price_data)):
+            per_split_data = price_data.iloc[train_indices].copy()
+            per_split = _indicators(per_split_data)
+            per_split_regimes = _regimes(per_split_data)
+
+            train_data = features.window(train_indices)
+            shared = store.get_causal(train_data, fingerprint_data(train_data), 'all@default', _indicators)
+            shared_regimes = features.regime_labels(train_indices, 'default', _regimes)
+
+            after = slice(warmup, None)
+            np.testing.assert_allclose(shared.iloc[after].to_numpy(), per_split.iloc[after].to_numpy(), rtol=1e-8)
+            for shared_signal, split_signal in zip(_signals(train_data, shared), _signals(per_split_data, per_split)):
+                pd.testing.assert_series_equal(shared_signal.iloc[after], split_signal.iloc[after])
+            pd.testing.assert_series_equal(shared_regimes.iloc[after], per_split_regimes.iloc[after])
+            if train_indices.start == 0:
+                # The first split has no earlier history, so nothing changes at all
+                pd.testing.assert_frame_equal(shared, per_split)
+
+
+def _worker_window(handle):
+    # Forget windows inherited from the parent; resolving the handle must register it
+    clear_windows()
+    frame = resolve_dataset(handle)
+    window = find_window(fingerprint_data(frame.copy()))
+    return len(frame), (window.start, window.stop, len(window.data)) if window else None
+
+
+def test_shared_window_handles_reference_the_full_series(price_data):
+    train_indices, test_indices = _splits(len(price_data))[1]
+    with SplitFeatures(price_data) as features, DatasetRegistry() as registry:
+        train_handle = registry.register(features.window(train_indices))
+        test_handle = registry.register(features.window(test_indices))
+        # Both windows share one copy of the full series
+        assert train_handle.blocks == test_handle.blocks and len(registry) == 3
+        assert train_handle.row_range == (train_indices.start, train_indices.stop)
+        pd.testing.assert_frame_equal(resolve_dataset(train_handle), price_data.iloc[train_indices])
+
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            n_rows, window = pool.submit(_worker_window, test_handle).result()
+    assert n_rows == TEST_POINTS
+    assert window == (test_indices.start, test_indices.stop, len(price_data))
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test two-level scheduling of walk-forward splits and resuming from interim results.
+"""
+import os
+import sys
+import time
+import threading
+
+import pytest
+import pandas as pd
+import numpy as np
+from joblib import Parallel, delayed
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from scripts.strategies.refactored_edge.split_scheduler import plan_split_budget, run_splits
+from scripts.strategies.refactored_edge.wfo_results import (
+    save_interim_results, load_interim_results, match_interim_results, parse_best_params
+)
+
+
+def _square_with_pid(x):
+    return x * x, os.getpid()
+
+
+def test_plan_split_budget_shares_one_worker_pool():
+    # Small grids: run enough splits to give 4 workers 2 tasks each
+    assert plan_split_budget(4, n_splits=12, n_combinations=2).split_workers == 4
+    assert plan_split_budget(4, n_splits=12, n_combinations=3).split_workers == 3
+    # Large grids fill the pool on their own
+    assert plan_split_budget(4, n_splits=12, n_combinations=500).split_workers == 1
+    # Explicit request, capped by splits and workers; the grid always gets the whole pool
+    budget = plan_split_budget(4, n_splits=2, n_combinations=500, split_jobs=8)
+    assert (budget.split_workers, budget.inner_jobs, budget.n_workers) == (2, 4, 4)
+    assert plan_split_budget(1, n_splits=12, n_combinations=1).split_workers == 1
+
+
+def test_run_splits_delivers_in_split_order_with_bounded_concurrency():
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0}
+    calls = []
+
+    def split_fn(split_num):
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+            calls.append(split_num)
+        # Later splits finish first
+        time.sleep(0.02 * (8 - split_num))
+        with lock:
+            state['running'] -= 1
+        return split_num * 10
+
+    delivered = []
+    results = run_splits(split_fn, range(8), split_workers=3,
+                         on_result=lambda num, result, resumed: delivered.append((num, result, resumed)),
+                         completed={0: 0, 2: 20})
+    assert results == [n * 10 for n in range(8)]
+    assert delivered == [(n, n * 10, n in (0, 2)) for n in range(8)]
+    assert sorted(calls) == [1, 3, 4, 5, 6, 7]
+    assert state['peak'] == 3
+
+
+def test_run_splits_propagates_errors():
+    def split_fn(split_num):
+        if split_num == 1:
+            raise ValueError("split failed")
+        return split_num
+
+    with pytest.raises(ValueError):
+        run_splits(split_fn, range(4), split_workers=2)
+
+
+def test_concurrent_splits_share_the_worker_pool():
+    def split_fn(split_num):
+        outputs = Parallel(n_jobs=2, batch_size=1)(delayed(_square_with_pid)(split_num * 10 + i) for i in range(4))
+        return [value for value, _ in outputs], {pid for _, pid in outputs}
+
+    results = run_splits(split_fn, range(4), split_workers=4)
+    assert [values for values, _ in results] == [[(n * 10 + i) ** 2 for i in range(4)] for n in range(4)]
+    # Every split's grid ran on the same two worker processes
+    assert len(set.union(*(pids for _, pids in results))) <= 2
+
+
+def test_resume_matches_interim_results_by_run_and_split_boundaries(tmp_path):
+    index = pd.date_range('2024-01-01', periods=100, freq='1h', tz='UTC')
+    price_data = pd.DataFrame({'close': np.arange(100.0)}, index=index)
+    splits = [(range(s, s + 40), range(s + 40, s + 60)) for s in (0, 20, 40)]
+
+    def result(split_num, params):
+        train_indices, test_indices = splits[split_num]
+        return {'split': split_num + 1,
+                'train_start': index[train_indices[0]], 'train_end': index[train_indices[-1]],
+                'test_start': index[test_indices[0]], 'test_end': index[test_indices[-1]],
+                'best_params': str(params), 'test_sharpe': 1.5 if params else np.nan,
+                'regime_breakdown': {'trending': {'sharpe': 0.5}}}
+
+    save_interim_results([result(0, {'rsi_window': 14}), result(1, {})], 2, output_dir=str(tmp_path),
+                         run_id='wfo-btc')
+    loaded = load_interim_results(output_dir=str(tmp_path))
+    assert loaded[0]['regime_breakdown'] == {'trending': {'sharpe': 0.5}}
+
+    matched = match_interim_results(loaded, price_data, splits, run_id='wfo-btc')
+    assert sorted(matched) == [0, 1] and 'run_id' not in matched[0]
+    assert matched[0]['train_start'] == index[0] and matched[0]['test_sharpe'] == 1.5
+    assert parse_best_params(matched[0]['best_params']) == {'rsi_window': 14}
+    assert parse_best_params(matched[1]['best_params']) is None
+
+    # Different split boundaries (e.g. another step size) are not reused
+    shifted = [(range(s + 1, s + 41), range(s + 41, s + 61)) for s in (0, 20, 40)]
+    assert match_interim_results(loaded, price_data, shifted, run_id='wfo-btc') == {}
+    # Same dates from another run (other symbol, grid or config) are not reused either
+    assert match_interim_results(loaded, price_data, splits, run_id='wfo-eth') == {}
+    save_interim_results([result(0, {'rsi_window': 14})], 1, output_dir=str(tmp_path))
+    assert match_interim_results(load_interim_results(output_dir=str(tmp_path)), price_data, splits,
+                                 run_id='wfo-btc') == {}
+    assert load_interim_results(output_dir=str(tmp_path / 'missing')) == []
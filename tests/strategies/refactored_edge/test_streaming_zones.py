@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test the incremental zone engine against the batch zone functions.
+"""
+import os
+import sys
+import pytest
+import pandas as pd
+import numpy as np
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from scripts.strategies.refactored_edge.zones import find_pivot_zones, add_zone_signals
+from scripts.strategies.refactored_edge.streaming_zones import StreamingZoneEngine
+
+ZONE_PARAMS = {
+    'pivot_lookback': 5,
+    'pivot_prominence': 0.01,
+    'zone_merge_proximity': 0.01,
+    'min_zone_width_candles': 3,
+    'min_zone_strength': 2,
+    'zone_extend_candles': 30
+}
+ZONE_PROXIMITY_PCT = 0.01
+
+
+def make_ohlc(n=1500, seed=0, decimals=None):
+    """Create random-walk OHLC candles, optionally rounded to create plateaus and ties."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2023-01-01', periods=n, freq='1h')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.005, n)))
+    high = close + rng.uniform(0.1, 1.0, n)
+    low = close - rng.uniform(0.1, 1.0, n)
+    if decimals is not None:
+        close, high, low = np.round(close, decimals), np.round(high, decimals), np.round(low, decimals)
+    return pd.DataFrame({'close': close, 'high': high, 'low': low}, index=index)
+
+
+def batch_zones(ohlc, **overrides):
+    params = dict(ZONE_PARAMS, **overrides)
+    return find_pivot_zones(ohlc['close'], ohlc['high'], ohlc['low'], **params)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("decimals", [None, 1, 0])
+def test_streamed_zones_and_flags_match_batch(seed, decimals):
+    """After streaming all candles, zones and flags equal the batch result on the same data."""
+    ohlc = make_ohlc(seed=seed, decimals=decimals)
+    engine = StreamingZoneEngine(zone_proximity_pct=ZONE_PROXIMITY_PCT, **ZONE_PARAMS)
+    engine.update_many(ohlc)
+
+    zones = batch_zones(ohlc)
+    pd.testing.assert_frame_equal(engine.zones(), zones, check_dtype=False)
+    pd.testing.assert_frame_equal(
+        engine.flags(),
+        add_zone_signals(ohlc['close'], zones, ZONE_PROXIMITY_PCT),
+        check_freq=False
+    )
+
+
+@pytest.mark.parametrize("pivot_lookback", [1, 5, 20])
+def test_live_flags_match_batch_on_each_prefix(pivot_lookback):
+    """The flags emitted per candle are the last row of the batch flags on the history so far."""
+    ohlc = make_ohlc(n=300, seed=3, decimals=1)
+    engine = StreamingZoneEngine(zone_proximity_pct=ZONE_PROXIMITY_PCT,
+                                 **dict(ZONE_PARAMS, pivot_lookback=pivot_lookback))
+    live = engine.update_many(ohlc)
+
+    for t in range(len(ohlc)):
+        prefix = ohlc.iloc[:t + 1]
+        expected = add_zone_signals(prefix['close'], batch_zones(prefix, pivot_lookback=pivot_lookback),
+                                    ZONE_PROXIMITY_PCT).iloc[-1]
+        assert live['price_in_demand_zone'].iloc[t] == expected['price_in_demand_zone'], t
+        assert live['price_in_supply_zone'].iloc[t] == expected['price_in_supply_zone'], t
+
+
+def test_update_returns_flags_for_latest_candle():
+    """update() returns both flags and the engine tracks the number of candles."""
+    ohlc = make_ohlc(n=50)
+    engine = StreamingZoneEngine(zone_proximity_pct=ZONE_PROXIMITY_PCT, **ZONE_PARAMS)
+    for ts, row in ohlc.iterrows():
+        flags = engine.update(ts, row['high'], row['low'], row['close'])
+
+    assert set(flags) == {'price_in_demand_zone', 'price_in_supply_zone'}
+    assert len(engine) == 50
+
+
+def test_invalid_pivot_lookback_raises():
+    """pivot_lookback below 1 is rejected like find_peaks rejects distance < 1."""
+    with pytest.raises(ValueError):
+        StreamingZoneEngine(zone_proximity_pct=ZONE_PROXIMITY_PCT, **dict(ZONE_PARAMS, pivot_lookback=0))
+
+
+if __name__ == "__main__":
+    pytest.main(["-xvs", __file__])
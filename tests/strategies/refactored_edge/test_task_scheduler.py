@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test chunked, cache-affine scheduling of parameter grid evaluation.
+"""
+import os
+import sys
+import itertools
+
+import pytest
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from scripts.strategies.refactored_edge.indicator_cache import IndicatorCache, make_cache_key
+from scripts.strategies.refactored_edge.task_scheduler import plan_chunks, run_chunks
+
+# Per-process cache standing in for the worker's indicator cache
+_worker_cache = IndicatorCache(max_entries=1024)
+
+
+def _evaluate(params, offset):
+    indicator = _worker_cache.get_or_compute(make_cache_key(params), lambda: params['rsi_window'] * 10)
+    return indicator + params['rsi_entry'] + offset
+
+
+def _counters():
+    return _worker_cache.stats()
+
+
+def _grid():
+    return [{'rsi_window': w, 'bb_window': b, 'rsi_entry': e}
+            for w, b, e in itertools.product([7, 14, 21], [10, 20], range(8))]
+
+
+def test_plan_chunks_covers_every_item_and_keeps_groups_together():
+    keys = [make_cache_key(p) for p in _grid()]
+    chunks = plan_chunks(keys, n_workers=2)
+    positions = sorted(p for chunk in chunks for p in chunk)
+    assert positions == list(range(len(keys)))
+    # Guided sizes shrink as work runs out
+    sizes = [len(c) for c in chunks]
+    assert sizes[0] > sizes[-1] and len(chunks) >= 2 * 2
+    # Each chunk boundary splits at most one group
+    pieces = {(i, keys[p]) for i, chunk in enumerate(chunks) for p in chunk}
+    assert len(pieces) <= len(set(keys)) + len(chunks) - 1
+
+    fixed = plan_chunks(keys, n_workers=2, chunk_size=8)
+    assert all(len({keys[p] for p in chunk}) == 1 for chunk in fixed)
+    assert plan_chunks([], n_workers=4) == []
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_run_chunks_preserves_order_and_reports_cache_hits(n_jobs):
+    grid = _grid()
+    expected = [p['rsi_window'] * 10 + p['rsi_entry'] + 1 for p in grid]
+    chunks = plan_chunks([make_cache_key(p) for p in grid], n_workers=n_jobs, chunk_size=8)
+    results, report = run_chunks(_evaluate, grid, chunks, n_jobs=n_jobs, args=(1,), counters_fn=_counters)
+
+    assert results == expected
+    assert report.n_tasks == len(grid) and report.n_chunks == 6
+    assert sum(w.tasks for w in report.workers.values()) == len(grid)
+    # One miss per indicator group at most (workers may also be warm from earlier runs)
+    assert sum(w.cache_misses for w in report.workers.values()) <= 6
+    assert report.cache_hit_rate >= 42 / 48
+    assert 0 < report.utilization <= 1.0 + 1e-6
+    assert "cache hit rate" in report.summary()
+    assert set(report.as_dict()['workers']) == set(report.workers)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test the array-based pivot grouping in find_pivot_zones against the original
+row-by-row implementation.
+"""
+import os
+import sys
+import pytest
+import pandas as pd
+import numpy as np
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from scripts.strategies.refactored_edge.zones import find_pivot_zones, select_by_peak_distance, ZONE_COLUMNS
+
+
+def make_prices(n=3000, seed=0, with_freq=True):
+    """Create random-walk close/high/low series."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2023-01-01', periods=n, freq='1h')
+    if not with_freq:
+        index = pd.DatetimeIndex(index.values)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.005, n)))
+    high = close + rng.uniform(0.1, 1.0, n)
+    low = close - rng.uniform(0.1, 1.0, n)
+    return pd.Series(close, index), pd.Series(high, index), pd.Series(low, index)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("with_freq", [True, False])
+@pytest.mark.parametrize("proximity,strength,width", [
+    (0.005, 2, 5),
+    (0.02, 1, 1),
+    (0.05, 3, 20),
+])
+def test_array_grouping_matches_reference(seed, with_freq, proximity, strength, width):
+    """The array pass returns exactly the zone DataFrame of the original implementation."""
+    close, high, low = make_prices(seed=seed, with_freq=with_freq)
+    kwargs = dict(
+        pivot_lookback=5,
+        pivot_prominence=0.005,
+        zone_merge_proximity=proximity,
+        min_zone_width_candles=width,
+        min_zone_strength=strength,
+        zone_extend_candles=50
+    )
+
+    zones = find_pivot_zones(close, high, low, **kwargs)
+    reference = find_pivot_zones(close, high, low, use_reference=True, **kwargs)
+
+    pd.testing.assert_frame_equal(zones, reference)
+
+
+def test_no_zones_returns_empty_frame():
+    """Flat prices produce no pivots and an empty frame with the zone columns."""
+    index = pd.date_range('2023-01-01', periods=100, freq='1h')
+    flat = pd.Series(100.0, index=index)
+
+    zones = find_pivot_zones(flat, flat, flat, 5, 0.01, 0.005, 5, 2, 50)
+
+    assert zones.empty
+    assert list(zones.columns) == ZONE_COLUMNS
+
+
+def test_zone_extension_clipped_to_last_candle():
+    """Zones near the end of the data are extended at most to the last candle."""
+    close, high, low = make_prices(n=500, seed=3)
+
+    zones = find_pivot_zones(close, high, low, 5, 0.005, 0.05, 1, 1, 10_000)
+
+    assert not zones.empty
+    assert (zones['end_idx'] == close.index[-1]).all()
+
+
+def test_distance_filter_breaks_ties_towards_later_peak():
+    """Equal-height peaks closer than the distance keep the later one, regardless of other peaks."""
+    peaks = np.array([10, 12, 30, 40, 43])
+    heights = np.array([5.0, 5.0, 7.0, 3.0, 3.0])
+
+    keep = select_by_peak_distance(peaks, heights, distance=5)
+
+    assert keep.tolist() == [False, True, True, False, True]
+
+
+if __name__ == "__main__":
+    pytest.main(["-xvs", __file__])
@@ -0,0 +1,114 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from app.core.backtest_engine import BacktestEngine
+from app.models.order import OrderStatus
+from app.strategies.base.strategy import Strategy
+
+
+class CrossoverStrategy(Strategy):
+    """Moving average crossover with a fixed ATR-style stop, usable by both engine paths."""
+
+    def __init__(self, vectorized: bool = True, **kwargs):
+        super().__init__(**kwargs)
+        self.vectorized = vectorized
+
+    def calculate_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
+        df = data.copy()
+        df['sma_fast'] = df['close'].rolling(5).mean()
+        df['sma_slow'] = df['close'].rolling(20).mean()
+        df['range'] = (df['high'] - df['low']).rolling(10).mean()
+        return df
+
+    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
+        df = self.calculate_indicators(data)
+        df['signal'] = np.where(df['sma_fast'] > df['sma_slow'], 1, 0)
+        df['exit_signal'] = df['sma_fast'] < df['sma_slow'] * 0.995
+        df['stop_loss'] = df['close'] - 2 * df['range']
+        df['regime'] = np.where(df['sma_slow'].diff() > 0, 'uptrend', 'downtrend')
+        return df
+
+    def should_enter_trade(self, row: pd.Series) -> bool:
+        return row['signal'] == 1
+
+    def should_exit_trade(self, row: pd.Series) -> bool:
+        stop = self.state.trailing_stop_price
+        return bool(row['exit_signal']) or (stop is not None and row['close'] <= stop)
+
+    def get_signal_arrays(self, data: pd.DataFrame):
+        if not self.vectorized:
+            return None
+        return {
+            'entry': (data['signal'] == 1).to_numpy(),
+            'exit': data['exit_signal'].to_numpy(dtype=bool),
+        }
+
+
+@pytest.fixture
+def price_data():
+    """Random-walk OHLCV candles with enough swings to trigger entries, exits and stops."""
+    rng = np.random.default_rng(7)
+    n = 1500
+    index = pd.date_range('2023-01-01', periods=n, freq='1h')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        'open': close,
+        'high': close * (1 + rng.uniform(0, 0.01, n)),
+        'low': close * (1 - rng.uniform(0, 0.01, n)),
+        'close': close,
+        'volume': rng.uniform(1, 10, n),
+    }, index=index)
+
+
+def run_engine(data, mode, vectorized=True, seed=42):
+    np.random.seed(seed)  # slippage draws
+    engine = BacktestEngine(data, CrossoverStrategy(vectorized=vectorized), mode=mode)
+    engine.run()
+    return engine
+
+
+def order_fields(order):
+    return (order.side, order.status, order.quantity, order.filled_price, order.fees,
+            order.realized_pnl, order.timestamp)
+
+
+def test_fast_path_matches_reference(price_data):
+    """Orders, portfolio values, metrics and final strategy state match the per-row loop."""
+    reference = run_engine(price_data, "reference")
+    fast = run_engine(price_data, "fast")
+
+    assert len(reference.trades) > 4
+    assert [order_fields(o) for o in fast.trades] == [order_fields(o) for o in reference.trades]
+    pd.testing.assert_series_equal(fast.portfolio_values, reference.portfolio_values)
+    assert fast.get_performance_metrics() == reference.get_performance_metrics()
+    assert fast.strategy.state == reference.strategy.state
+    assert fast.available_balance == reference.available_balance
+
+
+def test_fast_path_handles_rejected_orders(price_data):
+    """Entries the account cannot afford are rejected identically in both modes."""
+    np.random.seed(1)
+    reference = BacktestEngine(price_data, CrossoverStrategy(max_position_size=5.0), initial_balance=1000.0)
+    reference.run()
+    np.random.seed(1)
+    fast = BacktestEngine(price_data, CrossoverStrategy(max_position_size=5.0), initial_balance=1000.0, mode="fast")
+    fast.run()
+
+    assert [order_fields(o) for o in fast.trades] == [order_fields(o) for o in reference.trades]
+    pd.testing.assert_series_equal(fast.portfolio_values, reference.portfolio_values)
+
+
+def test_fast_mode_falls_back_without_signal_arrays(price_data):
+    """Strategies without get_signal_arrays run through the reference loop."""
+    reference = run_engine(price_data, "reference", vectorized=False)
+    fallback = run_engine(price_data, "fast", vectorized=False)
+
+    assert all(o.status == OrderStatus.FILLED for o in fallback.trades)
+    assert [order_fields(o) for o in fallback.trades] == [order_fields(o) for o in reference.trades]
+    pd.testing.assert_series_equal(fallback.portfolio_values, reference.portfolio_values)
+
+
+def test_unknown_mode_rejected(price_data):
+    with pytest.raises(ValueError):
+        BacktestEngine(price_data, CrossoverStrategy(), mode="turbo")
@@ -0,0 +1,124 @@
+import asyncio
+import json
+
+from app.core.broadcaster import EVICT_CLOSE_CODE, Broadcaster
+
+
+class FakeWebSocket:
+    """Records payloads; send_delay simulates a slow browser, stuck=True a send that never completes."""
+
+    def __init__(self, send_delay=0.0, stuck=False):
+        self.send_delay, self.stuck = send_delay, stuck
+        self.received = []
+        self.close_code = None
+
+    async def send_text(self, payload):
+        if self.stuck:
+            await asyncio.Event().wait()
+        if self.send_delay:
+            await asyncio.sleep(self.send_delay)
+        else:
+            await asyncio.sleep(0)
+        self.received.append(json.loads(payload))
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+
+def ticker(product_id, price):
+    return {'type': 'ticker', 'product_id': product_id, 'price': str(price)}
+
+
+def test_fast_clients_are_not_delayed_by_slow_or_stuck_clients():
+    async def run():
+        evicted = []
+        broadcaster = Broadcaster(max_pending=50, on_evict=evicted.append)
+        fast = [FakeWebSocket() for _ in range(500)]
+        slow = FakeWebSocket(send_delay=0.003)
+        stuck = FakeWebSocket(stuck=True)
+        for ws in fast + [slow, stuck]:
+            broadcaster.register(ws)
+        for i in range(100):
+            broadcaster.publish({'type': 'trade', 'seq': i})
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.05)
+        stats = broadcaster.stats()
+        await broadcaster.close()
+        return fast, slow, stuck, evicted, stats
+
+    fast, slow, stuck, evicted, stats = asyncio.run(run())
+    assert all([m['seq'] for m in ws.received] == list(range(100)) for ws in fast)
+    # The stuck client overflows its buffer and is closed; the slow one is just behind
+    assert evicted == [stuck] and stuck.close_code == EVICT_CLOSE_CODE
+    assert slow not in evicted and len(slow.received) > 0
+    assert stats['evicted'] == 1
+    assert stats['latency_p50_ms'] < 50
+
+
+def test_lagging_client_gets_latest_ticker_per_product():
+    async def run():
+        broadcaster = Broadcaster()
+        ws = FakeWebSocket(send_delay=0.02)
+        broadcaster.register(ws)
+        for i in range(50):
+            for product in ("BTC-USD", "ETH-USD"):
+                broadcaster.publish(ticker(product, i))
+            broadcaster.publish({'type': 'user_order', 'order_id': f"o{i}"})
+            await asyncio.sleep(0.001)
+        for _ in range(200):
+            if ws.received and ws.received[-1].get('order_id') == "o49":
+                break
+            await asyncio.sleep(0.01)
+        stats = broadcaster.stats()
+        await broadcaster.close()
+        return ws.received, stats
+
+    received, stats = asyncio.run(run())
+    tickers = [m for m in received if m['type'] == 'ticker']
+    assert len(tickers) < 100 and stats['conflated'] > 0
+    last = {m['product_id']: m['price'] for m in tickers}
+    assert last == {"BTC-USD": "49", "ETH-USD": "49"}
+    # Non-ticker messages are never conflated
+    assert [m['order_id'] for m in received if m['type'] == 'user_order'] == [f"o{i}" for i in range(50)]
+
+
+def test_lag_eviction_and_send_failure():
+    class Broken(FakeWebSocket):
+        async def send_text(self, payload):
+            raise RuntimeError("connection reset")
+
+    async def run():
+        dropped = []
+        broadcaster = Broadcaster(max_lag=0.05, on_evict=dropped.append)
+        stuck, broken = FakeWebSocket(stuck=True), Broken()
+        broadcaster.register(stuck)
+        broadcaster.register(broken)
+        broadcaster.publish(ticker("BTC-USD", 1))
+        await asyncio.sleep(0.1)
+        broadcaster.publish(ticker("BTC-USD", 2))
+        await asyncio.sleep(0)
+        clients = len(broadcaster.clients)
+        await broadcaster.close()
+        return dropped, stuck, broken, clients
+
+    dropped, stuck, broken, clients = asyncio.run(run())
+    assert set(dropped) == {stuck, broken}
+    assert stuck.close_code == EVICT_CLOSE_CODE
+    assert clients == 0
+
+
+def test_send_to_single_client_and_publish_without_clients():
+    async def run():
+        broadcaster = Broadcaster()
+        assert broadcaster.publish(ticker("BTC-USD", 1)) == 0
+        a, b = FakeWebSocket(), FakeWebSocket()
+        broadcaster.register(a)
+        broadcaster.register(b)
+        assert broadcaster.send_to(a, ticker("ETH-USD", 5))
+        assert not broadcaster.send_to(FakeWebSocket(), ticker("ETH-USD", 5))
+        await asyncio.sleep(0.01)
+        await broadcaster.close()
+        return a.received, b.received
+
+    a_received, b_received = asyncio.run(run())
+    assert a_received == [ticker("ETH-USD", 5)] and b_received == []
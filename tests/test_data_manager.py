@@ -1,6 +1,6 @@
 import pytest
 import pandas as pd # Import pandas
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 from unittest.mock import patch, MagicMock
 import time
@@ -158,6 +158,108 @@ def test_store_historical_ohlcv_duplicates(db_session: Session, mock_processor:
 
     manager.close_session()
 
+def make_ohlcv_frame(start_dt, periods, freq_minutes=15, base=100.0):
+    """Helper to create a tz-aware OHLCV frame with increasing prices."""
+    timestamps = [start_dt + timedelta(minutes=freq_minutes * i) for i in range(periods)]
+    prices = [base + i for i in range(periods)]
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'open': prices,
+        'high': [p + 1 for p in prices],
+        'low': [p - 1 for p in prices],
+        'close': prices,
+        'volume': [10.0] * periods
+    })
+
+def test_store_historical_ohlcv_partial_overlap_keeps_new_rows(db_session: Session, mock_processor: MagicMock):
+    """Test that duplicates are skipped per row instead of discarding the whole batch."""
+    manager = DataManager(db_session=db_session)
+    start_dt = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    start_unix = int(start_dt.timestamp())
+
+    mock_processor.get_ohlcv.return_value = make_ohlcv_frame(start_dt, 10)
+    first = manager.store_historical_ohlcv("BTC-USD", "15m", start_unix, start_unix + 900 * 10)
+    assert first == {'inserted': 10, 'updated': 0, 'skipped': 0, 'invalid': 0, 'failed': 0}
+
+    # Overlaps the last 5 stored candles and adds 5 new ones, with small chunks
+    mock_processor.get_ohlcv.return_value = make_ohlcv_frame(start_dt + timedelta(minutes=15 * 5), 10)
+    second = manager.store_historical_ohlcv("BTC-USD", "15m", start_unix, start_unix + 900 * 15, chunk_size=3)
+    assert second['inserted'] == 5
+    assert second['skipped'] == 5
+    assert second['failed'] == 0
+
+    stored = db_session.query(Candle).order_by(Candle.timestamp).all()
+    assert len(stored) == 15
+    # Existing rows were left unchanged in 'ignore' mode
+    assert stored[5].close == 105.0
+
+    manager.close_session()
+
+def test_store_historical_ohlcv_update_mode_overwrites(db_session: Session, mock_processor: MagicMock):
+    """Test that on_conflict='update' overwrites stored candles and counts them as updated."""
+    manager = DataManager(db_session=db_session)
+    start_dt = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    start_unix = int(start_dt.timestamp())
+
+    mock_processor.get_ohlcv.return_value = make_ohlcv_frame(start_dt, 4)
+    manager.store_historical_ohlcv("ETH-USD", "15m", start_unix, start_unix + 3600)
+
+    mock_processor.get_ohlcv.return_value = make_ohlcv_frame(start_dt, 6, base=200.0)
+    counts = manager.store_historical_ohlcv("ETH-USD", "15m", start_unix, start_unix + 5400, on_conflict='update')
+    assert counts['inserted'] == 2
+    assert counts['updated'] == 4
+
+    stored = db_session.query(Candle).order_by(Candle.timestamp).all()
+    assert [c.close for c in stored] == [200.0, 201.0, 202.0, 203.0, 204.0, 205.0]
+
+    manager.close_session()
+
+def test_bulk_upsert_ohlcv_drops_invalid_and_duplicate_rows(db_session: Session, mock_processor: MagicMock):
+    """Test NaN rows are counted as invalid and repeated timestamps keep the last row."""
+    manager = DataManager(db_session=db_session)
+    start_dt = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    df = make_ohlcv_frame(start_dt, 5)
+    df.loc[1, 'close'] = float('nan')
+    df = pd.concat([df, df.iloc[[4]].assign(close=999.0)], ignore_index=True)
+
+    counts = manager.bulk_upsert_ohlcv(df, "SOL-USD", TIMEFRAME_TO_GRANULARITY["15m"])
+
+    assert counts['invalid'] == 1
+    assert counts['inserted'] == 4
+    stored = db_session.query(Candle).order_by(Candle.timestamp).all()
+    assert len(stored) == 4
+    assert stored[-1].close == 999.0
+
+    with pytest.raises(ValueError):
+        manager.bulk_upsert_ohlcv(df, "SOL-USD", TIMEFRAME_TO_GRANULARITY["15m"], on_conflict='replace')
+
+    manager.close_session()
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_bulk_upsert_ohlcv_counts_come_from_the_write(db_session: Session, mock_processor: MagicMock,
+                                                      monkeypatch, returning):
+    """Inserted/updated counts come from RETURNING or the affected-row count, not COUNT(*) queries."""
+    manager = DataManager(db_session=db_session)
+    dialect = db_session.get_bind().dialect
+    monkeypatch.setattr(dialect, 'insert_executemany_returning', dialect.insert_executemany_returning and returning)
+    start_dt = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    granularity = TIMEFRAME_TO_GRANULARITY["15m"]
+    manager.bulk_upsert_ohlcv(make_ohlcv_frame(start_dt, 6), "ADA-USD", granularity)
+
+    statements = []
+    event.listen(db_session.get_bind(), 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement.lower()))
+    frame = make_ohlcv_frame(start_dt + timedelta(minutes=15 * 3), 6, base=300.0)
+    ignored = manager.bulk_upsert_ohlcv(frame, "ADA-USD", granularity, chunk_size=4)
+    updated = manager.bulk_upsert_ohlcv(frame, "ADA-USD", granularity, on_conflict='update', chunk_size=4)
+
+    assert (ignored['inserted'], ignored['skipped']) == (3, 3)
+    assert (updated['inserted'], updated['updated']) == (0, 6)
+    assert not any('count(' in statement for statement in statements)
+    stored = db_session.query(Candle).filter(Candle.symbol == "ADA-USD").order_by(Candle.timestamp).all()
+    assert [c.close for c in stored] == [100.0, 101.0, 102.0, 300.0, 301.0, 302.0, 303.0, 304.0, 305.0]
+    manager.close_session()
+
 def test_get_stored_ohlcv(db_session: Session, mock_processor: MagicMock):
     """Test retrieving stored OHLCV data with filters."""
     # manager init patches processor, but we don't need the mock return value here
@@ -212,6 +314,49 @@ def test_get_stored_ohlcv(db_session: Session, mock_processor: MagicMock):
 
     manager.close_session()
 
+def test_get_stored_ohlcv_frame_matches_orm_read(db_session: Session, mock_processor: MagicMock):
+    """Test the columnar read returns the same candles as the ORM path, with projection."""
+    manager = DataManager(db_session=db_session)
+    start_dt = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    start_unix = int(start_dt.timestamp())
+    api_granularity = TIMEFRAME_TO_GRANULARITY["15m"]
+    manager.bulk_upsert_ohlcv(make_ohlcv_frame(start_dt, 25), "BTC-USD", api_granularity)
+    manager.bulk_upsert_ohlcv(make_ohlcv_frame(start_dt, 25, base=500.0), "ETH-USD", api_granularity)
+
+    end_unix = start_unix + 900 * 19
+    candles = manager.get_stored_ohlcv("BTC-USD", "15m", start_unix, end_unix)
+    frame = manager.get_stored_ohlcv_frame("BTC-USD", "15m", start_unix, end_unix, chunk_size=7)
+
+    assert list(frame.columns) == ['open', 'high', 'low', 'close', 'volume']
+    assert len(frame) == len(candles) == 20
+    assert frame.index.name == 'timestamp'
+    assert frame.index[0] == pd.Timestamp(start_dt)
+    assert [int(ts.timestamp()) for ts in frame.index] == [c.timestamp for c in candles]
+    assert frame['close'].tolist() == [c.close for c in candles]
+    assert frame['volume'].dtype == 'float64'
+
+    projected = manager.get_stored_ohlcv_frame("ETH-USD", "15m", start_unix, end_unix, columns=['close'])
+    assert list(projected.columns) == ['close']
+    assert projected['close'].iloc[0] == 500.0
+
+    manager.close_session()
+
+def test_get_stored_ohlcv_frame_empty_and_invalid(db_session: Session, mock_processor: MagicMock):
+    """Test empty results keep the frame layout and unknown columns are rejected."""
+    manager = DataManager(db_session=db_session)
+
+    frame = manager.get_stored_ohlcv_frame("BTC-USD", "1h", 0, 10**10, columns=['high', 'low'])
+    assert frame.empty
+    assert list(frame.columns) == ['high', 'low']
+    assert isinstance(frame.index, pd.DatetimeIndex)
+
+    assert manager.get_stored_ohlcv_frame("BTC-USD", "7m", 0, 10**10).empty
+
+    with pytest.raises(ValueError):
+        manager.get_stored_ohlcv_frame("BTC-USD", "1h", 0, 10**10, columns=['vwap'])
+
+    manager.close_session()
+
 def test_update_recent_ohlcv_success(db_session: Session, mock_processor: MagicMock):
     """Test updating recent data when prior data exists."""
     manager = DataManager(db_session=db_session)
@@ -561,4 +706,95 @@ def test_update_zone_status_candle_before_formation(db_session: Session):
     assert updated_zone.is_active is True
     manager.close_session()
 
-# --- Test Cases Will Go Here --- 
\ No newline at end of file
+def test_update_zone_status_matches_sql_semantics_over_candle_stream(db_session: Session):
+    """Indexed, write-behind zone updates end in the same DB state as the per-candle SQL path."""
+    import random
+    rng = random.Random(7)
+    reference = {}
+    for i in range(300):
+        symbol = rng.choice(["BTC-USD", "ETH-USD"])
+        low = rng.uniform(95, 105)
+        zone = Zone(symbol=symbol, timeframe=rng.choice(["15m", "1h", "4h"]), type=rng.choice(["supply", "demand"]),
+                    zone_low=low, zone_high=low + rng.uniform(0.1, 2), formation_timestamp=1000 + i,
+                    leg_in_timestamp=900, base_start_timestamp=950, base_end_timestamp=950,
+                    is_active=rng.random() > 0.1, num_touches=0)
+        db_session.add(zone)
+        db_session.flush()
+        reference[zone.id] = dict(symbol=zone.symbol, type=zone.type, zone_low=zone.zone_low, zone_high=zone.zone_high,
+                                  formation_timestamp=zone.formation_timestamp, is_active=zone.is_active,
+                                  num_touches=0, last_tested_timestamp=None)
+    db_session.commit()
+
+    manager = DataManager(db_session=db_session, zone_flush_interval=3600, zone_flush_max_pending=10_000)
+    price = {"BTC-USD": 100.0, "ETH-USD": 100.0}
+    for ts in range(1100, 1700):
+        symbol = rng.choice(["BTC-USD", "ETH-USD"])
+        close = price[symbol] = price[symbol] + rng.gauss(0, 0.7)
+        candle = {'timestamp': ts, 'open': close, 'high': close + abs(rng.gauss(0, 0.5)),
+                  'low': close - abs(rng.gauss(0, 0.5)), 'close': close}
+        manager.update_zone_status(symbol, candle)
+
+        # Previous behaviour: SQL overlap filter, then the same touch/deactivation rules
+        for z in reference.values():
+            if (z['symbol'] == symbol and z['is_active'] and z['zone_low'] <= candle['high']
+                    and z['zone_high'] >= candle['low'] and ts > z['formation_timestamp']):
+                z['num_touches'] += 1
+                z['last_tested_timestamp'] = ts
+                if (z['type'] == 'demand' and close < z['zone_low']) or (z['type'] == 'supply' and close > z['zone_high']):
+                    z['is_active'] = False
+
+    # Nothing is written until a flush; an ORM read on the session flushes first
+    assert manager.zone_index.dirty
+    stored = {z.id: z for z in db_session.query(Zone).all()}
+    assert not manager.zone_index.dirty
+    assert sum(z['num_touches'] for z in reference.values()) > 100
+    for zone_id, expected in reference.items():
+        zone = stored[zone_id]
+        assert (zone.num_touches, zone.last_tested_timestamp, zone.is_active) == \
+            (expected['num_touches'], expected['last_tested_timestamp'], expected['is_active'])
+
+    # A fresh manager rebuilds the index from the DB
+    rebuilt = DataManager(db_session=db_session)
+    assert rebuilt.rebuild_zone_index() == sum(z['is_active'] for z in reference.values())
+    rebuilt.close_session()
+    manager.close_session()
+
+# --- Test Cases Will Go Here --- 
+
+
+def test_default_session_is_created_per_manager(mock_processor: MagicMock):
+    """Default-constructed managers get their own session, each with only its own zone flush hook."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    with patch('app.core.data_manager.SessionLocal', sessionmaker(bind=engine)):
+        first, second = DataManager(), DataManager()
+    assert first.db is not second.db
+    assert event.contains(first.db, 'do_orm_execute', first._flush_zones_before_read)
+    assert not event.contains(first.db, 'do_orm_execute', second._flush_zones_before_read)
+    assert not event.contains(second.db, 'do_orm_execute', first._flush_zones_before_read)
+    first.close_session()
+    assert not event.contains(first.db, 'do_orm_execute', first._flush_zones_before_read)
+    second.close_session()
+
+
+def test_read_flush_leaves_commit_and_rollback_to_the_caller(db_session: Session):
+    """The zone flush run by an ORM read joins the caller's transaction instead of committing it."""
+    manager = DataManager(db_session=db_session, zone_flush_interval=3600)
+    zone = Zone(symbol="HOOK-USD", timeframe="1h", type='demand', zone_low=100, zone_high=102, formation_timestamp=1000,
+                leg_in_timestamp=900, base_start_timestamp=950, base_end_timestamp=950, is_active=True)
+    db_session.add(zone)
+    db_session.commit()
+    zone_id = zone.id
+
+    manager.update_zone_status("HOOK-USD", {'timestamp': 1100, 'open': 103, 'high': 104, 'low': 101.5, 'close': 102.5})
+    assert manager.zone_index.dirty
+    assert db_session.query(Zone).filter(Zone.id == zone_id).one().num_touches == 1
+    assert db_session.in_transaction() and not manager.zone_index.dirty
+
+    # The caller rolls back: the touch is pending again and written by the next flush
+    db_session.rollback()
+    assert list(manager.zone_index.dirty) == [zone_id]
+    assert manager.flush_zone_updates() == 1
+    assert db_session.query(Zone).filter(Zone.id == zone_id).one().num_touches == 1
+    assert not manager.zone_index.dirty and not manager.zone_index.uncommitted
+    manager.close_session()
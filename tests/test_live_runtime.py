@@ -0,0 +1,171 @@
+import asyncio
+import time
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from app.core.live_runtime import MultiProductRuntime, ShardedLiveRuntime, shard_for, ticker_to_candle
+from app.core.streaming_indicators import SMA, StreamingIndicatorEngine
+from app.strategies.base.strategy import Strategy
+
+
+class CrossStrategy(Strategy):
+    """Fast/slow SMA crossover; optionally sleeps on every evaluation to simulate a slow strategy."""
+
+    def __init__(self, delay: float = 0.0, streaming: bool = True):
+        super().__init__()
+        self.delay = delay
+        self.streaming = streaming
+
+    def calculate_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
+        df = data.copy()
+        df['fast'] = df['close'].rolling(3).mean()
+        df['slow'] = df['close'].rolling(8).mean()
+        return df
+
+    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
+        df = self.calculate_indicators(data)
+        df['signal'] = np.where(df['fast'] > df['slow'], 1, 0)
+        return df
+
+    def create_signal_engine(self):
+        if not self.streaming:
+            return None
+        return StreamingIndicatorEngine(
+            {'fast': SMA(3), 'slow': SMA(8)},
+            signal_fn=lambda row, prev: {'signal': 1 if row['fast'] > row['slow'] else 0})
+
+    def should_enter_trade(self, row: pd.Series) -> bool:
+        if self.delay:
+            time.sleep(self.delay)
+        return not self.state.is_in_position and row['signal'] == 1
+
+    def should_exit_trade(self, row: pd.Series) -> bool:
+        return self.state.is_in_position and row['signal'] == 0
+
+
+def cross_factory(product_id):
+    return CrossStrategy(delay=0.2 if product_id == 'SLOW-USD' else 0.0)
+
+
+def make_tickers(products, n, seed=5):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2024-01-01', tz='UTC')
+    tickers = []
+    prices = {p: 100.0 for p in products}
+    for i in range(n):
+        for product in products:
+            prices[product] *= float(np.exp(rng.normal(0, 0.01)))
+            tickers.append({'type': 'ticker', 'product_id': product, 'price': f"{prices[product]:.4f}",
+                            'volume_24_h': '10', 'time': (start + pd.Timedelta(seconds=i)).isoformat()})
+    return tickers
+
+
+def reference_actions(tickers, product_id, streaming):
+    """Per-tick evaluation as LiveTrader does it: append, compute the latest row, check entry then exit."""
+    strategy = CrossStrategy(streaming=streaming)
+    engine = strategy.create_signal_engine()
+    buffer, actions = [], []
+    for ticker in tickers:
+        if ticker['product_id'] != product_id:
+            continue
+        candle = ticker_to_candle(ticker)
+        buffer.append(candle)
+        if engine is not None:
+            row = engine.update(candle)
+        else:
+            row = strategy.generate_signals(pd.DataFrame(buffer).set_index('timestamp')).iloc[-1]
+        if strategy.should_enter_trade(row):
+            strategy.update_state(row.name, True)
+            actions.append(('buy', row.name))
+        elif strategy.should_exit_trade(row):
+            strategy.update_state(row.name, False)
+            actions.append(('sell', row.name))
+    return actions
+
+
+@pytest.mark.parametrize('streaming', [True, False], ids=['engine', 'dataframe'])
+def test_per_tick_decisions_match_single_product_loop(streaming):
+    products = ['BTC-USD', 'ETH-USD', 'SOL-USD']
+    tickers = make_tickers(products, 150)
+    decisions = []
+
+    async def run():
+        runtime = MultiProductRuntime(lambda pid: CrossStrategy(streaming=streaming),
+                                      on_decision=decisions.append, buffer_size=1000, max_workers=0)
+        for product in products:
+            runtime.add_product(product)
+        await runtime.start()
+        for ticker in tickers:
+            runtime.dispatch(ticker)
+            await asyncio.sleep(0)
+        await runtime.stop()
+        return runtime
+
+    runtime = asyncio.run(run())
+    for product in products:
+        got = [(d.action, d.timestamp) for d in decisions if d.product_id == product]
+        assert got == reference_actions(tickers, product, streaming)
+        assert len(got) > 3
+        assert runtime.stats()[product]['evaluations'] == 150
+
+
+def test_slow_product_does_not_delay_others():
+    """A strategy that takes 200ms per evaluation only coalesces its own backlog."""
+    products = [f'P{i:02d}-USD' for i in range(10)] + ['SLOW-USD']
+    tickers = make_tickers(products, 60)
+
+    async def run():
+        runtime = MultiProductRuntime(cross_factory, max_workers=4)
+        for product in products:
+            runtime.add_product(product)
+        await runtime.start()
+        for i in range(0, len(tickers), len(products)):
+            for ticker in tickers[i:i + len(products)]:
+                runtime.dispatch(ticker)
+            await asyncio.sleep(0.01)
+        await runtime.stop()
+        return runtime.stats()
+
+    stats = asyncio.run(run())
+    slow = stats.pop('SLOW-USD')
+    assert slow['ticks'] == 60
+    assert slow['evaluations'] < 60  # backlog coalesced into fewer evaluations
+    assert slow['p50_ms'] >= 150
+    for product, product_stats in stats.items():
+        assert product_stats['ticks'] == 60
+        assert product_stats['p95_ms'] < 100, product
+
+
+def test_unknown_products_and_bad_ticks_are_ignored():
+    async def run():
+        runtime = MultiProductRuntime(lambda pid: CrossStrategy(), max_workers=0)
+        runtime.add_product('BTC-USD')
+        await runtime.start()
+        assert not runtime.dispatch({'type': 'ticker', 'product_id': 'DOGE-USD', 'price': '1'})
+        assert not runtime.dispatch({'type': 'heartbeats'})
+        runtime.dispatch({'type': 'ticker', 'product_id': 'BTC-USD', 'price': None})
+        await runtime.stop()
+        return runtime
+
+    runtime = asyncio.run(run())
+    assert runtime.dropped == 1
+    assert runtime.stats()['BTC-USD']['ticks'] == 0
+
+
+def test_sharded_runtime_routes_products_to_stable_shards():
+    products = [f'P{i:02d}-USD' for i in range(12)]
+    assert [shard_for(p, 3) for p in products] == [shard_for(p, 3) for p in products]
+
+    tickers = make_tickers(products, 40)
+    sharded = ShardedLiveRuntime(cross_factory, products, n_shards=3, batch_size=16, max_workers=2)
+    sharded.start()
+    for ticker in tickers:
+        sharded.dispatch(ticker)
+    result = sharded.stop()
+
+    assert sorted(result['stats']) == products
+    assert all(s['ticks'] == 40 for s in result['stats'].values())
+    assert {d['product_id'] for d in result['decisions']} <= set(products)
+    assert result['decisions']
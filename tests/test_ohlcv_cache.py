@@ -0,0 +1,170 @@
+import pytest
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from app.core.ohlcv_cache import OHLCVCache, timeframe_to_seconds
+from app.core.data_processor import OHLCVProcessor
+
+
+def make_candles(start, end, freq='1h'):
+    """Create an OHLCV frame in the processor format for candles in [start, end)."""
+    timestamps = pd.date_range(start, end, freq=freq, tz='UTC', inclusive='left')
+    prices = np.arange(len(timestamps), dtype=float) + timestamps.asi8 / 1e15
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'open': prices,
+        'high': prices + 1,
+        'low': prices - 1,
+        'close': prices + 0.5,
+        'volume': np.full(len(timestamps), 10.0)
+    })
+
+
+class RecordingFetcher:
+    """Fetch function that records requested gaps and returns synthetic candles."""
+
+    def __init__(self, freq='1h'):
+        self.freq = freq
+        self.calls = []
+
+    def __call__(self, start, end):
+        self.calls.append((start, end))
+        return make_candles(start, end, self.freq)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return OHLCVCache(root_dir=str(tmp_path))
+
+
+def test_cached_range_is_served_without_fetching(cache):
+    """A second request for the same range is served from disk."""
+    fetcher = RecordingFetcher()
+    first = cache.get('BTC-USD', '1h', '2023-01-10', '2023-01-20', fetch_fn=fetcher)
+    second = cache.get('BTC-USD', '1h', '2023-01-10', '2023-01-20', fetch_fn=fetcher)
+
+    assert len(fetcher.calls) == 1
+    assert len(first) == 240
+    pd.testing.assert_frame_equal(first, second)
+    expected = make_candles('2023-01-10', '2023-01-20').set_index('timestamp')
+    expected.index = expected.index.as_unit('s')
+    pd.testing.assert_frame_equal(first, expected, check_freq=False)
+
+
+def test_only_missing_gaps_are_fetched(cache):
+    """Extending a cached range fetches just the uncovered parts on either side."""
+    fetcher = RecordingFetcher()
+    cache.get('BTC-USD', '1h', '2023-01-10', '2023-01-20', fetch_fn=fetcher)
+    fetcher.calls.clear()
+
+    data = cache.get('BTC-USD', '1h', '2023-01-05', '2023-01-25', fetch_fn=fetcher)
+
+    utc = timezone.utc
+    assert fetcher.calls == [
+        (datetime(2023, 1, 5, tzinfo=utc), datetime(2023, 1, 10, tzinfo=utc)),
+        (datetime(2023, 1, 20, tzinfo=utc), datetime(2023, 1, 25, tzinfo=utc)),
+    ]
+    assert len(data) == 20 * 24
+    assert data.index.is_monotonic_increasing
+
+
+def test_partitions_by_month_and_reads_zero_copy(cache, tmp_path):
+    """Candles are split into monthly partitions; single-partition reads are memmap views."""
+    cache.get('ETH-USD', '1h', '2023-01-25', '2023-02-05', fetch_fn=RecordingFetcher())
+
+    series_dir = tmp_path / 'ETH-USD' / '1h'
+    assert sorted(p.name for p in series_dir.glob('*.npy')) == ['2023-01.npy', '2023-02.npy']
+
+    arrays = cache.read_arrays('ETH-USD', '1h', '2023-01-26', '2023-01-27')
+    assert isinstance(arrays['close'], np.memmap)
+    assert len(arrays['timestamp']) == 24
+
+    spanning = cache.read('ETH-USD', '1h', '2023-01-31', '2023-02-02', columns=['close'])
+    assert list(spanning.columns) == ['close']
+    assert len(spanning) == 48
+
+
+def test_empty_fetch_is_not_marked_as_covered(cache):
+    """A failed or empty fetch is retried on the next request instead of poisoning the cache."""
+    calls = []
+
+    def empty_fetch(start, end):
+        calls.append((start, end))
+        return pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+
+    assert cache.get('SOL-USD', '1h', '2023-03-01', '2023-03-02', fetch_fn=empty_fetch).empty
+    cache.get('SOL-USD', '1h', '2023-03-01', '2023-03-02', fetch_fn=empty_fetch)
+
+    assert len(calls) == 2
+    assert cache.missing_ranges('SOL-USD', '1h', '2023-03-01', '2023-03-02') != []
+
+
+def test_truncated_fetch_marks_only_the_returned_span(cache):
+    """A fetch that returns fewer candles than requested leaves the rest of the gap missing."""
+    fetcher = RecordingFetcher()
+
+    def truncated_fetch(start, end):
+        # Like an exchange page limit: at most 48 candles per request
+        return fetcher(start, end).iloc[:48]
+
+    cache.get('BTC-USD', '1h', '2023-01-10', '2023-01-20', fetch_fn=truncated_fetch)
+
+    utc = timezone.utc
+    assert cache.missing_ranges('BTC-USD', '1h', '2023-01-10', '2023-01-20') == [
+        (int(datetime(2023, 1, 12, tzinfo=utc).timestamp()), int(datetime(2023, 1, 20, tzinfo=utc).timestamp()))
+    ]
+    data = cache.get('BTC-USD', '1h', '2023-01-10', '2023-01-20', fetch_fn=fetcher)
+    assert fetcher.calls[-1] == (datetime(2023, 1, 12, tzinfo=utc), datetime(2023, 1, 20, tzinfo=utc))
+    assert len(data) == 240
+
+
+def test_forming_candle_is_refetched(cache):
+    """Coverage stops at the candle still forming, so the latest candle is fetched again."""
+    fetcher = RecordingFetcher()
+    now = pd.Timestamp.now(tz='UTC')
+    start = now.floor('1h') - pd.Timedelta(hours=5)
+    end = now.floor('1h') + pd.Timedelta(hours=1)
+
+    cache.get('BTC-USD', '1h', start, end, fetch_fn=fetcher)
+    cache.get('BTC-USD', '1h', start, end, fetch_fn=fetcher)
+
+    assert len(fetcher.calls) == 2
+    assert fetcher.calls[1][0] == now.floor('1h').to_pydatetime()
+
+
+def test_newer_data_replaces_cached_candles(cache):
+    """Storing a candle again overwrites the cached values."""
+    df = make_candles('2023-01-01', '2023-01-02')
+    cache.store('BTC-USD', '1h', df)
+    cache.store('BTC-USD', '1h', df.iloc[[3]].assign(close=-1.0))
+
+    data = cache.read('BTC-USD', '1h', '2023-01-01', '2023-01-02')
+    assert len(data) == 24
+    assert data['close'].iloc[3] == -1.0
+
+
+def test_processor_uses_cache(tmp_path):
+    """OHLCVProcessor.get_ohlcv only calls the API for ranges that are not cached."""
+    with patch('app.core.data_processor.RESTClient'):
+        processor = OHLCVProcessor(cache=OHLCVCache(root_dir=str(tmp_path)))
+    start = datetime(2023, 5, 1, tzinfo=timezone.utc)
+    end = datetime(2023, 5, 3, tzinfo=timezone.utc)
+
+    with patch.object(processor, '_fetch_ohlcv', side_effect=lambda s, tf, a, b: make_candles(a, b)) as fetch:
+        first = processor.get_ohlcv('BTC-USD', '1h', start, end)
+        second = processor.get_ohlcv('BTC-USD', '1h', start, end)
+
+    assert fetch.call_count == 1
+    assert list(first.columns) == ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+    assert len(first) == 48
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_timeframe_to_seconds():
+    assert timeframe_to_seconds('15m') == 900
+    assert timeframe_to_seconds('4h') == 14400
+    assert timeframe_to_seconds('1d') == 86400
+    with pytest.raises(ValueError):
+        timeframe_to_seconds('fortnight')
@@ -4,8 +4,14 @@ from datetime import datetime, timedelta
 from app.core.data_processor import OHLCVProcessor
 from unittest.mock import patch, MagicMock
 import json
+import time
+import threading
+from datetime import timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
 from requests.exceptions import HTTPError
 import requests
+from app.core.data_processor import TokenBucket
 
 # Mock data generator for different symbols and timeframes
 def create_mock_candles(symbol, start_timestamp, end_timestamp, granularity):
@@ -224,4 +230,133 @@ def test_error_handling(mock_coinbase_api):
             symbol='BTC-USD',
             timeframe='15m',
             start_time=datetime.now() + timedelta(days=1)
-        ) 
\ No newline at end of file
+        ) 
+
+
+class StubCandleServer:
+    """Local HTTP server mimicking the public candles endpoint, with optional latency and 429s."""
+
+    def __init__(self, latency=0.0, rate_limited_requests=0):
+        self.latency = latency
+        self.rate_limited_requests = rate_limited_requests
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                with stub.lock:
+                    stub.requests.append(query)
+                    throttle = len(stub.requests) <= stub.rate_limited_requests
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    time.sleep(stub.latency)
+                    if throttle:
+                        self.send_response(429)
+                        self.send_header('Retry-After', '0.01')
+                        self.end_headers()
+                        return
+                    product_id = url.path.split('/')[-2]
+                    # The end bound is inclusive, so adjacent chunks overlap by one candle
+                    body = create_mock_candles(product_id, int(query['start']), int(query['end']) + 1,
+                                               query['granularity'])
+                    payload = json.dumps(body).encode()
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                finally:
+                    with stub.lock:
+                        stub.in_flight -= 1
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+BACKFILL_START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+BACKFILL_END = datetime(2024, 3, 1, 0, 7, tzinfo=timezone.utc)
+
+
+def test_concurrent_fetch_matches_sequential(mock_coinbase_api):
+    """Parallel chunk requests against a local server give the same frame as the sequential loop."""
+    sequential = OHLCVProcessor()
+    sequential.rate_limit_wait = 0
+    expected = sequential.get_ohlcv('BTC-USD', '15m', BACKFILL_START, BACKFILL_END)
+
+    with StubCandleServer(latency=0.02) as server:
+        processor = OHLCVProcessor(max_workers=8, requests_per_second=200, base_url=server.url)
+        df = processor.get_ohlcv('BTC-USD', '15m', BACKFILL_START, BACKFILL_END)
+
+    assert len(server.requests) == 20  # 60 days of 15m candles in chunks of 300
+    assert server.max_in_flight > 1
+    assert df['timestamp'].is_unique
+    assert df['timestamp'].is_monotonic_increasing
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_concurrent_fetch_backs_off_on_rate_limit():
+    """429 responses slow the shared limiter down and the affected chunks are retried."""
+    with StubCandleServer(rate_limited_requests=3) as server:
+        processor = OHLCVProcessor(max_workers=4, requests_per_second=100, base_url=server.url)
+        df = processor.get_ohlcv('ETH-USD', '1h', BACKFILL_START, BACKFILL_START + timedelta(days=40))
+
+    assert len(server.requests) == 4 + 3  # 960 hourly candles in 4 chunks, plus 3 throttled attempts
+    assert len(df) == 40 * 24 + 1  # the end bound is inclusive
+    assert processor.rate_limiter.rate < processor.rate_limiter.max_rate
+
+
+def test_concurrent_fetch_invalid_symbol_raises():
+    """A 400 for an unknown product is raised as ValueError like the sequential path."""
+    class InvalidProductHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            payload = json.dumps({"error": "INVALID_ARGUMENT", "error_details": "valid product_id is required"}).encode()
+            self.send_response(400)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), InvalidProductHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        processor = OHLCVProcessor(max_workers=4, base_url=f"http://127.0.0.1:{server.server_address[1]}")
+        with pytest.raises(ValueError):
+            processor.get_ohlcv('INVALID-PAIR', '15m', BACKFILL_START, BACKFILL_END)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_token_bucket_enforces_rate():
+    """After the burst is used up, acquisitions are spaced at the configured rate."""
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.monotonic()
+    for _ in range(11):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.18
+
+    bucket.on_rate_limited(retry_after=0.1)
+    assert bucket.rate == 25
+    start = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - start >= 0.09
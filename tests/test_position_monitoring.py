@@ -0,0 +1,151 @@
+import asyncio
+from datetime import datetime
+
+from app.core.coinbase import OrderSide
+from app.core.order_executor import POSITION_EVENTS_MAXLEN, OrderExecutor, Position
+from app.core.price_cache import PriceCache
+
+
+class FakeClient:
+    """Counts REST price lookups."""
+
+    def __init__(self, price=100.0):
+        self.price = price
+        self.get_product_calls = 0
+
+    async def get_product(self, product_id):
+        self.get_product_calls += 1
+        return {"product_id": product_id, "price": str(self.price)}
+
+
+def open_position(executor, product_id="BTC-USD", size=0.5, entry_price=100.0):
+    now = datetime.now()
+    executor._positions[product_id] = Position(
+        product_id=product_id, side=OrderSide.BUY, size=size, entry_price=entry_price,
+        current_price=entry_price, unrealized_pnl=0.0, entry_time=now, last_update_time=now)
+    return executor._positions[product_id]
+
+
+async def settle(n=5):
+    for _ in range(n):
+        await asyncio.sleep(0)
+
+
+def test_ticker_stream_marks_position_without_rest_calls():
+    async def run():
+        cache = PriceCache()
+        client = FakeClient()
+        executor = OrderExecutor(client, price_cache=cache, risk_check_move_pct=1.0)
+        position = open_position(executor)
+        cache.update("BTC-USD", 100.0)
+        await executor.start_position_monitoring()
+        await settle()
+        marks = []
+        for i in range(1, 201):
+            cache.on_ticker({'type': 'ticker', 'product_id': "BTC-USD", 'price': f"{100 + i * 0.01:.2f}"})
+            await settle()
+            marks.append(position.current_price)
+        await executor.stop_position_monitoring()
+        return client, executor, position, marks
+
+    client, executor, position, marks = asyncio.run(run())
+    assert client.get_product_calls == 0
+    # Every tick is reflected before the next one arrives
+    assert marks == [round(100 + i * 0.01, 2) for i in range(1, 201)]
+    assert position.unrealized_pnl == (102.0 - 100.0) * 0.5
+    stats = executor.get_monitoring_stats()
+    assert stats['price_updates'] == 201
+    # 100 -> 102 with a 1% move threshold: the initial check plus one at 101.0 and 102.0 at most
+    assert stats['risk_checks'] <= 3
+    assert executor._risk_metrics_cache["BTC-USD"]["metrics"]["position_value"] > 0
+
+
+def test_stale_feed_falls_back_to_rest_until_ticks_resume():
+    async def run():
+        cache = PriceCache()
+        client = FakeClient(price=99.5)
+        executor = OrderExecutor(client, price_cache=cache, price_stale_after=0.05)
+        position = open_position(executor)
+        await executor.start_position_monitoring()
+        await asyncio.sleep(0.17)
+        rest_calls_while_stale = client.get_product_calls
+        mark_while_stale = position.current_price
+        for _ in range(10):
+            cache.update("BTC-USD", 100.5)
+            await asyncio.sleep(0.01)
+        calls_after_resume = client.get_product_calls
+        await executor.stop_position_monitoring()
+        return rest_calls_while_stale, mark_while_stale, calls_after_resume, position, executor
+
+    stale_calls, stale_mark, resumed_calls, position, executor = asyncio.run(run())
+    assert 2 <= stale_calls <= 5
+    assert stale_mark == 99.5
+    assert resumed_calls == stale_calls
+    assert position.current_price == 100.5
+    assert executor.get_monitoring_stats()['rest_fallbacks'] == stale_calls
+    assert executor.price_cache.entry("BTC-USD").source == "ws"
+
+
+def test_tick_during_rest_fallback_is_not_lost():
+    class SlowClient(FakeClient):
+        """REST lookup that only returns once released."""
+
+        def __init__(self, price):
+            super().__init__(price)
+            self.release = asyncio.Event()
+
+        async def get_product(self, product_id):
+            self.get_product_calls += 1
+            await self.release.wait()
+            return {"product_id": product_id, "price": str(self.price)}
+
+    async def run():
+        cache = PriceCache()
+        client = SlowClient(price=99.5)
+        executor = OrderExecutor(client, price_cache=cache, price_stale_after=10.0)
+        position = open_position(executor)
+        await executor.start_position_monitoring()
+        await settle()
+        assert client.get_product_calls == 1
+        # A ticker arrives while the REST request is in flight, then the stale REST price returns
+        cache.update("BTC-USD", 101.0)
+        client.release.set()
+        await settle(10)
+        await executor.stop_position_monitoring()
+        return client, position, cache
+
+    client, position, cache = asyncio.run(run())
+    assert client.get_product_calls == 1
+    assert position.current_price == 101.0
+    assert cache.entry("BTC-USD").source == "ws"
+
+
+def test_risk_breach_is_recorded_and_events_are_bounded():
+    async def run():
+        cache = PriceCache()
+        executor = OrderExecutor(FakeClient(), price_cache=cache)
+        halts = []
+
+        async def halt_trading(reason="Emergency halt triggered"):
+            halts.append(reason)
+        executor.halt_trading = halt_trading
+        open_position(executor, size=0.5)
+        cache.update("BTC-USD", 100.0)
+        await executor.start_position_monitoring()
+        await settle()
+        cache.update("BTC-USD", 90.0)  # -10% drawdown > max_drawdown_pct
+        await settle()
+        await executor.stop_position_monitoring()
+        events = await executor.get_position_events(event_type="risk_threshold_breach")
+        return halts, events, executor
+
+    halts, events, executor = asyncio.run(run())
+    assert len(halts) == 1 and "drawdown" in halts[0]
+    assert len(events) == 1 and events[0]["product_id"] == "BTC-USD"
+
+    for i in range(POSITION_EVENTS_MAXLEN + 10):
+        executor._position_events.append({"type": "pnl_change", "product_id": "BTC-USD", "seq": i})
+    assert len(executor._position_events) == POSITION_EVENTS_MAXLEN
+    assert executor._position_events[-1]["seq"] == POSITION_EVENTS_MAXLEN + 9
+    executor.clear_position_events()
+    assert len(executor._position_events) == 0
@@ -0,0 +1,169 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from app.core.indicators import (
+    calculate_adx, calculate_atr, calculate_bollinger_bands, calculate_ema, calculate_rsi, calculate_sma
+)
+from app.core.streaming_indicators import (
+    ADX, ATR, EMA, RSI, SMA, BollingerBands, StreamingIndicatorEngine
+)
+from app.strategies.base.strategy import Strategy
+
+
+def make_candles(n=3000, seed=11, decimals=None):
+    """Random-walk OHLCV candles; rounding produces repeated closes and flat stretches."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    high = close * (1 + rng.uniform(0, 0.003, n))
+    low = close * (1 - rng.uniform(0, 0.003, n))
+    df = pd.DataFrame({
+        'open': np.r_[close[0], close[:-1]],
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': rng.uniform(1, 10, n),
+    }, index=pd.date_range('2024-01-01', periods=n, freq='1min', tz='UTC'))
+    if decimals is not None:
+        df = df.round(decimals)
+        # A stretch of identical candles exercises the zero-range paths
+        df.iloc[500:560, :4] = df['close'].iloc[500]
+    return df
+
+
+def stream(indicator, df):
+    values = [indicator.update(h, l, c) for h, l, c in zip(df['high'], df['low'], df['close'])]
+    if isinstance(values[0], tuple):
+        return [pd.Series(column, index=df.index) for column in zip(*values)]
+    return pd.Series(values, index=df.index)
+
+
+def assert_close(streamed, batch):
+    pd.testing.assert_series_equal(streamed, batch, check_names=False, check_freq=False, rtol=1e-9, atol=1e-9)
+
+
+@pytest.fixture(params=[None, 1], ids=['continuous', 'rounded'])
+def candles(request):
+    return make_candles(decimals=request.param)
+
+
+def test_moving_averages_match_batch(candles):
+    assert_close(stream(SMA(20), candles), calculate_sma(candles['close'], 20))
+    assert_close(stream(EMA(20), candles), calculate_ema(candles['close'], 20))
+
+
+def test_rsi_matches_batch(candles):
+    assert_close(stream(RSI(14), candles), calculate_rsi(candles['close'], 14))
+
+
+def test_bollinger_matches_batch(candles):
+    for streamed, batch in zip(stream(BollingerBands(20, 2.0), candles),
+                               calculate_bollinger_bands(candles['close'], 20, 2.0)):
+        assert_close(streamed, batch)
+
+
+def test_atr_and_adx_match_batch(candles):
+    high, low, close = candles['high'], candles['low'], candles['close']
+    assert_close(stream(ATR(14), candles), calculate_atr(high, low, close, 14))
+    for streamed, batch in zip(stream(ADX(14), candles), calculate_adx(high, low, close, 14)):
+        assert_close(streamed, batch)
+
+
+class RSIRegimeStrategy(Strategy):
+    """RSI momentum entries filtered by an SMA-slope regime and ADX, with an ATR stop."""
+
+    def __init__(self, rsi_period=14, ma_period=20, atr_period=14, **kwargs):
+        super().__init__(**kwargs)
+        self.rsi_period = rsi_period
+        self.ma_period = ma_period
+        self.atr_period = atr_period
+
+    def calculate_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
+        df = data.copy()
+        high, low, close = df['high'], df['low'], df['close']
+        df['rsi'] = calculate_rsi(close, self.rsi_period)
+        df['sma'] = calculate_sma(close, self.ma_period)
+        df['ema'] = calculate_ema(close, self.ma_period)
+        df['bb_upper'], df['bb_middle'], df['bb_lower'] = calculate_bollinger_bands(close, self.ma_period)
+        df['atr'] = calculate_atr(high, low, close, self.atr_period)
+        df['adx'], df['plus_di'], df['minus_di'] = calculate_adx(high, low, close, self.atr_period)
+        return df
+
+    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
+        df = self.calculate_indicators(data)
+        slope = df['sma'].diff()
+        df['regime'] = np.where(slope > 0, 'uptrend', np.where(slope < 0, 'downtrend', 'ranging'))
+        crossed_up = (df['rsi'] > 55) & (df['rsi'].shift(1) <= 55)
+        df['signal'] = np.where(crossed_up & (df['regime'] == 'uptrend') & (df['adx'] > 20), 1, 0)
+        df['exit_signal'] = (df['rsi'] < 45) | (df['close'] < df['bb_lower'])
+        df['stop_loss'] = df['close'] - 2 * df['atr']
+        return df
+
+    def create_signal_engine(self) -> StreamingIndicatorEngine:
+        return StreamingIndicatorEngine({
+            'rsi': RSI(self.rsi_period),
+            'sma': SMA(self.ma_period),
+            'ema': EMA(self.ma_period),
+            ('bb_upper', 'bb_middle', 'bb_lower'): BollingerBands(self.ma_period),
+            'atr': ATR(self.atr_period),
+            ('adx', 'plus_di', 'minus_di'): ADX(self.atr_period),
+        }, signal_fn=self._stream_signals)
+
+    @staticmethod
+    def _stream_signals(row, prev):
+        prev = prev or {}
+        slope = row['sma'] - prev.get('sma', np.nan)
+        regime = 'uptrend' if slope > 0 else 'downtrend' if slope < 0 else 'ranging'
+        crossed_up = row['rsi'] > 55 and prev.get('rsi', np.nan) <= 55
+        return {
+            'regime': regime,
+            'signal': 1 if crossed_up and regime == 'uptrend' and row['adx'] > 20 else 0,
+            'exit_signal': row['rsi'] < 45 or row['close'] < row['bb_lower'],
+            'stop_loss': row['close'] - 2 * row['atr'],
+        }
+
+    def should_enter_trade(self, row: pd.Series) -> bool:
+        return row['signal'] == 1
+
+    def should_exit_trade(self, row: pd.Series) -> bool:
+        return bool(row['exit_signal'])
+
+
+def test_engine_matches_generate_signals(candles):
+    """Feeding candles one at a time reproduces every row of generate_signals."""
+    strategy = RSIRegimeStrategy()
+    batch = strategy.generate_signals(candles)
+    engine = strategy.create_signal_engine()
+    rows = [engine.update({'timestamp': ts, **candle})
+            for ts, candle in zip(candles.index, candles.to_dict('records'))]
+    streamed = pd.DataFrame(rows)
+
+    assert list(streamed.columns) == list(batch.columns)
+    assert list(streamed.index) == list(batch.index)
+    assert batch['signal'].sum() > 5
+    for column in ['regime', 'signal', 'exit_signal']:
+        assert streamed[column].tolist() == batch[column].tolist(), column
+    for column in batch.columns.difference(['regime', 'signal', 'exit_signal']):
+        assert_close(streamed[column].astype(float), batch[column])
+
+
+def test_engine_latest_row_matches_prefix(candles):
+    """The engine's latest row equals generate_signals(history).iloc[-1] at any point."""
+    strategy = RSIRegimeStrategy()
+    for cut in [1, 15, 40, 777, len(candles)]:
+        history = candles.iloc[:cut]
+        engine = strategy.create_signal_engine()
+        latest = engine.update_many(history)
+        expected = strategy.generate_signals(history).iloc[-1]
+
+        assert latest.name == expected.name
+        assert latest['regime'] == expected['regime']
+        assert latest['signal'] == expected['signal']
+        assert bool(latest['exit_signal']) == bool(expected['exit_signal'])
+        numeric = expected.drop(['regime', 'signal', 'exit_signal']).astype(float)
+        assert_close(latest[numeric.index].astype(float), numeric)
+
+
+def test_engine_rejects_mismatched_output_names():
+    with pytest.raises(ValueError):
+        StreamingIndicatorEngine({'adx': ADX(14)})
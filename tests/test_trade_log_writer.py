@@ -0,0 +1,183 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import exc as sa_exc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.queue_processor import process_message_queue
+from app.core.trade_log.base import Base
+from app.core.trade_log.crud import create_log_entries
+from app.core.trade_log.models import EventType, OrderStatus, TradeLog
+from app.core.trade_log.writer import TradeLogWriter, is_transient_error
+
+
+def fill(i, side="BUY"):
+    return {'type': 'user_order_update', 'order_id': f"o{i}", 'client_order_id': f"c{i}",
+            'product_id': "BTC-USD", 'side': side, 'status': 'FILLED', 'cumulative_quantity': "0.01",
+            'total_fees': "0.1", 'average_filled_price': "64000.5", 'time': "2024-05-01T12:00:00Z"}
+
+
+async def make_session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'log.sqlite'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def count_rows(factory):
+    async with factory() as db:
+        return (await db.execute(select(func.count()).select_from(TradeLog))).scalar()
+
+
+class FlakySessionFactory:
+    """Wraps a session factory with a delay per session and a number of initial failures."""
+
+    def __init__(self, factory, delay=0.0, failures=0):
+        self.factory, self.delay, self.failures, self.sessions = factory, delay, failures, 0
+
+    def __call__(self):
+        self.sessions += 1
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        return self._session()
+
+    def _session(self):
+        outer = self
+
+        class _Ctx:
+            async def __aenter__(self):
+                await asyncio.sleep(outer.delay)
+                self.session = outer.factory()
+                return await self.session.__aenter__()
+
+            async def __aexit__(self, *exc):
+                return await self.session.__aexit__(*exc)
+        return _Ctx()
+
+
+def test_queue_processor_batches_fills_and_flushes_on_sentinel(tmp_path):
+    async def run():
+        engine, factory = await make_session_factory(tmp_path)
+        counting = FlakySessionFactory(factory)
+        queue = asyncio.Queue()
+        for i in range(500):
+            queue.put_nowait(fill(i, "BUY" if i % 2 else "SELL"))
+            queue.put_nowait({'type': 'ticker', 'product_id': "BTC-USD", 'price': "1"})
+        queue.put_nowait(None)
+        await process_message_queue(queue, counting)
+        rows, sessions = await count_rows(factory), counting.sessions
+        async with factory() as db:
+            first = (await db.execute(select(TradeLog).where(TradeLog.order_id == "o1"))).scalar_one()
+        await engine.dispose()
+        return rows, sessions, first
+
+    rows, sessions, first = asyncio.run(run())
+    assert rows == 500
+    assert sessions < 10
+    assert first.event_type == EventType.ENTRY_FILL and first.status == OrderStatus.FILLED
+    assert first.price == 64000.5 and first.timestamp is not None
+
+
+def test_slow_database_does_not_stall_consumer(tmp_path):
+    async def run():
+        engine, factory = await make_session_factory(tmp_path)
+        writer = TradeLogWriter(FlakySessionFactory(factory, delay=0.2), batch_size=10, max_buffer=1_000)
+        writer.start()
+        start = asyncio.get_running_loop().time()
+        for i in range(300):
+            await writer.put(event_type=EventType.ENTRY_FILL, symbol="BTC-USD", order_id=f"o{i}")
+        put_time = asyncio.get_running_loop().time() - start
+        assert await writer.close()
+        rows = await count_rows(factory)
+        await engine.dispose()
+        return put_time, rows, writer.stats()
+
+    put_time, rows, stats = asyncio.run(run())
+    assert put_time < 0.1
+    assert rows == 300 and stats['buffered'] == 0
+    assert stats['backpressure_waits'] == 0
+
+
+def test_backpressure_and_retry_when_database_falls_behind(tmp_path):
+    async def run():
+        engine, factory = await make_session_factory(tmp_path)
+        writer = TradeLogWriter(FlakySessionFactory(factory, delay=0.01, failures=2),
+                                batch_size=5, max_buffer=20, retry_delay=0.01)
+        writer.start()
+        for i in range(100):
+            await writer.put(event_type=EventType.EXIT_FILL, symbol="ETH-USD", order_id=f"o{i}")
+            assert writer.stats()['buffered'] <= 20
+        assert await writer.close()
+        rows = await count_rows(factory)
+        await engine.dispose()
+        return rows, writer.stats()
+
+    rows, stats = asyncio.run(run())
+    assert rows == 100
+    assert stats['failed_flushes'] == 2
+    assert stats['backpressure_waits'] > 0
+
+
+def test_rows_that_cannot_be_written_are_dead_lettered(tmp_path):
+    async def run():
+        engine, factory = await make_session_factory(tmp_path)
+        writer = TradeLogWriter(factory, batch_size=10, max_buffer=20, retry_delay=0.01)
+        writer.start()
+        for i in range(100):
+            fields = {'event_type': EventType.ENTRY_FILL, 'symbol': "BTC-USD", 'order_id': f"o{i}"}
+            if i == 7:
+                fields['symbol'] = None  # NOT NULL violation
+            if i == 42:
+                fields['event_timestamp'] = "yesterday"  # Not a datetime
+            # Bad rows must not block the fills queued behind them
+            await asyncio.wait_for(writer.put(**fields), timeout=5)
+        assert await writer.close()
+        async with factory() as db:
+            order_ids = set((await db.execute(select(TradeLog.order_id))).scalars().all())
+        await engine.dispose()
+        return order_ids, writer
+
+    order_ids, writer = asyncio.run(run())
+    assert order_ids == {f"o{i}" for i in range(100)} - {"o7", "o42"}
+    assert writer.stats()['rejected'] == 2 and writer.stats()['failed_flushes'] == 0
+    assert [row['order_id'] for row, _ in writer.dead_letters] == ["o7", "o42"]
+
+
+def test_only_connection_errors_are_retried():
+    assert is_transient_error(ConnectionError("refused"))
+    assert is_transient_error(sa_exc.OperationalError("INSERT", {}, Exception("database is locked")))
+    assert not is_transient_error(sa_exc.IntegrityError("INSERT", {}, Exception("NOT NULL constraint failed")))
+    assert not is_transient_error(sa_exc.DataError("INSERT", {}, Exception("invalid input")))
+
+
+def test_put_after_close_raises():
+    async def run():
+        writer = TradeLogWriter(session_factory=None)
+        assert await writer.close()
+        await writer.put(event_type=EventType.WARNING, symbol="BTC-USD")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+
+
+def test_create_log_entries_mixes_explicit_and_default_timestamps(tmp_path):
+    async def run():
+        engine, factory = await make_session_factory(tmp_path)
+        explicit = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        async with factory() as db:
+            written = await create_log_entries(db, [
+                {'event_type': EventType.SYSTEM_STATUS, 'symbol': "BTC-USD", 'timestamp': explicit},
+                {'event_type': EventType.WARNING, 'symbol': "BTC-USD", 'timestamp': None, 'notes': "x"},
+            ])
+        async with factory() as db:
+            logs = (await db.execute(select(TradeLog).order_by(TradeLog.id))).scalars().all()
+        await engine.dispose()
+        return written, logs
+
+    written, logs = asyncio.run(run())
+    assert written == 2
+    assert logs[0].timestamp.replace(tzinfo=None) == datetime(2024, 1, 1)
+    assert logs[1].timestamp is not None and logs[1].notes == "x"
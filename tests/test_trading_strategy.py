@@ -0,0 +1,58 @@
+import pytest
+import numpy as np
+
+from app.core.trading_strategy import MA_RESYNC_INTERVAL, MovingAverageState, TradingStrategy
+
+
+def make_prices(n, seed=3):
+    rng = np.random.default_rng(seed)
+    return np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.002, n))), 2)
+
+
+def test_running_sums_match_full_mean():
+    """Running-sum MAs equal np.mean over the window, including after a resync."""
+    state = MovingAverageState(short_window=20, long_window=50)
+    prices = make_prices(MA_RESYNC_INTERVAL + 500)
+    for i, price in enumerate(prices):
+        state.append(price)
+        if i >= 49 and i % 97 == 0:
+            window = prices[i - 49:i + 1]
+            assert state.short_ma == pytest.approx(np.mean(window[-20:]), rel=1e-12)
+            assert state.long_ma == pytest.approx(np.mean(window), rel=1e-12)
+    assert list(state.prices) == list(prices[-50:])
+
+
+def test_signals_match_full_window_recompute():
+    """analyze_ticker emits the same crossover signals as recomputing both means per tick."""
+    strategy = TradingStrategy(short_window=5, long_window=12)
+    prices = make_prices(3000)
+
+    signals = []
+    for price in prices:
+        signal = strategy.analyze_ticker({"product_id": "BTC-USD", "price": str(price)})
+        if signal:
+            signals.append((signal["signal"], signal["price"]))
+
+    expected, position = [], None
+    for i in range(11, len(prices)):
+        window = prices[i - 11:i + 1]
+        side = "buy" if np.mean(window[-5:]) > np.mean(window) else "sell"
+        wanted = "long" if side == "buy" else "short"
+        if position != wanted:
+            position = wanted
+            expected.append((side, prices[i]))
+
+    assert len(signals) > 10
+    assert signals == expected
+    assert strategy.price_history["BTC-USD"] is strategy.ma_state["BTC-USD"].prices
+
+
+def test_products_are_tracked_independently():
+    strategy = TradingStrategy(short_window=2, long_window=3)
+    for price in [1.0, 2.0, 3.0]:
+        strategy.analyze_ticker({"product_id": "A", "price": price})
+        strategy.analyze_ticker({"product_id": "B", "price": price * 10})
+
+    assert strategy.long_ma["A"] == pytest.approx(2.0)
+    assert strategy.long_ma["B"] == pytest.approx(20.0)
+    assert strategy.analyze_ticker({"product_id": "A", "price": 0}) is None
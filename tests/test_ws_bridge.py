@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import threading
+
+import pytest
+
+from app.core.ws_bridge import MessageBridge
+from app.core import websocket_client
+from app.core.websocket_client import CoinbaseWebSocketClient
+
+
+@pytest.fixture(autouse=True)
+def no_websocket_log_file(monkeypatch):
+    """Keep the client's websocket.log file handler from writing into the working tree."""
+    monkeypatch.setattr(websocket_client.logger, 'handlers',
+                        [h for h in websocket_client.logger.handlers if not isinstance(h, logging.FileHandler)])
+
+
+PRODUCTS = ["BTC-USD", "ETH-USD", "SOL-USD", "XRP-USD"]
+
+
+def ticker(product_id, price):
+    return {'type': 'ticker', 'product_id': product_id, 'price': str(price), 'volume_24_h': '1', 'time': 't'}
+
+
+def order_update(i):
+    return {'type': 'user_order_update', 'order_id': f"o{i}", 'status': 'FILLED'}
+
+
+def burst(bridge, n):
+    """Push n messages from a separate thread, as the websocket SDK does."""
+    def run():
+        for i in range(n):
+            bridge.put(order_update(i) if i % 50 == 0 else ticker(PRODUCTS[i % len(PRODUCTS)], i))
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+async def drain(queue, bridge, delay=0.0):
+    received = []
+    while True:
+        try:
+            message = await asyncio.wait_for(queue.get(), timeout=0.2)
+        except asyncio.TimeoutError:
+            if bridge.stats()['pending'] == 0:
+                return received
+            continue
+        received.append(message)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+def check_delivery(received, n):
+    orders = [m['order_id'] for m in received if m['type'] == 'user_order_update']
+    assert orders == [f"o{i}" for i in range(0, n, 50)]
+    # The last ticker delivered for each product is the last one sent
+    last = {}
+    for m in received:
+        if m['type'] == 'ticker':
+            last[m['product_id']] = int(m['price'])
+    expected = {}
+    for i in range(n):
+        if i % 50:
+            expected[PRODUCTS[i % len(PRODUCTS)]] = i
+    assert last == expected
+
+
+def test_burst_is_delivered_in_batches():
+    async def run():
+        queue = asyncio.Queue()
+        bridge = MessageBridge(asyncio.get_running_loop(), queue, max_batch=128, max_delay=0.002)
+        n = 20_000
+        thread = burst(bridge, n)
+        received = await drain(queue, bridge)
+        thread.join()
+        return bridge.stats(), received, n
+
+    stats, received, n = asyncio.run(run())
+    check_delivery(received, n)
+    assert stats['received'] == n
+    assert stats['delivered'] + stats['conflated'] + stats['dropped'] == n
+    assert stats['dropped'] == 0
+    # One loop wakeup per micro-batch rather than per message
+    assert stats['wakeups'] < n / 20
+    assert stats['lag_max_ms'] >= stats['lag_avg_ms'] >= 0
+
+
+def test_bounded_queue_conflates_tickers_for_slow_consumer():
+    async def run():
+        queue = asyncio.Queue(maxsize=16)
+        bridge = MessageBridge(asyncio.get_running_loop(), queue, max_batch=64, max_delay=0.001)
+        n = 5_000
+        thread = burst(bridge, n)
+        received = await drain(queue, bridge, delay=0.0005)
+        thread.join()
+        return bridge.stats(), received, n
+
+    stats, received, n = asyncio.run(run())
+    check_delivery(received, n)
+    assert stats['max_queue_depth'] <= 16
+    assert stats['conflated'] > 0
+    assert len(received) < n
+
+
+def test_full_queue_does_not_arm_immediate_flushes():
+    async def run():
+        queue = asyncio.Queue(maxsize=4)
+        bridge = MessageBridge(asyncio.get_running_loop(), queue, max_batch=8, max_delay=0.01)
+        for i in range(200):
+            bridge.put(order_update(i))
+            # Let any flush the bridge scheduled run between messages
+            await asyncio.sleep(0)
+        wakeups_while_full = bridge.stats()['wakeups']
+        received = await drain(queue, bridge)
+        return wakeups_while_full, received
+
+    wakeups_while_full, received = asyncio.run(run())
+    # One wakeup fills the queue; after that only the retry timer flushes, not one wakeup per message
+    assert wakeups_while_full <= 2
+    assert [m['order_id'] for m in received] == [f"o{i}" for i in range(200)]
+
+
+def test_overflow_sheds_tickers_but_keeps_order_updates():
+    async def run():
+        queue = asyncio.Queue()
+        bridge = MessageBridge(asyncio.get_running_loop(), queue, max_batch=10_000,
+                               max_pending=5, conflate_tickers=False)
+        for i in range(4):
+            bridge.put(order_update(i))
+        for i in range(10):
+            bridge.put(ticker("BTC-USD", i))
+        bridge.flush_now()
+        return bridge.stats(), [queue.get_nowait() for _ in range(queue.qsize())]
+
+    stats, received = asyncio.run(run())
+    assert [m.get('order_id') for m in received[:4]] == ["o0", "o1", "o2", "o3"]
+    assert [m['price'] for m in received[4:]] == ["9"]
+    assert stats['dropped'] == 9
+
+
+def test_client_routes_messages_through_bridge():
+    frame = ('{"channel":"ticker","client_id":"","timestamp":"2024-05-01T12:00:00Z","sequence_num":1,'
+             '"events":[{"type":"update","tickers":[{"type":"ticker","product_id":"BTC-USD","price":"1",'
+             '"volume_24_h":"2"},{"type":"ticker","product_id":"BTC-USD","price":"3","volume_24_h":"2"}]}]}')
+
+    async def run():
+        queue = asyncio.Queue()
+        client = CoinbaseWebSocketClient("key", "secret", ["BTC-USD"], ["ticker"],
+                                         message_queue=queue, loop=asyncio.get_running_loop())
+        assert client.bridge_stats() == {}
+        await asyncio.to_thread(client._on_message, frame)
+        message = await asyncio.wait_for(queue.get(), timeout=1)
+        return client.bridge_stats(), message, queue.qsize()
+
+    stats, message, remaining = asyncio.run(run())
+    assert message['price'] == "3"
+    assert remaining == 0
+    assert stats['conflated'] == 1 and stats['delivered'] == 1
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import logging
+
+import pytest
+from coinbase.websocket import WebsocketResponse
+
+from app.core import ws_decoder
+from app.core.ws_decoder import MessageDecoder, OrderUpdate, Ticker, peek_channel
+from app.core import websocket_client
+from app.core.websocket_client import CoinbaseWebSocketClient
+
+
+@pytest.fixture(autouse=True)
+def no_websocket_log_file(monkeypatch):
+    """Keep the client's websocket.log file handler from writing into the working tree."""
+    monkeypatch.setattr(websocket_client.logger, 'handlers',
+                        [h for h in websocket_client.logger.handlers if not isinstance(h, logging.FileHandler)])
+
+
+def ticker_frame(products=("BTC-USD", "ETH-USD"), timestamp="2024-05-01T12:00:00.123456Z"):
+    return json.dumps({
+        "channel": "ticker", "client_id": "", "timestamp": timestamp, "sequence_num": 7,
+        "events": [{"type": "update", "tickers": [
+            {"type": "ticker", "product_id": p, "price": "64000.12", "volume_24_h": "1234.5",
+             "low_24_h": "63000", "high_24_h": "65000", "low_52_w": "25000", "high_52_w": "73000",
+             "price_percent_chg_24_h": "1.5", "best_bid": "64000.10", "best_ask": "64000.14",
+             "best_bid_quantity": "0.5", "best_ask_quantity": "0.4"}
+            for p in products]}],
+    }, separators=(",", ":"))
+
+
+def user_frame(event_type="update", status="FILLED"):
+    return json.dumps({
+        "channel": "user", "client_id": "", "timestamp": "2024-05-01T12:00:01Z", "sequence_num": 8,
+        "events": [{"type": event_type, "orders": [{
+            "order_id": "abc", "client_order_id": "live_x_BUY_1", "product_id": "BTC-USD",
+            "order_side": "BUY", "status": status, "cumulative_quantity": "0.01",
+            "total_fees": "0.25", "avg_price": "64000.5", "order_type": "MARKET"}]}],
+    }, separators=(",", ":"))
+
+
+HEARTBEAT = '{"channel":"heartbeats","client_id":"","timestamp":"2024-05-01T12:00:00Z","sequence_num":1,' \
+            '"events":[{"current_time":"2024-05-01 12:00:00","heartbeat_counter":"42"}]}'
+
+
+def legacy_ticker_dicts(frame):
+    """The payloads the previous WebsocketResponse-based _on_message put on the queue."""
+    response = WebsocketResponse(json.loads(frame))
+    return [{'type': 'ticker', 'product_id': t.product_id, 'price': t.price,
+             'volume_24_h': t.volume_24_h, 'time': response.timestamp}
+            for event in response.events for t in event.tickers]
+
+
+def test_ticker_messages_match_previous_payloads():
+    frame = ticker_frame()
+    channel, messages, _ = MessageDecoder().decode(frame)
+
+    assert channel == "ticker"
+    assert all(isinstance(m, Ticker) for m in messages)
+    assert [m.to_dict() for m in messages] == legacy_ticker_dicts(frame)
+    assert messages[0].get("price") == "64000.12"
+    assert messages[0].get("index") is None
+
+
+def test_unconsumed_channels_are_skipped_without_parsing(monkeypatch):
+    def fail(raw):
+        raise AssertionError("frame should not be parsed")
+
+    monkeypatch.setattr(ws_decoder, "_loads", fail)
+    decoder = MessageDecoder()
+    assert decoder.decode(HEARTBEAT) == ("heartbeats", [], None)
+    assert decoder.decode('{"channel":"l2_data","events":[]}') == ("l2_data", [], None)
+    assert decoder.skipped == 2 and decoder.heartbeats == 1
+
+
+def test_unusual_frames_fall_back_to_full_parse():
+    assert peek_channel('{"type":"error","message":"bad"}') is None
+    channel, messages, data = MessageDecoder().decode('{ "type": "error", "message": "bad" }')
+    assert channel is None and messages == [] and data["type"] == "error"
+    with pytest.raises(ValueError):
+        MessageDecoder().decode('{"channel":"ticker", broken')
+
+
+def test_order_updates_use_advanced_trade_field_names():
+    decoder = MessageDecoder()
+    _, messages, _ = decoder.decode(user_frame())
+    assert messages == [OrderUpdate("user_order_update", "abc", "live_x_BUY_1", "BTC-USD", "BUY", "FILLED",
+                                    "0.01", "0.25", "64000.5", "2024-05-01T12:00:01Z")]
+    assert decoder.decode(user_frame(event_type="snapshot"))[1] == []
+    assert decoder.decode(user_frame(status="OPEN"))[1] == []
+
+
+@pytest.mark.parametrize("message_format", ["dict", "struct"])
+def test_client_queues_decoded_messages(message_format):
+    async def run():
+        queue = asyncio.Queue()
+        client = CoinbaseWebSocketClient(api_key="k", api_secret="s", product_ids=["BTC-USD"],
+                                         channels=["ticker"], message_queue=queue,
+                                         loop=asyncio.get_running_loop(), message_format=message_format)
+        for frame in [HEARTBEAT, ticker_frame(), user_frame(), "not json"]:
+            client._on_message(frame)
+        client.bridge.flush_now()  # delivery is batched; don't wait for the flush timer
+        return [queue.get_nowait() for _ in range(queue.qsize())]
+
+    queued = asyncio.run(run())
+    assert [m.get("type") for m in queued] == ["ticker", "ticker", "user_order_update"]
+    assert all(isinstance(m, dict) == (message_format == "dict") for m in queued)
+    assert queued[2].get("side") == "BUY" and queued[2].get("average_filled_price") == "64000.5"
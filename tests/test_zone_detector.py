@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.zone_detector import (
+    classify_candles, detect_base_patterns, detect_base_patterns_iterative,
+    find_runs, get_candle_direction, is_base_candle,
+)
+
+
+def random_ohlcv(n, seed=0, base_share=0.5):
+    """Random walk with many small-bodied candles, dojis, zero-range candles and gaps."""
+    rng = np.random.default_rng(seed)
+    open_ = 100 + np.cumsum(rng.normal(0, 1, n))
+    body = np.where(rng.random(n) < base_share, rng.normal(0, 0.1, n), rng.normal(0, 1.5, n))
+    body[rng.random(n) < 0.05] = 0.0  # dojis
+    close = open_ + body
+    high = np.maximum(open_, close) + rng.exponential(0.4, n)
+    low = np.minimum(open_, close) - rng.exponential(0.4, n)
+    flat = rng.random(n) < 0.02
+    high[flat] = low[flat] = open_[flat] = close[flat]
+    low[rng.random(n) < 0.005] = np.nan
+    timestamps = pd.date_range("2024-01-01", periods=n, freq="1h", tz="UTC")
+    return pd.DataFrame({'timestamp': timestamps, 'open': open_, 'high': high, 'low': low,
+                         'close': close, 'volume': 1.0})
+
+
+def assert_same_zones(actual, expected):
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected):
+        rsi_a, rsi_e = a.pop('rsi_at_formation'), e.pop('rsi_at_formation')
+        assert a == e
+        assert (np.isnan(rsi_a) and np.isnan(rsi_e)) or rsi_a == rsi_e
+
+
+def test_classify_candles_matches_row_functions():
+    df = random_ohlcv(500, seed=1)
+    is_base, direction = classify_candles(df['open'], df['high'], df['low'], df['close'])
+    names = {1: 'up', -1: 'down', 0: 'doji'}
+    for i in range(len(df)):
+        row = df.iloc[i]
+        assert is_base[i] == is_base_candle(row)
+        assert names[int(direction[i])] == get_candle_direction(row)
+
+
+def test_find_runs():
+    starts, ends = find_runs(np.array([1, 1, 0, 1, 0, 0, 1, 1, 1], dtype=bool))
+    assert starts.tolist() == [0, 3, 6] and ends.tolist() == [2, 4, 9]
+    starts, ends = find_runs(np.zeros(4, dtype=bool))
+    assert len(starts) == len(ends) == 0
+
+
+@pytest.mark.parametrize("seed,base_share", [(0, 0.5), (1, 0.3), (2, 0.7), (3, 0.85)])
+def test_detect_base_patterns_matches_iterative(seed, base_share):
+    df = random_ohlcv(3000, seed=seed, base_share=base_share)
+    expected = detect_base_patterns_iterative(df.copy())
+    actual = detect_base_patterns(df)
+    assert len(expected) > 50
+    assert_same_zones(actual, expected)
+    assert list(df.columns) == ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+def test_back_to_back_zones_skip_shared_leg():
+    # down leg, base, up leg, base, down leg: the second run's leg-in is the first zone's leg-out
+    rows = [(105, 106, 98, 99), (101, 102, 100, 101), (101, 108, 100.5, 107),
+            (107.2, 108, 106.5, 107.3), (107, 107.5, 100, 100), (100, 101, 99, 100.5)]
+    df = pd.DataFrame(rows, columns=['open', 'high', 'low', 'close'])
+    df.insert(0, 'timestamp', pd.date_range("2024-01-01", periods=len(df), freq="1h"))
+    zones = detect_base_patterns(df)
+    assert [(z['type'], z['leg_in_index'], z['leg_out_index']) for z in zones] == [('demand', 0, 2)]
+    assert_same_zones(zones, detect_base_patterns_iterative(df.copy()))
+    assert detect_base_patterns(df.iloc[:2]) == []
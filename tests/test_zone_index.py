@@ -0,0 +1,120 @@
+import random
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database.models import Base, Zone
+from app.core.zone_index import SymbolZoneIndex, ZoneIndex, ZoneRecord
+
+
+def random_records(n, seed=0, symbol="BTC-USD"):
+    rng = random.Random(seed)
+    records = []
+    for i in range(1, n + 1):
+        low = rng.uniform(90, 110)
+        records.append(ZoneRecord(i, symbol, "1h", rng.choice(["supply", "demand"]),
+                                  low, low + rng.uniform(0, 3) ** 2, 1000 + i))
+    return records
+
+
+def brute_force(records, low, high):
+    return sorted(r.id for r in records if r.is_active and r.zone_low <= high and r.zone_high >= low)
+
+
+def test_overlapping_matches_sql_filter_with_removals_and_adds():
+    rng = random.Random(1)
+    records = random_records(500)
+    index = SymbolZoneIndex(records)
+    for step in range(2000):
+        low = rng.uniform(85, 115)
+        high = low + rng.uniform(0, 2)
+        assert sorted(r.id for r in index.overlapping(low, high)) == brute_force(records, low, high)
+        if step % 10 == 0:
+            victim = rng.choice(records)
+            victim.is_active = False
+            index.remove(victim.id)
+        if step % 250 == 0:
+            new = random_records(20, seed=step, symbol="BTC-USD")
+            for j, r in enumerate(new):
+                r.id = 10_000 + step * 100 + j
+            records.extend(new)
+            index.add(new)
+    assert len(index) == sum(r.is_active for r in records)
+
+
+def test_boundaries_are_inclusive():
+    index = SymbolZoneIndex([ZoneRecord(1, "X", "1h", "demand", 100.0, 102.0, 0)])
+    assert [r.id for r in index.overlapping(102.0, 103.0)] == [1]
+    assert [r.id for r in index.overlapping(99.0, 100.0)] == [1]
+    assert index.overlapping(102.0001, 103.0) == []
+    assert SymbolZoneIndex().overlapping(0, 1e9) == []
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+def add_zone(session, **kwargs):
+    values = dict(symbol="BTC-USD", timeframe="1h", type="demand", zone_low=100, zone_high=102,
+                  formation_timestamp=1000, leg_in_timestamp=900, base_start_timestamp=950,
+                  base_end_timestamp=950, is_active=True, num_touches=0)
+    values.update(kwargs)
+    zone = Zone(**values)
+    session.add(zone)
+    session.commit()
+    return zone
+
+
+def test_load_flush_and_rebuild_from_db(session):
+    a = add_zone(session)
+    b = add_zone(session, type="supply", zone_low=110, zone_high=111, formation_timestamp=1001)
+    add_zone(session, zone_low=50, zone_high=51, formation_timestamp=1002, is_active=False)
+    add_zone(session, symbol="ETH-USD", formation_timestamp=1003)
+
+    zone_index = ZoneIndex()
+    assert zone_index.rebuild(session) == 3
+    btc = zone_index.get(session, "BTC-USD")
+    assert sorted(r.id for r in btc.overlapping(0, 1000)) == [a.id, b.id]
+
+    record = btc.overlapping(101, 101)[0]
+    record.num_touches, record.last_tested_timestamp, record.is_active = 2, 1100, False
+    zone_index.mark_dirty(record)
+    btc.remove(record.id)
+    # Reloading before the flush keeps the pending deactivation
+    zone_index.invalidate("BTC-USD")
+    assert [r.id for r in zone_index.get(session, "BTC-USD").overlapping(0, 1000)] == [b.id]
+
+    assert zone_index.flush(session) == 1 and zone_index.dirty == {}
+    stored = session.get(Zone, a.id)
+    assert (stored.num_touches, stored.last_tested_timestamp, stored.is_active) == (2, 1100, False)
+    assert zone_index.rebuild(session, ["BTC-USD"]) == 1
+
+
+def test_flush_without_commit_leaves_the_transaction_to_the_caller(session):
+    a = add_zone(session)
+    zone_index = ZoneIndex()
+    record = zone_index.get(session, "BTC-USD").overlapping(101, 101)[0]
+    record.num_touches = 3
+    zone_index.mark_dirty(record)
+
+    assert zone_index.flush(session, commit=False) == 1
+    assert zone_index.dirty == {} and list(zone_index.uncommitted) == [a.id]
+    assert session.in_transaction()
+    # The caller rolls back: the write is pending again
+    session.rollback()
+    zone_index.rolled_back()
+    assert list(zone_index.dirty) == [a.id] and zone_index.uncommitted == {}
+    assert session.get(Zone, a.id).num_touches == 0
+
+    assert zone_index.flush(session, commit=False) == 1
+    session.commit()
+    zone_index.committed()
+    assert zone_index.dirty == {} and zone_index.uncommitted == {}
+    session.expire_all()
+    assert session.get(Zone, a.id).num_touches == 3